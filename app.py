@@ -2,6 +2,8 @@
 拼豆图案生成系统 - FastAPI主应用
 """
 import os
+import io
+import json
 import uuid
 import shutil
 import traceback
@@ -11,11 +13,19 @@ import asyncio
 import webbrowser
 import threading
 import time
+import multiprocessing
+
+if __name__ == "__main__":
+    # 打包后的可执行文件中，进程池的工作进程从这里进入（必须在其他初始化之前）
+    multiprocessing.freeze_support()
+
+from functools import partial
 from pathlib import Path
+from urllib.parse import quote
 from typing import Optional, Dict, List
 from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -42,12 +52,23 @@ from core.image_processor import ImageProcessor
 from core.color_matcher import ColorMatcher
 from core.optimizer import PatternOptimizer
 from bead_pattern import BeadPattern
-from bead_pattern.render.technical_panel import (
-    generate_technical_sheet,
-    export_statistics,
-    TechnicalPanelConfig
-)
 from core.printer import Printer
+from core.exports import (
+    BUNDLE_ARTIFACTS, pattern_cache_key, export_png_build, print_build,
+    technical_sheet_build, statistics_build, json_build, bundle_artifact
+)
+from core.pattern_store import PatternStore
+from core.executor import create_stage_executor
+from core.jobs import (
+    JobManager, JobStage, Job, JobQueueFull, JobCancelled,
+    SUCCEEDED, CANCELLED, FINISHED_STATES
+)
+from bead_pattern.render.fonts import get_font_registry, get_sprite_atlas
+from bead_pattern.render.cache import configure_render_cache
+from bead_pattern.render.plan import RenderPlan
+from bead_pattern.render.tiles import TilePyramid, render_tile
+from bead_pattern.render.bead_sim import stream_bead_preview_png
+from bead_pattern.io import to_compact_payload, stream_zip, to_svg
 from core.nano_banana import NanoBananaClient, calculate_aspect_ratio
 
 
@@ -68,23 +89,106 @@ templates = Jinja2Templates(directory="templates")
 
 # 全局实例
 image_processor = ImageProcessor()
-color_matcher = ColorMatcher()
-pattern_optimizer = PatternOptimizer(color_matcher)
 printer = Printer()
+
+# 预览图（显示编号 / 不显示编号）共享渲染计划时在同一计划中输出
+PREVIEW_OUTPUTS = ("grid", "grid_labels")
+
+# 瓦片由图案内容哈希决定，内容不变瓦片不变，浏览器可长期缓存
+TILE_CACHE_CONTROL = "public, max-age=86400"
+
+# 导出文件的地址不变但图案可能被变换，浏览器每次用 ETag 重新验证（命中返回 304）
+EXPORT_CACHE_CONTROL = "private, no-cache"
 nano_banana_client: Optional[NanoBananaClient] = None
 
 # 线程池执行器用于CPU密集型任务
 # 使用线程池而不是进程池，因为NumPy、PIL等库在线程间共享更高效
 thread_pool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image_processing")
 
-# 存储生成的图案（内存中）
-patterns_store: Dict[str, Dict] = {}
-
+# 条目存储：内存按字节数限制，超出部分落盘到应用自己的数据目录（不在 static 目录下，
+# 不对外公开，目录权限 0700），最后一次访问后超过 TTL 自动删除
+STORE_DIR = os.path.join("data", "store")
+STORE_TTL_SECONDS = 24 * 3600
+
+# CPU 密集型阶段（图像优化、颜色匹配、预览渲染）的执行器：
+# thread 在调用线程中执行；process 在进程池中执行（工作进程预加载色板和字体，数组走共享内存）；
+# auto 多核时使用 process。可用环境变量 BEAD_STAGE_EXECUTOR / BEAD_STAGE_WORKERS 配置
+STAGE_EXECUTOR = os.environ.get("BEAD_STAGE_EXECUTOR", "auto")
+STAGE_WORKERS = int(os.environ.get("BEAD_STAGE_WORKERS", "0")) or None
+
+# 后台任务：每个阶段在各自的工作池中执行（Nano Banana 网络请求、预处理、图案生成/渲染），
+# 未完成任务数超过上限时拒绝新任务（503）
+JOB_NANO_BANANA_WORKERS = 4
+JOB_MAX_PENDING = 32
+
+# 以下对象在应用启动时创建（_startup），导入 app.py 不产生副作用：
+# 进程池（spawn）的工作进程会重新导入本模块，不能再加载色板、扫描存储目录或创建执行器
+color_matcher: Optional[ColorMatcher] = None
+pattern_optimizer: Optional[PatternOptimizer] = None
+render_cache = None
+# 存储生成的图案
+patterns_store: Optional[PatternStore] = None
 # 存储上传的文件信息（用于Nano Banana）
-uploaded_files: Dict[str, Dict] = {}
-
+uploaded_files: Optional[PatternStore] = None
 # 存储每个文件的处理步骤结果（用于分步骤处理）
-step_results: Dict[str, Dict] = {}
+step_results: Optional[PatternStore] = None
+stage_executor = None
+job_manager: Optional[JobManager] = None
+
+# 任务失败时的错误前缀（与同步接口的错误信息一致）
+JOB_ERROR_PREFIXES = {
+    "nano_banana": "转换失败",
+    "preprocess": "预处理失败",
+    "generate_pattern": "生成失败",
+    "process": "处理失败",
+    "generate_render": "生成失败",
+}
+
+# 进度事件流（SSE）的检查间隔与心跳间隔（秒）
+JOB_EVENT_POLL_SECONDS = 0.25
+JOB_EVENT_HEARTBEAT_SECONDS = 15
+
+
+@app.on_event("startup")
+def _startup():
+    """创建色板、存储、执行器和任务管理器"""
+    global color_matcher, pattern_optimizer, render_cache
+    global patterns_store, uploaded_files, step_results, stage_executor, job_manager
+
+    color_matcher = ColorMatcher()
+    pattern_optimizer = PatternOptimizer(color_matcher)
+
+    # 探测一次可用字体，所有渲染器共享
+    get_font_registry().discover()
+
+    # 渲染结果缓存（内存 LRU + data/render_cache 磁盘层，不在 static 目录下，
+    # 缓存文件只能通过按图案校验的接口获取）
+    render_cache = configure_render_cache(os.path.join("data", "render_cache"))
+
+    patterns_store = PatternStore(os.path.join(STORE_DIR, "patterns"),
+                                  max_memory_bytes=256 * 1024 * 1024, ttl_seconds=STORE_TTL_SECONDS)
+    uploaded_files = PatternStore(os.path.join(STORE_DIR, "uploads"),
+                                  max_memory_bytes=4 * 1024 * 1024, ttl_seconds=STORE_TTL_SECONDS)
+    step_results = PatternStore(os.path.join(STORE_DIR, "steps"),
+                                max_memory_bytes=32 * 1024 * 1024, ttl_seconds=STORE_TTL_SECONDS)
+
+    stage_executor = create_stage_executor(STAGE_EXECUTOR, color_matcher, pattern_optimizer,
+                                           max_workers=STAGE_WORKERS)
+
+    # 使用进程池时预处理 / 图案线程只负责等待结果，线程数与工作进程数一致
+    cpu_workers = max(2, stage_executor.max_workers)
+    job_manager = JobManager({"nano_banana": JOB_NANO_BANANA_WORKERS,
+                              "preprocess": cpu_workers, "pattern": cpu_workers},
+                             max_pending=JOB_MAX_PENDING)
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    """停止任务管理器和执行器"""
+    if job_manager is not None:
+        job_manager.shutdown()
+    if stage_executor is not None:
+        stage_executor.shutdown()
 
 
 def run_in_thread_pool(func, *args, **kwargs):
@@ -106,17 +210,164 @@ def run_in_thread_pool(func, *args, **kwargs):
     return loop.run_in_executor(thread_pool_executor, lambda: func(*args))
 
 
+def _save_step_result(file_id: str, step: str, result: Dict) -> None:
+    """保存分步结果（整个条目重新写入存储，以便重新计算内存占用）"""
+    steps = step_results.get(file_id) or {}
+    steps[step] = result
+    step_results[file_id] = steps
+
+
+def _submit_job(kind: str, stages: List[JobStage]) -> Job:
+    """提交后台任务（队列已满时返回 503）"""
+    try:
+        return job_manager.submit(kind, stages)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _job_links(job: Job) -> Dict:
+    """任务提交后的响应：任务 ID 以及状态 / 进度 / 结果 / 取消地址"""
+    base = f"/api/jobs/{job.job_id}"
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "status_url": base,
+        "events_url": f"{base}/events",
+        "result_url": f"{base}/result",
+        "cancel_url": f"{base}/cancel",
+    }
+
+
+def _job_result(job: Job):
+    """已结束任务的结果（失败 / 取消时抛出 HTTPException）"""
+    if job.status == SUCCEEDED:
+        return job.result
+    if job.status == CANCELLED:
+        raise HTTPException(status_code=409, detail="任务已取消")
+    if isinstance(job.exception, HTTPException):
+        raise job.exception
+    prefix = JOB_ERROR_PREFIXES.get(job.kind, "处理失败")
+    raise HTTPException(status_code=500, detail=f"{prefix}: {job.error}")
+
+
+async def _job_response(job: Job, async_job: bool):
+    """
+    分步接口的响应
+    
+    async_job 为 True 时立即返回任务信息（202），否则等待任务结束后返回结果（同步接口）
+    """
+    if async_job:
+        return JSONResponse(status_code=202, content=_job_links(job))
+    await asyncio.wrap_future(job.done)
+    return _job_result(job)
+
+
+def _get_stored_pattern(pattern_id: str) -> Dict:
+    """
+    取图案条目，不存在或已过期时返回 404
+
+    只读取一次存储：条目可能在检查和读取之间过期或被淘汰，先检查再读取会抛出 KeyError
+    """
+    entry = patterns_store.get(pattern_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="图案不存在")
+    return entry
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """检查 If-None-Match 是否命中 ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _content_disposition(filename: str) -> str:
+    """下载文件名响应头（非 ASCII 文件名使用 RFC 5987 编码）"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+async def _cached_file_response(request: Request, cache_key: str, suffix: str, build,
+                                media_type: str, filename: Optional[str] = None,
+                                cache_control: Optional[str] = None, persist: bool = True):
+    """
+    按缓存键返回渲染结果，支持条件请求
+    
+    - If-None-Match 命中时直接返回 304
+    - 否则从渲染缓存读取（内存 → 磁盘），都未命中时在线程池中调用 build 生成
+    - persist=False 时不写缓存目录：渲染到内存缓冲区（过大时转存匿名临时文件），
+      小结果留在内存层，大结果边读边发送
+    
+    Args:
+        request: 请求对象
+        cache_key: pattern_cache_key 生成的键
+        suffix: 文件后缀（含扩展名），例如 "_export.png"
+        build: 生成函数，参数为输出路径或二进制文件对象（persist=False）
+        media_type: 响应类型
+        filename: 下载文件名
+        cache_control: Cache-Control 响应头（None 不发送）
+        persist: 未命中时是否把结果写入磁盘缓存
+    """
+    # 同一缓存键可能对应多个文件（例如预览图的有/无编号版本），ETag 带上后缀
+    etag = f'"{cache_key}{suffix}"'
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    file, size = await run_in_thread_pool(render_cache.render, cache_key, suffix, build,
+                                          persist=persist)
+    if filename:
+        headers["Content-Disposition"] = _content_disposition(filename)
+    if isinstance(file, io.BytesIO):
+        return Response(file.getvalue(), media_type=media_type, headers=headers)
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_iter_file(file), media_type=media_type, headers=headers)
+
+
+def _iter_file(file, chunk_size: int = 1 << 20):
+    """分块读取文件对象，读完后关闭（匿名临时文件随之删除）"""
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
+
+
 # CPU密集型任务的包装函数
 def _preprocess_image(image_path: str, target_colors: int, max_dimension: int,
                      denoise_strength: float, contrast_factor: float, 
-                     sharpness_factor: float, use_custom: bool, bead_size_mm: float):
-    """在线程池中执行的图像预处理函数"""
+                     sharpness_factor: float, use_custom: bool, bead_size_mm: float,
+                     progress=None):
+    """
+    在线程池中执行的图像预处理函数
+    
+    progress(fraction, message) 用于报告进度（后台任务）；
+    多个任务可能同时执行，每次使用独立的 ImageProcessor
+    """
+    progress = progress or (lambda fraction, message=None: None)
+    
     # 加载图像
-    image_processor.load_image(image_path)
-    image_array = image_processor.get_image_array()
+    progress(0.05, "加载图像")
+    processor = ImageProcessor()
+    processor.load_image(image_path)
+    image_array = processor.get_image_array()
     
     # 应用优化
-    optimized_image, (new_width, new_height) = pattern_optimizer.apply_full_optimization(
+    progress(0.15, "优化图像")
+    optimized_image, (new_width, new_height) = stage_executor.optimize_image(
         image_array,
         target_colors=target_colors,
         max_dimension=max_dimension,
@@ -130,6 +381,7 @@ def _preprocess_image(image_path: str, target_colors: int, max_dimension: int,
     )
     
     # 保存预处理后的图像
+    progress(0.9, "保存图像")
     from PIL import Image
     processed_image = Image.fromarray(optimized_image)
     preprocess_file_id = str(uuid.uuid4())
@@ -141,15 +393,24 @@ def _preprocess_image(image_path: str, target_colors: int, max_dimension: int,
 
 def _generate_pattern(preprocess_path: str, new_width: int, new_height: int,
                      bead_size_mm: float, use_custom: bool, brand: Optional[str],
-                     series: Optional[str], match_mode: str = "nearest"):
-    """在线程池中执行的图案生成函数"""
+                     series: Optional[str], match_mode: str = "nearest",
+                     progress=None):
+    """在线程池中执行的图案生成函数（progress 同 _preprocess_image）"""
+    progress = progress or (lambda fraction, message=None: None)
+    
     # 重新加载预处理后的图像
-    image_processor.load_image(preprocess_path)
-    optimized_image = image_processor.get_image_array()
+    progress(0.05, "加载图像")
+    processor = ImageProcessor()
+    processor.load_image(preprocess_path)
+    optimized_image = processor.get_image_array()
     
-    # 颜色匹配
-    matched_colors = color_matcher.match_image_colors(
+    # 颜色匹配并生成拼豆图案
+    progress(0.1, "颜色匹配")
+    bead_pattern = stage_executor.match_pattern(
         optimized_image,
+        new_width,
+        new_height,
+        bead_size_mm,
         use_custom=use_custom,
         method="cie94",
         brand=brand if brand else None,
@@ -157,40 +418,147 @@ def _generate_pattern(preprocess_path: str, new_width: int, new_height: int,
         match_mode=match_mode
     )
     
-    # 生成拼豆图案
-    bead_pattern = BeadPattern(new_width, new_height, bead_size_mm=bead_size_mm)
-    bead_pattern.from_matched_colors(matched_colors)
+    progress(0.85, "统计颜色")
+    pattern_id = str(uuid.uuid4())
+    previews = _pattern_preview_urls(pattern_id)
+    stats, stats_without_bg, subject_size = _pattern_summary(bead_pattern)
     
-    # 生成可视化图像（显示编号和不显示编号两个版本）
-    viz_image_with_labels = bead_pattern.to_image(cell_size=10, show_labels=True, show_grid=True)
-    viz_image_no_labels = bead_pattern.to_image(cell_size=10, show_labels=False, show_grid=True)
+    return pattern_id, bead_pattern, stats, stats_without_bg, subject_size, previews
+
+
+def _preview_build(bead_pattern: BeadPattern, show_labels: bool,
+                   plan: Optional[RenderPlan] = None):
+    """
+    可视化图像的缓存键、后缀与生成函数（按内容缓存，相同图案只渲染一次）
     
-    pattern_id = str(uuid.uuid4())
-    viz_path_with_labels = f"static/output/{pattern_id}_viz.png"
-    viz_path_no_labels = f"static/output/{pattern_id}_viz_no_labels.png"
+    plan 由多个预览共享时，未命中的预览一次渲染完成，底图与网格只计算一次
+    """
+    cache_key = pattern_cache_key(bead_pattern, "preview", cell_size=10, show_grid=True)
+    suffix = "_viz.png" if show_labels else "_viz_no_labels.png"
+    output = "grid_labels" if show_labels else "grid"
+    
+    def _render(path: str):
+        if plan is None:
+            stage_executor.render_preview(bead_pattern, output, path, cell_size=10)
+        else:
+            plan.render(PREVIEW_OUTPUTS)[output].save(path)
+    
+    return cache_key, suffix, _render
+
+
+def _preview_file(bead_pattern: BeadPattern, show_labels: bool,
+                  plan: Optional[RenderPlan] = None):
+    """
+    可视化图像文件（未缓存时渲染），with 块内文件不会被缓存淘汰
+
+    用法：
+        with _preview_file(pattern, False) as path:
+            ...
+    """
+    return render_cache.pinned(*_preview_build(bead_pattern, show_labels, plan))
+
+
+def _pattern_preview_urls(pattern_id: str) -> Dict[str, str]:
+    """
+    图案结果中的预览地址
     
-    viz_image_with_labels.save(viz_path_with_labels)
-    viz_image_no_labels.save(viz_path_no_labels)
+    生成/变换时不再渲染预览图：网页端用 grid_url 的紧凑数据在 canvas 上绘制，
+    viz_url / viz_url_no_labels 在首次请求时才渲染
     
-    # 获取统计信息
+    Returns:
+        {"viz_url": ..., "viz_url_no_labels": ..., "grid_url": ...}
+    """
+    return {
+        "viz_url": f"/api/pattern/{pattern_id}/preview.png?labels=true",
+        "viz_url_no_labels": f"/api/pattern/{pattern_id}/preview.png?labels=false",
+        "grid_url": f"/api/pattern/{pattern_id}/grid",
+    }
+
+
+def _pattern_summary(bead_pattern: BeadPattern):
+    """获取统计信息和主体尺寸"""
     stats = bead_pattern.get_color_statistics(exclude_background=False)
     stats_without_bg = bead_pattern.get_color_statistics(exclude_background=True)
     subject_size = bead_pattern.get_subject_size()
+    return stats, stats_without_bg, subject_size
+
+
+def _pattern_response(pattern_id: str, bead_pattern: BeadPattern, stats: Dict,
+                      stats_without_bg: Dict, subject_size: Dict, previews: Dict) -> Dict:
+    """构造图案结果（generate-pattern / process / transform 共用）"""
+    return {
+        "pattern_id": pattern_id,
+        "content_hash": bead_pattern.content_hash,
+        "width": bead_pattern.width,
+        "height": bead_pattern.height,
+        "actual_width_mm": bead_pattern.actual_width_mm,
+        "actual_height_mm": bead_pattern.actual_height_mm,
+        "subject_width": subject_size['subject_width'],
+        "subject_height": subject_size['subject_height'],
+        "subject_width_mm": subject_size['subject_width_mm'],
+        "subject_height_mm": subject_size['subject_height_mm'],
+        "statistics": stats,
+        "subject_statistics": stats_without_bg,
+        "tiles": TilePyramid.for_pattern(bead_pattern).to_dict(),
+        **previews
+    }
+
+
+def _transform_pattern(bead_pattern: BeadPattern, params: "TransformParams"):
+    """
+    在线程池中执行的图案变换函数
+    
+    直接在色号网格上操作，不重新做颜色匹配；色板与统计缓存沿用原图案
+    """
+    operation = params.operation
+    if operation == "mirror":
+        new_pattern = bead_pattern.mirror(params.axis)
+    elif operation == "rotate":
+        new_pattern = bead_pattern.rotate(params.degrees)
+    elif operation == "crop":
+        if not params.bounds or len(params.bounds) != 4:
+            raise ValueError("crop 需要 bounds=[min_x, min_y, max_x, max_y]")
+        new_pattern = bead_pattern.crop(tuple(params.bounds))
+    elif operation == "crop_subject":
+        new_pattern = bead_pattern.crop_to_subject(margin=params.margin)
+    elif operation == "pad":
+        new_pattern = bead_pattern.pad(params.left, params.top, params.right, params.bottom,
+                                       params.color_id)
+    elif operation == "upscale":
+        new_pattern = bead_pattern.upscale(params.factor)
+    elif operation == "downscale":
+        new_pattern = bead_pattern.downscale(params.factor)
+    else:
+        raise ValueError(f"不支持的变换: {operation}")
     
-    return pattern_id, bead_pattern, stats, stats_without_bg, subject_size
+    pattern_id = str(uuid.uuid4())
+    previews = _pattern_preview_urls(pattern_id)
+    stats, stats_without_bg, subject_size = _pattern_summary(new_pattern)
+    
+    return pattern_id, new_pattern, stats, stats_without_bg, subject_size, previews
+
+
+def _print_build(bead_pattern: BeadPattern, params: "PrintParams"):
+    """打印PDF的缓存键、后缀与生成函数（相同内容和参数复用已生成的文件）"""
+    return print_build(bead_pattern, printer=printer, **params.dict())
 
 
-def _generate_pdf(pattern: BeadPattern, pdf_path: str, paper_size: str,
-                 margin_mm: float, show_grid: bool, show_labels: bool, dpi: int):
-    """在线程池中执行的PDF生成函数"""
-    printer.generate_pdf(
-        pattern,
-        pdf_path,
-        paper_size=paper_size,
-        margin_mm=margin_mm,
-        show_grid=show_grid,
-        show_labels=show_labels,
-        dpi=dpi
+def _technical_sheet_build(bead_pattern: BeadPattern, params: "TechnicalPanelParams"):
+    """
+    工程图纸的缓存键、后缀与生成函数
+    
+    params.paginate 为 True 时生成分页 PDF，否则生成单张 PNG（工程图纸通常不显示编号）
+    """
+    return technical_sheet_build(
+        bead_pattern,
+        paginate=params.paginate,
+        font_size=params.font_size,
+        color_block_size=params.color_block_size,
+        row_height=params.row_height,
+        panel_padding=params.panel_padding,
+        margin_from_pattern=params.margin_from_pattern,
+        exclude_background=params.exclude_background,
+        paper_size=params.paper_size
     )
 
 
@@ -225,7 +593,24 @@ class PrintParams(BaseModel):
     margin_mm: float = 10.0
     show_grid: bool = True
     show_labels: bool = True  # 默认显示色号，因为PDF需要保存带色号的图
-    dpi: int = 300
+    dpi: int = 300  # 仅位图PDF使用
+    vector: bool = True  # 矢量PDF（False 时嵌入整页位图）
+    tiled: bool = False  # 1:1 分页打印（不缩放，大图案拆成多页拼接）
+    overlap_cells: int = 2  # 分页打印时相邻页重叠的格数
+
+
+class TransformParams(BaseModel):
+    operation: str  # mirror / rotate / crop / crop_subject / pad / upscale / downscale
+    axis: str = "horizontal"  # mirror: horizontal / vertical
+    degrees: int = 90  # rotate: 90 / 180 / 270（顺时针）
+    bounds: Optional[List[int]] = None  # crop: [min_x, min_y, max_x, max_y]
+    margin: int = 0  # crop_subject: 主体四周保留的拼豆数
+    left: int = 0  # pad
+    top: int = 0
+    right: int = 0
+    bottom: int = 0
+    color_id: int = -1  # pad: 填充颜色ID，-1 为空白
+    factor: int = 2  # upscale / downscale
 
 
 class TechnicalPanelParams(BaseModel):
@@ -239,6 +624,8 @@ class TechnicalPanelParams(BaseModel):
     show_bead_size: bool = True
     sort_by_count: bool = True
     exclude_background: bool = True
+    paginate: bool = False  # 分页 PDF：封面（缩略图 + 信息区）+ 带坐标标尺的分页主网格
+    paper_size: str = "A4"  # 仅分页模式使用
 
 
 class NanoBananaConfig(BaseModel):
@@ -335,96 +722,89 @@ async def step_nano_banana(
     prompt: str = Form("拼豆风格，像素艺术，清晰的色块"),
     model: str = Form("nano-banana-fast"),
     image_size: str = Form("1K"),
-    max_dimension: int = Form(200)
+    max_dimension: int = Form(200),
+    async_job: bool = Form(False)
 ):
     """
     步骤1: Nano Banana AI转换
+
+    async_job 为 True 时立即返回任务信息，通过 /api/jobs/{job_id} 系列接口获取进度和结果
     """
-    try:
-        if not nano_banana_client:
-            raise HTTPException(status_code=400, detail="请先配置Nano Banana API")
-        
-        # 查找上传的文件
-        image_files = list(Path("static/images").glob(f"{file_id}.*"))
-        if not image_files:
-            raise HTTPException(status_code=404, detail="图像文件不存在")
-        
-        image_path = str(image_files[0])
-        file_info = uploaded_files.get(file_id, {})
-        original_width = file_info.get("width", 0)
-        original_height = file_info.get("height", 0)
-        
-        # 计算aspectRatio
-        if original_width > 0 and original_height > 0:
-            aspect_ratio = calculate_aspect_ratio(original_width, original_height)
-        else:
-            aspect_ratio = "auto"
-        
-        logger.info(f"开始Nano Banana转换: file_id={file_id}, prompt={prompt}, model={model}")
-        
-        # 在线程池中执行Nano Banana API调用（I/O密集型任务，使用同步requests库会阻塞事件循环）
-        def _call_nano_banana():
-            # 调用Nano Banana API
-            result = nano_banana_client.generate_image(
-                prompt=prompt,
-                image_path=image_path,
-                model=model,
-                aspect_ratio=aspect_ratio,
-                image_size=image_size,
-                max_dimension=max_dimension,
-                timeout=300
-            )
-            
-            # 下载生成的图片
-            if result.get("results") and len(result["results"]) > 0:
-                generated_image_url = result["results"][0]["url"]
-                nano_banana_file_id = str(uuid.uuid4())
-                downloaded_path = nano_banana_client.download_image(
-                    generated_image_url,
-                    save_path=f"static/images/nano_banana_{nano_banana_file_id}.png"
-                )
-                return result, nano_banana_file_id, downloaded_path
-            else:
-                raise ValueError("Nano Banana API未返回图片")
-        
-        result, nano_banana_file_id, downloaded_path = await run_in_thread_pool(_call_nano_banana)
-        
-        # 处理结果
-        if result and downloaded_path:
-            
-            # 保存步骤结果
-            if file_id not in step_results:
-                step_results[file_id] = {}
-            step_results[file_id]["nano_banana"] = {
-                "image_path": downloaded_path,
-                "file_id": nano_banana_file_id,
-                "url": f"/static/images/nano_banana_{nano_banana_file_id}.png",
-                "params": {
-                    "prompt": prompt,
-                    "model": model,
-                    "image_size": image_size,
-                    "max_dimension": max_dimension
-                }
-            }
-            
-            logger.info(f"Nano Banana转换完成: {downloaded_path}")
-            
-            return {
-                "success": True,
-                "image_url": f"/static/images/nano_banana_{nano_banana_file_id}.png",
-                "file_id": nano_banana_file_id
-            }
-        else:
+    if not nano_banana_client:
+        raise HTTPException(status_code=400, detail="请先配置Nano Banana API")
+
+    # 查找上传的文件
+    image_files = list(Path("static/images").glob(f"{file_id}.*"))
+    if not image_files:
+        raise HTTPException(status_code=404, detail="图像文件不存在")
+
+    image_path = str(image_files[0])
+    file_info = uploaded_files.get(file_id, {})
+    original_width = file_info.get("width", 0)
+    original_height = file_info.get("height", 0)
+
+    # 计算aspectRatio
+    if original_width > 0 and original_height > 0:
+        aspect_ratio = calculate_aspect_ratio(original_width, original_height)
+    else:
+        aspect_ratio = "auto"
+
+    logger.info(f"开始Nano Banana转换: file_id={file_id}, prompt={prompt}, model={model}")
+
+    # 在任务工作池中执行Nano Banana API调用（I/O密集型任务，使用同步requests库会阻塞事件循环）
+    def _call_nano_banana(ctx):
+        ctx.progress(0.0, "等待 Nano Banana 生成图片")
+        # 调用Nano Banana API
+        result = nano_banana_client.generate_image(
+            prompt=prompt,
+            image_path=image_path,
+            model=model,
+            aspect_ratio=aspect_ratio,
+            image_size=image_size,
+            max_dimension=max_dimension,
+            timeout=300
+        )
+        ctx.check_cancelled()
+
+        # 下载生成的图片
+        if not (result and result.get("results") and len(result["results"]) > 0):
             raise HTTPException(status_code=500, detail="Nano Banana API未返回图片")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
-        logger.error(f"Nano Banana转换失败: {error_msg}")
-        logger.error(f"详细错误:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"转换失败: {error_msg}")
+
+        ctx.progress(0.9, "下载图片")
+        generated_image_url = result["results"][0]["url"]
+        nano_banana_file_id = str(uuid.uuid4())
+        downloaded_path = nano_banana_client.download_image(
+            generated_image_url,
+            save_path=f"static/images/nano_banana_{nano_banana_file_id}.png"
+        )
+        if not downloaded_path:
+            raise HTTPException(status_code=500, detail="Nano Banana API未返回图片")
+
+        # 保存步骤结果
+        _save_step_result(file_id, "nano_banana", {
+            "image_path": downloaded_path,
+            "file_id": nano_banana_file_id,
+            "url": f"/static/images/nano_banana_{nano_banana_file_id}.png",
+            "params": {
+                "prompt": prompt,
+                "model": model,
+                "image_size": image_size,
+                "max_dimension": max_dimension
+            }
+        })
+
+        logger.info(f"Nano Banana转换完成: {downloaded_path}")
+
+        return {
+            "success": True,
+            "image_url": f"/static/images/nano_banana_{nano_banana_file_id}.png",
+            "file_id": nano_banana_file_id
+        }
+
+    job = _submit_job("nano_banana", [
+        JobStage("nano_banana", _call_nano_banana, label="Nano Banana 转换"),
+    ])
+    return await _job_response(job, async_job)
 
 
 @app.post("/api/step/preprocess")
@@ -437,11 +817,12 @@ async def step_preprocess(
     sharpness_factor: float = Form(1.1),
     use_custom: bool = Form(True),
     use_nano_banana_result: bool = Form(False),
-    bead_size_mm: float = Form(2.6)
+    bead_size_mm: float = Form(2.6),
+    async_job: bool = Form(False)
 ):
     """
     步骤2: 图像预处理（降噪、对比度、锐度、颜色优化）
-    
+
     Args:
         file_id: 文件ID
         max_dimension: 最大尺寸（拼豆数量）
@@ -452,24 +833,25 @@ async def step_preprocess(
         use_custom: 是否使用自定义色板
         use_nano_banana_result: 是否使用Nano Banana结果
         bead_size_mm: 拼豆大小（毫米），2.6或5.0
+        async_job: 是否以后台任务方式执行（立即返回任务信息）
     """
-    try:
-        # 确定输入图片路径
-        if use_nano_banana_result and file_id in step_results and "nano_banana" in step_results[file_id]:
-            # 使用Nano Banana的结果
-            input_image_path = step_results[file_id]["nano_banana"]["image_path"]
-            logger.info(f"使用Nano Banana转换后的图片: {input_image_path}")
-        else:
-            # 使用原始上传的图片
-            image_files = list(Path("static/images").glob(f"{file_id}.*"))
-            if not image_files:
-                raise HTTPException(status_code=404, detail="图像文件不存在")
-            input_image_path = str(image_files[0])
-            logger.info(f"使用原始图片: {input_image_path}")
-        
-        # 在线程池中执行图像预处理（CPU密集型任务）
-        preprocess_file_id, preprocess_path, new_width, new_height = await run_in_thread_pool(
-            _preprocess_image,
+    # 确定输入图片路径
+    steps = step_results.get(file_id) or {}
+    if use_nano_banana_result and "nano_banana" in steps:
+        # 使用Nano Banana的结果
+        input_image_path = steps["nano_banana"]["image_path"]
+        logger.info(f"使用Nano Banana转换后的图片: {input_image_path}")
+    else:
+        # 使用原始上传的图片
+        image_files = list(Path("static/images").glob(f"{file_id}.*"))
+        if not image_files:
+            raise HTTPException(status_code=404, detail="图像文件不存在")
+        input_image_path = str(image_files[0])
+        logger.info(f"使用原始图片: {input_image_path}")
+
+    def _preprocess(ctx):
+        # 在预处理工作池中执行图像预处理（CPU密集型任务）
+        preprocess_file_id, preprocess_path, new_width, new_height = _preprocess_image(
             input_image_path,
             target_colors,
             max_dimension,
@@ -477,24 +859,22 @@ async def step_preprocess(
             contrast_factor,
             sharpness_factor,
             use_custom,
-            bead_size_mm
+            bead_size_mm,
+            progress=ctx.progress
         )
-        
+
         # 验证拼豆大小
-        if bead_size_mm not in [2.6, 5.0]:
-            bead_size_mm = 2.6  # 默认使用2.6mm
-        
+        validated_bead_size = bead_size_mm if bead_size_mm in [2.6, 5.0] else 2.6  # 默认使用2.6mm
+
         # 保存步骤结果
-        if file_id not in step_results:
-            step_results[file_id] = {}
-        step_results[file_id]["preprocess"] = {
+        _save_step_result(file_id, "preprocess", {
             "image_path": preprocess_path,
             "file_id": preprocess_file_id,
             "url": f"/static/output/preprocess_{preprocess_file_id}.png",
             "image_array": None,  # 不保存numpy数组，太大
             "width": new_width,
             "height": new_height,
-            "bead_size_mm": bead_size_mm,  # 保存拼豆大小
+            "bead_size_mm": validated_bead_size,  # 保存拼豆大小
             "params": {
                 "max_dimension": max_dimension,
                 "target_colors": target_colors,
@@ -502,29 +882,60 @@ async def step_preprocess(
                 "contrast_factor": contrast_factor,
                 "sharpness_factor": sharpness_factor,
                 "use_custom": use_custom,
-                "bead_size_mm": bead_size_mm
+                "bead_size_mm": validated_bead_size
             }
-        }
-        
+        })
+
         logger.info(f"预处理完成: {preprocess_path}, 尺寸: {new_width}x{new_height}")
-        
+
         return {
             "success": True,
             "image_url": f"/static/output/preprocess_{preprocess_file_id}.png",
             "width": new_width,
             "height": new_height,
             "file_id": preprocess_file_id,
-            "bead_size_mm": bead_size_mm  # 返回拼豆大小
+            "bead_size_mm": validated_bead_size  # 返回拼豆大小
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
-        logger.error(f"预处理失败: {error_msg}")
-        logger.error(f"详细错误:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"预处理失败: {error_msg}")
+
+    job = _submit_job("preprocess", [JobStage("preprocess", _preprocess, label="预处理")])
+    return await _job_response(job, async_job)
+
+
+def _generate_pattern_stage(file_id: str, preprocess_result: Dict, bead_size_mm: float,
+                            use_custom: bool, brand: Optional[str], series: Optional[str],
+                            match_mode: str):
+    """分步生成图案的任务阶段（生成图案并保存到图案存储与步骤结果）"""
+    def _generate(ctx):
+        pattern_id, bead_pattern, stats, stats_without_bg, subject_size, previews = _generate_pattern(
+            preprocess_result["image_path"],
+            preprocess_result["width"],
+            preprocess_result["height"],
+            bead_size_mm,
+            use_custom,
+            brand,
+            series,
+            match_mode,
+            progress=ctx.progress
+        )
+
+        # 保存图案
+        patterns_store[pattern_id] = {
+            "pattern": bead_pattern,
+            "file_id": file_id,
+            "params": preprocess_result["params"]
+        }
+
+        result = _pattern_response(pattern_id, bead_pattern, stats, stats_without_bg,
+                                   subject_size, previews)
+
+        # 保存步骤结果
+        _save_step_result(file_id, "generate_pattern", result)
+
+        logger.info(f"图案生成完成: pattern_id={pattern_id}, 主体尺寸: {subject_size['subject_width']}×{subject_size['subject_height']} ({subject_size['subject_width_mm']:.1f}×{subject_size['subject_height_mm']:.1f}mm)")
+
+        return {"success": True, **result}
+
+    return JobStage("generate_pattern", _generate, pool="pattern", label="生成图案")
 
 
 @app.post("/api/step/generate-pattern")
@@ -534,98 +945,38 @@ async def step_generate_pattern(
     bead_size_mm: float = Form(2.6),
     brand: Optional[str] = Form(None),
     series: Optional[str] = Form(None),
-    match_mode: str = Form("nearest")
+    match_mode: str = Form("nearest"),
+    async_job: bool = Form(False)
 ):
     """
     步骤3: 生成拼豆图案
-    
+
     Args:
         file_id: 文件ID
         use_custom: 是否使用自定义色板
         bead_size_mm: 拼豆大小（毫米），2.6或5.0
+        async_job: 是否以后台任务方式执行（立即返回任务信息）
     """
-    try:
-        # 验证拼豆大小
-        if bead_size_mm not in [2.6, 5.0]:
-            bead_size_mm = 2.6  # 默认使用2.6mm
-        
-        # 检查是否有预处理结果
-        if file_id not in step_results or "preprocess" not in step_results[file_id]:
-            raise HTTPException(status_code=400, detail="请先执行预处理步骤")
-        
-        preprocess_result = step_results[file_id]["preprocess"]
-        preprocess_path = preprocess_result["image_path"]
-        new_width = preprocess_result["width"]
-        new_height = preprocess_result["height"]
-        
-        # 从预处理结果中获取拼豆大小（如果存在），否则使用传入的参数
-        if "bead_size_mm" in preprocess_result:
-            bead_size_mm = preprocess_result["bead_size_mm"]
-        
-        # 在线程池中执行图案生成（CPU密集型任务）
-        pattern_id, bead_pattern, stats, stats_without_bg, subject_size = await run_in_thread_pool(
-            _generate_pattern,
-            preprocess_path,
-            new_width,
-            new_height,
-            bead_size_mm,
-            use_custom,
-            brand if brand else None,
-            series if series else None,
-            match_mode
-        )
-        
-        # 保存图案（这个操作很快，不需要在线程池中执行）
-        patterns_store[pattern_id] = {
-            "pattern": bead_pattern,
-            "file_id": file_id,
-            "params": preprocess_result["params"]
-        }
-        
-        # 保存步骤结果
-        step_results[file_id]["generate_pattern"] = {
-            "pattern_id": pattern_id,
-            "viz_url": f"/static/output/{pattern_id}_viz.png",
-            "viz_url_no_labels": f"/static/output/{pattern_id}_viz_no_labels.png",
-            "width": new_width,
-            "height": new_height,
-            "actual_width_mm": bead_pattern.actual_width_mm,
-            "actual_height_mm": bead_pattern.actual_height_mm,
-            "subject_width": subject_size['subject_width'],
-            "subject_height": subject_size['subject_height'],
-            "subject_width_mm": subject_size['subject_width_mm'],
-            "subject_height_mm": subject_size['subject_height_mm'],
-            "statistics": stats,
-            "subject_statistics": stats_without_bg
-        }
-        
-        logger.info(f"图案生成完成: pattern_id={pattern_id}, 主体尺寸: {subject_size['subject_width']}×{subject_size['subject_height']} ({subject_size['subject_width_mm']:.1f}×{subject_size['subject_height_mm']:.1f}mm)")
-        
-        return {
-            "success": True,
-            "pattern_id": pattern_id,
-            "width": new_width,
-            "height": new_height,
-            "actual_width_mm": bead_pattern.actual_width_mm,
-            "actual_height_mm": bead_pattern.actual_height_mm,
-            "subject_width": subject_size['subject_width'],
-            "subject_height": subject_size['subject_height'],
-            "subject_width_mm": subject_size['subject_width_mm'],
-            "subject_height_mm": subject_size['subject_height_mm'],
-            "statistics": stats,
-            "subject_statistics": stats_without_bg,
-            "viz_url": f"/static/output/{pattern_id}_viz.png",
-            "viz_url_no_labels": f"/static/output/{pattern_id}_viz_no_labels.png"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
-        logger.error(f"图案生成失败: {error_msg}")
-        logger.error(f"详细错误:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"生成失败: {error_msg}")
+    # 验证拼豆大小
+    if bead_size_mm not in [2.6, 5.0]:
+        bead_size_mm = 2.6  # 默认使用2.6mm
+
+    # 检查是否有预处理结果
+    steps = step_results.get(file_id) or {}
+    if "preprocess" not in steps:
+        raise HTTPException(status_code=400, detail="请先执行预处理步骤")
+
+    preprocess_result = steps["preprocess"]
+
+    # 从预处理结果中获取拼豆大小（如果存在），否则使用传入的参数
+    if "bead_size_mm" in preprocess_result:
+        bead_size_mm = preprocess_result["bead_size_mm"]
+
+    job = _submit_job("generate_pattern", [
+        _generate_pattern_stage(file_id, preprocess_result, bead_size_mm, use_custom,
+                                brand if brand else None, series if series else None, match_mode),
+    ])
+    return await _job_response(job, async_job)
 
 
 @app.get("/api/step/{file_id}/status")
@@ -633,11 +984,11 @@ async def get_step_status(file_id: str):
     """
     获取文件的处理步骤状态
     """
-    if file_id not in step_results:
+    steps = step_results.get(file_id)
+    if steps is None:
         return {"steps": {}}
     
     status = {"steps": {}}
-    steps = step_results[file_id]
     
     if "nano_banana" in steps:
         status["steps"]["nano_banana"] = {
@@ -658,7 +1009,10 @@ async def get_step_status(file_id: str):
             "completed": True,
             "pattern_id": steps["generate_pattern"]["pattern_id"],
             "viz_url": steps["generate_pattern"]["viz_url"],
-            "viz_url_no_labels": steps["generate_pattern"].get("viz_url_no_labels", steps["generate_pattern"]["viz_url"])
+            "viz_url_no_labels": steps["generate_pattern"].get("viz_url_no_labels", steps["generate_pattern"]["viz_url"]),
+            "grid_url": steps["generate_pattern"].get("grid_url"),
+            "content_hash": steps["generate_pattern"].get("content_hash"),
+            "tiles": steps["generate_pattern"].get("tiles")
         }
     
     if "generate_render" in steps:
@@ -684,97 +1038,100 @@ async def process_image(
     nano_banana_prompt: str = Form("像素艺术风格，一格一格的色块，清晰的像素点阵，无网格线，纯色块拼接，像素化处理，马赛克风格，8位像素艺术，移除所有背景，移除所有文字和字幕，只保留角色主体，角色抠图，纯白色背景，小尺寸像素图，控制在有限像素内尽可能还原角色细节，适合拼豆制作的小尺寸像素艺术"),
     nano_banana_model: str = Form("nano-banana-fast"),
     nano_banana_image_size: str = Form("1K"),
-    match_mode: str = Form("nearest")
+    match_mode: str = Form("nearest"),
+    async_job: bool = Form(False)
 ):
     """
     处理图像生成拼豆图案（旧API，保持向后兼容）
+
+    依次执行 Nano Banana（可选）、预处理、图案生成三个阶段；
+    async_job 为 True 时立即返回任务信息
     """
-    try:
-        # 查找上传的文件
-        image_files = list(Path("static/images").glob(f"{file_id}.*"))
-        if not image_files:
-            raise HTTPException(status_code=404, detail="图像文件不存在")
-        
-        image_path = str(image_files[0])
-        file_info = uploaded_files.get(file_id, {})
-        original_width = file_info.get("width", 0)
-        original_height = file_info.get("height", 0)
-        
-        # 调试日志：检查参数和客户端状态
-        logger.info(f"处理参数 - use_nano_banana: {use_nano_banana}, nano_banana_client: {nano_banana_client is not None}")
-        logger.info(f"Nano Banana参数 - prompt: {nano_banana_prompt}, model: {nano_banana_model}, image_size: {nano_banana_image_size}")
-        
-        # 如果启用Nano Banana，先调用API转换图片
-        if use_nano_banana:
-            if not nano_banana_client:
-                logger.warning("Nano Banana已启用，但客户端未配置，请先配置API")
-            else:
-                try:
-                    logger.info("开始调用Nano Banana API转换图片...")
-                    
-                    # 计算aspectRatio
-                    if original_width > 0 and original_height > 0:
-                        aspect_ratio = calculate_aspect_ratio(original_width, original_height)
-                    else:
-                        aspect_ratio = "auto"
-                    
-                    # 在线程池中执行Nano Banana API调用
-                    def _call_nano_banana_legacy():
-                        # 调用Nano Banana API
-                        result = nano_banana_client.generate_image(
-                            prompt=nano_banana_prompt,
-                            image_path=image_path,
-                            model=nano_banana_model,
-                            aspect_ratio=aspect_ratio,
-                            image_size=nano_banana_image_size,
-                            max_dimension=max_dimension,
-                            timeout=300
-                        )
-                        
-                        # 下载生成的图片
-                        if result.get("results") and len(result["results"]) > 0:
-                            generated_image_url = result["results"][0]["url"]
-                            nano_banana_file_id = str(uuid.uuid4())
-                            downloaded_path = nano_banana_client.download_image(
-                                generated_image_url,
-                                save_path=f"static/images/nano_banana_{nano_banana_file_id}.png"
-                            )
-                            return downloaded_path
-                        else:
-                            return None
-                    
-                    downloaded_path = await run_in_thread_pool(_call_nano_banana_legacy)
-                    
+    # 查找上传的文件
+    image_files = list(Path("static/images").glob(f"{file_id}.*"))
+    if not image_files:
+        raise HTTPException(status_code=404, detail="图像文件不存在")
+
+    image_path = str(image_files[0])
+    file_info = uploaded_files.get(file_id, {})
+    original_width = file_info.get("width", 0)
+    original_height = file_info.get("height", 0)
+
+    # 调试日志：检查参数和客户端状态
+    logger.info(f"处理参数 - use_nano_banana: {use_nano_banana}, nano_banana_client: {nano_banana_client is not None}")
+    logger.info(f"Nano Banana参数 - prompt: {nano_banana_prompt}, model: {nano_banana_model}, image_size: {nano_banana_image_size}")
+
+    stages = []
+
+    # 如果启用Nano Banana，先调用API转换图片
+    if use_nano_banana and not nano_banana_client:
+        logger.warning("Nano Banana已启用，但客户端未配置，请先配置API")
+    elif use_nano_banana:
+        # 计算aspectRatio
+        if original_width > 0 and original_height > 0:
+            aspect_ratio = calculate_aspect_ratio(original_width, original_height)
+        else:
+            aspect_ratio = "auto"
+
+        def _call_nano_banana_legacy(ctx):
+            # 失败时返回 None，后续阶段使用原始图片
+            try:
+                logger.info("开始调用Nano Banana API转换图片...")
+                ctx.progress(0.0, "等待 Nano Banana 生成图片")
+                # 调用Nano Banana API
+                result = nano_banana_client.generate_image(
+                    prompt=nano_banana_prompt,
+                    image_path=image_path,
+                    model=nano_banana_model,
+                    aspect_ratio=aspect_ratio,
+                    image_size=nano_banana_image_size,
+                    max_dimension=max_dimension,
+                    timeout=300
+                )
+                ctx.check_cancelled()
+
+                # 下载生成的图片
+                if result.get("results") and len(result["results"]) > 0:
+                    ctx.progress(0.9, "下载图片")
+                    generated_image_url = result["results"][0]["url"]
+                    nano_banana_file_id = str(uuid.uuid4())
+                    downloaded_path = nano_banana_client.download_image(
+                        generated_image_url,
+                        save_path=f"static/images/nano_banana_{nano_banana_file_id}.png"
+                    )
                     if downloaded_path:
-                        # 使用生成的图片
-                        image_path = downloaded_path
                         logger.info(f"Nano Banana转换完成，图片已保存到: {downloaded_path}")
-                    else:
-                        logger.warning("Nano Banana API未返回图片，使用原始图片")
-                except Exception as e:
-                    logger.error(f"Nano Banana API调用失败: {str(e)}")
-                    logger.warning("将使用原始图片继续处理")
-                    # 继续使用原始图片
-        else:
-            logger.info("未启用Nano Banana，使用原始图片处理")
-        
-        # 在线程池中执行图像预处理（CPU密集型任务）
-        # 先预处理图像
-        _, preprocess_path, new_width, new_height = await run_in_thread_pool(
-            _preprocess_image,
-            image_path,
+                        return downloaded_path
+                logger.warning("Nano Banana API未返回图片，使用原始图片")
+            except JobCancelled:
+                raise
+            except Exception as e:
+                logger.error(f"Nano Banana API调用失败: {str(e)}")
+                logger.warning("将使用原始图片继续处理")
+            return None
+
+        stages.append(JobStage("nano_banana", _call_nano_banana_legacy, weight=6,
+                               label="Nano Banana 转换"))
+    else:
+        logger.info("未启用Nano Banana，使用原始图片处理")
+
+    def _preprocess(ctx):
+        # 使用 Nano Banana 生成的图片（未启用或失败时使用原始图片）
+        return _preprocess_image(
+            ctx.results.get("nano_banana") or image_path,
             target_colors,
             max_dimension,
             denoise_strength,
             contrast_factor,
             sharpness_factor,
             use_custom,
-            2.6  # 默认拼豆大小
+            2.6,  # 默认拼豆大小
+            progress=ctx.progress
         )
-        
-        # 在线程池中执行图案生成（CPU密集型任务）
-        pattern_id, bead_pattern, stats, stats_without_bg, subject_size = await run_in_thread_pool(
-            _generate_pattern,
+
+    def _generate(ctx):
+        _, preprocess_path, new_width, new_height = ctx.results["preprocess"]
+        pattern_id, bead_pattern, stats, stats_without_bg, subject_size, previews = _generate_pattern(
             preprocess_path,
             new_width,
             new_height,
@@ -782,10 +1139,11 @@ async def process_image(
             use_custom,
             None,  # 不使用品牌过滤（旧API）
             None,   # 不使用系列过滤（旧API）
-            match_mode
+            match_mode,
+            progress=ctx.progress
         )
-        
-        # 保存图案（这个操作很快，不需要在线程池中执行）
+
+        # 保存图案
         patterns_store[pattern_id] = {
             "pattern": bead_pattern,
             "file_id": file_id,
@@ -795,40 +1153,62 @@ async def process_image(
                 "use_custom": use_custom
             }
         }
-        
-        return {
-            "pattern_id": pattern_id,
-            "width": new_width,
-            "height": new_height,
-            "actual_width_mm": bead_pattern.actual_width_mm,
-            "actual_height_mm": bead_pattern.actual_height_mm,
-            "subject_width": subject_size['subject_width'],
-            "subject_height": subject_size['subject_height'],
-            "subject_width_mm": subject_size['subject_width_mm'],
-            "subject_height_mm": subject_size['subject_height_mm'],
-            "statistics": stats,
-            "subject_statistics": stats_without_bg,
-            "viz_url": f"/static/output/{pattern_id}_viz.png",
-            "viz_url_no_labels": f"/static/output/{pattern_id}_viz_no_labels.png"
-        }
-    except Exception as e:
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
-        logger.error(f"处理图像失败: {error_msg}")
-        logger.error(f"详细错误:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"处理失败: {error_msg}")
+
+        return _pattern_response(pattern_id, bead_pattern, stats, stats_without_bg,
+                                 subject_size, previews)
+
+    stages.append(JobStage("preprocess", _preprocess, weight=2, label="预处理"))
+    stages.append(JobStage("generate_pattern", _generate, pool="pattern", weight=2, label="生成图案"))
+
+    job = _submit_job("process", stages)
+    return await _job_response(job, async_job)
 
 
 @app.get("/api/pattern/{pattern_id}")
-async def get_pattern(pattern_id: str):
+async def get_pattern(pattern_id: str, request: Request):
     """
-    获取生成的图案数据
+    获取生成的图案数据（带 ETag，支持 If-None-Match）
     """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    etag = f'"{pattern.content_hash}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(pattern.to_dict(), headers={"ETag": etag})
+
+
+@app.post("/api/pattern/{pattern_id}/transform")
+async def transform_pattern(pattern_id: str, params: TransformParams):
+    """
+    镜像 / 旋转 / 裁剪 / 加边 / 整数缩放已生成的图案
+    
+    直接在色号网格上变换，无需从上传开始重新处理；
+    结果保存为新的 pattern_id，原图案保持不变
+    """
+    stored_data = _get_stored_pattern(pattern_id)
     
-    pattern = patterns_store[pattern_id]["pattern"]
-    return pattern.to_dict()
+    try:
+        new_id, new_pattern, stats, stats_without_bg, subject_size, previews = await run_in_thread_pool(
+            _transform_pattern, stored_data["pattern"], params
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    patterns_store[new_id] = {
+        "pattern": new_pattern,
+        "file_id": stored_data["file_id"],
+        "params": stored_data["params"],
+        "source_pattern_id": pattern_id
+    }
+    
+    result = _pattern_response(new_id, new_pattern, stats, stats_without_bg, subject_size, previews)
+    
+    # 分步骤流程中后续步骤使用变换后的图案
+    file_id = stored_data["file_id"]
+    if "generate_pattern" in (step_results.get(file_id) or {}):
+        _save_step_result(file_id, "generate_pattern", dict(result))
+    
+    return {"success": True, "source_pattern_id": pattern_id, **result}
 
 
 @app.post("/api/optimize")
@@ -843,11 +1223,9 @@ async def optimize_pattern(
     """
     优化已生成的图案
     """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
+    stored_data = _get_stored_pattern(pattern_id)
     
     # 获取原始图像
-    stored_data = patterns_store[pattern_id]
     file_id = stored_data["file_id"]
     
     # 重新处理（简化：重新加载和优化）
@@ -1027,66 +1405,74 @@ async def import_custom_colors(
 @app.post("/api/pattern/{pattern_id}/print")
 async def generate_print(
     pattern_id: str,
-    params: PrintParams
+    params: PrintParams,
+    request: Request,
+    persist: bool = False
 ):
     """
     生成打印文件
-    """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
     
-    pattern = patterns_store[pattern_id]["pattern"]
-    
-    # 在线程池中执行PDF生成（CPU密集型任务）
-    pdf_path = f"static/output/{pattern_id}_print.pdf"
-    await run_in_thread_pool(
-        _generate_pdf,
-        pattern,
-        pdf_path,
-        params.paper_size,
-        params.margin_mm,
-        params.show_grid,
-        params.show_labels,
-        params.dpi
-    )
+    默认在内存中生成，persist=true 时同时写入磁盘渲染缓存
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    if params.tiled:
+        try:
+            printer.plan_tiled_pages(pattern.width, pattern.height, params.paper_size,
+                                     params.margin_mm, params.overlap_cells,
+                                     bead_size_mm=pattern.bead_size_mm)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
-    return FileResponse(
-        pdf_path,
+    # 在线程池中执行PDF生成（CPU密集型任务），相同内容和参数复用已生成的文件
+    cache_key, suffix, build = _print_build(pattern, params)
+    return await _cached_file_response(
+        request, cache_key, suffix, build,
         media_type="application/pdf",
-        filename=f"pattern_{pattern_id}.pdf"
+        filename=f"pattern_{pattern_id}.pdf",
+        cache_control=EXPORT_CACHE_CONTROL,
+        persist=persist
     )
 
 
 @app.get("/api/pattern/{pattern_id}/export")
-async def export_pattern(pattern_id: str, format: str = "json"):
+async def export_pattern(pattern_id: str, request: Request, format: str = "json",
+                         persist: bool = False):
     """
     导出图案
+    
+    默认在内存中生成，persist=true 时同时写入磁盘渲染缓存
     """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
-
-    pattern = patterns_store[pattern_id]["pattern"]
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
 
     if format == "json":
-        json_path = f"static/output/{pattern_id}.json"
-        pattern.to_json(json_path)
-        return FileResponse(json_path, media_type="application/json",
-                          filename=f"pattern_{pattern_id}.json")
+        cache_key, suffix, build = json_build(pattern)
+        return await _cached_file_response(
+            request, cache_key, suffix, build, media_type="application/json",
+            filename=f"pattern_{pattern_id}.json",
+            cache_control=EXPORT_CACHE_CONTROL, persist=persist)
     elif format == "csv":
-        csv_path = f"static/output/{pattern_id}.csv"
-        pattern.to_csv(csv_path)
-        return FileResponse(csv_path, media_type="text/csv",
-                          filename=f"pattern_{pattern_id}.csv")
+        return await _cached_file_response(
+            request, pattern_cache_key(pattern, "export_csv"), ".csv",
+            pattern.to_csv, media_type="text/csv",
+            filename=f"pattern_{pattern_id}.csv",
+            cache_control=EXPORT_CACHE_CONTROL, persist=persist)
     elif format == "png":
         # 在线程池中执行PNG导出（CPU密集型任务）
-        def _save_png():
-            png_path = f"static/output/{pattern_id}_export.png"
-            pattern.save_image(png_path, cell_size=30, show_labels=True, show_grid=True, show_legend=True)
-            return png_path
-
-        png_path = await run_in_thread_pool(_save_png)
-        return FileResponse(png_path, media_type="image/png",
-                          filename=f"pattern_{pattern_id}.png")
+        cache_key, suffix, build = export_png_build(pattern, show_labels=True)
+        return await _cached_file_response(
+            request, cache_key, suffix, build, media_type="image/png",
+            filename=f"pattern_{pattern_id}.png",
+            cache_control=EXPORT_CACHE_CONTROL, persist=persist)
+    elif format == "svg":
+        # 矢量图：每种颜色一条路径，文件大小与颜色边界数量相关，与拼豆数量无关
+        return await _cached_file_response(
+            request, pattern_cache_key(pattern, "export_svg", show_labels=True, show_grid=True),
+            ".svg",
+            lambda target: to_svg(pattern, target, show_labels=True, show_grid=True),
+            media_type="image/svg+xml",
+            filename=f"pattern_{pattern_id}.svg",
+            cache_control=EXPORT_CACHE_CONTROL, persist=persist)
     else:
         raise HTTPException(status_code=400, detail="不支持的导出格式")
 
@@ -1094,7 +1480,9 @@ async def export_pattern(pattern_id: str, format: str = "json"):
 @app.post("/api/pattern/{pattern_id}/technical-sheet")
 async def generate_technical_sheet_api(
     pattern_id: str,
-    params: TechnicalPanelParams
+    params: TechnicalPanelParams,
+    request: Request,
+    persist: bool = False
 ):
     """
     生成工程说明书风格的拼豆图（含信息面板）
@@ -1102,58 +1490,35 @@ async def generate_technical_sheet_api(
     Args:
         pattern_id: 图案ID
         params: 面板参数
+        persist: 是否同时写入磁盘渲染缓存（默认只在内存中生成）
 
     Returns:
         工程图纸的PNG文件
     """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
-
-    pattern = patterns_store[pattern_id]["pattern"]
-
-    # 创建面板配置
-    config = TechnicalPanelConfig(
-        font_size=params.font_size,
-        color_block_size=params.color_block_size,
-        row_height=params.row_height,
-        panel_padding=params.panel_padding,
-        margin_from_pattern=params.margin_from_pattern,
-        background_color=(255, 255, 255),
-        text_color=(0, 0, 0),
-        border_width=0,
-        header_font_size=params.font_size + 2
-    )
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
 
     # 在线程池中生成工程图纸（CPU密集型任务）
-    def _generate_sheet():
-        tech_sheet = generate_technical_sheet(
-            pattern,
-            cell_size=10,
-            show_grid=True,
-            show_labels=False,  # 工程图纸通常不显示编号
-            config=config,
-            exclude_background=params.exclude_background
-        )
-        return tech_sheet
-
-    sheet_img = await run_in_thread_pool(_generate_sheet)
-
-    # 保存图像
-    sheet_path = f"static/output/{pattern_id}_technical_sheet.png"
-    sheet_img.save(sheet_path, compress_level=1)
-
-    return FileResponse(
-        sheet_path,
-        media_type="image/png",
-        filename=f"pattern_{pattern_id}_technical_sheet.png"
+    cache_key, suffix, build = _technical_sheet_build(pattern, params)
+    if params.paginate:
+        media_type, extension = "application/pdf", "pdf"
+    else:
+        media_type, extension = "image/png", "png"
+    return await _cached_file_response(
+        request, cache_key, suffix, build,
+        media_type=media_type,
+        filename=f"pattern_{pattern_id}_technical_sheet.{extension}",
+        cache_control=EXPORT_CACHE_CONTROL,
+        persist=persist
     )
 
 
 @app.get("/api/pattern/{pattern_id}/statistics")
 async def export_statistics_api(
     pattern_id: str,
+    request: Request,
     format: str = "json",
-    exclude_background: bool = True
+    exclude_background: bool = True,
+    persist: bool = False
 ):
     """
     导出颜色统计数据
@@ -1162,59 +1527,82 @@ async def export_statistics_api(
         pattern_id: 图案ID
         format: 导出格式（'json' 或 'csv'）
         exclude_background: 是否排除背景色
+        persist: 是否同时写入磁盘渲染缓存（默认只在内存中生成）
 
     Returns:
         统计数据文件
     """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
-
-    pattern = patterns_store[pattern_id]["pattern"]
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
 
     if format not in ['json', 'csv']:
         raise HTTPException(status_code=400, detail="不支持的导出格式，支持: json, csv")
 
     # 在线程池中导出统计数据（CPU密集型任务）
-    def _export_stats():
-        stats_path = f"static/output/{pattern_id}_statistics.{format}"
-        export_statistics(
-            pattern,
-            stats_path,
-            format=format,
-            exclude_background=exclude_background
-        )
-        return stats_path
+    cache_key, suffix, build = statistics_build(pattern, format, exclude_background)
+    media_type = "application/json" if format == "json" else "text/csv"
+    return await _cached_file_response(
+        request, cache_key, suffix, build,
+        media_type=media_type,
+        filename=f"pattern_{pattern_id}_statistics.{format}",
+        cache_control=EXPORT_CACHE_CONTROL,
+        persist=persist
+    )
 
-    stats_path = await run_in_thread_pool(_export_stats)
 
-    media_type = "application/json" if format == "json" else "text/csv"
-    filename = f"pattern_{pattern_id}_statistics.{format}"
+@app.get("/api/pattern/{pattern_id}/bundle")
+async def export_bundle(pattern_id: str, artifacts: str = ",".join(BUNDLE_ARTIFACTS)):
+    """
+    打包下载（ZIP）
 
-    return FileResponse(
-        stats_path,
-        media_type=media_type,
-        filename=filename
+    所选文件在线程池中并发生成（已缓存的直接读取），
+    按完成顺序流式写入 ZIP 响应，不生成临时压缩包
+
+    Args:
+        pattern_id: 图案ID
+        artifacts: 逗号分隔的文件列表（png, labeled_png, json, statistics, technical_sheet, pdf）
+
+    Returns:
+        ZIP 文件流
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    names = list(dict.fromkeys(name.strip() for name in artifacts.split(",") if name.strip()))
+    unknown = [name for name in names if name not in BUNDLE_ARTIFACTS]
+    if not names or unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"不支持的打包文件: {', '.join(unknown)}，支持: {', '.join(BUNDLE_ARTIFACTS)}")
+    files = {}
+    for name in names:
+        arcname, cache_key, suffix, build = bundle_artifact(pattern, name, f"pattern_{pattern_id}",
+                                                             printer=printer)
+        files[arcname] = partial(render_cache.get_bytes, cache_key, suffix, build, persist=False)
+
+    return StreamingResponse(
+        stream_zip(files, executor=thread_pool_executor),
+        media_type="application/zip",
+        headers={"Content-Disposition": _content_disposition(f"pattern_{pattern_id}.zip")}
     )
 
 
 @app.get("/api/pattern/{pattern_id}/print-preview")
 async def print_preview(
     pattern_id: str,
+    request: Request,
     paper_size: str = "A4",
     margin_mm: float = 10.0,
     show_grid: bool = True,
-    show_labels: bool = True  # 默认显示色号
+    show_labels: bool = True,  # 默认显示色号
+    persist: bool = False
 ):
     """
     打印预览
-    """
-    if pattern_id not in patterns_store:
-        raise HTTPException(status_code=404, detail="图案不存在")
     
-    pattern = patterns_store[pattern_id]["pattern"]
+    默认在内存中生成，persist=true 时同时写入磁盘渲染缓存
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
     
     # 在线程池中执行预览图像生成（CPU密集型任务）
-    def _generate_preview_image():
+    def _generate_preview_image(target):
         preview_image = printer.generate_print_image(
             pattern,
             paper_size=paper_size,
@@ -1222,13 +1610,219 @@ async def print_preview(
             show_grid=show_grid,
             show_labels=show_labels
         )
-        preview_path = f"static/output/{pattern_id}_preview.png"
-        preview_image.save(preview_path)
-        return preview_path
+        preview_image.save(target, format='PNG')
+    
+    return await _cached_file_response(
+        request,
+        pattern_cache_key(pattern, "print_preview", paper_size=paper_size, margin_mm=margin_mm,
+                           show_grid=show_grid, show_labels=show_labels),
+        "_preview.png",
+        _generate_preview_image,
+        media_type="image/png",
+        cache_control=EXPORT_CACHE_CONTROL,
+        persist=persist
+    )
+
+
+@app.get("/api/pattern/{pattern_id}/grid")
+async def get_pattern_grid(pattern_id: str, request: Request):
+    """
+    紧凑图案数据（色板 + uint8/uint16 索引平面，base64）
+    
+    网页端据此在 canvas 上绘制单元格、网格线和色号，切换编号无需再请求图片
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+    
+    def _write_payload(path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(to_compact_payload(pattern._v2), f, ensure_ascii=False, separators=(',', ':'))
+    
+    return await _cached_file_response(
+        request, pattern_cache_key(pattern, "compact_grid"), "_grid.json",
+        _write_payload, media_type="application/json")
+
+
+@app.get("/api/pattern/{pattern_id}/preview.png")
+async def pattern_preview(pattern_id: str, request: Request, labels: bool = True):
+    """
+    网格预览图（cell_size=10，首次请求时渲染，之后按内容缓存）
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    cache_key, suffix, build = _preview_build(pattern, labels)
+    return await _cached_file_response(request, cache_key, suffix, build, media_type="image/png")
+
+
+@app.get("/api/pattern/{pattern_id}/bead-preview.png")
+async def bead_preview(pattern_id: str, request: Request, melted: bool = False,
+                       cell_size: int = 20):
+    """
+    本地拼豆实物效果预览（圆形拼豆 / 熔烫效果）
+    
+    不调用 Nano Banana，通常不到一秒；用于草稿迭代，最终效果图再调用远程接口。
+    按行带流式写入 PNG，大图案不会分配整幅图像
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+    if not 4 <= cell_size <= 64:
+        raise HTTPException(status_code=400, detail="cell_size 需在 4-64 之间")
+    
+    def _render(path: str):
+        stream_bead_preview_png(pattern, path, cell_size=cell_size, melted=melted)
+    
+    return await _cached_file_response(
+        request,
+        pattern_cache_key(pattern, "bead_preview", cell_size=cell_size, melted=melted),
+        "_bead.png",
+        _render,
+        media_type="image/png"
+    )
+
+
+@app.get("/api/pattern/{pattern_id}/tiles/{z}/{x}/{y}.png")
+async def pattern_tile(pattern_id: str, z: int, x: int, y: int, request: Request,
+                       labels: bool = True):
+    """
+    超大图案的 Deep Zoom 瓦片（256×256）
     
-    preview_path = await run_in_thread_pool(_generate_preview_image)
+    低层级按色号网格抽样显示颜色，高层级依次显示网格线、色号；
+    瓦片按内容哈希缓存，支持 ETag / Cache-Control
+    """
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    pyramid = TilePyramid.for_pattern(pattern)
+    cols, rows = pyramid.tile_count(z) if 0 <= z <= pyramid.max_zoom else (0, 0)
+    if not (0 <= x < cols and 0 <= y < rows):
+        raise HTTPException(status_code=404, detail="瓦片不存在")
     
-    return FileResponse(preview_path, media_type="image/png")
+    def _render(path: str):
+        render_tile(pattern, z, x, y, show_labels=labels).save(path, compress_level=1)
+    
+    return await _cached_file_response(
+        request,
+        pattern_cache_key(pattern, "tile", z=z, x=x, y=y, labels=labels),
+        "_tile.png",
+        _render,
+        media_type="image/png",
+        cache_control=TILE_CACHE_CONTROL
+    )
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    渲染缓存与标签精灵图集的命中统计（监控用）
+    """
+    return {
+        "render_cache": render_cache.stats(),
+        "sprite_atlas": get_sprite_atlas().stats()
+    }
+
+
+@app.get("/api/admin/stores")
+async def store_stats(entries: bool = False):
+    """
+    图案 / 上传文件 / 分步结果存储的占用统计（监控用）
+
+    Args:
+        entries: 是否列出每个条目的大小、位置（memory / disk）和剩余有效期
+    """
+    result = {}
+    for name, store in (("patterns", patterns_store), ("uploads", uploaded_files),
+                        ("steps", step_results)):
+        result[name] = store.stats()
+        if entries:
+            result[name]["entries"] = store.entries()
+    return result
+
+
+# ============ 后台任务API ============
+
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job
+
+
+async def _job_events(job: Job):
+    """
+    任务进度事件流（SSE）
+
+    状态变化时发送 progress 事件（任务快照），任务结束时发送 end 事件后关闭；
+    长时间无变化时发送注释行保持连接
+    """
+    version = None
+    last_sent = time.monotonic()
+    while True:
+        if job.version != version:
+            snapshot = job.snapshot()
+            version = snapshot["version"]
+            data = json.dumps(snapshot, ensure_ascii=False)
+            yield f"id: {version}\nevent: progress\ndata: {data}\n\n"
+            last_sent = time.monotonic()
+            if snapshot["status"] in FINISHED_STATES:
+                yield f"event: end\ndata: {data}\n\n"
+                return
+        elif time.monotonic() - last_sent > JOB_EVENT_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    获取任务状态：当前阶段、百分比、各阶段排队 / 执行耗时
+    """
+    return _get_job(job_id).snapshot()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    订阅任务进度（Server-Sent Events）
+
+    事件：progress（任务快照，与 GET /api/jobs/{job_id} 相同），end（任务结束，最后一个事件）
+    """
+    job = _get_job(job_id)
+    return StreamingResponse(
+        _job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    获取任务结果
+
+    成功时返回与同步接口相同的结果；未结束时返回 202 和任务状态；
+    失败时返回与同步接口相同的错误，已取消返回 409
+    """
+    job = _get_job(job_id)
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.snapshot())
+    return _job_result(job)
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    取消任务
+
+    排队中的任务立即取消；执行中的阶段（如 Nano Banana 请求）结束后停止，结果丢弃
+    """
+    _get_job(job_id)
+    return job_manager.cancel(job_id).snapshot()
+
+
+@app.get("/api/admin/jobs")
+async def job_stats():
+    """
+    后台任务统计（各状态任务数、工作池线程数、CPU 阶段执行器，监控用）
+    """
+    return {**job_manager.stats(), "stage_executor": stage_executor.stats()}
 
 
 @app.post("/api/step/generate-render")
@@ -1237,46 +1831,43 @@ async def step_generate_render(
     pattern_id: str = Form(None),
     prompt: str = Form("拼豆实物效果图，真实的拼豆工艺品，近距离拍摄，高清晰度，专业摄影，自然光线"),
     model: str = Form("nano-banana-fast"),
-    image_size: str = Form("1K")
+    image_size: str = Form("1K"),
+    async_job: bool = Form(False)
 ):
     """
     步骤4: 生成实物效果图（使用Nano Banana）
+
+    async_job 为 True 时立即返回任务信息
     """
-    try:
-        if not nano_banana_client:
-            raise HTTPException(status_code=400, detail="请先配置Nano Banana API")
-        
-        # 确定使用的pattern_id
-        if not pattern_id:
-            # 从步骤结果中获取pattern_id
-            if file_id not in step_results or "generate_pattern" not in step_results[file_id]:
-                raise HTTPException(status_code=400, detail="请先生成拼豆图案")
-            pattern_id = step_results[file_id]["generate_pattern"]["pattern_id"]
-        
-        # 检查图案是否存在
-        if pattern_id not in patterns_store:
-            raise HTTPException(status_code=404, detail="图案不存在")
-        
-        # 获取图案的可视化图片路径（使用不显示编号的版本）
-        viz_path = f"static/output/{pattern_id}_viz_no_labels.png"
-        if not Path(viz_path).exists():
-            # 如果可视化图片不存在，在线程池中重新生成（不显示编号的版本）
-            pattern = patterns_store[pattern_id]["pattern"]
-            def _regenerate_viz():
-                viz_image = pattern.to_image(cell_size=10, show_labels=False, show_grid=True)
-                viz_image.save(viz_path)
-                return viz_path
-            await run_in_thread_pool(_regenerate_viz)
-        
-        # 计算aspectRatio（基于图案尺寸）
-        pattern = patterns_store[pattern_id]["pattern"]
-        aspect_ratio = calculate_aspect_ratio(pattern.width, pattern.height)
-        
-        logger.info(f"开始生成实物效果图: pattern_id={pattern_id}, prompt={prompt}")
-        
-        # 在线程池中执行Nano Banana API调用
-        def _call_nano_banana_render():
-            # 调用Nano Banana API生成实物效果图
+    if not nano_banana_client:
+        raise HTTPException(status_code=400, detail="请先配置Nano Banana API")
+
+    # 确定使用的pattern_id
+    if not pattern_id:
+        # 从步骤结果中获取pattern_id
+        steps = step_results.get(file_id) or {}
+        if "generate_pattern" not in steps:
+            raise HTTPException(status_code=400, detail="请先生成拼豆图案")
+        pattern_id = steps["generate_pattern"]["pattern_id"]
+
+    # 检查图案是否存在
+    pattern = _get_stored_pattern(pattern_id)["pattern"]
+
+    # 计算aspectRatio（基于图案尺寸）
+    aspect_ratio = calculate_aspect_ratio(pattern.width, pattern.height)
+
+    logger.info(f"开始生成实物效果图: pattern_id={pattern_id}, prompt={prompt}")
+
+    def _render_preview(ctx):
+        # 渲染图案的可视化图片（使用不显示编号的版本），已缓存时直接命中
+        with _preview_file(pattern, False) as path:
+            return path
+
+    def _call_nano_banana_render(ctx):
+        ctx.progress(0.0, "等待 Nano Banana 生成效果图")
+        # 调用Nano Banana API生成实物效果图；调用期间固定预览文件，
+        # 预览阶段之后已被缓存淘汰时重新生成
+        with _preview_file(pattern, False) as viz_path:
             result = nano_banana_client.generate_image(
                 prompt=prompt,
                 image_path=viz_path,  # 使用拼豆图案的可视化图片作为参考
@@ -1285,57 +1876,48 @@ async def step_generate_render(
                 image_size=image_size,
                 timeout=300  # 5分钟超时
             )
-            
-            # 下载生成的图片
-            if result.get("results") and len(result["results"]) > 0:
-                generated_image_url = result["results"][0]["url"]
-                render_file_id = str(uuid.uuid4())
-                downloaded_path = nano_banana_client.download_image(
-                    generated_image_url,
-                    save_path=f"static/output/render_{render_file_id}.png"
-                )
-                return render_file_id, downloaded_path
-            else:
-                raise ValueError("Nano Banana API未返回图片")
-        
-        render_file_id, downloaded_path = await run_in_thread_pool(_call_nano_banana_render)
-        
-        # 处理结果
-        if downloaded_path:
-            
-            # 保存步骤结果
-            if file_id not in step_results:
-                step_results[file_id] = {}
-            step_results[file_id]["generate_render"] = {
-                "render_url": f"/static/output/render_{render_file_id}.png",
-                "file_id": render_file_id,
-                "pattern_id": pattern_id,
-                "params": {
-                    "prompt": prompt,
-                    "model": model,
-                    "image_size": image_size
-                }
-            }
-            
-            logger.info(f"实物效果图生成完成: {downloaded_path}")
-            
-            return {
-                "success": True,
-                "render_url": f"/static/output/render_{render_file_id}.png",
-                "file_id": render_file_id,
-                "pattern_id": pattern_id
-            }
-        else:
+        ctx.check_cancelled()
+
+        # 下载生成的图片
+        if not (result.get("results") and len(result["results"]) > 0):
+            raise ValueError("Nano Banana API未返回图片")
+
+        ctx.progress(0.9, "下载图片")
+        generated_image_url = result["results"][0]["url"]
+        render_file_id = str(uuid.uuid4())
+        downloaded_path = nano_banana_client.download_image(
+            generated_image_url,
+            save_path=f"static/output/render_{render_file_id}.png"
+        )
+        if not downloaded_path:
             raise HTTPException(status_code=500, detail="Nano Banana API未返回图片")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        error_msg = str(e)
-        error_trace = traceback.format_exc()
-        logger.error(f"实物效果图生成失败: {error_msg}")
-        logger.error(f"详细错误:\n{error_trace}")
-        raise HTTPException(status_code=500, detail=f"生成失败: {error_msg}")
+
+        # 保存步骤结果
+        _save_step_result(file_id, "generate_render", {
+            "render_url": f"/static/output/render_{render_file_id}.png",
+            "file_id": render_file_id,
+            "pattern_id": pattern_id,
+            "params": {
+                "prompt": prompt,
+                "model": model,
+                "image_size": image_size
+            }
+        })
+
+        logger.info(f"实物效果图生成完成: {downloaded_path}")
+
+        return {
+            "success": True,
+            "render_url": f"/static/output/render_{render_file_id}.png",
+            "file_id": render_file_id,
+            "pattern_id": pattern_id
+        }
+
+    job = _submit_job("generate_render", [
+        JobStage("preview", _render_preview, pool="pattern", weight=1, label="渲染预览"),
+        JobStage("nano_banana", _call_nano_banana_render, weight=8, label="生成效果图"),
+    ])
+    return await _job_response(job, async_job)
 
 
 if __name__ == "__main__":
@@ -7,8 +7,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from bead_pattern.core.pattern import BeadPatternV2
 from bead_pattern.core.grid import BeadGrid
 from bead_pattern.core.palette import Palette
-from bead_pattern.render.raster import render_base, render_grid_lines
-from ..render.labels import overlay_labels
+from bead_pattern.render.raster import render_base, render_grid_lines, render_pattern
+from ..render.labels import overlay_labels, build_label_sprites
 
 
 def create_test_pattern(width: int = 100, height: int = 100, num_colors: int = 20) -> BeadPatternV2:
@@ -133,6 +133,75 @@ def bench_bounds(pattern: BeadPatternV2, iterations: int = 100) -> dict:
     }
 
 
+def bench_png_encode(img: Image.Image, iterations: int = 3, **save_kwargs) -> dict:
+    """
+    基准测试PNG编码（耗时与文件大小）
+    
+    Args:
+        img: 待编码图像
+        iterations: 迭代次数
+        **save_kwargs: 传给 Image.save 的参数（如 compress_level）
+    
+    Returns:
+        性能统计字典
+    """
+    import io
+    times = []
+    size = 0
+    
+    for i in range(iterations):
+        buffer = io.BytesIO()
+        start = time.time()
+        img.save(buffer, format='PNG', **save_kwargs)
+        times.append(time.time() - start)
+        size = buffer.tell()
+    
+    return {
+        'mode': img.mode,
+        'avg_time_ms': sum(times) / len(times) * 1000,
+        'min_time_ms': min(times) * 1000,
+        'size_kb': size / 1024,
+        'iterations': iterations
+    }
+
+
+def bench_indexed_png(pattern: BeadPatternV2) -> dict:
+    """
+    对比 RGB 与调色板（P 模式）PNG 的编码耗时和文件大小
+    
+    覆盖：预览（cell_size=10，有/无标签）、导出（cell_size=30，网格+标签，
+    compress_level=1）、工程蓝图（含抗锯齿文字，始终为 RGB）。
+    标签颜色过多时调色板输出会退回 RGB，结果中 mode 一栏可见
+    
+    Args:
+        pattern: BeadPatternV2对象
+    
+    Returns:
+        {输出名称: {'rgb': 统计, 'indexed': 统计}}
+    """
+    from ..render.blueprint import generate_engineering_blueprint
+    
+    results = {}
+    for name, cell_size, show_labels, save_kwargs in (
+            ('preview', 10, False, {}),
+            ('preview+lb', 10, True, {}),
+            ('export', 30, True, {'compress_level': 1})):
+        sprites = build_label_sprites(pattern, cell_size) if show_labels else None
+        results[name] = {
+            kind: bench_png_encode(render_pattern(pattern, cell_size, show_grid=True,
+                                                  label_sprites=sprites, indexed=indexed),
+                                   **save_kwargs)
+            for kind, indexed in (('rgb', False), ('indexed', True))
+        }
+    
+    blueprint = generate_engineering_blueprint(pattern, crop_to_subject=False)
+    results['blueprint'] = {
+        'rgb': bench_png_encode(blueprint, compress_level=1),
+        'colors': len(blueprint.getcolors(1 << 24)),
+    }
+    return results
+
+
 def run_full_benchmark(width: int = 100, height: int = 100,
                     cell_size: int = 20, num_colors: int = 20) -> None:
     """
@@ -176,6 +245,17 @@ def run_full_benchmark(width: int = 100, height: int = 100,
     print(f"  最大: {bounds_results['max_time_ms']:.2f}ms")
     print(f"  目标: <5ms")
     print(f"=" * 60)
+    
+    print("PNG编码测试（RGB vs 调色板）:")
+    for name, result in bench_indexed_png(pattern).items():
+        for kind in ('rgb', 'indexed'):
+            if kind in result:
+                stats = result[kind]
+                print(f"  {name:<10} {kind:<8} {stats['mode']:<4} "
+                      f"{stats['avg_time_ms']:8.2f}ms {stats['size_kb']:10.1f}KB")
+        if 'colors' in result:
+            print(f"  {name:<10} 颜色数: {result['colors']}（超过 256，保持 RGB）")
+    print(f"=" * 60)
 
 
 if __name__ == '__main__':
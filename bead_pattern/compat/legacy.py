@@ -1,11 +1,13 @@
 import numpy as np
-from typing import Dict, Optional, List, Tuple
+from typing import BinaryIO, Dict, Optional, List, Tuple, Union
 from PIL import Image, ImageDraw, ImageFont
 from ..core.pattern import BeadPatternV2
 from ..core.color import ColorInfo
 from ..core.grid import BeadGrid
-from ..render.raster import render_base, render_grid_lines
-from ..render.labels import overlay_labels
+from ..render.raster import render_pattern
+from ..render.labels import build_label_sprites
+from ..render.stream import stream_pattern_png
+from ..io.text_output import open_text_output
 
 
 class BeadPattern:
@@ -27,6 +29,28 @@ class BeadPattern:
         self.actual_width_mm = self._v2.actual_width_mm
         self.actual_height_mm = self._v2.actual_height_mm
     
+    @classmethod
+    def _from_v2(cls, pattern_v2: BeadPatternV2) -> 'BeadPattern':
+        """
+        用已有的 BeadPatternV2 构造兼容包装器（不复制数据）
+        
+        Args:
+            pattern_v2: BeadPatternV2 对象
+        """
+        pattern = cls.__new__(cls)
+        pattern._v2 = pattern_v2
+        pattern.width = pattern_v2.grid.width
+        pattern.height = pattern_v2.grid.height
+        pattern.bead_size_mm = pattern_v2.bead_size_mm
+        pattern.actual_width_mm = pattern_v2.actual_width_mm
+        pattern.actual_height_mm = pattern_v2.actual_height_mm
+        return pattern
+    
+    @property
+    def content_hash(self) -> str:
+        """图案内容哈希（网格 + 色板 + 拼豆尺寸），内容相同则相同"""
+        return self._v2.content_hash
+    
     def set_bead(self, x: int, y: int, color_info: Dict) -> None:
         if 0 <= x < self.width and 0 <= y < self.height:
             color_id = color_info.get('id')
@@ -98,11 +122,86 @@ class BeadPattern:
 
         self._v2.grid.grid_ids = grid_ids
     
+    def from_color_ids(self, grid_ids: np.ndarray, colors: List[Dict]) -> None:
+        """
+        从颜色 ID 网格和颜色列表生成图案（from_matched_colors 的数组版本）
+        
+        Args:
+            grid_ids: 颜色 ID 网格 (H, W)，空位为 BeadGrid.EMPTY
+            colors: 网格中出现的颜色字典
+        """
+        height, width = grid_ids.shape[:2]
+
+        if width != self.width or height != self.height:
+            self._v2.grid.resize(width, height)
+            self.actual_width_mm = width * self.bead_size_mm
+            self.actual_height_mm = height * self.bead_size_mm
+
+        for color_data in colors:
+            if color_data.get('id') not in self._v2.palette.colors_by_id:
+                self._v2.palette.upsert_from_dict(color_data)
+
+        _ = self._v2.palette.rgb_lut
+
+        self._v2.grid.grid_ids = np.ascontiguousarray(grid_ids, dtype=np.int32)
+    
     def get_subject_bounds(self, background_colors: Optional[List] = None) -> Optional[Tuple[int, int, int, int]]:
         return self._v2.get_subject_bounds(background_colors)
     
     def get_subject_size(self, background_colors: Optional[List] = None) -> Optional[Dict]:
-        return self._v2.get_subject_size(background_colors)
+        """
+        获取主体尺寸（同时提供旧版 subject_* 键名）
+        
+        Returns:
+            width/height/width_mm/height_mm 以及 subject_width/subject_height/
+            subject_width_mm/subject_height_mm；没有主体时尺寸均为0
+        """
+        size = self._v2.get_subject_size(background_colors)
+        if size is None:
+            size = {'width': 0, 'height': 0, 'width_mm': 0.0, 'height_mm': 0.0}
+        size = {key: (int(value) if key in ('width', 'height') else float(value))
+                for key, value in size.items()}
+        size.update({
+            'subject_width': size['width'],
+            'subject_height': size['height'],
+            'subject_width_mm': size['width_mm'],
+            'subject_height_mm': size['height_mm']
+        })
+        return size
+    
+    def snapshot(self) -> 'BeadPattern':
+        """写时复制快照：共享网格和色板，任一方修改时只复制被修改的行块"""
+        return BeadPattern._from_v2(self._v2.snapshot())
+    
+    def mirror(self, axis: str = 'horizontal') -> 'BeadPattern':
+        """镜像（axis: 'horizontal' 左右 / 'vertical' 上下），返回新图案"""
+        return BeadPattern._from_v2(self._v2.mirror(axis))
+    
+    def rotate(self, degrees: int) -> 'BeadPattern':
+        """顺时针旋转 90/180/270 度，返回新图案"""
+        return BeadPattern._from_v2(self._v2.rotate(degrees))
+    
+    def crop(self, bounds: Tuple[int, int, int, int]) -> 'BeadPattern':
+        """裁剪到 (min_x, min_y, max_x, max_y)，返回新图案"""
+        return BeadPattern._from_v2(self._v2.crop(bounds))
+    
+    def crop_to_subject(self, background_colors: Optional[List] = None,
+                        margin: int = 0) -> 'BeadPattern':
+        """裁剪到主体区域（保留 margin 颗边距），返回新图案"""
+        return BeadPattern._from_v2(self._v2.crop_to_subject(background_colors, margin))
+    
+    def pad(self, left: int = 0, top: int = 0, right: int = 0, bottom: int = 0,
+            color_id: int = BeadGrid.EMPTY) -> 'BeadPattern':
+        """四周加边（默认空白），返回新图案"""
+        return BeadPattern._from_v2(self._v2.pad(left, top, right, bottom, color_id))
+    
+    def upscale(self, factor: int) -> 'BeadPattern':
+        """整数倍放大，返回新图案"""
+        return BeadPattern._from_v2(self._v2.upscale(factor))
+    
+    def downscale(self, factor: int) -> 'BeadPattern':
+        """整数倍缩小（每块取众数颜色，不产生新颜色），返回新图案"""
+        return BeadPattern._from_v2(self._v2.downscale(factor))
     
     def get_color_statistics(self, exclude_background: bool = False, 
                          background_colors: Optional[List] = None) -> Dict:
@@ -158,17 +257,17 @@ class BeadPattern:
             'statistics': self.get_color_statistics()
         }
     
-    def to_json(self, file_path: str) -> None:
+    def to_json(self, file_path: Union[str, BinaryIO]) -> None:
         import json
         data = self.to_dict()
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with open_text_output(file_path, encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
     
-    def to_csv(self, file_path: str) -> None:
+    def to_csv(self, file_path: Union[str, BinaryIO]) -> None:
         import csv
         height, width = self._v2.grid.shape
         
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        with open_text_output(file_path, encoding='utf-8-sig', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['行(Y)', '列(X)', '颜色ID', '色号代码', '颜色名称', 'RGB'])
             
@@ -189,19 +288,16 @@ class BeadPattern:
                         writer.writerow([y, x, None, '', '', ''])
     
     def to_image(self, cell_size: int = 20, show_labels: bool = True,
-                 show_grid: bool = True, grid_color: Tuple[int, int, int] = (200, 200, 200)) -> Image.Image:
-        img = render_base(self._v2, cell_size)
-        
-        if show_grid:
-            img = render_grid_lines(img, width=self.width, height=self.height, 
-                               cell_size=cell_size, grid_color=grid_color)
-        
-        if show_labels:
-            img = overlay_labels(img, self._v2, cell_size=cell_size)
-        
-        return img
+                 show_grid: bool = True, grid_color: Tuple[int, int, int] = (200, 200, 200),
+                 indexed: bool = False) -> Image.Image:
+        sprites = build_label_sprites(self._v2, cell_size) if show_labels else None
+        return render_pattern(self._v2, cell_size, show_grid=show_grid,
+                              grid_color=grid_color, label_sprites=sprites, indexed=indexed)
     
-    def save_image(self, file_path: str, cell_size: int = 20,
+    def save_image(self, file_path: Union[str, BinaryIO], cell_size: int = 20,
                    show_labels: bool = True, show_grid: bool = True) -> None:
-        img = self.to_image(cell_size, show_labels, show_grid)
-        img.save(file_path, compress_level=1)
+        # 分带渲染并流式写入 PNG（峰值内存只与一个行带有关）；
+        # 颜色不超过 256 种时保存为调色板 PNG
+        sprites = build_label_sprites(self._v2, cell_size) if show_labels else None
+        stream_pattern_png(self._v2, file_path, cell_size, show_grid=show_grid,
+                           label_sprites=sprites)
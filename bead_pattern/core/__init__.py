@@ -6,5 +6,6 @@ from .color import ColorInfo
 from .palette import Palette
 from .grid import BeadGrid
 from .pattern import BeadPatternV2
+from .tiling import BoardTile, BoardTiling
 
-__all__ = ['ColorInfo', 'Palette', 'BeadGrid', 'BeadPatternV2']
+__all__ = ['ColorInfo', 'Palette', 'BeadGrid', 'BeadPatternV2', 'BoardTile', 'BoardTiling']
@@ -1,9 +1,23 @@
+import hashlib
 import numpy as np
-from typing import Tuple, Optional
+from typing import Callable, Iterator, Tuple, Optional
 
 
 EMPTY = -1
 
+# Rows per band for copy-on-write and the incremental content digest
+BAND_ROWS = 64
+
+
+def _share(view: np.ndarray) -> None:
+    """Make a view and the array owning its memory read-only"""
+    view.setflags(write=False)
+    base = view.base
+    while isinstance(base, np.ndarray):
+        if base.flags.writeable:
+            base.setflags(write=False)
+        base = base.base
+
 
 class BeadGrid:
     """
@@ -12,6 +26,23 @@ class BeadGrid:
     Uses -1 for blank positions (no bead)
     grid_ids stores color_id or EMPTY
     Memory efficiency: int32 array (4 bytes per element) vs object dict (~150 bytes)
+
+    Change tracking:
+    - version increments on every write through the grid API
+      (set_id, resize, assigning grid_ids), caches key on it
+    - code writing into grid_ids in place must call touch() afterwards
+    - content_digest() hashes row bands separately, set_id only
+      invalidates the band it touches
+
+    Copy-on-write:
+    - a read-only grid_ids is shared with snapshots and with grids
+      wrapping a view of it (from_array)
+    - set_id on a shared grid copies only the touched band of BAND_ROWS
+      rows into a private overlay, get_id / content_digest read through it
+    - iter_bands / rows / map_bands read through the overlay without
+      copying the base array; read-only consumers should use them
+    - reading grid_ids merges the overlay into one private, writable
+      array (a full H x W copy)
     """
 
     EMPTY = EMPTY
@@ -24,9 +55,241 @@ class BeadGrid:
             width: grid width (number of columns)
             height: grid height (number of rows)
         """
+        self.version = 0
+        self._band_digests = None
+        self._dirty_bands = set()
+        self._bands = {}
+        self._grid_ids = np.full((height, width), EMPTY, dtype=np.int32)
         self.width = width
         self.height = height
-        self.grid_ids = np.full((height, width), EMPTY, dtype=np.int32)
+    
+    @property
+    def grid_ids(self) -> np.ndarray:
+        """
+        Color ID array shape (H, W), int32
+
+        Merges private bands first (full copy of a shared array); callers
+        that only read should use iter_bands / rows / map_bands instead.
+        """
+        if self._bands:
+            self._merge_bands()
+        return self._grid_ids
+    
+    @grid_ids.setter
+    def grid_ids(self, value: np.ndarray) -> None:
+        """Replace the whole array (shape defines the new width/height)"""
+        self._grid_ids = value
+        self._bands = {}
+        self.height, self.width = value.shape
+        self.version += 1
+        self._band_digests = None
+    
+    @property
+    def is_shared(self) -> bool:
+        """True while the base array is shared (read-only)"""
+        return not self._grid_ids.flags.writeable
+    
+    @property
+    def private_bands(self) -> int:
+        """Number of bands copied by copy-on-write and not yet merged"""
+        return len(self._bands)
+    
+    def snapshot(self) -> 'BeadGrid':
+        """
+        Create a copy-on-write snapshot
+        
+        Both grids keep sharing the array (and any private bands), which
+        become read-only; whichever side writes first copies only the
+        band it touches. Version and band digests carry over, so caches
+        keyed on them stay valid.
+        
+        Returns:
+            New BeadGrid sharing this grid's data
+        """
+        self._grid_ids.setflags(write=False)
+        for rows in self._bands.values():
+            rows.setflags(write=False)
+        
+        snap = BeadGrid.__new__(BeadGrid)
+        snap._grid_ids = self._grid_ids
+        snap._bands = dict(self._bands)
+        snap.width = self.width
+        snap.height = self.height
+        snap.version = self.version
+        snap._band_digests = list(self._band_digests) if self._band_digests is not None else None
+        snap._dirty_bands = set(self._dirty_bands)
+        return snap
+    
+    def _band_view(self, band: int) -> np.ndarray:
+        """Current rows of a band (private copy if any, else base rows)"""
+        rows = self._bands.get(band)
+        if rows is None:
+            rows = self._grid_ids[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+        return rows
+    
+    def _merge_bands(self) -> None:
+        """Merge private bands into one private array"""
+        merged = np.array(self._grid_ids, dtype=np.int32)
+        for band, rows in self._bands.items():
+            merged[band * BAND_ROWS:band * BAND_ROWS + rows.shape[0]] = rows
+        self._grid_ids = merged
+        self._bands = {}
+    
+    def iter_bands(self, y0: int = 0,
+                   y1: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Iterate rows y0:y1 as read-only chunks without merging private bands
+        
+        Consecutive rows without a private copy come as one view of the
+        base array, so a grid without private bands yields a single chunk.
+        
+        Args:
+            y0: first row
+            y1: end row (exclusive), None for the grid height
+        
+        Yields:
+            (first row, (rows, W) read-only int32 view)
+        """
+        y1 = self.height if y1 is None else min(y1, self.height)
+        y0 = max(y0, 0)
+        if y0 >= y1:
+            return
+        
+        start = y0
+        for band in range(y0 // BAND_ROWS, (y1 - 1) // BAND_ROWS + 1):
+            rows = self._bands.get(band)
+            if rows is None:
+                continue
+            band_y = band * BAND_ROWS
+            lo, hi = max(band_y, y0), min(band_y + BAND_ROWS, y1)
+            if start < lo:
+                yield start, self._read_only(self._grid_ids[start:lo])
+            yield lo, self._read_only(rows[lo - band_y:hi - band_y])
+            start = hi
+        if start < y1:
+            yield start, self._read_only(self._grid_ids[start:y1])
+    
+    @staticmethod
+    def _read_only(view: np.ndarray) -> np.ndarray:
+        """Read-only view (leaves the viewed array's own flags alone)"""
+        view = view.view()
+        view.setflags(write=False)
+        return view
+    
+    def rows(self, y0: int = 0, y1: Optional[int] = None) -> np.ndarray:
+        """
+        Read-only rows y0:y1 without merging private bands
+        
+        A view when the rows come from one chunk (see iter_bands),
+        otherwise a copy of just these rows; the grid keeps its overlay.
+        
+        Args:
+            y0: first row
+            y1: end row (exclusive), None for the grid height
+        
+        Returns:
+            (rows, W) int32 array
+        """
+        chunks = [ids for _, ids in self.iter_bands(y0, y1)]
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return np.empty((0, self.width), dtype=np.int32)
+        rows = np.concatenate(chunks)
+        rows.setflags(write=False)
+        return rows
+    
+    def map_bands(self, func: Callable[[np.ndarray], np.ndarray],
+                  bounds: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        Apply an element-wise function to the color IDs chunk by chunk
+        
+        The results are assembled into one array, so reading a grid with
+        private bands costs only the output, never a merge of the input.
+        
+        Args:
+            func: element-wise function of an (h, w) int32 array, returning
+                an array of shape (h, w, ...) and a fixed dtype
+            bounds: (min_x, min_y, max_x, max_y) region, None for the whole grid
+        
+        Returns:
+            func's result for the whole region
+        """
+        min_x, min_y, max_x, max_y = bounds if bounds is not None else (0, 0, self.width, self.height)
+        chunks = list(self.iter_bands(min_y, max_y))
+        if len(chunks) <= 1:
+            ids = chunks[0][1] if chunks else self._grid_ids[0:0]
+            return func(ids[:, min_x:max_x])
+        
+        out = None
+        for row, ids in chunks:
+            result = func(ids[:, min_x:max_x])
+            if out is None:
+                out = np.empty((max_y - min_y,) + result.shape[1:], dtype=result.dtype)
+            out[row - min_y:row - min_y + result.shape[0]] = result
+        return out
+    
+    def touch(self) -> None:
+        """Mark grid as modified after in-place writes to grid_ids"""
+        self.version += 1
+        self._band_digests = None
+    
+    def content_digest(self) -> bytes:
+        """
+        Get digest of grid contents (shape + color IDs)
+        
+        Bands of BAND_ROWS rows are hashed separately and cached,
+        only bands touched since the last call are rehashed.
+        
+        Returns:
+            16-byte blake2b digest, equal for grids with equal contents
+        """
+        n_bands = -(-self.height // BAND_ROWS)
+        if self._band_digests is None or len(self._band_digests) != n_bands:
+            self._band_digests = [None] * n_bands
+        else:
+            for band in self._dirty_bands:
+                self._band_digests[band] = None
+        self._dirty_bands = set()
+        
+        for band in range(n_bands):
+            if self._band_digests[band] is None:
+                data = np.ascontiguousarray(self._band_view(band), dtype=np.int32)
+                self._band_digests[band] = hashlib.blake2b(data.tobytes(), digest_size=16).digest()
+        
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.array(self.shape, dtype=np.int64).tobytes())
+        for digest in self._band_digests:
+            h.update(digest)
+        return h.digest()
+    
+    @classmethod
+    def from_array(cls, grid_ids: np.ndarray) -> 'BeadGrid':
+        """
+        Wrap an existing (H, W) int32 array without copying
+
+        A view into another array (e.g. a board tile, a transform or a
+        blueprint crop) is shared copy-on-write: the view and the array
+        owning its memory become read-only, so the first set_id on either
+        side copies only the touched band.
+
+        Args:
+            grid_ids: (H, W) int32 array of color IDs / EMPTY
+
+        Returns:
+            BeadGrid sharing the given array
+        """
+        if grid_ids.ndim != 2:
+            raise ValueError("grid_ids must be a 2D array")
+        if not grid_ids.flags.owndata:
+            _share(grid_ids)
+        grid = cls.__new__(cls)
+        grid.version = 0
+        grid._band_digests = None
+        grid._dirty_bands = set()
+        grid._bands = {}
+        grid.grid_ids = grid_ids
+        return grid
     
     def resize(self, width: int, height: int) -> None:
         """
@@ -42,10 +305,8 @@ class BeadGrid:
         w_copy = min(self.width, width)
         
         if h_copy > 0 and w_copy > 0:
-            new_grid[:h_copy, :w_copy] = self.grid_ids[:h_copy, :w_copy]
+            new_grid[:h_copy, :w_copy] = self.rows(0, h_copy)[:, :w_copy]
         
-        self.width = width
-        self.height = height
         self.grid_ids = new_grid
     
     def set_id(self, x: int, y: int, color_id: int) -> None:
@@ -58,7 +319,17 @@ class BeadGrid:
             color_id: color ID (use EMPTY for blank)
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid_ids[y, x] = color_id
+            if self._grid_ids.flags.writeable:
+                self._grid_ids[y, x] = color_id
+            else:
+                band = y // BAND_ROWS
+                rows = self._bands.get(band)
+                if rows is None or not rows.flags.writeable:
+                    rows = np.array(self._band_view(band), dtype=np.int32)
+                    self._bands[band] = rows
+                rows[y - band * BAND_ROWS, x] = color_id
+            self.version += 1
+            self._dirty_bands.add(y // BAND_ROWS)
     
     def get_id(self, x: int, y: int) -> int:
         """
@@ -72,7 +343,10 @@ class BeadGrid:
             color ID, or EMPTY if position invalid
         """
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.grid_ids[y, x]
+            if self._bands:
+                band = y // BAND_ROWS
+                return self._band_view(band)[y - band * BAND_ROWS, x]
+            return self._grid_ids[y, x]
         return EMPTY
     
     def get_valid_mask(self) -> np.ndarray:
@@ -82,7 +356,7 @@ class BeadGrid:
         Returns:
             bool array shape(H, W), True for valid beads
         """
-        return self.grid_ids != EMPTY
+        return self.map_bands(lambda ids: ids != EMPTY)
     
     def get_background_mask(self, background_ids: set) -> np.ndarray:
         """
@@ -94,11 +368,10 @@ class BeadGrid:
         Returns:
             bool array shape(H, W), True for non-background
         """
-        valid = self.grid_ids != EMPTY
         if background_ids:
-            not_bg = ~np.isin(self.grid_ids, list(background_ids))
-            return valid & not_bg
-        return valid
+            background = list(background_ids)
+            return self.map_bands(lambda ids: (ids != EMPTY) & ~np.isin(ids, background))
+        return self.get_valid_mask()
     
     def get_color_ids_flat(self, valid_only: bool = False) -> np.ndarray:
         """
@@ -110,7 +383,7 @@ class BeadGrid:
         Returns:
             1D int array
         """
-        flat = self.grid_ids.flatten()
+        flat = self.map_bands(np.array).ravel()
         if valid_only:
             return flat[flat != EMPTY]
         return flat
@@ -125,7 +398,7 @@ class BeadGrid:
         Returns:
             (N, 2) array, each row is [y, x]
         """
-        mask = self.grid_ids == color_id
+        mask = self.map_bands(lambda ids: ids == color_id)
         coords = np.argwhere(mask)
         return coords if coords.size > 0 else np.array([]).reshape(0, 2)
     
@@ -136,7 +409,7 @@ class BeadGrid:
         Returns:
             {color_id: count} dictionary
         """
-        flat = self.grid_ids.flatten()
+        flat = self.get_color_ids_flat()
         valid_flat = flat[flat != EMPTY]
         unique_ids, counts = np.unique(valid_flat, return_counts=True)
         return dict(zip(unique_ids, counts))
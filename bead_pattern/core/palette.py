@@ -1,3 +1,4 @@
+import hashlib
 from typing import Dict, Optional, List, Tuple
 import numpy as np
 from .color import ColorInfo
@@ -16,6 +17,8 @@ class Palette:
     - Single data source, avoiding color duplication
     - RGB LUT for O(1) color lookup
     - Compact indices for fast array operations
+    - version counter bumped on every change (cache key)
+    - snapshot() shares all tables until one side changes (copy-on-write)
     """
     
     def __init__(self) -> None:
@@ -23,6 +26,35 @@ class Palette:
         self.index_by_id: Dict[int, int] = {}
         self._lut_dirty = True
         self._rgb_lut: Optional[np.ndarray] = None
+        self._sorted_ids: Optional[np.ndarray] = None
+        self.version = 0
+        self._digest: Optional[Tuple[int, bytes]] = None
+        self._shared = False
+    
+    def snapshot(self) -> 'Palette':
+        """
+        Create a copy-on-write snapshot
+        
+        The snapshot shares colors_by_id, the LUT and the cached digest
+        (ColorInfo is immutable); the first upsert on either side copies
+        the color dict before modifying it.
+        
+        Returns:
+            New Palette with the same colors
+        """
+        # build LUT once so both sides share it
+        _ = self.rgb_lut
+        snap = Palette.__new__(Palette)
+        snap.colors_by_id = self.colors_by_id
+        snap.index_by_id = self.index_by_id
+        snap._lut_dirty = False
+        snap._rgb_lut = self._rgb_lut
+        snap._sorted_ids = self._sorted_ids
+        snap.version = self.version
+        snap._digest = self._digest
+        snap._shared = True
+        self._shared = True
+        return snap
     
     @property
     def rgb_lut(self) -> np.ndarray:
@@ -50,11 +82,14 @@ class Palette:
         """
         if not self.colors_by_id:
             self._rgb_lut = np.array([[255, 255, 255]], dtype=np.uint8)
+            self._sorted_ids = np.empty(0, dtype=np.int64)
+            self.index_by_id = {}
             return
         
         sorted_ids = sorted(self.colors_by_id.keys())
         
         self.index_by_id = {cid: idx + 1 for idx, cid in enumerate(sorted_ids)}
+        self._sorted_ids = np.array(sorted_ids, dtype=np.int64)
         
         self._rgb_lut = np.zeros((len(sorted_ids) + 1, 3), dtype=np.uint8)
         self._rgb_lut[0] = [255, 255, 255]
@@ -63,6 +98,59 @@ class Palette:
             color_info = self.colors_by_id[color_id]
             self._rgb_lut[idx + 1] = list(color_info.rgb)
     
+    @property
+    def sorted_ids(self) -> np.ndarray:
+        """
+        Get color IDs in compact index order
+        
+        Returns:
+            np.ndarray shape (K,), sorted_ids[i - 1] is the color_id of compact index i
+        """
+        _ = self.rgb_lut
+        return self._sorted_ids
+    
+    def to_compact_indices(self, color_ids: np.ndarray) -> np.ndarray:
+        """
+        Map color IDs to compact indices (vectorized)
+        
+        Uses binary search over sorted IDs instead of one mask per color,
+        so the cost is independent of palette size.
+        
+        Args:
+            color_ids: int array of any shape (color_id or EMPTY)
+        
+        Returns:
+            int32 array of same shape, 0 for EMPTY/unknown IDs, 1..K otherwise
+            (directly usable as index into rgb_lut)
+        """
+        sorted_ids = self.sorted_ids
+        if sorted_ids.size == 0:
+            return np.zeros(np.shape(color_ids), dtype=np.int32)
+        
+        pos = np.searchsorted(sorted_ids, color_ids)
+        np.minimum(pos, sorted_ids.size - 1, out=pos)
+        found = sorted_ids[pos] == color_ids
+        return np.where(found, pos + 1, 0).astype(np.int32)
+    
+    def content_digest(self) -> bytes:
+        """
+        Get digest of all palette entries (cached per version)
+        
+        Returns:
+            16-byte blake2b digest, independent of insertion order
+        """
+        if self._digest is not None and self._digest[0] == self.version:
+            return self._digest[1]
+        
+        h = hashlib.blake2b(digest_size=16)
+        for color_id in sorted(self.colors_by_id):
+            info = self.colors_by_id[color_id]
+            h.update(repr((info.id, info.code, info.name_zh, info.name_en,
+                           tuple(int(c) for c in info.rgb), info.brand, info.series)).encode('utf-8'))
+        digest = h.digest()
+        self._digest = (self.version, digest)
+        return digest
+    
     def upsert_from_dict(self, d: dict) -> int:
         """
         Insert or update color from dictionary
@@ -95,8 +183,15 @@ class Palette:
             series=d.get('series')
         )
         
+        if self.colors_by_id.get(color_id) == color_info:
+            return color_id
+        
+        if self._shared:
+            self.colors_by_id = dict(self.colors_by_id)
+            self._shared = False
         self.colors_by_id[color_id] = color_info
         self._lut_dirty = True
+        self.version += 1
         
         return color_id
     
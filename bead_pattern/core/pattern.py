@@ -1,8 +1,10 @@
+import hashlib
 import numpy as np
 from typing import Dict, Optional, List, Tuple
 from .color import ColorInfo
 from .palette import Palette
 from .grid import BeadGrid, EMPTY
+from . import transforms
 
 
 class BeadPatternV2:
@@ -18,6 +20,11 @@ class BeadPatternV2:
     - Grid uses int32 array instead of dict
     - Palette uses LUT for O(1) color lookups
     - Vectorized operations for statistics
+    - Color counts cached per grid version
+    - content_hash identifies pattern contents (cache key / ETag)
+    - Geometric transforms work on the index plane (views where possible)
+      and share the palette, no color re-matching
+    - snapshot() shares grid and palette copy-on-write
     """
 
     def __init__(self, width: int, height: int, bead_size_mm: float = 2.6):
@@ -32,12 +39,60 @@ class BeadPatternV2:
         self.grid = BeadGrid(width, height)
         self.palette = Palette()
         self._bead_size_mm = bead_size_mm
+        self._stats_cache = None
+        self._hash_cache = None
+
+    @classmethod
+    def from_grid(cls, grid: BeadGrid, palette: Palette,
+                  bead_size_mm: float = 2.6) -> 'BeadPatternV2':
+        """
+        Build a pattern around an existing grid and palette (no copies)
+
+        Args:
+            grid: BeadGrid (may wrap a view of another pattern's grid)
+            palette: Palette shared with the source pattern
+            bead_size_mm: size of individual bead in millimeters
+
+        Returns:
+            BeadPatternV2 sharing grid and palette
+        """
+        pattern = cls.__new__(cls)
+        pattern.grid = grid
+        pattern.palette = palette
+        pattern._bead_size_mm = bead_size_mm
+        pattern._stats_cache = None
+        pattern._hash_cache = None
+        return pattern
 
     @property
     def bead_size_mm(self) -> float:
         """Bead size in millimeters"""
         return self._bead_size_mm
 
+    @property
+    def content_hash(self) -> str:
+        """
+        Stable hash of grid contents, palette entries and bead size
+
+        Two patterns with identical contents have the same hash. Cached
+        until grid or palette version changes.
+
+        Returns:
+            32-char hex string
+        """
+        key = (self.grid, self.grid.version, self.palette, self.palette.version, self._bead_size_mm)
+        cache = self._hash_cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.grid.content_digest())
+        h.update(self.palette.content_digest())
+        h.update(repr(float(self._bead_size_mm)).encode('ascii'))
+        value = h.hexdigest()
+        self._hash_cache = (key, value)
+        return value
+
     @property
     def actual_width_mm(self) -> float:
         """Actual width in millimeters"""
@@ -65,7 +120,7 @@ class BeadPatternV2:
                 'background_beads': number of background beads (if exclude_background)
             }
         """
-        flat_ids = self.grid.get_color_ids_flat(valid_only=False)
+        unique_ids, counts = self._color_counts()
 
         # Determine background IDs
         background_ids = set()
@@ -76,13 +131,13 @@ class BeadPatternV2:
                 background_ids = set(self.palette.get_background_ids())
 
         if exclude_background and background_ids:
-            valid_mask = ~np.isin(flat_ids, list(background_ids))
-            flat_ids = flat_ids[valid_mask]
-            background_count = self.grid.get_color_ids_flat(valid_only=False).size - flat_ids.size
+            valid_mask = ~np.isin(unique_ids, list(background_ids))
+            background_count = int(counts[~valid_mask].sum())
+            unique_ids = unique_ids[valid_mask]
+            counts = counts[valid_mask]
         else:
             background_count = 0
 
-        unique_ids, counts = np.unique(flat_ids, return_counts=True)
         color_counts = dict(zip(unique_ids.tolist(), counts.tolist()))
 
         return {
@@ -92,6 +147,28 @@ class BeadPatternV2:
             'background_beads': background_count if exclude_background else None
         }
 
+    def _color_counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get (unique_ids, counts) over all cells, EMPTY included
+
+        Cached until the grid changes (keyed on grid object and grid.version).
+        """
+        cache = self._stats_cache
+        if cache is not None and cache[0] is self.grid and cache[1] == self.grid.version:
+            return cache[2], cache[3]
+        chunks = [np.unique(ids, return_counts=True) for _, ids in self.grid.iter_bands()]
+        if len(chunks) == 1:
+            unique_ids, counts = chunks[0]
+        else:
+            # Count band by band so private copy-on-write bands are not merged
+            chunk_ids = np.concatenate([ids for ids, _ in chunks]) if chunks else np.empty(0, np.int32)
+            unique_ids, inverse = np.unique(chunk_ids, return_inverse=True)
+            counts = np.zeros(len(unique_ids), dtype=np.intp)
+            if chunks:
+                np.add.at(counts, inverse, np.concatenate([c for _, c in chunks]))
+        self._stats_cache = (self.grid, self.grid.version, unique_ids, counts)
+        return unique_ids, counts
+
     def get_subject_bounds(self, background_colors: Optional[List[int]] = None) -> Optional[Tuple[int, int, int, int]]:
         """
         Get bounding box of non-background beads
@@ -153,3 +230,160 @@ class BeadPatternV2:
             'width_mm': width * self._bead_size_mm,
             'height_mm': height * self._bead_size_mm
         }
+
+    def snapshot(self) -> 'BeadPatternV2':
+        """
+        Create a copy-on-write snapshot
+
+        Grid array and palette are shared until one side writes; a write
+        then copies only the touched band of rows (see BeadGrid) or the
+        color dict (see Palette). Statistics and hash caches carry over.
+
+        Returns:
+            New BeadPatternV2 with the same contents
+        """
+        snap = BeadPatternV2.from_grid(self.grid.snapshot(), self.palette.snapshot(),
+                                       self._bead_size_mm)
+        cache = self._stats_cache
+        if cache is not None and cache[0] is self.grid and cache[1] == self.grid.version:
+            snap._stats_cache = (snap.grid, snap.grid.version, cache[2], cache[3])
+        return snap
+
+    # ------------------------------------------------------------------
+    # Geometric transforms
+    #
+    # Each returns a new pattern with a snapshot of this palette. mirror,
+    # rotate and crop wrap NumPy views of the index plane: the shared
+    # array is made read-only, so a later write through the grid API on
+    # either side copies the touched band instead of leaking into the
+    # other pattern.
+    # ------------------------------------------------------------------
+
+    def _derive(self, grid_ids: np.ndarray,
+                counts: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> 'BeadPatternV2':
+        """
+        Wrap a transformed index plane in a new pattern
+
+        Args:
+            grid_ids: transformed (H, W) array (view or new array)
+            counts: known (unique_ids, counts) for the result, seeds the statistics cache
+
+        Returns:
+            New BeadPatternV2 with a snapshot of this palette
+        """
+        derived = BeadPatternV2.from_grid(BeadGrid.from_array(grid_ids), self.palette.snapshot(),
+                                          self._bead_size_mm)
+        if counts is not None:
+            derived._stats_cache = (derived.grid, derived.grid.version, counts[0], counts[1])
+        return derived
+
+    def mirror(self, axis: str = 'horizontal') -> 'BeadPatternV2':
+        """
+        Mirror pattern
+
+        Args:
+            axis: 'horizontal' (left-right) or 'vertical' (top-bottom)
+
+        Returns:
+            Mirrored pattern (view of this grid)
+        """
+        return self._derive(transforms.mirror_ids(self.grid.rows(), axis), self._color_counts())
+
+    def rotate(self, degrees: int) -> 'BeadPatternV2':
+        """
+        Rotate pattern clockwise
+
+        Args:
+            degrees: multiple of 90 (negative rotates counter-clockwise)
+
+        Returns:
+            Rotated pattern (view of this grid)
+        """
+        return self._derive(transforms.rotate_ids(self.grid.rows(), degrees), self._color_counts())
+
+    def crop(self, bounds: Tuple[int, int, int, int]) -> 'BeadPatternV2':
+        """
+        Crop pattern
+
+        Args:
+            bounds: (min_x, min_y, max_x, max_y), max exclusive - same as get_subject_bounds
+
+        Returns:
+            Cropped pattern (view of this grid)
+        """
+        return self._derive(transforms.crop_ids(self.grid.rows(), bounds))
+
+    def crop_to_subject(self, background_colors: Optional[List[int]] = None,
+                        margin: int = 0) -> 'BeadPatternV2':
+        """
+        Crop pattern to the non-background region
+
+        Args:
+            background_colors: explicit background color IDs, None means auto-detect white colors
+            margin: extra beads kept around the subject (clamped to the grid)
+
+        Returns:
+            Cropped pattern, or a full view if there is no subject
+        """
+        bounds = self.get_subject_bounds(background_colors)
+        if bounds is None:
+            return self.crop((0, 0, self.grid.width, self.grid.height))
+        min_x, min_y, max_x, max_y = bounds
+        return self.crop((max(0, min_x - margin), max(0, min_y - margin),
+                          min(self.grid.width, max_x + margin),
+                          min(self.grid.height, max_y + margin)))
+
+    def pad(self, left: int = 0, top: int = 0, right: int = 0, bottom: int = 0,
+            color_id: int = EMPTY) -> 'BeadPatternV2':
+        """
+        Add a border around the pattern
+
+        Args:
+            left, top, right, bottom: border width in beads
+            color_id: fill color ID (EMPTY by default, must be in the palette otherwise)
+
+        Returns:
+            Padded pattern (new array)
+
+        Raises:
+            ValueError: if color_id is not in the palette
+        """
+        if color_id != EMPTY and color_id not in self.palette.colors_by_id:
+            raise ValueError(f"Color ID {color_id} is not in the palette")
+        grid_ids = transforms.pad_ids(self.grid.rows(), left, top, right, bottom, color_id)
+
+        unique_ids, counts = self._color_counts()
+        added = grid_ids.size - len(self.grid)
+        if added:
+            merged = dict(zip(unique_ids.tolist(), counts.tolist()))
+            merged[color_id] = merged.get(color_id, 0) + added
+            unique_ids = np.array(sorted(merged), dtype=unique_ids.dtype)
+            counts = np.array([merged[i] for i in unique_ids.tolist()], dtype=counts.dtype)
+        return self._derive(grid_ids, (unique_ids, counts))
+
+    def upscale(self, factor: int) -> 'BeadPatternV2':
+        """
+        Integer upscale, each bead becomes factor x factor beads
+
+        Args:
+            factor: integer scale factor >= 1
+
+        Returns:
+            Upscaled pattern (new array)
+        """
+        unique_ids, counts = self._color_counts()
+        return self._derive(transforms.upscale_ids(self.grid.rows(), factor),
+                            (unique_ids, counts * factor * factor))
+
+    def downscale(self, factor: int) -> 'BeadPatternV2':
+        """
+        Mode-preserving integer downscale, each factor x factor block
+        becomes its most frequent color (no new colors introduced)
+
+        Args:
+            factor: integer block size >= 1
+
+        Returns:
+            Downscaled pattern (new array)
+        """
+        return self._derive(transforms.mode_downscale_ids(self.grid.rows(), factor, self.palette))
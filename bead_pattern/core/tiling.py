@@ -0,0 +1,198 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from .grid import BeadGrid
+from .palette import Palette
+
+
+# Common pegboard sizes (beads per side) by bead size in millimeters
+DEFAULT_BOARD_SIZES: Dict[float, Tuple[int, int]] = {
+    5.0: (29, 29),
+    2.6: (50, 50),
+}
+
+
+def default_board_size(bead_size_mm: float) -> Tuple[int, int]:
+    """
+    Get the standard pegboard size for a bead size
+
+    Args:
+        bead_size_mm: size of individual bead in millimeters
+
+    Returns:
+        (board_width, board_height) in beads, 29x29 when unknown
+    """
+    return DEFAULT_BOARD_SIZES.get(bead_size_mm, (29, 29))
+
+
+@dataclass(frozen=True)
+class BoardTile:
+    """
+    One pegboard of a tiled pattern
+
+    Coordinates are in beads, half-open: [x0, x1) x [y0, y1).
+    Edge tiles may be smaller than the board.
+
+    Args:
+        index: flat tile index (row-major)
+        row: tile row (0-based)
+        col: tile column (0-based)
+    """
+
+    index: int
+    row: int
+    col: int
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+
+    @property
+    def width(self) -> int:
+        """Tile width in beads"""
+        return self.x1 - self.x0
+
+    @property
+    def height(self) -> int:
+        """Tile height in beads"""
+        return self.y1 - self.y0
+
+    @property
+    def label(self) -> str:
+        """Human readable board label, e.g. R1C2"""
+        return f"R{self.row + 1}C{self.col + 1}"
+
+    def view(self, grid_ids: np.ndarray) -> np.ndarray:
+        """
+        Get this tile's region of a grid (zero-copy view)
+
+        Args:
+            grid_ids: full (H, W) grid array
+
+        Returns:
+            (height, width) view into grid_ids
+        """
+        return grid_ids[self.y0:self.y1, self.x0:self.x1]
+
+
+class BoardTiling:
+    """
+    Partition of a BeadGrid into fixed-size pegboards
+
+    Tiles are views into the grid, nothing is copied. Per-tile color
+    counts are computed for all tiles at once with a single bincount
+    over (tile_index, compact_color_index) keys.
+
+    Args:
+        grid: BeadGrid to partition
+        board_width: board width in beads
+        board_height: board height in beads (defaults to board_width)
+    """
+
+    def __init__(self, grid: BeadGrid, board_width: int, board_height: Optional[int] = None):
+        if board_height is None:
+            board_height = board_width
+        if board_width <= 0 or board_height <= 0:
+            raise ValueError("Board size must be positive")
+
+        self.grid = grid
+        self.board_width = board_width
+        self.board_height = board_height
+        self.cols = -(-grid.width // board_width) if grid.width else 0
+        self.rows = -(-grid.height // board_height) if grid.height else 0
+
+        self.tiles: List[BoardTile] = []
+        for row in range(self.rows):
+            y0 = row * board_height
+            y1 = min(y0 + board_height, grid.height)
+            for col in range(self.cols):
+                x0 = col * board_width
+                x1 = min(x0 + board_width, grid.width)
+                self.tiles.append(BoardTile(len(self.tiles), row, col, x0, y0, x1, y1))
+
+    def __len__(self) -> int:
+        """Number of tiles"""
+        return len(self.tiles)
+
+    def __iter__(self) -> Iterator[BoardTile]:
+        return iter(self.tiles)
+
+    def get_tile(self, row: int, col: int) -> BoardTile:
+        """
+        Get tile by board coordinates
+
+        Args:
+            row: tile row (0-based)
+            col: tile column (0-based)
+
+        Returns:
+            BoardTile
+
+        Raises:
+            IndexError: if coordinates are outside the tiling
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Tile ({row}, {col}) out of range {self.rows}x{self.cols}")
+        return self.tiles[row * self.cols + col]
+
+    def iter_views(self) -> Iterator[Tuple[BoardTile, np.ndarray]]:
+        """
+        Iterate tiles together with their zero-copy grid views
+
+        Yields:
+            (tile, view) pairs
+        """
+        for tile in self.tiles:
+            yield tile, self.grid.rows(tile.y0, tile.y1)[:, tile.x0:tile.x1]
+
+    def tile_index_map(self) -> np.ndarray:
+        """
+        Get tile index of every grid cell
+
+        Returns:
+            (H, W) int64 array, value = flat tile index
+        """
+        row_idx = np.arange(self.grid.height) // self.board_height
+        col_idx = np.arange(self.grid.width) // self.board_width
+        return row_idx[:, None] * self.cols + col_idx[None, :]
+
+    def tile_color_counts(self, palette: Palette) -> np.ndarray:
+        """
+        Count colors of every tile in one vectorized pass
+
+        Args:
+            palette: Palette used to map color IDs to compact indices
+
+        Returns:
+            (n_tiles, K+1) int64 array; column 0 counts EMPTY/unknown cells,
+            column i counts compact index i (color_id = palette.sorted_ids[i - 1])
+        """
+        n_bins = len(palette) + 1
+        compact = self.grid.map_bands(palette.to_compact_indices)
+        keys = self.tile_index_map() * n_bins + compact
+        counts = np.bincount(keys.ravel(), minlength=len(self.tiles) * n_bins)
+        return counts.reshape(len(self.tiles), n_bins)
+
+    def tile_boms(self, palette: Palette,
+                  exclude_ids: Optional[set] = None) -> List[Dict[int, int]]:
+        """
+        Get per-tile bill of materials
+
+        Args:
+            palette: Palette of the pattern
+            exclude_ids: color IDs to leave out (e.g. background colors)
+
+        Returns:
+            List indexed by tile index of {color_id: count}, counts > 0 only
+        """
+        counts = self.tile_color_counts(palette)
+        color_ids = palette.sorted_ids
+        keep = np.ones(color_ids.size, dtype=bool)
+        if exclude_ids:
+            keep &= ~np.isin(color_ids, list(exclude_ids))
+
+        boms = []
+        for tile_counts in counts[:, 1:]:
+            mask = keep & (tile_counts > 0)
+            boms.append(dict(zip(color_ids[mask].tolist(), tile_counts[mask].tolist())))
+        return boms
@@ -0,0 +1,172 @@
+import numpy as np
+from typing import Tuple
+from .grid import EMPTY
+from .palette import Palette
+
+
+# Maximum number of (block, color) counters held at once by mode_downscale
+_MODE_CHUNK_CELLS = 1 << 22
+
+
+def mirror_ids(grid_ids: np.ndarray, axis: str = 'horizontal') -> np.ndarray:
+    """
+    Mirror the index plane (view, no copy)
+
+    Args:
+        grid_ids: (H, W) color ID array
+        axis: 'horizontal' (left-right) or 'vertical' (top-bottom)
+
+    Returns:
+        Mirrored view of grid_ids
+
+    Raises:
+        ValueError: if axis is unknown
+    """
+    if axis == 'horizontal':
+        return grid_ids[:, ::-1]
+    if axis == 'vertical':
+        return grid_ids[::-1, :]
+    raise ValueError(f"Unknown mirror axis: {axis}")
+
+
+def rotate_ids(grid_ids: np.ndarray, degrees: int) -> np.ndarray:
+    """
+    Rotate the index plane clockwise (view, no copy)
+
+    Args:
+        grid_ids: (H, W) color ID array
+        degrees: 0, 90, 180 or 270 (negative values rotate counter-clockwise)
+
+    Returns:
+        Rotated view of grid_ids
+
+    Raises:
+        ValueError: if degrees is not a multiple of 90
+    """
+    if degrees % 90 != 0:
+        raise ValueError(f"Rotation must be a multiple of 90 degrees, got {degrees}")
+    return np.rot90(grid_ids, k=-(degrees // 90) % 4)
+
+
+def crop_ids(grid_ids: np.ndarray, bounds: Tuple[int, int, int, int]) -> np.ndarray:
+    """
+    Crop the index plane (view, no copy)
+
+    Args:
+        grid_ids: (H, W) color ID array
+        bounds: (min_x, min_y, max_x, max_y), max exclusive - same as get_subject_bounds
+
+    Returns:
+        Cropped view of grid_ids
+
+    Raises:
+        ValueError: if bounds are empty or outside the grid
+    """
+    height, width = grid_ids.shape
+    min_x, min_y, max_x, max_y = (int(v) for v in bounds)
+    if not (0 <= min_x < max_x <= width and 0 <= min_y < max_y <= height):
+        raise ValueError(f"Invalid crop bounds {bounds} for grid {width}x{height}")
+    return grid_ids[min_y:max_y, min_x:max_x]
+
+
+def pad_ids(grid_ids: np.ndarray, left: int = 0, top: int = 0, right: int = 0,
+            bottom: int = 0, fill_id: int = EMPTY) -> np.ndarray:
+    """
+    Pad the index plane with a constant color ID
+
+    Args:
+        grid_ids: (H, W) color ID array
+        left, top, right, bottom: padding in beads (>= 0)
+        fill_id: color ID of the new cells (EMPTY by default)
+
+    Returns:
+        New (H + top + bottom, W + left + right) int32 array
+
+    Raises:
+        ValueError: if any padding is negative
+    """
+    if min(left, top, right, bottom) < 0:
+        raise ValueError("Padding must be non-negative")
+    height, width = grid_ids.shape
+    padded = np.full((height + top + bottom, width + left + right), fill_id, dtype=np.int32)
+    padded[top:top + height, left:left + width] = grid_ids
+    return padded
+
+
+def upscale_ids(grid_ids: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Integer nearest-neighbour upscale (each bead becomes factor x factor beads)
+
+    Args:
+        grid_ids: (H, W) color ID array
+        factor: integer scale factor >= 1
+
+    Returns:
+        New (H * factor, W * factor) int32 array
+    """
+    if factor < 1:
+        raise ValueError("Upscale factor must be >= 1")
+    height, width = grid_ids.shape
+    out = np.empty((height, factor, width, factor), dtype=np.int32)
+    out[...] = grid_ids[:, None, :, None]
+    return out.reshape(height * factor, width * factor)
+
+
+def mode_downscale_ids(grid_ids: np.ndarray, factor: int, palette: Palette) -> np.ndarray:
+    """
+    Mode-preserving integer downscale
+
+    Each factor x factor block becomes its most frequent color, so no new
+    colors are introduced (unlike averaging). EMPTY cells only win when the
+    whole block is empty; ties go to the lower compact index. Partial blocks
+    at the right/bottom edge are treated as padded with EMPTY.
+
+    Counting is one bincount over (block, compact_index) keys, processed in
+    row chunks to bound memory for large palettes.
+
+    Args:
+        grid_ids: (H, W) color ID array
+        factor: integer block size >= 1
+        palette: Palette used for compact indices
+
+    Returns:
+        New (ceil(H / factor), ceil(W / factor)) int32 array
+    """
+    if factor < 1:
+        raise ValueError("Downscale factor must be >= 1")
+    if factor == 1:
+        return np.array(grid_ids, dtype=np.int32)
+
+    height, width = grid_ids.shape
+    out_h = -(-height // factor)
+    out_w = -(-width // factor)
+
+    compact = palette.to_compact_indices(grid_ids)
+    if out_h * factor != height or out_w * factor != width:
+        compact = np.pad(compact, ((0, out_h * factor - height), (0, out_w * factor - width)))
+
+    n_bins = len(palette) + 1
+    # id of every compact index, EMPTY for 0
+    ids_by_compact = np.concatenate(([EMPTY], palette.sorted_ids)).astype(np.int32)
+
+    result = np.empty((out_h, out_w), dtype=np.int32)
+    rows_per_chunk = max(1, _MODE_CHUNK_CELLS // max(1, out_w * n_bins))
+    block_col = np.repeat(np.arange(out_w), factor)
+
+    for start in range(0, out_h, rows_per_chunk):
+        stop = min(start + rows_per_chunk, out_h)
+        chunk = compact[start * factor:stop * factor]
+        block_row = np.repeat(np.arange(stop - start), factor)
+        block_index = block_row[:, None] * out_w + block_col[None, :]
+        counts = np.bincount((block_index * n_bins + chunk).ravel(),
+                             minlength=(stop - start) * out_w * n_bins)
+        counts = counts.reshape(-1, n_bins)
+        # EMPTY only wins when nothing else is present
+        if n_bins > 1:
+            best = np.argmax(counts[:, 1:], axis=1) + 1
+            best[counts[:, 1:].sum(axis=1) == 0] = 0
+        else:
+            best = np.zeros(len(counts), dtype=np.int64)
+        result[start:stop] = ids_by_compact[best].reshape(stop - start, out_w)
+
+    return result
@@ -4,11 +4,28 @@
 
 from .json_io import to_json, from_json, to_legacy_json
 from .csv_io import to_csv_coords, to_csv_summary
+from .png_stream import PNGStreamWriter
+from .compact_io import to_compact_payload, from_compact_payload, to_compact_bytes, from_compact_bytes
+from .pdf_io import draw_pattern_vector, register_pdf_fonts
+from .svg_io import to_svg
+from .zip_stream import ZipStreamWriter, stream_zip
+from .text_output import open_text_output
 
 __all__ = [
     'to_json',
     'from_json',
     'to_legacy_json',
     'to_csv_coords',
-    'to_csv_summary'
+    'to_csv_summary',
+    'PNGStreamWriter',
+    'to_compact_payload',
+    'from_compact_payload',
+    'to_compact_bytes',
+    'from_compact_bytes',
+    'draw_pattern_vector',
+    'register_pdf_fonts',
+    'to_svg',
+    'ZipStreamWriter',
+    'stream_zip',
+    'open_text_output',
 ]
@@ -0,0 +1,163 @@
+import base64
+import json
+import struct
+import zlib
+import numpy as np
+from typing import Dict
+from ..core.grid import BeadGrid
+from ..core.palette import Palette
+from ..core.pattern import BeadPatternV2
+
+
+COMPACT_FORMAT_VERSION = 1
+
+# 二进制格式：魔数 + 头部长度（uint32 小端）+ JSON 头部 + zlib 压缩的紧凑索引平面
+COMPACT_BINARY_MAGIC = b'BPC1'
+
+
+def to_compact_payload(pattern: BeadPatternV2) -> Dict:
+    """
+    导出紧凑图案数据（供前端 canvas 直接绘制）
+
+    结构：
+    - width, height, bead_size_mm, content_hash: 元数据
+    - palette: 按紧凑索引排列的颜色列表（id / code / 标签文字 label / rgb），
+      下标 0 为空白（白色）
+    - dtype: 'uint8'（不超过 255 种颜色）或 'uint16'
+    - indices: 紧凑索引平面（行优先、小端）的 base64 编码
+
+    100×100 的图案约 13KB，远小于两张预览 PNG。
+
+    Args:
+        pattern: BeadPatternV2对象
+
+    Returns:
+        可直接 JSON 序列化的字典
+    """
+    palette = pattern.palette
+    lut = palette.rgb_lut
+    sorted_ids = palette.sorted_ids
+    compact = pattern.grid.map_bands(palette.to_compact_indices)
+    dtype = np.dtype(np.uint8 if len(lut) <= 256 else np.uint16).newbyteorder('<')
+
+    colors = [{'id': None, 'code': '', 'label': '', 'rgb': [255, 255, 255]}]
+    for color_id in sorted_ids:
+        color_info = palette.get_color(int(color_id))
+        colors.append({
+            'id': color_info.id,
+            'code': color_info.code,
+            'label': color_info.display_code,
+            'rgb': list(color_info.rgb),
+        })
+
+    return {
+        'format': 'compact',
+        'format_version': COMPACT_FORMAT_VERSION,
+        'width': pattern.grid.width,
+        'height': pattern.grid.height,
+        'bead_size_mm': pattern.bead_size_mm,
+        'content_hash': pattern.content_hash,
+        'palette': colors,
+        'dtype': dtype.name,
+        'indices': base64.b64encode(compact.astype(dtype).tobytes()).decode('ascii'),
+    }
+
+
+def from_compact_payload(data: Dict) -> BeadPatternV2:
+    """
+    从紧凑图案数据重建图案
+
+    Args:
+        data: to_compact_payload 的结果
+
+    Returns:
+        BeadPatternV2对象
+    """
+    width, height = data['width'], data['height']
+    dtype = np.dtype(data['dtype']).newbyteorder('<')
+    compact = np.frombuffer(base64.b64decode(data['indices']), dtype=dtype).reshape(height, width)
+
+    palette = Palette()
+    ids = np.full(len(data['palette']), BeadGrid.EMPTY, dtype=np.int32)
+    for i, color in enumerate(data['palette'][1:], start=1):
+        ids[i] = color['id']
+        palette.upsert_from_dict({'id': color['id'], 'code': color['code'], 'rgb': color['rgb']})
+
+    grid = BeadGrid.from_array(ids[compact])
+    return BeadPatternV2.from_grid(grid, palette, data.get('bead_size_mm', 2.6))
+
+
+def to_compact_bytes(pattern: BeadPatternV2, compress_level: int = 1) -> bytes:
+    """
+    导出紧凑二进制图案（用于落盘暂存）
+
+    头部保存尺寸、拼豆尺寸和完整色板（含中英文名、品牌、系列），
+    网格保存为 uint8/uint16 紧凑索引并用 zlib 压缩；
+    100×100、几十种颜色的图案通常只有几 KB。
+
+    Args:
+        pattern: BeadPatternV2对象
+        compress_level: zlib 压缩级别
+
+    Returns:
+        二进制数据
+    """
+    palette = pattern.palette
+    sorted_ids = palette.sorted_ids
+    compact = pattern.grid.map_bands(palette.to_compact_indices)
+    dtype = np.dtype(np.uint8 if len(sorted_ids) < 256 else np.uint16).newbyteorder('<')
+
+    colors = []
+    for color_id in sorted_ids:
+        color_info = palette.get_color(int(color_id))
+        colors.append({
+            'id': color_info.id,
+            'code': color_info.code,
+            'name_zh': color_info.name_zh,
+            'name_en': color_info.name_en,
+            'rgb': list(color_info.rgb),
+            'brand': color_info.brand,
+            'series': color_info.series,
+        })
+
+    header = json.dumps({
+        'format_version': COMPACT_FORMAT_VERSION,
+        'width': pattern.grid.width,
+        'height': pattern.grid.height,
+        'bead_size_mm': pattern.bead_size_mm,
+        'dtype': dtype.name,
+        'palette': colors,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    indices = zlib.compress(compact.astype(dtype).tobytes(), compress_level)
+    return COMPACT_BINARY_MAGIC + struct.pack('<I', len(header)) + header + indices
+
+
+def from_compact_bytes(data: bytes) -> BeadPatternV2:
+    """
+    从紧凑二进制数据重建图案
+
+    Args:
+        data: to_compact_bytes 的结果
+
+    Returns:
+        BeadPatternV2对象
+
+    Raises:
+        ValueError: 数据格式不正确
+    """
+    if data[:4] != COMPACT_BINARY_MAGIC:
+        raise ValueError("不是紧凑二进制图案数据")
+    (header_size,) = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_size].decode('utf-8'))
+    width, height = header['width'], header['height']
+    dtype = np.dtype(header['dtype']).newbyteorder('<')
+    compact = np.frombuffer(zlib.decompress(data[8 + header_size:]), dtype=dtype).reshape(height, width)
+
+    palette = Palette()
+    ids = np.full(len(header['palette']) + 1, BeadGrid.EMPTY, dtype=np.int32)
+    for i, color in enumerate(header['palette'], start=1):
+        ids[i] = color['id']
+        palette.upsert_from_dict(color)
+
+    grid = BeadGrid.from_array(ids[compact])
+    return BeadPatternV2.from_grid(grid, palette, header['bead_size_mm'])
@@ -25,7 +25,7 @@ def to_json(pattern: BeadPatternV2, file_path: str, format_version: str = "2.0")
         'height': pattern.height,
         'bead_size_mm': pattern.bead_size_mm,
         'palette': [],
-        'grid_ids': pattern.grid.grid_ids.tolist(),
+        'grid_ids': [row for _, ids in pattern.grid.iter_bands() for row in ids.tolist()],
         'statistics': pattern.get_color_statistics()
     }
     
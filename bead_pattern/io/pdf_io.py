@@ -0,0 +1,220 @@
+"""
+矢量 PDF 绘制
+
+直接在 ReportLab 画布上绘制图案，不嵌入位图：
+- 单元格：每行相同颜色的连续单元格合并为一个矩形，同色矩形放在一条路径里一次填充
+- 网格线：所有细线一条路径、加粗线一条路径
+- 色号：嵌入 TrueType 字体的真实文字（先描边后填充），任意缩放打印都清晰
+"""
+
+import threading
+import numpy as np
+from typing import Dict, Optional, Tuple
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+from ..core.pattern import BeadPatternV2
+from ..render.fonts import get_font_registry
+from ..render.labels import compute_text_color
+
+
+LABEL_FONT_NAME = 'BeadLabel'
+# 中文信息文本使用 ReportLab 内置 CID 字体（阅读器自带，无需嵌入）
+INFO_FONT_NAME = 'STSong-Light'
+
+_font_lock = threading.Lock()
+_registered: Dict[str, str] = {}
+
+
+def register_pdf_fonts() -> Tuple[str, str]:
+    """
+    注册 PDF 字体（每个进程只注册一次）
+
+    - 色号：字体注册表探测到的 TrueType 字体（嵌入子集），不可用时退回 Helvetica
+    - 信息文本：STSong-Light，不可用时退回 Helvetica
+
+    Returns:
+        (色号字体名, 信息文本字体名)
+    """
+    with _font_lock:
+        if not _registered:
+            label_font = 'Helvetica'
+            path = get_font_registry().font_path()
+            if path:
+                try:
+                    pdfmetrics.registerFont(TTFont(LABEL_FONT_NAME, path))
+                    label_font = LABEL_FONT_NAME
+                except Exception:
+                    pass
+            info_font = 'Helvetica'
+            try:
+                pdfmetrics.registerFont(UnicodeCIDFont(INFO_FONT_NAME))
+                info_font = INFO_FONT_NAME
+            except Exception:
+                pass
+            _registered['label'] = label_font
+            _registered['info'] = info_font
+        return _registered['label'], _registered['info']
+
+
+def color_runs(compact: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    按行把相同紧凑索引的连续单元格合并为区段
+
+    Args:
+        compact: (H, W) 紧凑索引
+
+    Returns:
+        (rows, starts, lengths, indices)，每个区段一项
+    """
+    height, width = compact.shape
+    if compact.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    change = np.ones((height, width), dtype=bool)
+    change[:, 1:] = compact[:, 1:] != compact[:, :-1]
+    rows, starts = np.nonzero(change)
+    # 每行第 0 列都是区段起点，因此区段不会跨行
+    flat_starts = rows * width + starts
+    lengths = np.diff(np.append(flat_starts, height * width))
+    return rows, starts, lengths, compact[rows, starts]
+
+
+def label_font_size(cell_pt: float, font_name: str, labels) -> float:
+    """
+    色号字体大小（点）：约为单元格的一半，最长的色号不超过单元格宽度的 80%
+
+    Args:
+        cell_pt: 单元格大小（点）
+        font_name: 字体名
+        labels: 本次要绘制的色号文字
+
+    Returns:
+        字体大小（点）
+    """
+    size = cell_pt * 0.5
+    widest = max((pdfmetrics.stringWidth(text, font_name, size) for text in labels), default=0)
+    if widest > cell_pt * 0.8:
+        size *= cell_pt * 0.8 / widest
+    return size
+
+
+def draw_pattern_vector(c, pattern, x: float, y: float, cell_pt: float,
+                        show_grid: bool = True, show_labels: bool = True,
+                        grid_color: Tuple[int, int, int] = (200, 200, 200),
+                        grid_width_pt: float = 0.25,
+                        major_interval: int = 0,
+                        major_color: Tuple[int, int, int] = (0, 0, 0),
+                        major_width_pt: float = 0.6,
+                        font_name: Optional[str] = None,
+                        bounds: Optional[Tuple[int, int, int, int]] = None,
+                        font_size: Optional[float] = None) -> None:
+    """
+    在 ReportLab 画布上以矢量方式绘制图案
+
+    Args:
+        c: reportlab.pdfgen.canvas.Canvas
+        pattern: BeadPatternV2 或 BeadPattern 兼容层对象
+        x: 图案左上角 x（点，PDF 坐标）
+        y: 图案左上角 y（点，PDF 坐标，向上为正）
+        cell_pt: 单元格大小（点）
+        show_grid: 是否绘制网格线
+        show_labels: 是否绘制色号
+        grid_color: 细网格线颜色
+        grid_width_pt: 细网格线宽度（点）
+        major_interval: 加粗线间隔（格数），0 表示不绘制
+        major_color: 加粗线颜色
+        major_width_pt: 加粗线宽度（点）
+        font_name: 色号字体（None 使用 register_pdf_fonts 的结果）
+        bounds: 只绘制 (min_x, min_y, max_x, max_y) 区域，该区域左上角画在 (x, y)
+        font_size: 色号字体大小（点，None 按本次出现的色号自动计算）；
+                   分页打印时各页传入同一值，保证字号一致
+    """
+    pattern: BeadPatternV2 = pattern._v2 if hasattr(pattern, '_v2') else pattern
+    palette = pattern.palette
+    lut = palette.rgb_lut
+    compact = pattern.grid.map_bands(palette.to_compact_indices, bounds)
+    height, width = compact.shape
+
+    c.saveState()
+
+    # 单元格：同色区段合并到一条路径
+    rows, starts, lengths, indices = color_runs(compact)
+    order = np.argsort(indices, kind='stable')
+    splits = np.flatnonzero(np.diff(indices[order])) + 1
+    for group in np.split(order, splits):
+        if group.size == 0 or indices[group[0]] == 0:
+            continue
+        r, g, b = (int(v) for v in lut[indices[group[0]]])
+        c.setFillColorRGB(r / 255, g / 255, b / 255)
+        path = c.beginPath()
+        for row, start, length in zip(rows[group].tolist(), starts[group].tolist(),
+                                      lengths[group].tolist()):
+            path.rect(x + start * cell_pt, y - (row + 1) * cell_pt, length * cell_pt, cell_pt)
+        c.drawPath(path, stroke=0, fill=1)
+
+    # 色号：每种颜色一个文本对象，先描边再填充
+    if show_labels:
+        if font_name is None:
+            font_name = register_pdf_fonts()[0]
+        present = np.unique(indices)
+        present = present[present > 0]
+        codes = {int(idx): palette.get_color(int(palette.sorted_ids[idx - 1])).display_code
+                 for idx in present}
+        size = font_size if font_size is not None else label_font_size(cell_pt, font_name, codes.values())
+        baseline = cell_pt / 2 - size * 0.35
+        widths = {idx: pdfmetrics.stringWidth(text, font_name, size) for idx, text in codes.items()}
+
+        ys, xs = np.nonzero(compact)
+        cell_idx = compact[ys, xs]
+        order = np.argsort(cell_idx, kind='stable')
+        splits = np.flatnonzero(np.diff(cell_idx[order])) + 1
+        c.setLineJoin(1)
+        c.setLineWidth(max(0.3, size * 0.12))
+        for group in np.split(order, splits):
+            if group.size == 0:
+                continue
+            idx = int(cell_idx[group[0]])
+            text, text_w = codes[idx], widths[idx]
+            text_rgb = compute_text_color(tuple(int(v) for v in lut[idx]))
+            stroke_rgb = tuple(255 - v for v in text_rgb)
+            c.setFillColorRGB(*(v / 255 for v in text_rgb))
+            c.setStrokeColorRGB(*(v / 255 for v in stroke_rgb))
+            # 相对移动（Td）代替绝对定位：相邻单元格的位移相同，压缩后几乎不占空间
+            xs_pt = (x + xs[group] * cell_pt + (cell_pt - text_w) / 2).tolist()
+            ys_pt = (y - (ys[group] + 1) * cell_pt + baseline).tolist()
+            for mode in (1, 0):
+                obj = c.beginText()
+                obj.setFont(font_name, size)
+                obj.setTextRenderMode(mode)
+                obj.setTextOrigin(xs_pt[0], ys_pt[0])
+                obj.textOut(text)
+                for i in range(1, len(xs_pt)):
+                    obj.moveCursor(xs_pt[i] - xs_pt[i - 1], ys_pt[i - 1] - ys_pt[i])
+                    obj.textOut(text)
+                c.drawText(obj)
+
+    # 网格线：细线、加粗线各一条路径
+    if show_grid:
+        right, bottom = x + width * cell_pt, y - height * cell_pt
+        thin = c.beginPath()
+        major = c.beginPath()
+        for i in range(width + 1):
+            is_major = major_interval > 0 and i % major_interval == 0
+            target = major if is_major else thin
+            target.moveTo(x + i * cell_pt, y)
+            target.lineTo(x + i * cell_pt, bottom)
+        for j in range(height + 1):
+            is_major = major_interval > 0 and j % major_interval == 0
+            target = major if is_major else thin
+            target.moveTo(x, y - j * cell_pt)
+            target.lineTo(right, y - j * cell_pt)
+        c.setStrokeColorRGB(*(v / 255 for v in grid_color))
+        c.setLineWidth(grid_width_pt)
+        c.drawPath(thin, stroke=1, fill=0)
+        if major_interval > 0:
+            c.setStrokeColorRGB(*(v / 255 for v in major_color))
+            c.setLineWidth(major_width_pt)
+            c.drawPath(major, stroke=1, fill=0)
+
+    c.restoreState()
@@ -0,0 +1,125 @@
+import struct
+import zlib
+import numpy as np
+from typing import BinaryIO, Optional, Union
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 颜色类型（PNG 规范）
+_COLOR_TYPES = {'RGB': (2, 3), 'P': (3, 1), 'L': (0, 1)}
+
+
+class PNGStreamWriter:
+    """
+    逐行写入的 PNG 编码器
+
+    - 先写 IHDR / PLTE，之后每次写入若干行像素，经 zlib 流式压缩后按块输出 IDAT
+    - 内存占用只与单次写入的行数有关，不需要整幅图像
+    - 行使用 Up 滤波（与上一行做差）：拼豆图每个单元格内的像素行完全相同，
+      差值全为 0，宽图行长超过 zlib 32KB 窗口时也能压缩
+
+    用法：
+        with PNGStreamWriter(path, width, height) as writer:
+            for band in bands:
+                writer.write_rows(band)
+    """
+
+    def __init__(self, file: Union[str, BinaryIO], width: int, height: int,
+                 mode: str = 'RGB', palette: Optional[np.ndarray] = None,
+                 compress_level: int = 6, chunk_size: int = 1 << 20):
+        """
+        Args:
+            file: 输出路径或二进制文件对象
+            width: 图像宽度（像素）
+            height: 图像高度（像素）
+            mode: 'RGB'、'P' 或 'L'
+            palette: P 模式的调色板 (N, 3)
+            compress_level: zlib 压缩级别 0-9
+            chunk_size: IDAT 块大小（字节）
+        """
+        if mode not in _COLOR_TYPES:
+            raise ValueError(f"不支持的PNG模式: {mode}")
+        if mode == 'P' and palette is None:
+            raise ValueError("P 模式需要调色板")
+
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.channels = _COLOR_TYPES[mode][1]
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+
+        self._owns_file = isinstance(file, str)
+        self._file = open(file, 'wb') if self._owns_file else file
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._previous = np.zeros((width * self.channels,), dtype=np.uint8)
+
+        self._file.write(PNG_SIGNATURE)
+        color_type = _COLOR_TYPES[mode][0]
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+        if mode == 'P':
+            self._write_chunk(b'PLTE', np.asarray(palette, dtype=np.uint8).tobytes())
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        """写入一个 PNG 块（长度 + 类型 + 数据 + CRC）"""
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+    def _emit(self, data: bytes) -> None:
+        """累积压缩数据，满一块输出一个 IDAT"""
+        self._pending += data
+        while len(self._pending) >= self.chunk_size:
+            self._write_chunk(b'IDAT', bytes(self._pending[:self.chunk_size]))
+            del self._pending[:self.chunk_size]
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """
+        写入若干行像素
+
+        Args:
+            rows: (n, width, channels) 或 (n, width) uint8 数组
+        """
+        if rows.shape[0] == 0:
+            return
+        rows = rows.reshape(rows.shape[0], -1)
+        if rows.shape[1] != self.width * self.channels:
+            raise ValueError(f"行宽不匹配: {rows.shape[1]} != {self.width * self.channels}")
+        if self.rows_written + rows.shape[0] > self.height:
+            raise ValueError("写入的行数超过图像高度")
+
+        # 每行前加滤波类型字节 2（Up）
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+        np.subtract(rows[0], self._previous, out=filtered[0, 1:])
+        self._previous = rows[-1].copy()
+
+        self._emit(self._compressor.compress(filtered.tobytes()))
+        self.rows_written += rows.shape[0]
+
+    def close(self) -> None:
+        """结束压缩流并写入 IEND"""
+        if self._compressor is None:
+            return
+        if self.rows_written != self.height:
+            raise ValueError(f"图像行数不完整: {self.rows_written}/{self.height}")
+        self._emit(self._compressor.flush())
+        if self._pending:
+            self._write_chunk(b'IDAT', bytes(self._pending))
+        self._write_chunk(b'IEND', b'')
+        self._compressor = None
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> 'PNGStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._owns_file:
+            self._file.close()
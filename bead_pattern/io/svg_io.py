@@ -0,0 +1,136 @@
+"""
+SVG 导出
+
+与分辨率无关的矢量图案，按顺序流式写出，不在内存中构建 DOM：
+- 单元格：每行相同颜色的连续单元格合并为一个矩形，每种颜色一条 <path>，
+  文件大小取决于颜色边界数量而不是拼豆数量
+- 网格线：所有细线一条 <path>（加粗线另一条）
+- 色号：每种颜色一个 <g>，其中每个单元格一个 <text>（ColorInfo.display_code）
+
+坐标以单元格为单位（viewBox 为 宽×高 格），width / height 按 cell_size 换算为像素
+"""
+
+import os
+from typing import BinaryIO, Iterable, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from ..core.pattern import BeadPatternV2
+from ..render.labels import compute_text_color
+from .pdf_io import color_runs
+from .text_output import open_text_output
+
+
+# 每次写入的区段 / 文字数量（控制单次拼接的字符串大小）
+_WRITE_BATCH = 8192
+
+# 无衬线字体的平均字宽（em），用于估算色号宽度
+_CHAR_WIDTH_EM = 0.6
+
+
+def _hex(rgb: Iterable[int]) -> str:
+    r, g, b = (int(v) for v in rgb)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _batched(items: list) -> Iterable[list]:
+    for start in range(0, len(items), _WRITE_BATCH):
+        yield items[start:start + _WRITE_BATCH]
+
+
+def to_svg(pattern, file: Union[str, os.PathLike, BinaryIO], cell_size: float = 10,
+           show_grid: bool = True, show_labels: bool = True,
+           grid_color: Tuple[int, int, int] = (200, 200, 200),
+           grid_width: float = 0.05,
+           major_interval: int = 0,
+           major_color: Tuple[int, int, int] = (0, 0, 0),
+           major_width: float = 0.12,
+           font_family: str = "Arial, Helvetica, sans-serif") -> None:
+    """
+    导出为 SVG
+
+    Args:
+        pattern: BeadPatternV2 或 BeadPattern 兼容层对象
+        file: 输出路径或二进制文件对象
+        cell_size: 单元格显示大小（像素，只影响 width / height 属性）
+        show_grid: 是否绘制网格线
+        show_labels: 是否绘制色号
+        grid_color: 细网格线颜色
+        grid_width: 细网格线宽度（单元格为单位）
+        major_interval: 加粗线间隔（格数），0 表示不绘制
+        major_color: 加粗线颜色
+        major_width: 加粗线宽度（单元格为单位）
+        font_family: 色号字体
+    """
+    pattern: BeadPatternV2 = pattern._v2 if hasattr(pattern, '_v2') else pattern
+    palette = pattern.palette
+    lut = palette.rgb_lut
+    compact = pattern.grid.map_bands(palette.to_compact_indices)
+    height, width = compact.shape
+
+    with open_text_output(file, encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * cell_size:g}" '
+                  f'height="{height * cell_size:g}" viewBox="0 0 {width} {height}" '
+                  f'shape-rendering="crispEdges">\n')
+
+        # 单元格：同色区段合并到一条路径
+        rows, starts, lengths, indices = color_runs(compact)
+        order = np.argsort(indices, kind='stable')
+        splits = np.flatnonzero(np.diff(indices[order])) + 1
+        for group in np.split(order, splits):
+            if group.size == 0 or indices[group[0]] == 0:
+                continue
+            out.write(f'<path fill="{_hex(lut[indices[group[0]]])}" d="')
+            runs = list(zip(starts[group].tolist(), rows[group].tolist(), lengths[group].tolist()))
+            for batch in _batched(runs):
+                out.write(''.join(f'M{x} {y}h{n}v1h-{n}z' for x, y, n in batch))
+            out.write('"/>\n')
+
+        # 网格线：细线、加粗线各一条路径
+        if show_grid:
+            thin, major = [], []
+            for i in range(width + 1):
+                is_major = major_interval > 0 and i % major_interval == 0
+                (major if is_major else thin).append(f'M{i} 0V{height}')
+            for j in range(height + 1):
+                is_major = major_interval > 0 and j % major_interval == 0
+                (major if is_major else thin).append(f'M0 {j}H{width}')
+            out.write(f'<path fill="none" stroke="{_hex(grid_color)}" '
+                      f'stroke-width="{grid_width:g}" d="{"".join(thin)}"/>\n')
+            if major:
+                out.write(f'<path fill="none" stroke="{_hex(major_color)}" '
+                          f'stroke-width="{major_width:g}" d="{"".join(major)}"/>\n')
+
+        # 色号：每种颜色一组，先描边后填充（paint-order），深浅底色上都清晰
+        if show_labels:
+            present = np.unique(indices)
+            codes = {int(idx): palette.get_color(int(palette.sorted_ids[idx - 1])).display_code
+                     for idx in present[present > 0]}
+            longest = max((len(code) for code in codes.values()), default=1)
+            font_size = min(0.5, 0.8 / (_CHAR_WIDTH_EM * max(longest, 1)))
+            out.write(f'<g font-family={quoteattr(font_family)} font-size="{font_size:.3g}" '
+                      f'text-anchor="middle" dominant-baseline="central" '
+                      f'paint-order="stroke" stroke-width="{font_size * 0.2:.3g}" '
+                      f'stroke-linejoin="round">\n')
+
+            ys, xs = np.nonzero(compact)
+            cell_idx = compact[ys, xs]
+            order = np.argsort(cell_idx, kind='stable')
+            splits = np.flatnonzero(np.diff(cell_idx[order])) + 1
+            for group in np.split(order, splits):
+                if group.size == 0:
+                    continue
+                idx = int(cell_idx[group[0]])
+                text_rgb = compute_text_color(tuple(int(v) for v in lut[idx]))
+                stroke_rgb = tuple(255 - v for v in text_rgb)
+                out.write(f'<g fill="{_hex(text_rgb)}" stroke="{_hex(stroke_rgb)}">\n')
+                text = escape(codes[idx])
+                cells = list(zip(xs[group].tolist(), ys[group].tolist()))
+                for batch in _batched(cells):
+                    out.write(''.join(f'<text x="{x}.5" y="{y}.5">{text}</text>' for x, y in batch))
+                out.write('\n</g>\n')
+            out.write('</g>\n')
+
+        out.write('</svg>\n')
@@ -0,0 +1,39 @@
+"""
+文本输出
+
+导出函数既可写入路径，也可写入内存缓冲区等二进制文件对象
+"""
+
+import io
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, TextIO, Union
+
+
+@contextmanager
+def open_text_output(file: Union[str, os.PathLike, BinaryIO], encoding: str = 'utf-8',
+                     newline: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    以文本方式写入路径或二进制文件对象
+
+    文件对象写完后只分离包装层，不会被关闭，调用方可以继续读取
+
+    Args:
+        file: 输出路径或二进制文件对象
+        encoding: 文本编码
+        newline: 换行处理（同 open，CSV 需要传 ''）
+
+    Yields:
+        文本文件对象
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+        return
+
+    wrapper = io.TextIOWrapper(file, encoding=encoding, newline=newline)
+    try:
+        yield wrapper
+    finally:
+        wrapper.flush()
+        wrapper.detach()
@@ -0,0 +1,120 @@
+"""
+流式 ZIP 打包
+
+- ZipStreamWriter：把 zipfile 的输出接到内存缓冲区，每添加一个文件就取出已生成的字节，
+  不需要可寻址的文件（本地文件头之后用数据描述符记录大小和 CRC）
+- stream_zip：并发生成多个文件，按完成顺序写入 ZIP 并逐块产出，不落临时文件
+"""
+
+import time
+import zipfile
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional
+
+
+# 已经压缩过的格式直接存储，再压缩只浪费 CPU
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.pdf', '.zip')
+
+
+class _ChunkSink:
+    """只写输出：累积 zipfile 写入的字节，由 ZipStreamWriter 取走"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """
+    逐个文件输出的 ZIP 编码器
+
+    用法：
+        writer = ZipStreamWriter()
+        for name, data in files:
+            yield writer.add(name, data)
+        yield writer.close()
+    """
+
+    def __init__(self, compresslevel: int = 6):
+        """
+        Args:
+            compresslevel: 文本类文件的 deflate 压缩级别
+        """
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, 'w', compression=zipfile.ZIP_DEFLATED,
+                                    compresslevel=compresslevel)
+        self.names = []
+
+    def add(self, arcname: str, data: bytes) -> bytes:
+        """
+        添加一个文件
+
+        Args:
+            arcname: 包内文件名
+            data: 文件内容
+
+        Returns:
+            本次新生成的 ZIP 字节
+        """
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        if arcname.lower().endswith(STORED_EXTENSIONS):
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        self._zip.writestr(info, data)
+        self.names.append(arcname)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """写入中央目录，返回剩余字节"""
+        self._zip.close()
+        return self._sink.drain()
+
+
+def stream_zip(files: Dict[str, Callable[[], bytes]],
+               executor: Optional[Executor] = None, max_workers: int = 4,
+               on_complete: Optional[Callable[[str, int, int], None]] = None) -> Iterator[bytes]:
+    """
+    并发生成文件并流式打包为 ZIP
+
+    生成函数在线程池中并发执行，哪个先完成就先写入；
+    只有已完成、尚未写出的文件在内存中。任一文件生成失败时异常向上抛出。
+
+    Args:
+        files: {包内文件名: 返回文件内容的函数}
+        executor: 执行生成函数的线程池（None 时新建，生成器结束后关闭）
+        max_workers: 新建线程池的线程数
+        on_complete: 每写入一个文件后回调 (文件名, 已完成数, 总数)
+
+    Yields:
+        ZIP 字节块
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files))))
+    futures = {executor.submit(build): name for name, build in files.items()}
+    try:
+        writer = ZipStreamWriter()
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            chunk = writer.add(name, future.result())
+            if on_complete is not None:
+                on_complete(name, done, len(futures))
+            yield chunk
+        yield writer.close()
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
@@ -2,16 +2,34 @@
 渲染引擎模块
 
 包含：
-- raster: 基础光栅化渲染
-- labels: 色号标签覆盖
+- raster: 光栅化渲染引擎（单元格颜色与网格线一次写入，可输出调色板索引）
+- fonts: 字体注册表与共享标签精灵图集
+- cache: 渲染结果缓存（内存 LRU + 磁盘配额）
+- labels: 色号标签覆盖（精灵批量混合）
 - legend: 图例渲染
+- plan: 渲染计划（多个输出共享中间阶段）
+- stream: 分带流式渲染（超大图案直接写入 PNG）
+- tiles: 瓦片金字塔（超大图案按需渲染 256×256 瓦片）
+- bead_sim: 拼豆实物效果模拟（本地预览）
+- board_sheet: 拼豆板分块导出
 - blueprint: 工程蓝图渲染（新增）
 - technical_panel: 工程蓝图入口（保持向后兼容）
 """
 
-from .raster import render_base, render_grid_lines
-from .labels import LabelCache, overlay_labels
+from .raster import (
+    alpha_blend, rasterize, rasterize_indexed, render_pattern, render_base, render_grid_lines,
+    IndexedPalette,
+)
+from .fonts import FontRegistry, SpriteAtlas, get_font_registry, get_sprite_atlas
+from .cache import RenderCache, configure_render_cache, get_render_cache
+from .labels import LabelCache, build_label_sprites, blit_labels, overlay_labels, fit_font_size
 from .legend import render_legend
+from .plan import RenderPlan
+from .stream import iter_pattern_bands, stream_pattern_png, stream_blueprint_png
+from .tiles import TilePyramid, render_tile
+from .bead_sim import (
+    build_bead_sprites, iter_bead_preview_bands, render_bead_preview, stream_bead_preview_png
+)
 
 # 导入工程蓝图模块
 from .blueprint import (
@@ -24,22 +42,60 @@ from .blueprint import (
     render_bom_table,
     composite_blueprint,
     generate_engineering_blueprint,
+    save_engineering_blueprint,
+    iter_blueprint_pages,
+    save_paginated_blueprint,
+)
+
+# 拼豆板分块
+from .board_sheet import (
+    create_board_tiling,
+    render_board_tiles,
+    render_tiling_summary,
+    export_board_tiles,
 )
 
 # 保持向后兼容的导入
 from .technical_panel import (
     TechnicalPanelConfig,
     generate_technical_sheet,
+    save_technical_sheet,
+    save_technical_sheet_pdf,
     export_statistics,
 )
 
 __all__ = [
     # 基础渲染
+    'alpha_blend',
+    'rasterize',
+    'rasterize_indexed',
+    'IndexedPalette',
+    'render_pattern',
     'render_base',
     'render_grid_lines',
+    'FontRegistry',
+    'SpriteAtlas',
+    'get_font_registry',
+    'get_sprite_atlas',
+    'RenderCache',
+    'configure_render_cache',
+    'get_render_cache',
     'LabelCache',
+    'build_label_sprites',
+    'blit_labels',
     'overlay_labels',
+    'fit_font_size',
     'render_legend',
+    'RenderPlan',
+    'iter_pattern_bands',
+    'stream_pattern_png',
+    'stream_blueprint_png',
+    'TilePyramid',
+    'render_tile',
+    'build_bead_sprites',
+    'iter_bead_preview_bands',
+    'render_bead_preview',
+    'stream_bead_preview_png',
     # 工程蓝图（新）
     'BlueprintConfig',
     'PaperSize',
@@ -50,8 +106,18 @@ __all__ = [
     'render_bom_table',
     'composite_blueprint',
     'generate_engineering_blueprint',
+    'save_engineering_blueprint',
+    'iter_blueprint_pages',
+    'save_paginated_blueprint',
+    # 拼豆板分块
+    'create_board_tiling',
+    'render_board_tiles',
+    'render_tiling_summary',
+    'export_board_tiles',
     # 向后兼容
     'TechnicalPanelConfig',
     'generate_technical_sheet',
+    'save_technical_sheet',
+    'save_technical_sheet_pdf',
     'export_statistics',
 ]
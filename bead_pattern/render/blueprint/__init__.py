@@ -22,7 +22,14 @@ from .config import BlueprintConfig, PaperSize
 from .layout import BlueprintLayout, compute_layout, compute_adaptive_cell_size
 from .title_block import render_title_block
 from .bom_table import render_bom_table
-from .compositor import composite_blueprint, generate_engineering_blueprint
+from .compositor import composite_blueprint, generate_engineering_blueprint, save_engineering_blueprint
+from .pages import (
+    BlueprintPage,
+    BlueprintPagePlan,
+    plan_blueprint_pages,
+    iter_blueprint_pages,
+    save_paginated_blueprint,
+)
 
 __all__ = [
     'BlueprintConfig',
@@ -34,4 +41,10 @@ __all__ = [
     'render_bom_table',
     'composite_blueprint',
     'generate_engineering_blueprint',
+    'save_engineering_blueprint',
+    'BlueprintPage',
+    'BlueprintPagePlan',
+    'plan_blueprint_pages',
+    'iter_blueprint_pages',
+    'save_paginated_blueprint',
 ]
@@ -6,16 +6,110 @@
 - 实现上下布局（主图在上，信息区在下）
 - 自动裁剪白色背景区域
 - 提供统一的导出入口
+
+Title Block 和 BOM 按 (图案内容哈希, 面板相关配置, 面板尺寸) 缓存在进程级
+面板缓存中，只改网格显示选项的重复导出直接复用。
 """
 
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import date
 from PIL import Image, ImageDraw
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 from .config import BlueprintConfig
 from .layout import BlueprintLayout, compute_layout
 from .title_block import render_title_block
 from .bom_table import render_bom_table
 
 
+# 面板缓存最多保留的面板数（A4 @ 300dpi 一组 Title Block + BOM 约 3MB）
+PANEL_CACHE_ENTRIES = 16
+
+# 只影响主网格的配置项，不参与面板缓存键
+_GRID_ONLY_FIELDS = frozenset({
+    'cell_size', 'min_cell_size', 'max_cell_size', 'label_font_size_pt',
+    'show_labels', 'show_grid', 'crop_to_subject',
+    'show_major_grid', 'major_grid_interval', 'major_grid_color',
+})
+
+
+
+class PanelCache:
+    """
+    Title Block / BOM 面板的 LRU 缓存
+
+    - 键为 (面板类型, 图案内容哈希, 面板相关配置, 面板尺寸 ...)
+    - 按面板数限制容量，超出时淘汰最久未使用的面板
+    - 面板在锁外渲染，同一键并发未命中时保留先写入的一份
+    """
+
+    def __init__(self, max_entries: int = PANEL_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._panels: 'OrderedDict[Hashable, Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, build: Callable[[], Image.Image]) -> Image.Image:
+        """
+        获取面板，不存在时调用 build 渲染并缓存
+
+        Returns:
+            面板图像（共享对象，调用方不得修改）
+        """
+        with self._lock:
+            panel = self._panels.get(key)
+            if panel is not None:
+                self._panels.move_to_end(key)
+                self.hits += 1
+                return panel
+            self.misses += 1
+
+        panel = build()
+
+        with self._lock:
+            existing = self._panels.get(key)
+            if existing is not None:
+                return existing
+            self._panels[key] = panel
+            while len(self._panels) > self.max_entries:
+                self._panels.popitem(last=False)
+                self.evictions += 1
+        return panel
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._panels.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            面板数、容量、命中 / 未命中 / 淘汰次数
+        """
+        with self._lock:
+            return {
+                'panels': len(self._panels),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+_panel_cache = PanelCache()
+
+
+def get_panel_cache() -> PanelCache:
+    """获取进程级 Title Block / BOM 面板缓存"""
+    return _panel_cache
+
+
 def get_pattern_v2(pattern):
     """
     获取 BeadPatternV2 对象（兼容层支持）
@@ -34,8 +128,7 @@ def get_pattern_v2(pattern):
 def render_cropped_grid(
     pattern_v2,
     bounds: Tuple[int, int, int, int],
-    cell_size: int,
-    config: BlueprintConfig
+    cell_size: int
 ) -> Image.Image:
     """
     渲染裁剪后的主网格（只渲染主体区域）
@@ -44,69 +137,47 @@ def render_cropped_grid(
         pattern_v2: BeadPatternV2 对象
         bounds: 主体边界 (min_x, min_y, max_x, max_y)
         cell_size: 单元格大小（像素）
-        config: 蓝图配置
 
     Returns:
         裁剪后的主网格图像
     """
-    min_x, min_y, max_x, max_y = bounds
-    crop_width = max_x - min_x
-    crop_height = max_y - min_y
-
-    # 创建裁剪后尺寸的图像
-    img_width = crop_width * cell_size
-    img_height = crop_height * cell_size
-
-    img = Image.new('RGB', (img_width, img_height), config.background_color)
+    from ..raster import render_pattern
+    return render_pattern(pattern_v2, cell_size, bounds=bounds)
 
-    # 使用 LUT 快速渲染
-    import numpy as np
-    lut = pattern_v2.palette.rgb_lut
-
-    # 获取裁剪区域的网格数据
-    grid_ids = pattern_v2.grid.grid_ids[min_y:max_y, min_x:max_x]
 
-    # 转换为紧凑索引
-    compact_ids = np.zeros_like(grid_ids, dtype=np.int32)
-    for color_id, compact_idx in pattern_v2.palette.index_by_id.items():
-        compact_ids[grid_ids == color_id] = compact_idx
+@dataclass
+class BlueprintParts:
+    """
+    工程蓝图的组成部分（布局、统计、主网格渲染参数）
 
-    # 使用 LUT 渲染
-    rgb_grid = lut[compact_ids]
+    composite_blueprint 一次合成整幅画布；流式导出按行带渲染主网格，
+    两者共用同一份准备结果。
+    """
 
-    # 扩展到像素尺寸
-    expanded = np.repeat(np.repeat(rgb_grid, cell_size, axis=0), cell_size, axis=1)
-    img = Image.fromarray(expanded.astype(np.uint8), mode='RGB')
+    pattern_v2: object
+    stats: dict
+    layout: BlueprintLayout
+    bounds: Optional[Tuple[int, int, int, int]]
+    pattern_width: int
+    pattern_height: int
+    grid_options: Dict[str, Any]   # 传给 rasterize / render_pattern 的参数（不含 pattern）
 
-    return img
+    @property
+    def info_top(self) -> int:
+        """信息区（分隔线、Title Block、BOM）起始 Y 坐标"""
+        return self.layout.grid_y + self.layout.grid_height
 
 
-def composite_blueprint(
-    pattern,
-    config: BlueprintConfig
-) -> Image.Image:
+def prepare_blueprint(pattern, config: BlueprintConfig) -> BlueprintParts:
     """
-    合成完整的工程蓝图
-
-    布局结构：
-    ┌──────────────────────────────────────┐
-    │                                      │
-    │        主拼豆网格（格内有色号）      │
-    │        ↑ 绝对主体，占最大面积 ↑      │
-    │                                      │
-    ├──────────────────────────────────────┤
-    │ ─────────── 分隔线 ───────────────── │
-    ├───────────────────────┬──────────────┤
-    │ 工程属性区            │ 颜色统计区   │
-    │ (Title Block)         │ (BOM/Legend) │
-    └───────────────────────┴──────────────┘
+    计算工程蓝图的布局、统计和主网格渲染参数
 
     Args:
         pattern: 拼豆图案对象
         config: 蓝图配置
 
     Returns:
-        完整的工程蓝图 PIL Image
+        BlueprintParts
     """
     # 获取 V2 对象
     pattern_v2 = get_pattern_v2(pattern)
@@ -133,8 +204,6 @@ def composite_blueprint(
     bounds = None
     pattern_width = full_width
     pattern_height = full_height
-    offset_x = 0
-    offset_y = 0
 
     if config.crop_to_subject and config.exclude_background:
         bounds = pattern_v2.get_subject_bounds()
@@ -142,8 +211,6 @@ def composite_blueprint(
             min_x, min_y, max_x, max_y = bounds
             pattern_width = max_x - min_x
             pattern_height = max_y - min_y
-            offset_x = min_x
-            offset_y = min_y
 
     # 计算布局（使用裁剪后的尺寸）
     layout = compute_layout(
@@ -153,99 +220,156 @@ def composite_blueprint(
         config
     )
 
-    # ========== 1. 创建画布 ==========
-    canvas = Image.new('RGB', (layout.canvas_width, layout.canvas_height), config.background_color)
-    draw = ImageDraw.Draw(canvas)
-
-    # ========== 2. 渲染主网格 ==========
-    from ..raster import render_grid_lines
+    # 单元格颜色、网格线、加粗辅助线、色号标签一次写入同一像素数组
+    from ..labels import build_label_sprites
 
-    if bounds:
-        # 渲染裁剪后的网格
-        main_grid = render_cropped_grid(pattern_v2, bounds, layout.cell_size, config)
-    else:
-        # 渲染完整网格
-        from ..raster import render_base
-        main_grid = render_base(pattern_v2, layout.cell_size)
-
-    # 添加网格线
-    if config.show_grid:
-        main_grid = render_grid_lines(
-            main_grid,
-            pattern_width,
-            pattern_height,
+    label_sprites = None
+    if config.show_labels:
+        # 使用固定字体大小，不允许缩小
+        label_sprites = build_label_sprites(
+            pattern_v2,
             layout.cell_size,
-            config.grid_line_color
+            font_size=config.pt_to_px(config.label_font_size_pt),
+            stroke_width=max(1, layout.cell_size // 20),
+            bounds=bounds
         )
 
-    # 添加辅助网格线（每 10 格加粗）
-    if config.show_major_grid:
-        main_grid = render_major_grid_lines(
-            main_grid,
-            pattern_width,
-            pattern_height,
-            layout.cell_size,
-            config.major_grid_interval,
-            config.major_grid_color
-        )
+    grid_options = dict(
+        cell_size=layout.cell_size,
+        bounds=bounds,
+        show_grid=config.show_grid,
+        grid_color=config.grid_line_color,
+        major_interval=config.major_grid_interval if config.show_major_grid else 0,
+        major_color=config.major_grid_color,
+        label_sprites=label_sprites
+    )
 
-    # 添加色号标签
-    if config.show_labels:
-        from ..labels import overlay_labels
-        # 使用固定字体大小，不允许缩小
-        font_size = config.pt_to_px(config.label_font_size_pt)
+    return BlueprintParts(pattern_v2, stats, layout, bounds, pattern_width,
+                          pattern_height, grid_options)
 
-        if bounds:
-            # 为裁剪后的网格添加标签
-            main_grid = overlay_labels_cropped(
-                main_grid,
-                pattern_v2,
-                bounds,
-                cell_size=layout.cell_size,
-                font_size=font_size,
-                stroke_width=max(1, layout.cell_size // 20)
-            )
-        else:
-            main_grid = overlay_labels(
-                main_grid,
-                pattern_v2,
-                cell_size=layout.cell_size,
-                font_size=font_size,
-                stroke_width=max(1, layout.cell_size // 20)
-            )
-
-    # 粘贴主网格到画布
-    canvas.paste(main_grid, (layout.grid_x, layout.grid_y))
 
-    # ========== 3. 绘制分隔线 ==========
-    separator_padding = 30
-    draw.line(
-        [(separator_padding, layout.separator_y),
-         (layout.canvas_width - separator_padding, layout.separator_y)],
-        fill=config.separator_color,
-        width=2
-    )
+def _panel_config_key(config: BlueprintConfig) -> Tuple:
+    """面板相关的配置项（排除只影响主网格的选项）"""
+    return tuple((f.name, getattr(config, f.name)) for f in fields(config)
+                 if f.name not in _GRID_ONLY_FIELDS)
+
+
+def render_cached_title_block(parts: BlueprintParts, config: BlueprintConfig) -> Image.Image:
+    """
+    渲染 Title Block（按图案内容、面板配置、图案与面板尺寸缓存）
+
+    统计和拼豆尺寸由内容哈希与面板配置（exclude_background）决定，不单独入键
 
-    # ========== 4. 渲染 Title Block ==========
-    title_block = render_title_block(
+    Returns:
+        Title Block 图像（共享对象，调用方不得修改）
+    """
+    layout = parts.layout
+    key = ('title_block', parts.pattern_v2.content_hash, _panel_config_key(config),
+           parts.pattern_width, parts.pattern_height, layout.title_width, layout.title_height,
+           date.today().isoformat())
+    return _panel_cache.get(key, lambda: render_title_block(
         layout,
         config,
-        stats,
-        pattern_width,
-        pattern_height,
-        pattern_v2.bead_size_mm
-    )
-    canvas.paste(title_block, (layout.title_x, layout.title_y))
+        parts.stats,
+        parts.pattern_width,
+        parts.pattern_height,
+        parts.pattern_v2.bead_size_mm
+    ))
+
+
+def render_cached_bom_table(parts: BlueprintParts, config: BlueprintConfig) -> Image.Image:
+    """
+    渲染 BOM Table（按图案内容、面板配置和面板尺寸缓存）
 
-    # ========== 5. 渲染 BOM Table ==========
-    bom_table = render_bom_table(
+    Returns:
+        BOM 图像（共享对象，调用方不得修改）
+    """
+    layout = parts.layout
+    palette = parts.pattern_v2.palette
+    key = ('bom_table', parts.pattern_v2.content_hash, _panel_config_key(config),
+           layout.bom_width, layout.bom_height)
+    return _panel_cache.get(key, lambda: render_bom_table(
         layout,
         config,
-        stats['color_counts'],
-        pattern_v2.palette,
+        parts.stats['color_counts'],
+        palette,
         sort_by_count=True
+    ))
+
+
+def render_blueprint_info(parts: BlueprintParts, config: BlueprintConfig) -> Image.Image:
+    """
+    渲染主网格下方的信息区（分隔线 + Title Block + BOM）
+
+    Args:
+        parts: prepare_blueprint 的结果
+        config: 蓝图配置
+
+    Returns:
+        宽为画布宽度、从 parts.info_top 到画布底部的图像
+    """
+    layout = parts.layout
+    top = parts.info_top
+    info = Image.new('RGB', (layout.canvas_width, layout.canvas_height - top), config.background_color)
+    draw = ImageDraw.Draw(info)
+
+    # ========== 绘制分隔线 ==========
+    separator_padding = 30
+    draw.line(
+        [(separator_padding, layout.separator_y - top),
+         (layout.canvas_width - separator_padding, layout.separator_y - top)],
+        fill=config.separator_color,
+        width=2
     )
-    canvas.paste(bom_table, (layout.bom_x, layout.bom_y))
+
+    # ========== Title Block 与 BOM Table（命中缓存时直接复用） ==========
+    info.paste(render_cached_title_block(parts, config), (layout.title_x, layout.title_y - top))
+    info.paste(render_cached_bom_table(parts, config), (layout.bom_x, layout.bom_y - top))
+
+    return info
+
+
+def composite_blueprint(
+    pattern,
+    config: BlueprintConfig
+) -> Image.Image:
+    """
+    合成完整的工程蓝图
+
+    布局结构：
+    ┌──────────────────────────────────────┐
+    │                                      │
+    │        主拼豆网格（格内有色号）      │
+    │        ↑ 绝对主体，占最大面积 ↑      │
+    │                                      │
+    ├──────────────────────────────────────┤
+    │ ─────────── 分隔线 ───────────────── │
+    ├───────────────────────┬──────────────┤
+    │ 工程属性区            │ 颜色统计区   │
+    │ (Title Block)         │ (BOM/Legend) │
+    └───────────────────────┴──────────────┘
+
+    Args:
+        pattern: 拼豆图案对象
+        config: 蓝图配置
+
+    Returns:
+        完整的工程蓝图 PIL Image
+    """
+    from ..raster import render_pattern
+
+    parts = prepare_blueprint(pattern, config)
+    layout = parts.layout
+
+    # ========== 1. 创建画布 ==========
+    canvas = Image.new('RGB', (layout.canvas_width, layout.canvas_height), config.background_color)
+
+    # ========== 2. 渲染主网格 ==========
+    main_grid = render_pattern(parts.pattern_v2, **parts.grid_options)
+    canvas.paste(main_grid, (layout.grid_x, layout.grid_y))
+
+    # ========== 3. 信息区（分隔线、Title Block、BOM） ==========
+    canvas.paste(render_blueprint_info(parts, config), (0, parts.info_top))
 
     return canvas
 
@@ -272,38 +396,11 @@ def overlay_labels_cropped(
     Returns:
         添加标签后的图像
     """
-    from ..labels import LabelCache, compute_text_color
-    from ...core.grid import BeadGrid
-
-    min_x, min_y, max_x, max_y = bounds
-    crop_width = max_x - min_x
-    crop_height = max_y - min_y
-
-    result_img = img.copy().convert('RGBA')
-    cache = LabelCache()
-
-    grid_ids = pattern_v2.grid.grid_ids
-
-    for y in range(crop_height):
-        for x in range(crop_width):
-            color_id = grid_ids[min_y + y, min_x + x]
-            if color_id != BeadGrid.EMPTY:
-                color_info = pattern_v2.palette.get_color(color_id)
-                if color_info:
-                    rgb = color_info.rgb
-                    display_code = color_info.display_code
-                    text_color = compute_text_color(rgb)
-
-                    label_img = cache.get_label_image(
-                        display_code, cell_size, font_size, text_color, stroke_width
-                    )
+    from ..labels import blit_labels
 
-                    paste_x = x * cell_size
-                    paste_y = y * cell_size
-
-                    result_img.alpha_composite(label_img, (paste_x, paste_y))
-
-    return result_img.convert('RGB')
+    buf = np.array(img.convert('RGB'))
+    blit_labels(buf, pattern_v2, cell_size, font_size, stroke_width, bounds=bounds)
+    return Image.fromarray(buf, 'RGB')
 
 
 def render_major_grid_lines(
@@ -328,25 +425,54 @@ def render_major_grid_lines(
     Returns:
         添加辅助线后的图像
     """
-    result = img.copy()
-    draw = ImageDraw.Draw(result)
+    import numpy as np
+    from ..raster import burn_grid_lines
+
+    buf = np.array(img.convert('RGB'))
+    burn_grid_lines(buf[:height * cell_size + 1, :width * cell_size + 1],
+                    cell_size, color, interval=interval, line_width=2)
+    return Image.fromarray(buf, 'RGB')
+
+
+def _configure_blueprint(
+    config: Optional[BlueprintConfig],
+    cell_size: int,
+    show_grid: bool,
+    show_labels: bool,
+    exclude_background: bool,
+    paper_size: str,
+    dpi: int,
+    crop_to_subject: bool
+) -> BlueprintConfig:
+    """将公共入口的参数写入蓝图配置"""
+    from .config import PaperSize
+
+    if config is None:
+        config = BlueprintConfig()
 
-    img_width = width * cell_size
-    img_height = height * cell_size
+    # 更新配置
+    config.show_grid = show_grid
+    config.show_labels = show_labels
+    config.exclude_background = exclude_background
+    config.crop_to_subject = crop_to_subject
+    config.dpi = dpi
 
-    # 竖线
-    for x in range(0, width + 1, interval):
-        x_pos = x * cell_size
-        if x_pos <= img_width:
-            draw.line([(x_pos, 0), (x_pos, img_height)], fill=color, width=2)
+    # 设置纸张尺寸
+    paper_map = {
+        "A4": PaperSize.A4,
+        "A3": PaperSize.A3,
+        "A2": PaperSize.A2,
+        "LETTER": PaperSize.LETTER,
+    }
+    config.paper_size = paper_map.get(paper_size.upper(), PaperSize.A4)
 
-    # 横线
-    for y in range(0, height + 1, interval):
-        y_pos = y * cell_size
-        if y_pos <= img_height:
-            draw.line([(0, y_pos), (img_width, y_pos)], fill=color, width=2)
+    # 如果指定了 cell_size，覆盖自动计算
+    if cell_size > 0:
+        config.cell_size = cell_size
+    else:
+        config.cell_size = 0  # 自动计算
 
-    return result
+    return config
 
 
 def generate_engineering_blueprint(
@@ -379,31 +505,38 @@ def generate_engineering_blueprint(
     Returns:
         完整的工程图纸 PIL Image
     """
-    from .config import PaperSize
+    config = _configure_blueprint(config, cell_size, show_grid, show_labels,
+                                  exclude_background, paper_size, dpi, crop_to_subject)
+    return composite_blueprint(pattern, config)
 
-    if config is None:
-        config = BlueprintConfig()
 
-    # 更新配置
-    config.show_grid = show_grid
-    config.show_labels = show_labels
-    config.exclude_background = exclude_background
-    config.crop_to_subject = crop_to_subject
-    config.dpi = dpi
+def save_engineering_blueprint(
+    pattern,
+    file,
+    cell_size: int = 0,
+    show_grid: bool = True,
+    show_labels: bool = True,
+    config: Optional[BlueprintConfig] = None,
+    exclude_background: bool = True,
+    paper_size: str = "A4",
+    dpi: int = 300,
+    crop_to_subject: bool = True,
+    compress_level: int = 1
+) -> Tuple[int, int]:
+    """
+    生成工程蓝图并直接流式写入 PNG（参数同 generate_engineering_blueprint）
 
-    # 设置纸张尺寸
-    paper_map = {
-        "A4": PaperSize.A4,
-        "A3": PaperSize.A3,
-        "A2": PaperSize.A2,
-        "LETTER": PaperSize.LETTER,
-    }
-    config.paper_size = paper_map.get(paper_size.upper(), PaperSize.A4)
+    主网格按行带渲染，不分配整幅画布，适合大尺寸图案。
 
-    # 如果指定了 cell_size，覆盖自动计算
-    if cell_size > 0:
-        config.cell_size = cell_size
-    else:
-        config.cell_size = 0  # 自动计算
+    Args:
+        file: 输出路径或二进制文件对象
+        compress_level: zlib 压缩级别
 
-    return composite_blueprint(pattern, config)
+    Returns:
+        (宽, 高) 像素
+    """
+    from ..stream import stream_blueprint_png
+
+    config = _configure_blueprint(config, cell_size, show_grid, show_labels,
+                                  exclude_background, paper_size, dpi, crop_to_subject)
+    return stream_blueprint_png(pattern, file, config, compress_level)
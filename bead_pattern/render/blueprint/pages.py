@@ -0,0 +1,338 @@
+"""
+工程蓝图自动分页
+
+图案在可读的 cell_size 下超出一张纸时，compute_adaptive_cell_size 会让画布超出纸张，
+composite_blueprint 得到一张巨幅图。分页模式改为：
+- 第 1 页为封面：缩小的完整图案（叠加分页框和页码）+ Title Block + BOM，信息区只渲染一次
+- 之后每页一块图案区域，上方和左侧是带全局坐标的标尺，页眉注明坐标范围
+- 分页大小取加粗线间隔的整数倍，辅助线位置与整图一致
+- 各页在线程池中并发渲染，按页序依次产出；同时在途的页数不超过线程数 + 1，
+  内存占用与线程数成正比，而不是与页数成正比
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from PIL import Image, ImageDraw
+from .config import BlueprintConfig
+from .layout import compute_layout
+from .compositor import BlueprintParts, prepare_blueprint, render_blueprint_info, _configure_blueprint
+from .title_block import load_font
+
+
+# 标尺与分页框颜色
+RULER_COLOR = (90, 90, 90)
+PAGE_FRAME_COLOR = (220, 40, 40)
+
+# 标尺数字间隔候选（格数）
+_RULER_STEPS = (1, 2, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class BlueprintPage:
+    """一页图案区域（坐标相对于裁剪后的主体区域，0 起始）"""
+
+    number: int                        # 页码（封面为第 1 页）
+    row: int
+    col: int
+    bounds: Tuple[int, int, int, int]  # (min_x, min_y, max_x, max_y)
+
+
+@dataclass
+class BlueprintPagePlan:
+    """
+    分页结果
+
+    所有尺寸单位：像素（@ config.dpi）
+    """
+
+    page_width: int
+    page_height: int
+    margin: int
+    header_height: int
+    ruler_size: int
+    cell_size: int
+    cells_x: int        # 每页列数
+    cells_y: int        # 每页行数
+    columns: int
+    rows: int
+    pages: List[BlueprintPage]
+
+    @property
+    def page_count(self) -> int:
+        """总页数（含封面）"""
+        return len(self.pages) + 1
+
+
+def plan_blueprint_pages(parts: BlueprintParts, config: BlueprintConfig) -> BlueprintPagePlan:
+    """
+    按纸张大小把主网格划分为若干页
+
+    Args:
+        parts: prepare_blueprint 的结果（cell_size 为可读尺寸）
+        config: 蓝图配置
+
+    Returns:
+        BlueprintPagePlan
+    """
+    page_width, page_height = config.get_paper_size_px()
+    margin = config.get_margin_px()
+    header_height = config.pt_to_px(config.title_font_size_pt) * 2
+    ruler_size = int(config.pt_to_px(config.label_font_size_pt) * 2.5)
+    cell_size = parts.layout.cell_size
+
+    # 预留 1 像素收边线
+    cells_x = max(1, (page_width - 2 * margin - ruler_size - 1) // cell_size)
+    cells_y = max(1, (page_height - 2 * margin - header_height - ruler_size - 1) // cell_size)
+    interval = config.major_grid_interval if config.show_major_grid else 0
+    if interval > 0:
+        cells_x = cells_x // interval * interval if cells_x >= interval else cells_x
+        cells_y = cells_y // interval * interval if cells_y >= interval else cells_y
+
+    xs = list(range(0, parts.pattern_width, cells_x)) or [0]
+    ys = list(range(0, parts.pattern_height, cells_y)) or [0]
+    pages = []
+    for row, y0 in enumerate(ys):
+        for col, x0 in enumerate(xs):
+            pages.append(BlueprintPage(
+                number=len(pages) + 2,
+                row=row,
+                col=col,
+                bounds=(x0, y0, min(x0 + cells_x, parts.pattern_width),
+                        min(y0 + cells_y, parts.pattern_height))
+            ))
+
+    return BlueprintPagePlan(page_width, page_height, margin, header_height, ruler_size,
+                             cell_size, cells_x, cells_y, len(xs), len(ys), pages)
+
+
+def _draw_header(draw: ImageDraw.ImageDraw, plan: BlueprintPagePlan, number: int,
+                 text: str, config: BlueprintConfig) -> None:
+    """页眉：左侧说明文字，右侧页码"""
+    font = load_font(config.pt_to_px(config.title_font_size_pt), bold=True)
+    y = plan.margin + plan.header_height // 2
+    draw.text((plan.margin, y), text, fill=config.text_color, font=font, anchor="lm")
+    draw.text((plan.page_width - plan.margin, y), f"Sheet {number} / {plan.page_count}",
+              fill=config.text_color, font=font, anchor="rm")
+
+
+def _draw_rulers(draw: ImageDraw.ImageDraw, plan: BlueprintPagePlan, page: BlueprintPage,
+                 grid_x: int, grid_y: int, config: BlueprintConfig) -> None:
+    """
+    上方和左侧的坐标标尺（全局坐标，1 起始）
+
+    每格一个短刻度，5 的倍数中刻度，10 的倍数长刻度；数字间隔按字宽自动放大。
+    """
+    min_x, min_y, max_x, max_y = page.bounds
+    cell, ruler = plan.cell_size, plan.ruler_size
+    font = load_font(config.pt_to_px(config.label_font_size_pt))
+    widest = font.getbbox(str(max(max_x, max_y)))
+    text_w = widest[2] - widest[0]
+    step = next((s for s in _RULER_STEPS if s * cell >= text_w * 1.3), _RULER_STEPS[-1])
+
+    def _tick(index: int) -> int:
+        if index % 10 == 0:
+            return int(ruler * 0.35)
+        if index % 5 == 0:
+            return int(ruler * 0.25)
+        return int(ruler * 0.12)
+
+    for i in range(min_x, max_x + 1):
+        x = grid_x + (i - min_x) * cell
+        draw.line([(x, grid_y - _tick(i)), (x, grid_y - 1)], fill=RULER_COLOR, width=1)
+        if i < max_x and (i + 1) % step == 0:
+            draw.text((x + cell // 2, grid_y - int(ruler * 0.4)), str(i + 1),
+                      fill=config.text_color, font=font, anchor="mb")
+    for j in range(min_y, max_y + 1):
+        y = grid_y + (j - min_y) * cell
+        draw.line([(grid_x - _tick(j), y), (grid_x - 1, y)], fill=RULER_COLOR, width=1)
+        if j < max_y and (j + 1) % step == 0:
+            draw.text((grid_x - int(ruler * 0.4), y + cell // 2), str(j + 1),
+                      fill=config.text_color, font=font, anchor="rm")
+
+
+def render_blueprint_cover(parts: BlueprintParts, plan: BlueprintPagePlan,
+                           config: BlueprintConfig) -> Image.Image:
+    """
+    渲染封面：缩小的完整图案（叠加分页框和页码）+ Title Block + BOM
+
+    Args:
+        parts: prepare_blueprint 的结果
+        plan: 分页结果
+        config: 蓝图配置
+
+    Returns:
+        纸张大小的图像
+    """
+    from ..raster import render_pattern
+
+    width, height = parts.pattern_width, parts.pattern_height
+    available_w = plan.page_width - 2 * plan.margin
+    available_h = (plan.page_height - 2 * plan.margin - plan.header_height
+                   - config.get_info_panel_height_px() - 20)
+    thumb_cell = max(1, min(available_w // max(width, 1), available_h // max(height, 1),
+                            config.max_cell_size))
+
+    # 与单页蓝图相同的布局，只是主网格缩小；统计沿用 parts，不重新计算
+    layout = compute_layout(width, height, 1, replace(config, cell_size=thumb_cell))
+    thumb_parts = replace(parts, layout=layout,
+                          grid_options=dict(cell_size=thumb_cell, bounds=parts.bounds))
+
+    page = Image.new('RGB', (plan.page_width, plan.page_height), config.background_color)
+    origin_x = max(0, (plan.page_width - layout.canvas_width) // 2)
+    origin_y = plan.header_height
+    grid_x, grid_y = origin_x + layout.grid_x, origin_y + layout.grid_y
+    page.paste(render_pattern(parts.pattern_v2, **thumb_parts.grid_options), (grid_x, grid_y))
+    page.paste(render_blueprint_info(thumb_parts, config), (origin_x, origin_y + thumb_parts.info_top))
+
+    draw = ImageDraw.Draw(page)
+    font = load_font(max(12, min(plan.cells_x, plan.cells_y) * thumb_cell // 4), bold=True)
+    line_width = max(2, thumb_cell // 4)
+    for item in plan.pages:
+        min_x, min_y, max_x, max_y = item.bounds
+        box = [grid_x + min_x * thumb_cell, grid_y + min_y * thumb_cell,
+               grid_x + max_x * thumb_cell - 1, grid_y + max_y * thumb_cell - 1]
+        draw.rectangle(box, outline=PAGE_FRAME_COLOR, width=line_width)
+        draw.text(((box[0] + box[2]) // 2, (box[1] + box[3]) // 2), str(item.number),
+                  fill=PAGE_FRAME_COLOR, font=font, anchor="mm",
+                  stroke_width=2, stroke_fill=(255, 255, 255))
+
+    _draw_header(draw, plan, 1,
+                 f"Overview  {width} x {height}  |  {len(plan.pages)} pages "
+                 f"({plan.columns} x {plan.rows})", config)
+    return page
+
+
+def render_blueprint_page(parts: BlueprintParts, plan: BlueprintPagePlan, page: BlueprintPage,
+                          config: BlueprintConfig) -> Image.Image:
+    """
+    渲染一页图案区域（页眉 + 坐标标尺 + 主网格）
+
+    Args:
+        parts: prepare_blueprint 的结果
+        plan: 分页结果
+        page: 要渲染的页
+        config: 蓝图配置
+
+    Returns:
+        纸张大小的图像
+    """
+    from ..raster import render_pattern
+
+    image = Image.new('RGB', (plan.page_width, plan.page_height), config.background_color)
+    grid_x = plan.margin + plan.ruler_size
+    grid_y = plan.margin + plan.header_height + plan.ruler_size
+
+    origin_x, origin_y = (parts.bounds[0], parts.bounds[1]) if parts.bounds else (0, 0)
+    min_x, min_y, max_x, max_y = page.bounds
+    grid_options = dict(parts.grid_options,
+                        bounds=(origin_x + min_x, origin_y + min_y, origin_x + max_x, origin_y + max_y),
+                        close_grid=config.show_grid)
+    image.paste(render_pattern(parts.pattern_v2, **grid_options), (grid_x, grid_y))
+
+    draw = ImageDraw.Draw(image)
+    _draw_rulers(draw, plan, page, grid_x, grid_y, config)
+    _draw_header(draw, plan, page.number,
+                 f"Columns {min_x + 1}-{max_x}  |  Rows {min_y + 1}-{max_y}  "
+                 f"(page {page.row + 1}-{page.col + 1})", config)
+    return image
+
+
+def _ordered_parallel(func: Callable, items: Iterable, max_workers: int) -> Iterator:
+    """
+    在线程池中执行 func(item)，按输入顺序产出结果
+
+    同时在途的任务不超过 max_workers + 1 个，消费方处理完一个结果后才提交下一个。
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) > max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_blueprint_pages(pattern, config: BlueprintConfig,
+                         max_workers: int = 4) -> Iterator[Image.Image]:
+    """
+    并发渲染分页蓝图，按页序产出（封面在前）
+
+    Args:
+        pattern: 拼豆图案对象
+        config: 蓝图配置
+        max_workers: 并行线程数
+
+    Yields:
+        纸张大小的页面图像
+    """
+    parts = prepare_blueprint(pattern, config)
+    plan = plan_blueprint_pages(parts, config)
+    # 预先构建 LUT，避免多个线程同时触发延迟重建
+    _ = parts.pattern_v2.palette.rgb_lut
+
+    def _render(page: Optional[BlueprintPage]) -> Image.Image:
+        if page is None:
+            return render_blueprint_cover(parts, plan, config)
+        return render_blueprint_page(parts, plan, page, config)
+
+    yield from _ordered_parallel(_render, [None] + plan.pages, max(1, max_workers))
+
+
+def write_blueprint_pdf(pages: Iterable[Image.Image], file: Union[str, BinaryIO],
+                        config: BlueprintConfig) -> int:
+    """
+    将页面图像依次写入 PDF（每页一张纸，按 config.dpi 还原纸张尺寸）
+
+    Args:
+        pages: 页面图像（可以是生成器，写完一页即释放）
+        file: 输出路径或二进制文件对象
+        config: 蓝图配置
+
+    Returns:
+        页数
+    """
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    paper_w_mm, paper_h_mm = config.get_paper_size_mm()
+    page_size = (paper_w_mm * mm, paper_h_mm * mm)
+    c = canvas.Canvas(file, pagesize=page_size)
+    count = 0
+    for image in pages:
+        c.drawImage(ImageReader(image), 0, 0, width=page_size[0], height=page_size[1])
+        c.showPage()
+        count += 1
+    c.save()
+    return count
+
+
+def save_paginated_blueprint(
+    pattern,
+    file: Union[str, BinaryIO],
+    cell_size: int = 0,
+    show_grid: bool = True,
+    show_labels: bool = True,
+    config: Optional[BlueprintConfig] = None,
+    exclude_background: bool = True,
+    paper_size: str = "A4",
+    dpi: int = 300,
+    crop_to_subject: bool = True,
+    max_workers: int = 4
+) -> int:
+    """
+    生成分页工程蓝图 PDF（参数同 generate_engineering_blueprint）
+
+    Args:
+        file: 输出路径或二进制文件对象
+        max_workers: 并行渲染线程数
+
+    Returns:
+        页数（含封面）
+    """
+    config = _configure_blueprint(config, cell_size, show_grid, show_labels,
+                                  exclude_background, paper_size, dpi, crop_to_subject)
+    return write_blueprint_pdf(iter_blueprint_pages(pattern, config, max_workers), file, config)
@@ -14,11 +14,12 @@ from typing import Dict, Optional
 from datetime import date
 from .config import BlueprintConfig
 from .layout import BlueprintLayout
+from ..fonts import get_font
 
 
 def load_font(size_px: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     """
-    加载字体（跨平台支持）
+    加载字体（跨平台支持，共享进程级字体注册表）
 
     Args:
         size_px: 字体大小（像素）
@@ -27,26 +28,7 @@ def load_font(size_px: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     Returns:
         ImageFont 对象
     """
-    font_paths = [
-        # Linux
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf" if bold else "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
-        # macOS
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/Library/Fonts/Arial Bold.ttf" if bold else "/Library/Fonts/Arial.ttf",
-        # Windows
-        "C:/Windows/Fonts/arialbd.ttf" if bold else "C:/Windows/Fonts/arial.ttf",
-        "arialbd.ttf" if bold else "arial.ttf",
-    ]
-
-    for path in font_paths:
-        try:
-            return ImageFont.truetype(path, size_px)
-        except (OSError, IOError):
-            continue
-
-    return ImageFont.load_default()
+    return get_font(size_px, bold=bold)
 
 
 def render_title_block(
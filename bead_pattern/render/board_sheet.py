@@ -0,0 +1,292 @@
+"""
+拼豆板分块渲染模块
+
+大图案需要拼在多块固定尺寸的拼豆板上（5mm 常用 29×29，2.6mm 常用 50×50）。
+本模块基于 BoardTiling 的零拷贝视图：
+- 并行渲染/导出每块板的图纸
+- 生成总览图（板坐标 R行C列 与图案位置的对应关系）
+- 导出每块板的物料清单（BOM）
+"""
+
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from ..core.grid import BeadGrid
+from ..core.pattern import BeadPatternV2
+from ..core.tiling import BoardTile, BoardTiling, default_board_size
+from .raster import render_base, render_pattern
+from .labels import build_label_sprites
+from .blueprint.compositor import get_pattern_v2
+from .blueprint.title_block import load_font
+
+
+def create_board_tiling(pattern, board_width: Optional[int] = None,
+                        board_height: Optional[int] = None) -> BoardTiling:
+    """
+    按拼豆板尺寸划分图案
+
+    Args:
+        pattern: 拼豆图案对象（BeadPatternV2 或 BeadPattern 兼容层）
+        board_width: 板宽（拼豆数，None 则按拼豆尺寸取标准板）
+        board_height: 板高（拼豆数，None 则与板宽相同或取标准板）
+
+    Returns:
+        BoardTiling 对象
+    """
+    pattern_v2 = get_pattern_v2(pattern)
+    if board_width is None:
+        board_width, default_height = default_board_size(pattern_v2.bead_size_mm)
+        if board_height is None:
+            board_height = default_height
+    return BoardTiling(pattern_v2.grid, board_width, board_height)
+
+
+def tile_pattern(pattern_v2: BeadPatternV2, tile: BoardTile) -> BeadPatternV2:
+    """
+    获取单块板的子图案（共享网格视图和色板，不复制数据）
+
+    Args:
+        pattern_v2: BeadPatternV2 对象
+        tile: 板块
+
+    Returns:
+        子图案 BeadPatternV2
+    """
+    view = pattern_v2.grid.rows(tile.y0, tile.y1)[:, tile.x0:tile.x1]
+    return BeadPatternV2.from_grid(BeadGrid.from_array(view), pattern_v2.palette,
+                                   pattern_v2.bead_size_mm)
+
+
+def render_board_tile(pattern_v2: BeadPatternV2, tile: BoardTile, cell_size: int = 20,
+                      show_grid: bool = True, show_labels: bool = True,
+                      indexed: bool = False) -> Image.Image:
+    """
+    渲染单块板
+
+    Args:
+        pattern_v2: BeadPatternV2 对象
+        tile: 板块
+        cell_size: 单元格像素大小
+        show_grid: 是否显示网格
+        show_labels: 是否显示色号
+        indexed: 优先输出 P 模式（调色板）图像
+
+    Returns:
+        板块图像
+    """
+    sub_pattern = tile_pattern(pattern_v2, tile)
+    sprites = build_label_sprites(sub_pattern, cell_size) if show_labels else None
+    return render_pattern(sub_pattern, cell_size, show_grid=show_grid, label_sprites=sprites,
+                          indexed=indexed)
+
+
+def render_board_tiles(pattern, tiling: BoardTiling, cell_size: int = 20,
+                       show_grid: bool = True, show_labels: bool = True,
+                       max_workers: int = 4) -> List[Tuple[BoardTile, Image.Image]]:
+    """
+    并行渲染所有板块
+
+    Args:
+        pattern: 拼豆图案对象
+        tiling: 板块划分
+        cell_size: 单元格像素大小
+        show_grid: 是否显示网格
+        show_labels: 是否显示色号
+        max_workers: 并行线程数
+
+    Returns:
+        [(tile, image), ...]，按板块顺序
+    """
+    pattern_v2 = get_pattern_v2(pattern)
+    # 预先构建 LUT，避免多个线程同时触发延迟重建
+    _ = pattern_v2.palette.rgb_lut
+
+    def _render(tile: BoardTile) -> Tuple[BoardTile, Image.Image]:
+        return tile, render_board_tile(pattern_v2, tile, cell_size, show_grid, show_labels)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render, tiling.tiles))
+
+
+def render_tiling_summary(pattern, tiling: BoardTiling,
+                          boms: Optional[List[Dict[int, int]]] = None,
+                          max_size_px: int = 2000) -> Image.Image:
+    """
+    渲染分板总览图
+
+    上方为缩小的完整图案，叠加板块边界和板号；
+    下方为板号、图案坐标范围和拼豆数量的对照表。
+
+    Args:
+        pattern: 拼豆图案对象
+        tiling: 板块划分
+        boms: 每块板的物料清单（None 则自动计算）
+        max_size_px: 总览图最长边像素上限
+
+    Returns:
+        总览图像
+    """
+    pattern_v2 = get_pattern_v2(pattern)
+    height, width = pattern_v2.grid.shape
+    if boms is None:
+        boms = tiling.tile_boms(pattern_v2.palette)
+
+    cell_size = max(1, min(20, max_size_px // max(width, height, 1)))
+    overview = render_base(pattern_v2, cell_size)
+    draw = ImageDraw.Draw(overview)
+
+    board_w_px = tiling.board_width * cell_size
+    board_h_px = tiling.board_height * cell_size
+    label_font = load_font(max(10, min(board_w_px, board_h_px) // 8), bold=True)
+    line_width = max(1, cell_size // 4)
+
+    for tile in tiling.tiles:
+        box = [tile.x0 * cell_size, tile.y0 * cell_size,
+               tile.x1 * cell_size - 1, tile.y1 * cell_size - 1]
+        draw.rectangle(box, outline=(255, 0, 0), width=line_width)
+        center = ((box[0] + box[2]) // 2, (box[1] + box[3]) // 2)
+        draw.text(center, tile.label, fill=(255, 0, 0), font=label_font, anchor="mm",
+                  stroke_width=2, stroke_fill=(255, 255, 255))
+
+    # 对照表
+    table_font = load_font(14)
+    header_font = load_font(14, bold=True)
+    row_height = 22
+    padding = 10
+    column_x = [0, 90, 220, 350, 450]
+    block_width = column_x[-1] + 110
+    header = ('Board', 'Columns', 'Rows', 'Beads', 'Colors')
+    rows = []
+    for tile, bom in zip(tiling.tiles, boms):
+        rows.append((tile.label, f"{tile.x0 + 1}-{tile.x1}", f"{tile.y0 + 1}-{tile.y1}",
+                     str(sum(bom.values())), str(len(bom))))
+
+    # 板块较多时对照表分多栏排列
+    table_width = max(overview.width, block_width + 2 * padding)
+    blocks = max(1, min((table_width - 2 * padding) // block_width, len(rows)))
+    rows_per_block = -(-len(rows) // blocks) if rows else 0
+    table_height = padding * 2 + row_height * (rows_per_block + 1)
+    sheet = Image.new('RGB', (table_width, overview.height + table_height), (255, 255, 255))
+    sheet.paste(overview, ((table_width - overview.width) // 2, 0))
+
+    sheet_draw = ImageDraw.Draw(sheet)
+    table_y = overview.height + padding
+    for block in range(blocks):
+        block_x = padding + block * block_width
+        block_rows = [header] + rows[block * rows_per_block:(block + 1) * rows_per_block]
+        for i, row in enumerate(block_rows):
+            for x_pos, text in zip(column_x, row):
+                sheet_draw.text((block_x + x_pos, table_y + i * row_height), text, fill=(0, 0, 0),
+                                font=header_font if i == 0 else table_font)
+
+    return sheet
+
+
+def write_tiling_bom_csv(pattern, tiling: BoardTiling, boms: List[Dict[int, int]],
+                         file_path: str) -> None:
+    """
+    导出每块板的物料清单CSV
+
+    Args:
+        pattern: 拼豆图案对象
+        tiling: 板块划分
+        boms: 每块板的物料清单
+        file_path: 输出文件路径
+    """
+    palette = get_pattern_v2(pattern).palette
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['板号', '列范围', '行范围', '颜色ID', '色号', '颜色名称', '数量'])
+        for tile, bom in zip(tiling.tiles, boms):
+            for color_id, count in sorted(bom.items(), key=lambda item: -item[1]):
+                color_info = palette.get_color(color_id)
+                writer.writerow([
+                    tile.label,
+                    f"{tile.x0 + 1}-{tile.x1}",
+                    f"{tile.y0 + 1}-{tile.y1}",
+                    color_id,
+                    color_info.display_code if color_info else '',
+                    color_info.name_zh if color_info else '',
+                    count
+                ])
+
+
+def export_board_tiles(pattern, output_dir: str, board_width: Optional[int] = None,
+                       board_height: Optional[int] = None, cell_size: int = 20,
+                       show_grid: bool = True, show_labels: bool = True,
+                       exclude_background: bool = False, max_workers: int = 4) -> Dict:
+    """
+    分板导出：每块板一张PNG + 总览图 + 分板BOM
+
+    每个工作线程渲染并保存自己的板块后立即释放图像，
+    内存占用与线程数成正比，而不是与板块数量成正比。
+
+    Args:
+        pattern: 拼豆图案对象
+        output_dir: 输出目录
+        board_width: 板宽（拼豆数，None 则取标准板）
+        board_height: 板高（拼豆数）
+        cell_size: 单元格像素大小
+        show_grid: 是否显示网格
+        show_labels: 是否显示色号
+        exclude_background: BOM 是否排除背景色
+        max_workers: 并行线程数
+
+    Returns:
+        {
+            'rows': 板行数, 'cols': 板列数,
+            'board_width': 板宽, 'board_height': 板高,
+            'tiles': [{'label', 'row', 'col', 'x0', 'y0', 'x1', 'y1', 'file', 'bom'}, ...],
+            'summary_file': 总览图路径,
+            'bom_file': BOM CSV路径
+        }
+    """
+    pattern_v2 = get_pattern_v2(pattern)
+    tiling = create_board_tiling(pattern_v2, board_width, board_height)
+    os.makedirs(output_dir, exist_ok=True)
+
+    exclude_ids = set(pattern_v2.palette.get_background_ids()) if exclude_background else None
+    boms = tiling.tile_boms(pattern_v2.palette, exclude_ids=exclude_ids)
+
+    def _export(tile: BoardTile) -> str:
+        img = render_board_tile(pattern_v2, tile, cell_size, show_grid, show_labels, indexed=True)
+        tile_path = os.path.join(output_dir, f"board_{tile.label}.png")
+        img.save(tile_path, compress_level=1)
+        return tile_path
+
+    _ = pattern_v2.palette.rgb_lut
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tile_paths = list(executor.map(_export, tiling.tiles))
+
+    summary_path = os.path.join(output_dir, "boards_summary.png")
+    render_tiling_summary(pattern_v2, tiling, boms).save(summary_path, compress_level=1)
+
+    bom_path = os.path.join(output_dir, "boards_bom.csv")
+    write_tiling_bom_csv(pattern_v2, tiling, boms, bom_path)
+
+    return {
+        'rows': tiling.rows,
+        'cols': tiling.cols,
+        'board_width': tiling.board_width,
+        'board_height': tiling.board_height,
+        'tiles': [
+            {
+                'label': tile.label,
+                'row': tile.row,
+                'col': tile.col,
+                'x0': tile.x0,
+                'y0': tile.y0,
+                'x1': tile.x1,
+                'y1': tile.y1,
+                'file': path,
+                'bom': {int(k): int(v) for k, v in bom.items()}
+            }
+            for tile, path, bom in zip(tiling.tiles, tile_paths, boms)
+        ],
+        'summary_file': summary_path,
+        'bom_file': bom_path
+    }
@@ -0,0 +1,512 @@
+"""
+渲染结果缓存
+
+两级缓存，键为 (图案内容哈希, 渲染器, 渲染参数)：
+- 内存层：按字节数限制的 LRU，保存渲染结果的文件内容
+- 磁盘层：缓存目录中的文件，按总大小配额淘汰最久未访问的文件
+
+同一个键同时只渲染一次，并发的调用者等待并共享这一次的结果；渲染先写
+临时文件再替换，读取方不会看到未写完的文件。
+
+正在使用的文件不会被磁盘配额淘汰：get_bytes / render 在持有文件期间
+固定（pin）该文件，需要文件路径的调用方使用 pinned()。
+
+render(persist=False) 不写缓存目录：结果渲染到内存缓冲区，超过阈值时
+转存匿名临时文件（所有读取方关闭后删除），只放入内存层。
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+
+# 默认容量
+DEFAULT_MEMORY_BYTES = 128 * 1024 * 1024
+DEFAULT_DISK_BYTES = 1024 * 1024 * 1024
+# 不落盘渲染时内存缓冲区的上限，超过后转存匿名临时文件
+DEFAULT_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class _Flight:
+    """某个键正在进行的渲染：渲染线程完成后通过 future 把结果交给等待者"""
+
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self):
+        self.future = Future()
+        self.waiters = 0
+
+
+class _SharedSpool:
+    """
+    不落盘且超过内存阈值的结果（匿名临时文件）
+
+    并发等待同一个键的调用者各自获得一个读取对象，
+    全部关闭后才关闭（删除）临时文件
+    """
+
+    def __init__(self, spool, size: int):
+        self.size = size
+        self._spool = spool
+        self._readers = 1
+        self._lock = threading.Lock()
+
+    def share(self, readers: int) -> None:
+        """设置读取方数量（在交出任何读取对象之前调用）"""
+        self._readers = readers
+
+    def reader(self) -> BinaryIO:
+        """新的读取对象（位于开头）"""
+        return io.BufferedReader(_SpoolReader(self))
+
+    def read_at(self, position: int, size: int) -> bytes:
+        with self._lock:
+            self._spool.seek(position)
+            return self._spool.read(size)
+
+    def release(self) -> None:
+        with self._lock:
+            self._readers -= 1
+            if self._readers == 0:
+                self._spool.close()
+
+
+class _SpoolReader(io.RawIOBase):
+    """_SharedSpool 的读取对象，各自维护读取位置"""
+
+    def __init__(self, shared: _SharedSpool):
+        self._shared = shared
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._shared.read_at(self._position, len(buffer))
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._shared.release()
+        super().close()
+
+
+class RenderCache:
+    """
+    渲染结果缓存 - 内存 LRU + 磁盘配额
+
+    - make_key() 生成缓存键，内容相同的图案共用缓存
+    - get_file() 返回磁盘文件路径（需要文件路径的场景：静态 URL、复制导出）
+    - get_bytes() 返回文件内容，优先命中内存层
+    - render() 返回只读文件对象，可选择不写磁盘层
+    - build(target) 由调用方提供，负责把结果写到给定路径；
+      不落盘渲染时 target 为二进制文件对象
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        """
+        Args:
+            directory: 磁盘缓存目录（None 使用系统临时目录）
+            max_memory_bytes: 内存层容量（字节）
+            max_disk_bytes: 磁盘层配额（字节）
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'bead_pattern_render_cache')
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: 'OrderedDict[str, int]' = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._building: Dict[str, _Flight] = {}
+        self._pins: Dict[str, int] = {}
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        self._scan_disk()
+
+    @staticmethod
+    def make_key(content_hash: str, renderer: str, **options) -> str:
+        """
+        生成缓存键
+
+        Args:
+            content_hash: 图案内容哈希
+            renderer: 渲染器名称（例如 'preview'、'print'、'export_png'）
+            **options: 影响输出的参数（单元格大小、开关、纸张、DPI 等）
+
+        Returns:
+            可用作文件名的键
+        """
+        if not options:
+            return f"{content_hash}-{renderer}"
+        digest = hashlib.blake2b(repr(sorted(options.items())).encode('utf-8'), digest_size=8)
+        return f"{content_hash}-{renderer}-{digest.hexdigest()}"
+
+    def path_for(self, key: str, suffix: str) -> str:
+        """缓存文件路径（不检查是否存在）"""
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def _scan_disk(self) -> None:
+        """启动时登记已有缓存文件（按修改时间排序）"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if '.tmp' in name or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_bytes += size
+
+    def _remember(self, name: str, data: bytes) -> None:
+        """放入内存层（需持有锁）；单个结果超过容量 1/4 时不缓存"""
+        if len(data) > self.max_memory_bytes // 4:
+            return
+        old = self._memory.pop(name, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[name] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.memory_evictions += 1
+
+    def _register_file(self, name: str, size: int) -> None:
+        """登记新文件并执行磁盘配额（需持有锁），固定中的文件和新文件本身不淘汰"""
+        self._disk_bytes -= self._disk.pop(name, 0)
+        self._disk[name] = size
+        self._disk_bytes += size
+        for evicted in list(self._disk):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            if evicted == name or evicted in self._pins:
+                continue
+            self._disk_bytes -= self._disk.pop(evicted)
+            self._memory_bytes -= len(self._memory.pop(evicted, b''))
+            self.disk_evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, evicted))
+            except OSError:
+                pass
+
+    def _join(self, name: str) -> Tuple[_Flight, bool]:
+        """
+        加入或发起某个键的渲染（需持有锁）
+
+        Returns:
+            (flight, 是否由当前线程渲染)
+        """
+        flight = self._building.get(name)
+        if flight is not None:
+            flight.waiters += 1
+            return flight, False
+        flight = self._building[name] = _Flight()
+        return flight, True
+
+    def _finish(self, name: str, flight: _Flight) -> int:
+        """结束渲染，返回等待者数量（此后新的调用者不再加入这次渲染）"""
+        with self._lock:
+            del self._building[name]
+            return flight.waiters
+
+    def _lookup_disk(self, name: str) -> Optional[str]:
+        """磁盘层查找并更新访问顺序（需持有锁）"""
+        path = os.path.join(self.directory, name)
+        if name not in self._disk:
+            return None
+        if not os.path.exists(path):
+            self._disk_bytes -= self._disk.pop(name)
+            return None
+        self._disk.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def get_file(self, key: str, suffix: str, build: Callable[[str], None]) -> str:
+        """
+        获取缓存文件路径，未命中时调用 build(path) 生成（同一个键同时只渲染一次）
+
+        返回后文件可能被磁盘配额淘汰，需要在之后读取文件的调用方使用 pinned()
+
+        Args:
+            key: make_key 生成的键
+            suffix: 文件后缀（含扩展名），例如 "_export.png"
+            build: 生成函数，参数为输出路径
+
+        Returns:
+            缓存文件路径
+        """
+        name = f"{key}{suffix}"
+        with self._lock:
+            path = self._lookup_disk(name)
+            if path is not None:
+                self.disk_hits += 1
+                return path
+            flight, leader = self._join(name)
+        if not leader:
+            return flight.future.result()
+
+        path = os.path.join(self.directory, name)
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.{uuid.uuid4().hex[:8]}.tmp{ext}"
+        try:
+            with self._lock:
+                self.misses += 1
+            build(tmp_path)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._register_file(name, os.path.getsize(path))
+        except BaseException as e:
+            self._finish(name, flight)
+            flight.future.set_exception(e)
+            raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self._finish(name, flight)
+        flight.future.set_result(path)
+        return path
+
+    @contextmanager
+    def pinned(self, key: str, suffix: str, build: Callable[[str], None]) -> Iterator[str]:
+        """
+        获取缓存文件路径（同 get_file），with 块内该文件不会被磁盘配额淘汰
+
+        用法：
+            with cache.pinned(key, suffix, build) as path:
+                shutil.copyfile(path, target)
+        """
+        name = f"{key}{suffix}"
+        with self._lock:
+            self._pins[name] = self._pins.get(name, 0) + 1
+        try:
+            yield self.get_file(key, suffix, build)
+        finally:
+            with self._lock:
+                self._pins[name] -= 1
+                if not self._pins[name]:
+                    del self._pins[name]
+
+    def _lookup_memory(self, name: str) -> Optional[bytes]:
+        """内存层查找并计数"""
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                self.memory_hits += 1
+            return data
+
+    def get_bytes(self, key: str, suffix: str, build: Callable[[str], None],
+                  persist: bool = True) -> bytes:
+        """
+        获取缓存内容，优先内存层，其次磁盘层，未命中时调用 build 生成
+
+        Args:
+            key: make_key 生成的键
+            suffix: 文件后缀（含扩展名）
+            build: 生成函数，参数为输出路径（persist=False 时为二进制文件对象）
+            persist: 未命中时是否写入磁盘层
+
+        Returns:
+            文件内容
+        """
+        if not persist:
+            file, _ = self.render(key, suffix, build, persist=False)
+            with file:
+                return file.read()
+
+        name = f"{key}{suffix}"
+        data = self._lookup_memory(name)
+        if data is not None:
+            return data
+
+        with self.pinned(key, suffix, build) as path:
+            with open(path, 'rb') as f:
+                data = f.read()
+        with self._lock:
+            self._remember(name, data)
+        return data
+
+    def render(self, key: str, suffix: str, build: Callable, persist: bool = False,
+               spool_bytes: int = DEFAULT_SPOOL_BYTES) -> Tuple[BinaryIO, int]:
+        """
+        获取渲染结果的只读文件对象（位于开头）
+
+        - 内存层、磁盘层命中时直接读取（persist=True 时只在内存层的结果补写到磁盘层）
+        - 未命中且 persist=True：同 get_file，渲染到缓存目录
+        - 未命中且 persist=False：build(file) 写入 SpooledTemporaryFile，
+          不超过 spool_bytes 的结果留在内存并放入内存层，
+          更大的结果转存匿名临时文件，所有读取方关闭后自动删除；
+          同一个键同时只渲染一次，并发的调用者各自读取同一个结果
+
+        Args:
+            key: make_key 生成的键
+            suffix: 文件后缀（含扩展名）
+            build: 生成函数，persist=True 时参数为输出路径，否则为二进制文件对象
+            persist: 未命中时是否写入磁盘层
+            spool_bytes: 内存缓冲区上限（字节）
+
+        Returns:
+            (文件对象, 字节数)，由调用方关闭
+        """
+        name = f"{key}{suffix}"
+        data = self._lookup_memory(name)
+        if data is not None:
+            if persist:
+                with self._lock:
+                    on_disk = name in self._disk
+                if not on_disk:
+                    self.get_file(key, suffix, lambda path: _write_bytes(path, data))
+            return io.BytesIO(data), len(data)
+
+        if persist:
+            with self.pinned(key, suffix, build) as path:
+                file = open(path, 'rb')
+            return file, os.fstat(file.fileno()).st_size
+
+        with self._lock:
+            path = self._lookup_disk(name)
+            if path is not None:
+                # 持有锁时打开，文件不会在打开之前被淘汰
+                self.disk_hits += 1
+                file = open(path, 'rb')
+                return file, os.fstat(file.fileno()).st_size
+            # 查找内存层之后其他线程可能刚渲染完成
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                self.memory_hits += 1
+                return io.BytesIO(data), len(data)
+            flight, leader = self._join(name)
+        if not leader:
+            return self._open_result(flight.future.result())
+
+        try:
+            with self._lock:
+                self.misses += 1
+            spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+            try:
+                build(spool)
+                spool.seek(0, io.SEEK_END)
+                size = spool.tell()
+                spool.seek(0)
+                if size > spool_bytes:
+                    result = _SharedSpool(spool, size)
+                else:
+                    result = spool.read()
+                    spool.close()
+            except BaseException:
+                spool.close()
+                raise
+            if isinstance(result, bytes):
+                with self._lock:
+                    self._remember(name, result)
+        except BaseException as e:
+            self._finish(name, flight)
+            flight.future.set_exception(e)
+            raise
+        waiters = self._finish(name, flight)
+        if isinstance(result, _SharedSpool):
+            result.share(waiters + 1)
+        flight.future.set_result(result)
+        return self._open_result(result)
+
+    @staticmethod
+    def _open_result(result: Union[bytes, _SharedSpool]) -> Tuple[BinaryIO, int]:
+        """不落盘渲染结果的文件对象与字节数"""
+        if isinstance(result, _SharedSpool):
+            return result.reader(), result.size
+        return io.BytesIO(result), len(result)
+
+    def clear(self) -> None:
+        """清空内存层和磁盘层（固定中的文件保留）"""
+        with self._lock:
+            for name in list(self._disk):
+                if name in self._pins:
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                self._disk_bytes -= self._disk.pop(name)
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            命中 / 未命中计数及各层占用
+        """
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'memory_evictions': self.memory_evictions,
+                'disk_files': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'max_disk_bytes': self.max_disk_bytes,
+                'disk_evictions': self.disk_evictions,
+            }
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def configure_render_cache(directory: Optional[str] = None, **kwargs) -> RenderCache:
+    """
+    配置进程级渲染缓存（应用启动时调用）
+
+    Args:
+        directory: 磁盘缓存目录
+        **kwargs: RenderCache 其他参数
+
+    Returns:
+        新的 RenderCache
+    """
+    global _render_cache
+    with _render_cache_lock:
+        _render_cache = RenderCache(directory, **kwargs)
+        return _render_cache
+
+
+def get_render_cache() -> RenderCache:
+    """获取进程级渲染缓存（未配置时使用系统临时目录）"""
+    global _render_cache
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache()
+        return _render_cache
@@ -0,0 +1,234 @@
+"""
+字体注册表与标签精灵图集
+
+- FontRegistry: 进程内只探测一次可用字体文件，按 (路径, 字号) 缓存字体对象
+- SpriteAtlas: 全局共享、按字节数限制的 LRU 标签精灵缓存，线程安全
+
+所有渲染器（标签、图例、Title Block、打印）通过 get_font_registry() /
+get_sprite_atlas() 共享同一份缓存，不再各自逐个尝试 ImageFont.truetype。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from PIL import Image, ImageFont
+
+
+# 候选字体（按优先级），常规 / 粗体各一组
+FONT_CANDIDATES: Dict[bool, List[str]] = {
+    False: [
+        # Windows
+        "arial.ttf",
+        "C:/Windows/Fonts/arial.ttf",
+        # macOS
+        "/System/Library/Fonts/Arial.ttf",
+        "/Library/Fonts/Arial.ttf",
+        # Linux
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+        "/System/Library/Fonts/Helvetica.ttc",
+    ],
+    True: [
+        "arialbd.ttf",
+        "C:/Windows/Fonts/arialbd.ttf",
+        "/System/Library/Fonts/Arial Bold.ttf",
+        "/Library/Fonts/Arial Bold.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
+        "/System/Library/Fonts/Helvetica.ttc",
+    ],
+}
+
+# 精灵图集默认容量（字节）
+DEFAULT_ATLAS_BYTES = 64 * 1024 * 1024
+
+
+class FontRegistry:
+    """
+    字体注册表
+
+    - 首次使用时探测一次每种字重可用的字体文件（粗体找不到时退回常规）
+    - 字体对象按 (路径, 字号) 缓存，所有线程共享
+    - 都找不到时使用 ImageFont.load_default()
+    """
+
+    def __init__(self, candidates: Optional[Dict[bool, List[str]]] = None):
+        self._candidates = candidates if candidates is not None else FONT_CANDIDATES
+        self._paths: Optional[Dict[bool, Optional[str]]] = None
+        self._fonts: Dict[Tuple[Optional[str], int], ImageFont.ImageFont] = {}
+        self._lock = threading.Lock()
+
+    def discover(self) -> Dict[bool, Optional[str]]:
+        """
+        探测可用字体文件（只执行一次）
+
+        Returns:
+            {是否粗体: 字体路径或 None}
+        """
+        if self._paths is not None:
+            return self._paths
+        with self._lock:
+            if self._paths is None:
+                paths = {}
+                for bold, candidates in self._candidates.items():
+                    paths[bold] = None
+                    for path in candidates:
+                        try:
+                            ImageFont.truetype(path, 10)
+                        except (OSError, IOError):
+                            continue
+                        paths[bold] = path
+                        break
+                if paths.get(True) is None:
+                    paths[True] = paths.get(False)
+                self._paths = paths
+            return self._paths
+
+    def font_path(self, bold: bool = False) -> Optional[str]:
+        """
+        获取字体文件路径
+
+        Args:
+            bold: 是否粗体
+
+        Returns:
+            字体路径，没有可用字体时为 None
+        """
+        return self.discover().get(bold)
+
+    def get_font(self, size: int, bold: bool = False) -> ImageFont.ImageFont:
+        """
+        获取字体（按路径和字号缓存）
+
+        Args:
+            size: 字体大小（像素）
+            bold: 是否粗体
+
+        Returns:
+            ImageFont 对象
+        """
+        path = self.font_path(bold)
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(path, size) if path else ImageFont.load_default()
+            with self._lock:
+                font = self._fonts.setdefault(key, font)
+        return font
+
+    def clear(self) -> None:
+        """清空字体缓存并在下次使用时重新探测"""
+        with self._lock:
+            self._paths = None
+            self._fonts.clear()
+
+
+class SpriteAtlas:
+    """
+    标签精灵图集 - 全局 LRU 缓存
+
+    - 键由调用方决定（如 (display_code, cell_size, font_size, text_color, stroke_width)）
+    - 值为 RGBA 图像，按像素字节数计入容量，超出时淘汰最久未使用的精灵
+    - 精灵在锁外渲染，多个线程可同时渲染不同精灵
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_ATLAS_BYTES):
+        self.max_bytes = max_bytes
+        self._sprites: 'OrderedDict[Hashable, Image.Image]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _sprite_bytes(sprite: Image.Image) -> int:
+        return sprite.width * sprite.height * len(sprite.getbands())
+
+    def get(self, key: Hashable, build: Callable[[], Image.Image]) -> Image.Image:
+        """
+        获取精灵，不存在时调用 build 渲染并缓存
+
+        Args:
+            key: 缓存键
+            build: 渲染函数
+
+        Returns:
+            RGBA 图像（共享对象，调用方不得修改）
+        """
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+
+        sprite = build()
+        size = self._sprite_bytes(sprite)
+
+        with self._lock:
+            existing = self._sprites.get(key)
+            if existing is not None:
+                return existing
+            if size <= self.max_bytes:
+                self._sprites[key] = sprite
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._sprites.popitem(last=False)
+                    self._bytes -= self._sprite_bytes(evicted)
+                    self.evictions += 1
+        return sprite
+
+    def clear(self) -> None:
+        """清空图集"""
+        with self._lock:
+            self._sprites.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            精灵数、占用字节、容量、命中 / 未命中 / 淘汰次数
+        """
+        with self._lock:
+            return {
+                'sprites': len(self._sprites),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+_font_registry = FontRegistry()
+_sprite_atlas = SpriteAtlas()
+
+
+def get_font_registry() -> FontRegistry:
+    """获取进程级字体注册表"""
+    return _font_registry
+
+
+def get_sprite_atlas() -> SpriteAtlas:
+    """获取进程级标签精灵图集"""
+    return _sprite_atlas
+
+
+def get_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """
+    获取字体（进程级注册表的快捷方式）
+
+    Args:
+        size: 字体大小（像素）
+        bold: 是否粗体
+
+    Returns:
+        ImageFont 对象
+    """
+    return _font_registry.get_font(size, bold)
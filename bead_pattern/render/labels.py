@@ -1,7 +1,14 @@
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, Tuple, Optional
+from typing import Tuple, Optional
 from ..core.pattern import BeadPatternV2
 from ..core.grid import BeadGrid
+from .raster import alpha_blend
+from .fonts import FontRegistry, SpriteAtlas, get_font_registry, get_sprite_atlas
+
+
+# 单次混合的最大像素数（控制 gather/scatter 临时数组大小）
+_BLEND_CHUNK_PIXELS = 1 << 21
 
 
 class LabelCache:
@@ -11,15 +18,14 @@ class LabelCache:
     缓存键：(display_code, cell_size, font_size, stroke_width, text_color)
     缓存值：预渲染的RGBA图像
 
-    性能优势：
-    - 避免每个标签重复的文本渲染
-    - 使用alpha混合快速粘贴
-    - 速度提升5-10倍（大量重复标签）
+    精灵存放在进程级 SpriteAtlas 中，所有 LabelCache 实例和线程共享，
+    字体来自进程级 FontRegistry；新建实例不会重新渲染已有精灵。
     """
     
-    def __init__(self):
-        self._cache: Dict[str, Image.Image] = {}
-        self._font_cache: Dict[int, ImageFont.ImageFont] = {}
+    def __init__(self, atlas: Optional[SpriteAtlas] = None,
+                 fonts: Optional[FontRegistry] = None):
+        self.atlas = atlas if atlas is not None else get_sprite_atlas()
+        self.fonts = fonts if fonts is not None else get_font_registry()
     
     def get_font(self, size: int) -> ImageFont.ImageFont:
         """
@@ -31,19 +37,7 @@ class LabelCache:
         Returns:
             ImageFont对象
         """
-        if size not in self._font_cache:
-            try:
-                font = ImageFont.truetype("arial.ttf", size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
-                except:
-                    try:
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size)
-                    except:
-                        font = ImageFont.load_default()
-            self._font_cache[size] = font
-        return self._font_cache[size]
+        return self.fonts.get_font(size)
     
     def get_label_image(self, display_code: str, cell_size: int, 
                     font_size: int, text_color: Tuple[int, int, int],
@@ -59,13 +53,17 @@ class LabelCache:
             stroke_width: 描边宽度
         
         Returns:
-            RGBA图像
+            RGBA图像（共享对象，不得修改）
         """
-        key = f"{display_code}_{cell_size}_{font_size}_{text_color}_{stroke_width}"
-        
-        if key in self._cache:
-            return self._cache[key]
-        
+        key = ('label', self.fonts.font_path(), display_code, cell_size,
+               font_size, tuple(text_color), stroke_width)
+        return self.atlas.get(key, lambda: self._render_label(
+            display_code, cell_size, font_size, text_color, stroke_width))
+    
+    def _render_label(self, display_code: str, cell_size: int,
+                      font_size: int, text_color: Tuple[int, int, int],
+                      stroke_width: int) -> Image.Image:
+        """渲染单个标签精灵"""
         font = self.get_font(font_size)
         
         bbox = font.getbbox(display_code)
@@ -91,13 +89,11 @@ class LabelCache:
         else:
             draw.text((text_x, text_y), display_code, fill=text_color, font=font)
         
-        self._cache[key] = label_img
         return label_img
     
     def clear(self) -> None:
-        """清空缓存"""
-        self._cache.clear()
-        self._font_cache.clear()
+        """清空缓存（共享图集）"""
+        self.atlas.clear()
 
 
 def compute_text_color(rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
@@ -116,17 +112,172 @@ def compute_text_color(rgb: Tuple[int, int, int]) -> Tuple[int, int, int]:
     return (255, 255, 255)
 
 
+def compute_base_font_size(cell_size: int) -> int:
+    """
+    根据单元格大小计算默认色号字体大小
+
+    Args:
+        cell_size: 单元格大小
+
+    Returns:
+        字体大小
+    """
+    if cell_size <= 15:
+        return max(7, int(cell_size * 0.6))
+    if cell_size <= 30:
+        return max(9, int(cell_size * 0.6))
+    return max(12, int(cell_size * 0.5))
+
+
+def fit_font_size(pattern: BeadPatternV2, cell_size: int, font_size: Optional[int] = None,
+                  max_ratio: float = 0.8, min_size: int = 6,
+                  fonts: Optional[FontRegistry] = None) -> int:
+    """
+    缩小字体使图案中出现的所有色号都不超出单元格
+
+    Args:
+        pattern: BeadPatternV2对象
+        cell_size: 单元格大小
+        font_size: 初始字体大小（None 使用 compute_base_font_size）
+        max_ratio: 文字宽高占单元格的最大比例
+        min_size: 最小字体大小
+        fonts: 字体注册表（None 使用全局注册表）
+
+    Returns:
+        字体大小
+    """
+    if font_size is None:
+        font_size = compute_base_font_size(cell_size)
+    fonts = fonts if fonts is not None else get_font_registry()
+    font = fonts.get_font(font_size)
+
+    palette = pattern.palette
+    present = np.unique(pattern.grid.map_bands(palette.to_compact_indices))
+    limit = cell_size * max_ratio
+    scale = 1.0
+    for compact_idx in present[present > 0]:
+        code = palette.get_color(int(palette.sorted_ids[compact_idx - 1])).display_code
+        bbox = font.getbbox(code)
+        text_width, text_height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+        if text_width > limit:
+            scale = min(scale, limit / text_width)
+        if text_height > limit:
+            scale = min(scale, limit / text_height)
+    if scale >= 1.0:
+        return font_size
+    return max(min_size, int(font_size * scale))
+
+
+def build_label_sprites(pattern: BeadPatternV2, cell_size: int,
+                        font_size: Optional[int] = None, stroke_width: int = 1,
+                        bounds: Optional[Tuple[int, int, int, int]] = None,
+                        cache: Optional[LabelCache] = None) -> np.ndarray:
+    """
+    为图案中出现的每种颜色光栅化一次标签精灵
+
+    Args:
+        pattern: BeadPatternV2对象
+        cell_size: 单元格大小
+        font_size: 字体大小（None 自动计算）
+        stroke_width: 描边宽度
+        bounds: 只统计 (min_x, min_y, max_x, max_y) 区域内出现的颜色
+        cache: 标签缓存（None 使用共享图集）
+
+    Returns:
+        (K+1, cs, cs, 4) uint8 数组，按紧凑索引排列；
+        索引 0（空白）及未出现的颜色全透明
+    """
+    if font_size is None:
+        font_size = compute_base_font_size(cell_size)
+    if cache is None:
+        cache = LabelCache()
+
+    palette = pattern.palette
+    sorted_ids = palette.sorted_ids
+    compact = pattern.grid.map_bands(palette.to_compact_indices, bounds)
+    counts = np.bincount(compact.ravel(), minlength=len(sorted_ids) + 1)
+
+    sprites = np.zeros((len(sorted_ids) + 1, cell_size, cell_size, 4), dtype=np.uint8)
+    for compact_idx in np.nonzero(counts[1:])[0] + 1:
+        color_info = palette.get_color(int(sorted_ids[compact_idx - 1]))
+        sprites[compact_idx] = np.asarray(cache.get_label_image(
+            color_info.display_code, cell_size, font_size,
+            compute_text_color(color_info.rgb), stroke_width
+        ))
+    return sprites
+
+
+def blit_labels(buf: np.ndarray, pattern: BeadPatternV2, cell_size: int,
+                font_size: Optional[int] = None, stroke_width: int = 1,
+                bounds: Optional[Tuple[int, int, int, int]] = None,
+                cache: Optional[LabelCache] = None) -> np.ndarray:
+    """
+    将色号标签混合到任意底图的像素数组上
+
+    每种颜色的精灵只处理 alpha > 0 的像素：单元格按紧凑索引一次排序分组，
+    对 (单元格数, 像素数) 的索引矩阵做 gather → 混合 → scatter。
+    渲染新图像时应改用 rasterize(..., label_sprites=...)，底色已知，
+    无需读取底图。
+
+    Args:
+        buf: (H, W, 3) uint8 数组，原地修改
+        pattern: BeadPatternV2对象
+        cell_size: 单元格大小
+        font_size: 字体大小（None 自动计算）
+        stroke_width: 描边宽度
+        bounds: 只处理 (min_x, min_y, max_x, max_y) 区域（buf 左上角为该区域起点）
+        cache: 标签缓存（None 使用共享图集）
+
+    Returns:
+        buf 本身
+    """
+    sprites = build_label_sprites(pattern, cell_size, font_size, stroke_width, bounds, cache)
+
+    compact = pattern.grid.map_bands(pattern.palette.to_compact_indices, bounds)
+    width = compact.shape[1]
+    compact = compact.ravel()
+    order = np.argsort(compact, kind='stable')
+    ends = np.cumsum(np.bincount(compact, minlength=len(sprites)))
+
+    flat_buf = buf.reshape(-1, 3)
+    row_pixels = buf.shape[1]
+
+    for compact_idx in range(1, len(sprites)):
+        alpha = sprites[compact_idx, ..., 3]
+        dy, dx = np.nonzero(alpha)
+        cells = order[ends[compact_idx - 1]:ends[compact_idx]]
+        if dy.size == 0 or cells.size == 0:
+            continue
+
+        src = sprites[compact_idx, dy, dx, :3]
+        a = alpha[dy, dx]
+        offsets = dy.astype(np.int64) * row_pixels + dx
+        cell_y, cell_x = np.divmod(cells, width)
+        origins = cell_y * cell_size * row_pixels + cell_x * cell_size
+
+        # 不透明像素直接写入，只有半透明边缘需要读取底图
+        opaque = a == 255
+        blend_offsets = offsets[~opaque]
+        blend_src = src[~opaque]
+        blend_alpha = a[~opaque][:, None]
+
+        cells_per_chunk = max(1, _BLEND_CHUNK_PIXELS // dy.size)
+        for start in range(0, origins.size, cells_per_chunk):
+            chunk = origins[start:start + cells_per_chunk, None]
+            flat_buf[chunk + offsets[opaque]] = src[opaque]
+            index = chunk + blend_offsets
+            flat_buf[index] = alpha_blend(blend_src, blend_alpha, flat_buf[index])
+
+    return buf
+
+
 def overlay_labels(img: Image.Image, pattern: BeadPatternV2,
                  cell_size: int, font_size: Optional[int] = None,
                  stroke_width: int = 1) -> Image.Image:
     """
-    在图像上覆盖标签（使用缓存 + 批量粘贴优化）
+    在图像上覆盖标签
 
-    性能优化：
-    - 使用LabelCache缓存预渲染的标签图像
-    - 按标签类型分组，批量粘贴相同标签
-    - 将alpha_composite调用从O(W*H)减少到O(unique_labels)
-    - 对于200x200图案，从40,000次粘贴减少到~100次（假设100种颜色）
+    渲染新图像时应使用 rasterize(..., label_sprites=...)，本函数用于已有图像。
 
     Args:
         img: 基础图像
@@ -138,64 +289,6 @@ def overlay_labels(img: Image.Image, pattern: BeadPatternV2,
     Returns:
         添加标签后的图像
     """
-    def compute_base_font_size(size: int) -> int:
-        if size <= 15:
-            return max(7, int(size * 0.6))
-        if size <= 30:
-            return max(9, int(size * 0.6))
-        return max(12, int(size * 0.5))
-
-    if font_size is None:
-        font_size = compute_base_font_size(cell_size)
-
-    result_img = img.copy().convert('RGBA')
-    cache = LabelCache()
-
-    height, width = pattern.grid.shape
-    grid_ids = pattern.grid.grid_ids
-
-    label_groups: Dict[str, list] = {}
-    unique_codes: set = set()
-
-    for y in range(height):
-        for x in range(width):
-            color_id = grid_ids[y, x]
-            if color_id != BeadGrid.EMPTY:
-                color_info = pattern.palette.get_color(color_id)
-                if color_info:
-                    unique_codes.add(color_info.display_code)
-
-    # 不再自动缩小字体
-    # 如果 cell_size 不够大，由调用方保证（通过自适应 cell_size 计算）
-    # 这确保了色号始终清晰可读
-    adjusted_font_size = font_size
-
-    for y in range(height):
-        for x in range(width):
-            color_id = grid_ids[y, x]
-            if color_id != BeadGrid.EMPTY:
-                color_info = pattern.palette.get_color(color_id)
-                if color_info:
-                    rgb = color_info.rgb
-                    display_code = color_info.display_code
-                    text_color = compute_text_color(rgb)
-
-                    label_img = cache.get_label_image(
-                        display_code, cell_size, adjusted_font_size, text_color, stroke_width
-                    )
-
-                    label_w, label_h = label_img.size
-                    paste_x = x * cell_size + (cell_size - label_w) // 2
-                    paste_y = y * cell_size + (cell_size - label_h) // 2
-
-                    key = f"{display_code}_{text_color}"
-                    if key not in label_groups:
-                        label_groups[key] = [label_img, []]
-                    label_groups[key][1].append((paste_x, paste_y))
-
-    for label_img, positions in label_groups.values():
-        if positions:
-            for paste_x, paste_y in positions:
-                result_img.alpha_composite(label_img, (paste_x, paste_y))
-
-    return result_img.convert('RGB')
+    buf = np.array(img.convert('RGB'))
+    blit_labels(buf, pattern, cell_size, font_size, stroke_width)
+    return Image.fromarray(buf, 'RGB')
@@ -1,6 +1,7 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from typing import List, Tuple
 from ..core.pattern import BeadPatternV2
+from .fonts import get_font
 
 
 def render_legend(pattern: BeadPatternV2, cell_size: int,
@@ -28,13 +29,7 @@ def render_legend(pattern: BeadPatternV2, cell_size: int,
     legend_img = Image.new('RGB', (legend_width_px, len(color_ids) * 40 + 20), (255, 255, 255))
     draw = ImageDraw.Draw(legend_img)
     
-    try:
-        font = ImageFont.truetype("arial.ttf", font_size)
-    except:
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+    font = get_font(font_size)
     
     for i, color_id in enumerate(color_ids):
         y_pos = 20 + i * 40
@@ -0,0 +1,179 @@
+"""
+渲染计划
+
+一次请求多个输出（底图、网格、标签、图例），共享的中间结果只计算一次：
+
+    base ──┬── grid
+           └── labels ── grid_labels
+    legend（独立）
+
+- 紧凑索引、标签精灵只计算一次
+- 每个阶段在父阶段的像素数组上原地写入；父阶段有多个子阶段时，
+  只有前面的子阶段复制一份，最后一个子阶段直接沿用父数组
+- 请求的输出在子阶段修改数组之前转为 PIL 图像
+- indexed=True 时各阶段直接写 1 字节调色板索引，输出 P 模式图像
+  （本次渲染用到的颜色超过 256 种时退回 RGB）
+"""
+
+import numpy as np
+from PIL import Image
+from typing import Dict, Iterable, Optional, Tuple
+from ..core.pattern import BeadPatternV2
+from .raster import IndexedPalette, fill_cells, burn_labels, burn_grid
+from .labels import build_label_sprites
+from .legend import render_legend
+
+
+class RenderPlan:
+    """
+    渲染计划 - 多个输出共享中间阶段
+
+    输出名称：
+    - 'base': 只有单元格底色
+    - 'grid': 底色 + 细网格线（及加粗线）
+    - 'labels': 底色 + 色号标签
+    - 'grid_labels': 底色 + 色号标签 + 网格线
+    - 'legend': 图例面板
+    """
+
+    OUTPUTS = ('base', 'grid', 'labels', 'grid_labels', 'legend')
+
+    # 阶段依赖：子阶段 -> 父阶段
+    _PARENTS = {
+        'grid': 'base',
+        'labels': 'base',
+        'grid_labels': 'labels',
+    }
+
+    def __init__(self, pattern, cell_size: int,
+                 grid_color: Tuple[int, int, int] = (200, 200, 200),
+                 major_interval: int = 0,
+                 major_color: Tuple[int, int, int] = (0, 0, 0),
+                 major_width: int = 2,
+                 close_grid: bool = False,
+                 font_size: Optional[int] = None,
+                 stroke_width: int = 1,
+                 legend_width_px: int = 300,
+                 legend_font_size: int = 12,
+                 indexed: bool = False):
+        """
+        Args:
+            pattern: BeadPatternV2 或 BeadPattern 兼容层对象
+            cell_size: 每个拼豆的像素大小
+            grid_color: 细网格线颜色
+            major_interval: 加粗线间隔（格数），0 表示不绘制
+            major_color: 加粗线颜色
+            major_width: 加粗线宽度（像素）
+            close_grid: 是否在右侧/底部多留 1 像素画出收边线
+            font_size: 标签字体大小（None 自动计算）
+            stroke_width: 标签描边宽度
+            legend_width_px: 图例宽度（像素）
+            legend_font_size: 图例字体大小
+            indexed: 优先输出 P 模式（调色板）图像
+        """
+        self.pattern: BeadPatternV2 = pattern._v2 if hasattr(pattern, '_v2') else pattern
+        self.cell_size = cell_size
+        self.grid_color = grid_color
+        self.major_interval = major_interval
+        self.major_color = major_color
+        self.major_width = major_width
+        self.close_grid = close_grid
+        self.font_size = font_size
+        self.stroke_width = stroke_width
+        self.legend_width_px = legend_width_px
+        self.legend_font_size = legend_font_size
+        self.indexed = indexed
+
+        self._compact: Optional[np.ndarray] = None
+        self._sprites: Optional[np.ndarray] = None
+        self._palette: Optional[IndexedPalette] = None
+        self._results: Dict[str, Image.Image] = {}
+        self.copies = 0
+
+    @property
+    def compact(self) -> np.ndarray:
+        """紧凑索引（所有阶段共享）"""
+        if self._compact is None:
+            self._compact = self.pattern.grid.map_bands(self.pattern.palette.to_compact_indices)
+        return self._compact
+
+    @property
+    def label_sprites(self) -> np.ndarray:
+        """标签精灵（labels / grid_labels 共享）"""
+        if self._sprites is None:
+            self._sprites = build_label_sprites(self.pattern, self.cell_size,
+                                                self.font_size, self.stroke_width)
+        return self._sprites
+
+    def _run_stage(self, name: str, buf: Optional[np.ndarray]) -> np.ndarray:
+        """执行单个阶段（base 新建数组，其余阶段原地修改 buf）"""
+        lut = self.pattern.palette.rgb_lut
+        if name == 'base':
+            return fill_cells(self.compact, lut, self.cell_size, self.close_grid, self._palette)
+        if name == 'labels':
+            return burn_labels(buf, self.compact, lut, self.cell_size, self.label_sprites,
+                               self._palette)
+        sprites = self.label_sprites if name == 'grid_labels' else None
+        return burn_grid(buf, self.compact, self.cell_size, True, self.grid_color,
+                         self.major_interval, self.major_color, self.major_width, sprites,
+                         self._palette)
+
+    def _run_tree(self, name: str, buf: Optional[np.ndarray],
+                  needed: set, requested: set) -> None:
+        """执行阶段及其子阶段；最后一个子阶段沿用父数组"""
+        buf = self._run_stage(name, buf)
+        if name in requested:
+            if self._palette is not None:
+                self._results[name] = self._palette.to_image(buf)
+            else:
+                self._results[name] = Image.fromarray(buf, 'RGB')
+
+        children = [child for child, parent in self._PARENTS.items()
+                    if parent == name and child in needed]
+        for i, child in enumerate(children):
+            if i < len(children) - 1:
+                self.copies += 1
+                self._run_tree(child, buf.copy(), needed, requested)
+            else:
+                self._run_tree(child, buf, needed, requested)
+
+    def render(self, outputs: Iterable[str]) -> Dict[str, Image.Image]:
+        """
+        渲染请求的输出（已渲染过的输出直接返回）
+
+        Args:
+            outputs: 输出名称，见 OUTPUTS
+
+        Returns:
+            {输出名称: PIL 图像}（RGB 模式，indexed=True 时尽量为 P 模式）
+        """
+        outputs = list(outputs)
+        unknown = [name for name in outputs if name not in self.OUTPUTS]
+        if unknown:
+            raise ValueError(f"未知的渲染输出: {unknown}")
+
+        requested = {name for name in outputs if name not in self._results}
+        if 'legend' in requested:
+            self._results['legend'] = render_legend(self.pattern, self.cell_size,
+                                                    self.legend_width_px, self.legend_font_size)
+            requested.discard('legend')
+
+        needed = set()
+        for name in requested:
+            while name is not None:
+                needed.add(name)
+                name = self._PARENTS.get(name)
+        if needed:
+            self._palette = None
+            if self.indexed:
+                sprites = self.label_sprites if 'labels' in needed else None
+                self._palette = IndexedPalette.for_grid(
+                    self.pattern.palette.rgb_lut, True, self.grid_color, self.major_interval,
+                    self.major_color, self.major_width, sprites)
+            self._run_tree('base', None, needed, requested)
+
+        return {name: self._results[name] for name in outputs}
+
+    def get(self, name: str) -> Image.Image:
+        """获取单个输出（未渲染时只渲染该输出）"""
+        return self.render([name])[name]
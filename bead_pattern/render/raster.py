@@ -1,67 +1,436 @@
 import numpy as np
-from PIL import Image, ImageDraw
-from typing import Tuple
+from PIL import Image
+from typing import Optional, Tuple
 from ..core.pattern import BeadPatternV2
 
 
+# 标签色块一次展开的最大像素数（按单元格行分块）
+_LABEL_CHUNK_PIXELS = 1 << 22
+
+
+def alpha_blend(src: np.ndarray, alpha: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    不透明底图上的 alpha 混合
+
+    整数运算与 Image.alpha_composite（底图 alpha=255）一致，结果逐像素相同。
+
+    Args:
+        src: 前景 RGB（可广播）
+        alpha: 前景 alpha（可广播，末维为 1）
+        dst: 底图 RGB
+
+    Returns:
+        uint8 混合结果
+    """
+    alpha = alpha.astype(np.uint32)
+    value = (src.astype(np.uint32) * alpha + dst.astype(np.uint32) * (255 - alpha)) * 128 + 16384
+    return (((value >> 8) + value) >> 15).astype(np.uint8)
+
+
+def burn_grid_lines(buf: np.ndarray, cell_size: int, color: Tuple[int, int, int],
+                    interval: int = 1, line_width: int = 1) -> np.ndarray:
+    """
+    将网格线直接写入像素数组（步进切片赋值，无逐线绘制）
+
+    线条位于每 interval 个单元格的起始像素行/列，宽度向右/下延伸，
+    与 ImageDraw.line 在相同坐标上的绘制结果一致。
+
+    Args:
+        buf: (H, W, 3) uint8 像素数组，原地修改
+        cell_size: 每个拼豆像素大小
+        color: 线条颜色
+        interval: 每隔多少个单元格画一条线（1 = 每格）
+        line_width: 线宽（像素）
+
+    Returns:
+        buf 本身
+    """
+    step = cell_size * interval
+    for offset in range(line_width):
+        buf[offset::step, :] = color
+        buf[:, offset::step] = color
+    return buf
+
+
+def _pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    """RGB → 24 位整数"""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+class IndexedPalette:
+    """
+    P 模式调色板（RGB → 1 字节调色板索引）
+
+    颜色集合在渲染前确定：色板颜色、线条颜色，以及每种颜色的标签精灵
+    与其底色 / 线条颜色混合后的全部颜色。渲染各阶段照常计算 RGB，
+    只在写入像素数组前查表换成索引，转回 RGB 后与 RGB 渲染逐像素一致。
+    """
+
+    def __init__(self, keys: np.ndarray):
+        self.keys = keys
+        self.colors = np.stack([keys >> 16, (keys >> 8) & 0xFF, keys & 0xFF], axis=-1).astype(np.uint8)
+
+    @classmethod
+    def build(cls, lut: np.ndarray, lines=(),
+              label_sprites: Optional[np.ndarray] = None) -> Optional['IndexedPalette']:
+        """
+        收集渲染会用到的所有颜色
+
+        Args:
+            lut: 色板 RGB 查找表 (K+1, 3)
+            lines: 网格线 [(颜色, 线宽), ...]
+            label_sprites: (K+1, cs, cs, 4) 标签精灵
+
+        Returns:
+            IndexedPalette；颜色超过 256 种（通常是颜色多、字号大的抗锯齿标签）时为 None
+        """
+        lut = lut.astype(np.uint8, copy=False)
+        parts = [lut, np.full((1, 3), 255, dtype=np.uint8)]
+        for color, line_width in lines:
+            color = np.array(color, dtype=np.uint8)
+            parts.append(color[None])
+            if label_sprites is not None:
+                # 只有线条经过的前 line_width 行/列会与线色混合
+                for edge in (label_sprites[:, :line_width], label_sprites[:, :, :line_width]):
+                    parts.append(alpha_blend(edge[..., :3], edge[..., 3:], color).reshape(-1, 3))
+        if label_sprites is not None:
+            parts.append(alpha_blend(label_sprites[..., :3], label_sprites[..., 3:],
+                                     lut[:, None, None, :]).reshape(-1, 3))
+        keys = np.unique(_pack_rgb(np.concatenate(parts)))
+        if keys.size > 256:
+            return None
+        return cls(keys)
+
+    @classmethod
+    def for_grid(cls, lut: np.ndarray, show_grid: bool = False,
+                 grid_color: Tuple[int, int, int] = (200, 200, 200),
+                 major_interval: int = 0,
+                 major_color: Tuple[int, int, int] = (0, 0, 0),
+                 major_width: int = 2,
+                 label_sprites: Optional[np.ndarray] = None) -> Optional['IndexedPalette']:
+        """按 rasterize 的网格参数构建调色板（参数含义同 rasterize）"""
+        lines = []
+        if show_grid:
+            lines.append((grid_color, 1))
+        if major_interval > 0:
+            lines.append((major_color, major_width))
+        return cls.build(lut, lines, label_sprites)
+
+    def lookup(self, rgb: np.ndarray) -> np.ndarray:
+        """
+        RGB → 调色板索引
+
+        Args:
+            rgb: (..., 3) 颜色（必须在调色板内）
+
+        Returns:
+            (..., 1) uint8 索引
+        """
+        return np.searchsorted(self.keys, _pack_rgb(np.asarray(rgb))).astype(np.uint8)[..., None]
+
+    def to_image(self, buf: np.ndarray) -> Image.Image:
+        """
+        (H, W, 1) 索引数组 → P 模式图像
+
+        Returns:
+            PIL Image对象（P模式）
+        """
+        # P 模式的 fromarray 与数组共享内存，复制一份，之后的阶段才能继续原地修改 buf
+        img = Image.fromarray(buf[..., 0].copy(), 'P')
+        img.putpalette(self.colors.tobytes())
+        return img
+
+
+def _burn_label_cells(cells: np.ndarray, compact: np.ndarray, lut: np.ndarray,
+                      sprites: np.ndarray, palette: Optional[IndexedPalette] = None) -> None:
+    """
+    将标签精灵与单元格底色预混合后写入单元格
+
+    只覆盖所有精灵 alpha > 0 的公共包围盒，按单元格行分块展开。
+    """
+    coverage = (sprites[..., 3] > 0).any(axis=0)
+    rows = np.nonzero(coverage.any(axis=1))[0]
+    cols = np.nonzero(coverage.any(axis=0))[0]
+    if rows.size == 0:
+        return
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+    box = sprites[:, r0:r1, c0:c1]
+    tiles = alpha_blend(box[..., :3], box[..., 3:], lut[:, None, None, :])
+    if palette is not None:
+        tiles = palette.lookup(tiles)
+    label_box = cells[:, r0:r1, :, c0:c1]
+
+    height, width = compact.shape
+    rows_per_chunk = max(1, _LABEL_CHUNK_PIXELS // max(1, width * tiles[0].size // tiles.shape[-1]))
+    for start in range(0, height, rows_per_chunk):
+        stop = start + rows_per_chunk
+        label_box[start:stop] = tiles[compact[start:stop]].transpose(0, 2, 1, 3, 4)
+
+
+def _burn_label_lines(cells: np.ndarray, compact: np.ndarray, sprites: np.ndarray,
+                      color: Tuple[int, int, int], interval: int = 1,
+                      line_width: int = 1, palette: Optional[IndexedPalette] = None) -> None:
+    """
+    在单元格内的网格线像素上重新叠加标签（与先画线再贴标签结果一致）
+
+    线条位置与 burn_grid_lines 相同：每 interval 个单元格的前 line_width 行/列。
+    """
+    line_color = np.array(color, dtype=np.uint8)
+
+    rows = sprites[:, :line_width]
+    row_tiles = alpha_blend(rows[..., :3], rows[..., 3:], line_color)
+    if palette is not None:
+        row_tiles = palette.lookup(row_tiles)
+    cells[::interval, :line_width] = row_tiles[compact[::interval]].transpose(0, 2, 1, 3, 4)
+
+    cols = sprites[:, :, :line_width]
+    col_tiles = alpha_blend(cols[..., :3], cols[..., 3:], line_color)
+    if palette is not None:
+        col_tiles = palette.lookup(col_tiles)
+    cells[:, :, ::interval, :line_width] = col_tiles[compact[:, ::interval]].transpose(0, 2, 1, 3, 4)
+
+
+def cell_view(buf: np.ndarray, compact: np.ndarray, cell_size: int) -> np.ndarray:
+    """
+    单元格区域的 5 维视图（不复制）：(行, 格内行, 列, 格内列, 通道)
+    """
+    height, width = compact.shape
+    return buf[:height * cell_size, :width * cell_size].reshape(
+        height, cell_size, width, cell_size, buf.shape[-1])
+
+
+def fill_cells(compact: np.ndarray, lut: np.ndarray, cell_size: int,
+               close_grid: bool = False,
+               palette: Optional[IndexedPalette] = None) -> np.ndarray:
+    """
+    渲染阶段：按紧凑索引填充单元格底色
+
+    先横向展开一行像素 (H, W*cs, 3)，再通过 (H, cs, W*cs, 3) 广播视图
+    一次写满所有像素行。
+
+    Args:
+        compact: (H, W) 紧凑索引
+        lut: 色板 RGB 查找表
+        cell_size: 每个拼豆的像素大小
+        close_grid: 是否在右侧/底部多留 1 像素（白色）
+        palette: 输出调色板索引（P 模式）而不是 RGB
+
+    Returns:
+        新分配的 (H*cs [+1], W*cs [+1], 3) uint8 数组（palette 不为 None 时末维为 1）
+    """
+    height, width = compact.shape
+    white = np.full(3, 255, dtype=np.uint8)
+    if palette is not None:
+        lut = palette.lookup(lut)
+        white = palette.lookup(white)
+    channels = lut.shape[-1]
+
+    extra = 1 if close_grid else 0
+    buf = np.empty((height * cell_size + extra, width * cell_size + extra, channels), dtype=np.uint8)
+    if extra:
+        buf[-1, :] = white
+        buf[:, -1] = white
+
+    pixel_rows = np.repeat(lut[compact].astype(np.uint8, copy=False), cell_size, axis=1)
+    cells = buf[:height * cell_size, :width * cell_size].reshape(height, cell_size, width * cell_size, channels)
+    cells[...] = pixel_rows[:, None]
+    return buf
+
+
+def burn_labels(buf: np.ndarray, compact: np.ndarray, lut: np.ndarray, cell_size: int,
+                label_sprites: np.ndarray,
+                palette: Optional[IndexedPalette] = None) -> np.ndarray:
+    """
+    渲染阶段：在只有底色的像素数组上写入标签（须在 burn_grid 之前）
+
+    lut 始终是 RGB 查找表；palette 不为 None 时 buf 为索引数组。
+
+    Returns:
+        buf 本身
+    """
+    _burn_label_cells(cell_view(buf, compact, cell_size), compact, lut, label_sprites, palette)
+    return buf
+
+
+def burn_grid(buf: np.ndarray, compact: np.ndarray, cell_size: int,
+              show_grid: bool = False,
+              grid_color: Tuple[int, int, int] = (200, 200, 200),
+              major_interval: int = 0,
+              major_color: Tuple[int, int, int] = (0, 0, 0),
+              major_width: int = 2,
+              label_sprites: Optional[np.ndarray] = None,
+              palette: Optional[IndexedPalette] = None) -> np.ndarray:
+    """
+    渲染阶段：写入细网格线与加粗线
+
+    buf 已含标签时需传入相同的 label_sprites，线条经过的像素会重新混合标签；
+    palette 不为 None 时 buf 为索引数组。
+
+    Returns:
+        buf 本身
+    """
+    cells = cell_view(buf, compact, cell_size)
+    lines = []
+    if show_grid:
+        lines.append((grid_color, 1, 1))
+    if major_interval > 0:
+        lines.append((major_color, major_interval, major_width))
+    for color, interval, line_width in lines:
+        value = palette.lookup(np.array(color)) if palette is not None else color
+        burn_grid_lines(buf, cell_size, value, interval, line_width)
+        if label_sprites is not None:
+            _burn_label_lines(cells, compact, label_sprites, color,
+                              interval, line_width, palette)
+    return buf
+
+
+def rasterize(pattern: BeadPatternV2, cell_size: int,
+              bounds: Optional[Tuple[int, int, int, int]] = None,
+              show_grid: bool = False,
+              grid_color: Tuple[int, int, int] = (200, 200, 200),
+              major_interval: int = 0,
+              major_color: Tuple[int, int, int] = (0, 0, 0),
+              major_width: int = 2,
+              close_grid: bool = False,
+              label_sprites: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    单次渲染到预分配像素数组
+
+    流程：
+    - 色号网格 → 紧凑索引 → LUT 查 RGB（每个拼豆一次）
+    - 先横向展开一行像素 (H, W*cs, 3)，再通过 (H, cs, W*cs, 3) 广播视图
+      一次写满所有像素行（内层为连续整行复制）
+    - 细网格线、每 N 格加粗线用步进切片写入同一数组
+    - 色号标签（label_sprites）按颜色与底色预混合成色块后一次写入，
+      网格线经过的像素再按线色重新混合，不逐格 alpha_composite
+
+    Args:
+        pattern: BeadPatternV2对象
+        cell_size: 每个拼豆的像素大小
+        bounds: 只渲染 (min_x, min_y, max_x, max_y) 区域，None 为整个图案
+        show_grid: 是否绘制细网格线
+        grid_color: 细网格线颜色
+        major_interval: 加粗线间隔（格数），0 表示不绘制
+        major_color: 加粗线颜色
+        major_width: 加粗线宽度（像素）
+        close_grid: 是否在右侧/底部多留 1 像素画出收边线
+        label_sprites: labels.build_label_sprites 生成的 (K+1, cs, cs, 4)
+            标签精灵，None 表示不绘制标签
+
+    Returns:
+        (H*cs [+1], W*cs [+1], 3) uint8 数组
+    """
+    lut = pattern.palette.rgb_lut
+    compact = pattern.grid.map_bands(pattern.palette.to_compact_indices, bounds)
+
+    buf = fill_cells(compact, lut, cell_size, close_grid)
+    if label_sprites is not None:
+        burn_labels(buf, compact, lut, cell_size, label_sprites)
+    burn_grid(buf, compact, cell_size, show_grid, grid_color, major_interval,
+              major_color, major_width, label_sprites)
+    return buf
+
+
+def rasterize_indexed(pattern: BeadPatternV2, cell_size: int,
+                      bounds: Optional[Tuple[int, int, int, int]] = None,
+                      show_grid: bool = False,
+                      grid_color: Tuple[int, int, int] = (200, 200, 200),
+                      major_interval: int = 0,
+                      major_color: Tuple[int, int, int] = (0, 0, 0),
+                      major_width: int = 2,
+                      close_grid: bool = False,
+                      label_sprites: Optional[np.ndarray] = None,
+                      palette: Optional[IndexedPalette] = None
+                      ) -> Optional[Tuple[np.ndarray, IndexedPalette]]:
+    """
+    直接渲染为调色板索引平面（参数同 rasterize）
+
+    每个像素 1 字节，转回 RGB 后与 rasterize 结果逐像素一致。
+    palette 为 None 时按本次参数构建；分带渲染时传入同一个调色板。
+
+    Returns:
+        ((H*cs [+1], W*cs [+1], 1) 索引数组, IndexedPalette)；
+        颜色超过 256 种（抗锯齿标签）时为 None，应改用 rasterize
+    """
+    lut = pattern.palette.rgb_lut
+    if palette is None:
+        palette = IndexedPalette.for_grid(lut, show_grid, grid_color, major_interval,
+                                          major_color, major_width, label_sprites)
+        if palette is None:
+            return None
+
+    compact = pattern.grid.map_bands(pattern.palette.to_compact_indices, bounds)
+    buf = fill_cells(compact, lut, cell_size, close_grid, palette)
+    if label_sprites is not None:
+        burn_labels(buf, compact, lut, cell_size, label_sprites, palette)
+    burn_grid(buf, compact, cell_size, show_grid, grid_color, major_interval,
+              major_color, major_width, label_sprites, palette)
+    return buf, palette
+
+
+def render_pattern(pattern: BeadPatternV2, cell_size: int,
+                   bounds: Optional[Tuple[int, int, int, int]] = None,
+                   show_grid: bool = False,
+                   grid_color: Tuple[int, int, int] = (200, 200, 200),
+                   major_interval: int = 0,
+                   major_color: Tuple[int, int, int] = (0, 0, 0),
+                   major_width: int = 2,
+                   close_grid: bool = False,
+                   label_sprites: Optional[np.ndarray] = None,
+                   indexed: bool = False) -> Image.Image:
+    """
+    渲染图案为PIL图像（参数同 rasterize）
+
+    Args:
+        indexed: 优先输出 P 模式（调色板）图像，PNG 更小、编码更快；
+            抗锯齿标签使颜色超过 256 种时退回 RGB
+
+    Returns:
+        PIL Image对象（RGB 模式；indexed=True 且颜色不超过 256 种时为 P 模式）
+    """
+    args = (pattern, cell_size, bounds, show_grid, grid_color, major_interval,
+            major_color, major_width, close_grid, label_sprites)
+    if indexed:
+        result = rasterize_indexed(*args)
+        if result is not None:
+            buf, palette = result
+            return palette.to_image(buf)
+    return Image.fromarray(rasterize(*args), 'RGB')
+
+
 def render_base(pattern: BeadPatternV2, cell_size: int) -> Image.Image:
     """
-    快速基础渲染 - 使用LUT查找+Image.fromarray
-    
-    性能优化：
-    - 不使用逐格绘制循环
-    - 构建索引数组后一次性查找RGB
-    - 使用Image.fromarray批量转换
-    
+    快速基础渲染（无网格线）
+
     Args:
         pattern: BeadPatternV2对象
         cell_size: 每个拼豆的像素大小
-    
+
     Returns:
         PIL Image对象（RGB模式）
     """
-    height, width = pattern.grid.shape
-    
-    grid_ids = pattern.grid.grid_ids
-    
-    idx_grid = np.zeros((height, width), dtype=np.int32)
-    lut = pattern.palette.rgb_lut
-    
-    for color_id, compact_idx in pattern.palette.index_by_id.items():
-        idx_grid[grid_ids == color_id] = compact_idx
-    
-    rgb = lut[idx_grid]
-    rgb = np.clip(rgb, 0, 255).astype(np.uint8)
-    
-    small_img = Image.fromarray(rgb, 'RGB')
-    final_img = small_img.resize((width * cell_size, height * cell_size), Image.NEAREST)
-    
-    return final_img
-
-
-def render_grid_lines(img: Image.Image, width: int, height: int, 
+    return render_pattern(pattern, cell_size)
+
+
+def render_grid_lines(img: Image.Image, width: int, height: int,
                   cell_size: int, grid_color: Tuple[int, int, int] = (200, 200, 200)) -> Image.Image:
     """
-    渲染网格线（批量绘制）
-    
+    在已有图像上添加网格线
+
+    新代码应直接使用 render_pattern(..., show_grid=True)，避免再转换一次图像。
+
     Args:
         img: 基础图像
         width: 网格宽度（拼豆数）
         height: 网格高度（拼豆数）
         cell_size: 每个拼豆像素大小
         grid_color: 网格线颜色
-    
+
     Returns:
         添加网格线后的图像
     """
-    draw = ImageDraw.Draw(img)
-    
-    for x in range(width + 1):
-        x_pos = x * cell_size
-        draw.line([(x_pos, 0), (x_pos, height * cell_size)], fill=grid_color, width=1)
-    
-    for y in range(height + 1):
-        y_pos = y * cell_size
-        draw.line([(0, y_pos), (width * cell_size, y_pos)], fill=grid_color, width=1)
-    
-    return img
+    buf = np.array(img.convert('RGB'))
+    burn_grid_lines(buf[:height * cell_size + 1, :width * cell_size + 1], cell_size, grid_color)
+    return Image.fromarray(buf, 'RGB')
@@ -0,0 +1,180 @@
+"""
+分带流式渲染
+
+超大图案（例如 500×500 @ cell_size=30 = 15000×15000 像素）按水平行带渲染，
+每个行带写入 PNGStreamWriter 后即释放，峰值内存只与一个行带成正比。
+
+- 行带高度为加粗线间隔的整数倍，网格线位置与整图渲染一致
+- 标签精灵和调色板在整图范围内只构建一次，所有行带共享
+- 工程蓝图：上边距、主网格（分带）、信息区依次写入
+"""
+
+import numpy as np
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+from ..core.pattern import BeadPatternV2
+from ..io.png_stream import PNGStreamWriter
+from .raster import IndexedPalette, rasterize, rasterize_indexed
+
+
+# 单个行带的默认像素字节上限
+DEFAULT_BAND_BYTES = 32 * 1024 * 1024
+
+
+def band_cells(width_px: int, cell_size: int, major_interval: int = 0,
+               max_band_bytes: int = DEFAULT_BAND_BYTES, channels: int = 3) -> int:
+    """
+    计算每个行带包含的单元格行数
+
+    Args:
+        width_px: 图像宽度（像素）
+        cell_size: 单元格大小
+        major_interval: 加粗线间隔（行带高度取其整数倍）
+        max_band_bytes: 单个行带的像素字节上限
+        channels: 每像素字节数
+
+    Returns:
+        单元格行数（至少为 1 个加粗线间隔）
+    """
+    step = max(1, major_interval)
+    rows = max_band_bytes // max(1, width_px * cell_size * channels)
+    return max(step, rows // step * step)
+
+
+def iter_pattern_bands(pattern: BeadPatternV2, cell_size: int,
+                       bounds: Optional[Tuple[int, int, int, int]] = None,
+                       show_grid: bool = False,
+                       grid_color: Tuple[int, int, int] = (200, 200, 200),
+                       major_interval: int = 0,
+                       major_color: Tuple[int, int, int] = (0, 0, 0),
+                       major_width: int = 2,
+                       close_grid: bool = False,
+                       label_sprites: Optional[np.ndarray] = None,
+                       palette: Optional[IndexedPalette] = None,
+                       max_band_bytes: int = DEFAULT_BAND_BYTES) -> Iterator[np.ndarray]:
+    """
+    按水平行带逐块渲染（参数同 rasterize）
+
+    所有行带依次拼接后与 rasterize(...) 的整图结果逐像素一致。
+
+    Args:
+        palette: 不为 None 时输出调色板索引 (rows, W, 1)，否则输出 RGB
+        max_band_bytes: 单个行带的像素字节上限
+
+    Yields:
+        行带像素数组
+    """
+    if bounds is None:
+        bounds = (0, 0, pattern.grid.width, pattern.grid.height)
+    min_x, min_y, max_x, max_y = bounds
+
+    channels = 1 if palette is not None else 3
+    step = band_cells((max_x - min_x) * cell_size, cell_size, major_interval,
+                      max_band_bytes, channels)
+    grid_args = (show_grid, grid_color, major_interval, major_color, major_width)
+
+    for y0 in range(min_y, max_y, step):
+        y1 = min(max_y, y0 + step)
+        last = y1 == max_y
+        band_bounds = (min_x, y0, max_x, y1)
+        # 收边列每个行带都需要；收边行只属于最后一个行带
+        if palette is not None:
+            band, _ = rasterize_indexed(pattern, cell_size, band_bounds, *grid_args,
+                                        close_grid, label_sprites, palette)
+        else:
+            band = rasterize(pattern, cell_size, band_bounds, *grid_args,
+                             close_grid, label_sprites)
+        if close_grid and not last:
+            band = band[:-1]
+        yield band
+
+
+def stream_pattern_png(pattern, file: Union[str, BinaryIO], cell_size: int,
+                       bounds: Optional[Tuple[int, int, int, int]] = None,
+                       show_grid: bool = False,
+                       grid_color: Tuple[int, int, int] = (200, 200, 200),
+                       major_interval: int = 0,
+                       major_color: Tuple[int, int, int] = (0, 0, 0),
+                       major_width: int = 2,
+                       close_grid: bool = False,
+                       label_sprites: Optional[np.ndarray] = None,
+                       indexed: bool = True,
+                       compress_level: int = 1,
+                       max_band_bytes: int = DEFAULT_BAND_BYTES) -> Tuple[int, int]:
+    """
+    流式渲染图案并写入 PNG（参数同 rasterize）
+
+    Args:
+        pattern: BeadPatternV2 或 BeadPattern 兼容层对象
+        file: 输出路径或二进制文件对象
+        indexed: 颜色不超过 256 种时写调色板 PNG
+        compress_level: zlib 压缩级别
+        max_band_bytes: 单个行带的像素字节上限
+
+    Returns:
+        (宽, 高) 像素
+    """
+    pattern = pattern._v2 if hasattr(pattern, '_v2') else pattern
+    if bounds is None:
+        bounds = (0, 0, pattern.grid.width, pattern.grid.height)
+    min_x, min_y, max_x, max_y = bounds
+    extra = 1 if close_grid else 0
+    width = (max_x - min_x) * cell_size + extra
+    height = (max_y - min_y) * cell_size + extra
+
+    palette = None
+    if indexed:
+        palette = IndexedPalette.for_grid(pattern.palette.rgb_lut, show_grid, grid_color,
+                                          major_interval, major_color, major_width,
+                                          label_sprites)
+
+    mode = 'P' if palette is not None else 'RGB'
+    with PNGStreamWriter(file, width, height, mode,
+                         palette.colors if palette is not None else None,
+                         compress_level) as writer:
+        for band in iter_pattern_bands(pattern, cell_size, bounds, show_grid, grid_color,
+                                       major_interval, major_color, major_width, close_grid,
+                                       label_sprites, palette, max_band_bytes):
+            writer.write_rows(band)
+    return width, height
+
+
+def stream_blueprint_png(pattern, file: Union[str, BinaryIO], config,
+                         compress_level: int = 1,
+                         max_band_bytes: int = DEFAULT_BAND_BYTES) -> Tuple[int, int]:
+    """
+    流式导出工程蓝图 PNG
+
+    与 composite_blueprint(pattern, config) 的结果逐像素一致，但不分配整幅画布：
+    上边距和左右留白按行带填充背景色，主网格分带渲染，信息区单独渲染后写入。
+
+    Args:
+        pattern: 拼豆图案对象
+        file: 输出路径或二进制文件对象
+        config: BlueprintConfig
+        compress_level: zlib 压缩级别
+        max_band_bytes: 单个行带的像素字节上限
+
+    Returns:
+        (宽, 高) 像素
+    """
+    from .blueprint.compositor import prepare_blueprint, render_blueprint_info
+
+    parts = prepare_blueprint(pattern, config)
+    layout = parts.layout
+    background = np.array(config.background_color, dtype=np.uint8)
+
+    with PNGStreamWriter(file, layout.canvas_width, layout.canvas_height, 'RGB',
+                         compress_level=compress_level) as writer:
+        writer.write_rows(np.broadcast_to(background, (layout.grid_y, layout.canvas_width, 3)))
+
+        x0, x1 = layout.grid_x, layout.grid_x + layout.grid_width
+        for band in iter_pattern_bands(parts.pattern_v2, max_band_bytes=max_band_bytes,
+                                       **parts.grid_options):
+            rows = np.empty((band.shape[0], layout.canvas_width, 3), dtype=np.uint8)
+            rows[:, :x0] = background
+            rows[:, x1:] = background
+            rows[:, x0:x1] = band
+            writer.write_rows(rows)
+
+        writer.write_rows(np.asarray(render_blueprint_info(parts, config)))
+    return layout.canvas_width, layout.canvas_height
@@ -30,14 +30,17 @@
 
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
-from typing import Dict, Tuple, Optional, List
+from typing import BinaryIO, Dict, Tuple, Optional, List, Union
 from ..core.pattern import BeadPatternV2
+from ..io.text_output import open_text_output
 
 # 导入新的 blueprint 模块
 from .blueprint import (
     BlueprintConfig,
     PaperSize,
     generate_engineering_blueprint,
+    save_engineering_blueprint,
+    save_paginated_blueprint,
 )
 
 
@@ -156,11 +159,90 @@ def generate_technical_sheet(
     )
 
 
+def save_technical_sheet(
+    pattern,
+    file,
+    cell_size: int = 0,
+    show_grid: bool = True,
+    show_labels: bool = True,
+    config: Optional[TechnicalPanelConfig] = None,
+    exclude_background: bool = True,
+    paper_size: str = "A4",
+    dpi: int = 300,
+    compress_level: int = 1
+) -> Tuple[int, int]:
+    """
+    生成工程图纸并流式写入 PNG（参数同 generate_technical_sheet）
+
+    主网格按行带渲染，不在内存中合成整幅画布。
+
+    Args:
+        file: 输出路径或二进制文件对象
+        compress_level: zlib 压缩级别
+
+    Returns:
+        (宽, 高) 像素
+    """
+    blueprint_config = config.to_blueprint_config() if config is not None else BlueprintConfig()
+    return save_engineering_blueprint(
+        pattern,
+        file,
+        cell_size=cell_size,
+        show_grid=show_grid,
+        show_labels=show_labels,
+        config=blueprint_config,
+        exclude_background=exclude_background,
+        paper_size=paper_size,
+        dpi=dpi,
+        compress_level=compress_level
+    )
+
+
+def save_technical_sheet_pdf(
+    pattern,
+    file,
+    cell_size: int = 0,
+    show_grid: bool = True,
+    show_labels: bool = True,
+    config: Optional[TechnicalPanelConfig] = None,
+    exclude_background: bool = True,
+    paper_size: str = "A4",
+    dpi: int = 300,
+    max_workers: int = 4
+) -> int:
+    """
+    生成分页工程图纸 PDF（参数同 generate_technical_sheet）
+
+    封面为缩略图 + Title Block + BOM，之后每页一块带坐标标尺的主网格，
+    各页并发渲染、依次写入。
+
+    Args:
+        file: 输出路径或二进制文件对象
+        max_workers: 并行渲染线程数
+
+    Returns:
+        页数（含封面）
+    """
+    blueprint_config = config.to_blueprint_config() if config is not None else BlueprintConfig()
+    return save_paginated_blueprint(
+        pattern,
+        file,
+        cell_size=cell_size,
+        show_grid=show_grid,
+        show_labels=show_labels,
+        config=blueprint_config,
+        exclude_background=exclude_background,
+        paper_size=paper_size,
+        dpi=dpi,
+        max_workers=max_workers
+    )
+
+
 # ========== 以下保留原有的导出统计功能 ==========
 
 def export_statistics(
     pattern,
-    file_path: str,
+    file_path: Union[str, BinaryIO],
     format: str = "json",
     exclude_background: bool = True
 ) -> None:
@@ -169,7 +251,7 @@ def export_statistics(
 
     Args:
         pattern: 拼豆图案对象（BeadPatternV2或BeadPattern兼容层）
-        file_path: 导出文件路径
+        file_path: 导出文件路径或二进制文件对象
         format: 导出格式（'json' 或 'csv'）
         exclude_background: 是否排除背景色
     """
@@ -219,13 +301,13 @@ def export_statistics(
             'colors': color_list
         }
 
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with open_text_output(file_path, encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
     elif format == 'csv':
         import csv
 
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        with open_text_output(file_path, encoding='utf-8-sig', newline='') as f:
             writer = csv.writer(f)
             writer.writerow([
                 '颜色ID', '色号', '中文名称', '英文名称', '品牌', '系列',
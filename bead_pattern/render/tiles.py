@@ -0,0 +1,128 @@
+"""
+瓦片金字塔（Deep Zoom）
+
+按需渲染 256×256 瓦片，直接从色号网格（索引平面）取样：
+- 最高层级每个拼豆 MAX_CELL_SIZE 像素，每降一级缩小一半
+- 单元格不足 1 像素时按步长抽样色号网格，每个像素显示一个拼豆的颜色
+- 单元格足够大时依次显示网格线、色号标签
+- 瓦片按拼豆边界对齐（TILE_SIZE 是各级单元格大小的整数倍），
+  各瓦片独立渲染，拼接后与整图渲染一致
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Tuple
+import numpy as np
+from PIL import Image
+from ..core.pattern import BeadPatternV2
+from ..core.grid import BeadGrid
+from .labels import build_label_sprites
+from .raster import render_pattern
+
+
+TILE_SIZE = 256
+MAX_CELL_SIZE = 32
+
+# 单元格大小达到阈值时显示网格线 / 色号
+GRID_MIN_CELL_SIZE = 8
+LABEL_MIN_CELL_SIZE = 16
+
+
+@dataclass
+class TilePyramid:
+    """
+    瓦片金字塔参数
+
+    层级 z 的单元格大小为 MAX_CELL_SIZE / 2**(max_zoom - z)；
+    层级 0 时整幅图案不超过一个瓦片。
+    """
+
+    width: int        # 图案宽度（拼豆）
+    height: int       # 图案高度（拼豆）
+    max_zoom: int
+    tile_size: int = TILE_SIZE
+    max_cell_size: int = MAX_CELL_SIZE
+
+    @classmethod
+    def for_pattern(cls, pattern) -> 'TilePyramid':
+        """根据图案尺寸计算层级数（BeadPatternV2 或 BeadPattern 兼容层对象）"""
+        pattern = pattern._v2 if hasattr(pattern, '_v2') else pattern
+        width, height = pattern.grid.width, pattern.grid.height
+        longest = max(width, height, 1) * MAX_CELL_SIZE
+        max_zoom = max(0, math.ceil(math.log2(longest / TILE_SIZE)))
+        return cls(width, height, max_zoom)
+
+    def cell_size(self, z: int) -> float:
+        """层级 z 每个拼豆的像素大小（可小于 1）"""
+        return self.max_cell_size / (1 << (self.max_zoom - z))
+
+    def level_size(self, z: int) -> Tuple[int, int]:
+        """层级 z 的整图像素尺寸"""
+        cell_size = self.cell_size(z)
+        return math.ceil(self.width * cell_size), math.ceil(self.height * cell_size)
+
+    def tile_count(self, z: int) -> Tuple[int, int]:
+        """层级 z 的瓦片列数、行数"""
+        level_w, level_h = self.level_size(z)
+        return math.ceil(level_w / self.tile_size), math.ceil(level_h / self.tile_size)
+
+    def to_dict(self) -> Dict:
+        """供前端查看器使用的描述"""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'tile_size': self.tile_size,
+            'max_zoom': self.max_zoom,
+            'max_cell_size': self.max_cell_size,
+            'grid_min_cell_size': GRID_MIN_CELL_SIZE,
+            'label_min_cell_size': LABEL_MIN_CELL_SIZE,
+        }
+
+
+def render_tile(pattern, z: int, x: int, y: int, show_labels: bool = True) -> Image.Image:
+    """
+    渲染单个瓦片
+
+    Args:
+        pattern: BeadPatternV2 或 BeadPattern 兼容层对象
+        z: 层级（0 ~ max_zoom）
+        x: 瓦片列
+        y: 瓦片行
+        show_labels: 单元格足够大时是否显示色号
+
+    Returns:
+        P 模式（颜色过多时为 RGB）瓦片图像；图案右侧/底部边缘的瓦片可能小于 TILE_SIZE
+
+    Raises:
+        ValueError: 层级或瓦片坐标超出范围
+    """
+    pattern = pattern._v2 if hasattr(pattern, '_v2') else pattern
+    pyramid = TilePyramid.for_pattern(pattern)
+    if not 0 <= z <= pyramid.max_zoom:
+        raise ValueError(f"层级超出范围: {z}")
+    cols, rows = pyramid.tile_count(z)
+    if not (0 <= x < cols and 0 <= y < rows):
+        raise ValueError(f"瓦片超出范围: {z}/{x}/{y}")
+
+    cell_size = pyramid.cell_size(z)
+    if cell_size >= 1:
+        cell_size = int(cell_size)
+        cells = TILE_SIZE // cell_size
+        bounds = (x * cells, y * cells,
+                  min(pyramid.width, (x + 1) * cells), min(pyramid.height, (y + 1) * cells))
+        sprites = None
+        if show_labels and cell_size >= LABEL_MIN_CELL_SIZE:
+            sprites = build_label_sprites(pattern, cell_size, bounds=bounds)
+        return render_pattern(pattern, cell_size, bounds=bounds,
+                              show_grid=cell_size >= GRID_MIN_CELL_SIZE,
+                              label_sprites=sprites, indexed=True)
+
+    # 单元格不足 1 像素：每 step 个拼豆取一个，每像素一个拼豆
+    step = int(round(1 / cell_size))
+    span = TILE_SIZE * step
+    # 抽样结果复制为独立数组，不与存储中的图案共享（否则其网格会被标为只读）
+    rows = pattern.grid.rows(y * span, (y + 1) * span)
+    sampled = np.array(rows[::step, x * span:(x + 1) * span:step], dtype=np.int32)
+    sub_pattern = BeadPatternV2.from_grid(BeadGrid.from_array(sampled), pattern.palette,
+                                          pattern.bead_size_mm)
+    return render_pattern(sub_pattern, 1, indexed=True)
@@ -0,0 +1,58 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.bead_sim import (
+    DEFAULT_BOARD_COLOR, bead_geometry, build_bead_sprites, render_bead_preview,
+    stream_bead_preview_png,
+)
+
+
+def _make_pattern(width, height):
+    pattern = BeadPatternV2(width, height, 5.0)
+    pattern.palette.upsert_from_dict({'id': 1, 'code': 'A', 'rgb': [200, 30, 30]})
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'B', 'rgb': [30, 60, 200]})
+    grid_ids = np.tile(np.array([1, 2], dtype=np.int32), (height, (width + 1) // 2))[:, :width]
+    grid_ids[0, 0] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_bead_preview_tiles_color_sprites():
+    pattern = _make_pattern(6, 4)
+    cell_size = 12
+    for melted in (False, True):
+        img = np.asarray(render_bead_preview(pattern, cell_size, melted))
+        sprites = build_bead_sprites(pattern.palette.rgb_lut, cell_size, melted)
+        compact = pattern.palette.to_compact_indices(pattern.grid.grid_ids)
+
+        assert img.shape == (4 * cell_size, 6 * cell_size, 3)
+        for y in range(4):
+            for x in range(6):
+                cell = img[y * cell_size:(y + 1) * cell_size, x * cell_size:(x + 1) * cell_size]
+                assert np.array_equal(cell, sprites[compact[y, x]])
+
+        # empty cells show the bare board; bead centers show the board through the hole
+        assert np.all(img[:cell_size, :cell_size] == DEFAULT_BOARD_COLOR)
+        red = sprites[1].astype(int)
+        assert red[:, :, 0].max() > red[:, :, 2].max()
+        bead = bead_geometry(cell_size, melted)[0]
+        c = cell_size // 2
+        assert bead[c, c] < 0.5
+        # the (grey) board dominates the center pixel, the bead body is red
+        assert red[c, c, 0] - red[c, c, 2] < (red[c, c + 3, 0] - red[c, c + 3, 2]) / 3
+
+
+def test_streamed_bead_preview_matches_full_render():
+    pattern = _make_pattern(7, 9)
+    cell_size = 8
+    out = io.BytesIO()
+    # one row of cells per band
+    size = stream_bead_preview_png(pattern, out, cell_size, max_band_bytes=7 * cell_size * cell_size * 3)
+
+    assert size == (7 * cell_size, 9 * cell_size)
+    streamed = np.asarray(Image.open(io.BytesIO(out.getvalue())).convert('RGB'))
+    assert np.array_equal(streamed, np.asarray(render_bead_preview(pattern, cell_size)))
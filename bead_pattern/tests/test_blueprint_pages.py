@@ -0,0 +1,100 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.blueprint import (
+    BlueprintConfig, composite_blueprint, iter_blueprint_pages, plan_blueprint_pages,
+)
+from bead_pattern.render.blueprint.compositor import (
+    PanelCache, get_panel_cache, prepare_blueprint, render_cached_bom_table,
+)
+from bead_pattern.render.blueprint.pages import write_blueprint_pdf
+from bead_pattern.render.raster import render_pattern
+
+
+def _make_pattern(width, height, num_colors=6):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({'id': i + 1, 'code': f'C{i}',
+                                          'rgb': [(40 * i) % 256, (90 * i) % 256, 255 - 30 * i]})
+    rng = np.random.default_rng(3)
+    grid_ids = rng.integers(1, num_colors + 1, (height, width)).astype(np.int32)
+    grid_ids[:2, :] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_pages_cover_subject_once_and_match_full_grid():
+    pattern = _make_pattern(90, 70)
+    config = BlueprintConfig(dpi=100)
+    parts = prepare_blueprint(pattern, config)
+    plan = plan_blueprint_pages(parts, config)
+
+    assert plan.columns * plan.rows == len(plan.pages) > 1
+    assert plan.cells_x % config.major_grid_interval == 0
+
+    covered = np.zeros((parts.pattern_height, parts.pattern_width), dtype=int)
+    for page in plan.pages:
+        min_x, min_y, max_x, max_y = page.bounds
+        covered[min_y:max_y, min_x:max_x] += 1
+    assert np.all(covered == 1)
+
+    full = np.asarray(render_pattern(parts.pattern_v2, **parts.grid_options))
+    images = list(iter_blueprint_pages(pattern, config, max_workers=3))
+    assert len(images) == plan.page_count
+    assert all(image.size == config.get_paper_size_px() for image in images)
+
+    cell = plan.cell_size
+    grid_x = plan.margin + plan.ruler_size
+    grid_y = plan.margin + plan.header_height + plan.ruler_size
+    for page, image in zip(plan.pages, images[1:]):
+        min_x, min_y, max_x, max_y = page.bounds
+        w, h = (max_x - min_x) * cell, (max_y - min_y) * cell
+        got = np.asarray(image)[grid_y:grid_y + h, grid_x:grid_x + w]
+        expected = full[min_y * cell:min_y * cell + h, min_x * cell:min_x * cell + w]
+        assert np.array_equal(got, expected)
+
+    out = io.BytesIO()
+    assert write_blueprint_pdf(iter(images[:2]), out, config) == 2
+    assert out.getvalue().startswith(b'%PDF')
+
+
+def test_info_panels_are_reused_across_grid_options():
+    pattern = _make_pattern(20, 16)
+    cache = get_panel_cache()
+    cache.clear()
+    start = cache.stats()['misses']
+
+    first = composite_blueprint(pattern, BlueprintConfig(dpi=100))
+    second = composite_blueprint(pattern, BlueprintConfig(dpi=100, show_grid=False, show_major_grid=False))
+
+    # title block and BOM rendered once
+    assert cache.stats()['misses'] - start == 2
+    # the info area below the grid is identical; only the grid differs
+    top = prepare_blueprint(pattern, BlueprintConfig(dpi=100)).info_top
+    assert np.array_equal(np.asarray(first)[top:], np.asarray(second)[top:])
+    assert not np.array_equal(np.asarray(first)[:top], np.asarray(second)[:top])
+
+    composite_blueprint(pattern, BlueprintConfig(dpi=100, bom_font_size_pt=12))
+    assert cache.stats()['misses'] - start == 4
+
+
+def test_panel_cache_keys_on_content_and_stays_bounded():
+    config = BlueprintConfig(dpi=100)
+    cache = get_panel_cache()
+    cache.clear()
+    start = cache.stats()['misses']
+
+    # a separate pattern object with the same contents reuses the panels
+    first = render_cached_bom_table(prepare_blueprint(_make_pattern(20, 16), config), config)
+    second = render_cached_bom_table(prepare_blueprint(_make_pattern(20, 16), config), config)
+    assert second is first
+    assert cache.stats()['misses'] - start == 1
+
+    small = PanelCache(max_entries=2)
+    for key in range(3):
+        small.get(key, lambda: Image.new('RGB', (1, 1)))
+    assert small.stats()['panels'] == 2 and small.stats()['evictions'] == 1
@@ -0,0 +1,47 @@
+import base64
+
+import numpy as np
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.io import from_compact_bytes, from_compact_payload, to_compact_bytes, to_compact_payload
+
+
+def _make_pattern(width, height, num_colors):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({'id': 10 + i, 'code': f'H{i:02d}',
+                                          'rgb': [i % 256, (7 * i) % 256, (13 * i) % 256]})
+    rng = np.random.default_rng(11)
+    grid_ids = rng.integers(10, 10 + num_colors, (height, width)).astype(np.int32)
+    grid_ids[0, :3] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_compact_payload_round_trip():
+    for num_colors, dtype in ((5, 'uint8'), (300, 'uint16')):
+        pattern = _make_pattern(17, 9, num_colors)
+        payload = to_compact_payload(pattern)
+
+        assert payload['dtype'] == dtype
+        assert len(base64.b64decode(payload['indices'])) == 17 * 9 * np.dtype(dtype).itemsize
+        assert payload['palette'][0]['rgb'] == [255, 255, 255]
+
+        restored = from_compact_payload(payload)
+        assert np.array_equal(restored.grid.grid_ids, pattern.grid.grid_ids)
+        assert restored.content_hash == pattern.content_hash
+
+
+def test_compact_bytes_round_trip_keeps_full_palette():
+    for num_colors in (5, 300):
+        pattern = _make_pattern(17, 9, num_colors)
+        pattern.palette.upsert_from_dict({'id': 999, 'code': 'Z1', 'name_zh': '红', 'name_en': 'Red',
+                                          'rgb': [200, 0, 0], 'brand': 'COCO', 'series': '291'})
+        data = to_compact_bytes(pattern)
+
+        restored = from_compact_bytes(data)
+        assert np.array_equal(restored.grid.grid_ids, pattern.grid.grid_ids)
+        assert restored.palette.get_color(999) == pattern.palette.get_color(999)
+        assert restored.bead_size_mm == pattern.bead_size_mm
+        assert restored.content_hash == pattern.content_hash
@@ -0,0 +1,44 @@
+import numpy as np
+
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.core.grid import BeadGrid, BAND_ROWS
+
+
+def _make_pattern(width, height, num_colors=4, seed=0):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({
+            'id': 10 + i,
+            'code': f'C{i}',
+            'rgb': [(40 * i) % 256, 60, (200 + 40 * i) % 256]
+        })
+    rng = np.random.default_rng(seed)
+    pattern.grid.grid_ids = rng.integers(10, 10 + num_colors, (height, width)).astype(np.int32)
+    return pattern
+
+
+def test_equal_contents_equal_hash():
+    a = _make_pattern(20, 150)
+    b = _make_pattern(20, 150)
+
+    assert a.content_hash == b.content_hash
+    assert a.rotate(90).rotate(270).content_hash == a.content_hash
+    assert a.rotate(90).content_hash != a.content_hash
+    assert BeadPatternV2.from_grid(a.grid, a.palette, 2.6).content_hash != a.content_hash
+
+
+def test_hash_tracks_grid_and_palette_changes():
+    pattern = _make_pattern(20, 3 * BAND_ROWS)
+    original = pattern.content_hash
+
+    pattern.grid.set_id(3, BAND_ROWS + 1, 11 if pattern.grid.get_id(3, BAND_ROWS + 1) != 11 else 12)
+    changed = pattern.content_hash
+    assert changed != original
+
+    # incremental result matches a fresh full hash
+    fresh = BeadPatternV2.from_grid(BeadGrid.from_array(pattern.grid.grid_ids.copy()),
+                                    pattern.palette, pattern.bead_size_mm)
+    assert fresh.content_hash == changed
+
+    pattern.palette.upsert_from_dict({'id': 10, 'code': 'C0', 'rgb': [1, 2, 3]})
+    assert pattern.content_hash != changed
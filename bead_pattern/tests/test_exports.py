@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from bead_pattern import BeadPattern
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.cache import RenderCache
+from core.exports import (
+    BUNDLE_ARTIFACTS, bundle_artifact, export_png_build, json_build,
+    print_build, statistics_build, technical_sheet_build
+)
+
+
+def _make_pattern(seed=0, size=12):
+    pattern = BeadPatternV2(size, size, 2.6)
+    for i in range(4):
+        pattern.palette.upsert_from_dict({'id': i + 1, 'code': f'A{i + 1:02d}',
+                                          'rgb': [60 * i, 255 - 60 * i, 30 * i]})
+    rng = np.random.default_rng(seed)
+    pattern.grid.grid_ids = rng.integers(1, 5, (size, size)).astype(np.int32)
+    return BeadPattern._from_v2(pattern)
+
+
+def test_bundle_artifacts_share_keys_with_single_exports():
+    pattern = _make_pattern()
+    expected = {
+        'png': export_png_build(pattern, show_labels=False),
+        'labeled_png': export_png_build(pattern, show_labels=True),
+        'json': json_build(pattern),
+        'statistics': statistics_build(pattern, 'csv', True),
+        'technical_sheet': technical_sheet_build(pattern),
+        'pdf': print_build(pattern),
+    }
+
+    for name in BUNDLE_ARTIFACTS:
+        arcname, key, suffix, _ = bundle_artifact(pattern, name, 'pattern_x')
+        assert arcname.startswith('pattern_x')
+        assert (key, suffix) == expected[name][:2]
+        assert bundle_artifact(_make_pattern(), name)[1] == key
+        assert bundle_artifact(_make_pattern(seed=1), name)[1] != key
+
+    with pytest.raises(ValueError):
+        bundle_artifact(pattern, 'svg')
+
+
+def test_keys_depend_only_on_output_parameters():
+    pattern = _make_pattern()
+
+    assert print_build(pattern, dpi=150)[0] == print_build(pattern)[0]
+    assert print_build(pattern, dpi=150, vector=False)[0] != print_build(pattern, vector=False)[0]
+    assert print_build(pattern, overlap_cells=4)[0] == print_build(pattern)[0]
+    assert print_build(pattern, tiled=True, overlap_cells=4)[0] != print_build(pattern, tiled=True)[0]
+
+    assert technical_sheet_build(pattern, paper_size='A3')[0] == technical_sheet_build(pattern)[0]
+    assert technical_sheet_build(pattern, cell_size=0, show_labels=True)[0] != technical_sheet_build(pattern)[0]
+    assert (technical_sheet_build(pattern, paginate=True, cell_size=20)[0]
+            == technical_sheet_build(pattern, paginate=True)[0])
+    assert (technical_sheet_build(pattern, paginate=True, paper_size='A3')[0]
+            != technical_sheet_build(pattern, paginate=True)[0])
+
+
+@pytest.mark.parametrize("name, magic", [
+    ('png', b'\x89PNG'),
+    ('statistics', None),
+    ('technical_sheet', b'\x89PNG'),
+    ('pdf', b'%PDF'),
+])
+def test_bundle_artifacts_build(tmp_path, name, magic):
+    cache = RenderCache(str(tmp_path))
+    _, key, suffix, build = bundle_artifact(_make_pattern(), name)
+
+    data = cache.get_bytes(key, suffix, build)
+
+    assert data
+    if magic is not None:
+        assert data.startswith(magic)
@@ -0,0 +1,37 @@
+from PIL import Image
+
+from bead_pattern.render.fonts import FontRegistry, SpriteAtlas
+from bead_pattern.render.labels import LabelCache
+
+
+def test_registry_discovers_once_and_caches_fonts():
+    registry = FontRegistry({False: ['/nonexistent/font.ttf'], True: []})
+
+    assert registry.discover() == {False: None, True: None}
+    assert registry.get_font(12) is registry.get_font(12)
+    assert registry.get_font(12, bold=True) is registry.get_font(12)
+
+
+def test_atlas_is_byte_bounded_lru():
+    atlas = SpriteAtlas(max_bytes=3 * 10 * 10 * 4)
+    build = lambda: Image.new('RGBA', (10, 10))
+
+    for key in 'abc':
+        atlas.get(key, build)
+    atlas.get('a', build)
+    atlas.get('d', build)
+
+    stats = atlas.stats()
+    assert stats['sprites'] == 3 and stats['bytes'] == 1200
+    assert stats['evictions'] == 1 and stats['hits'] == 1
+    atlas.get('b', build)
+    assert atlas.stats()['misses'] == 5
+
+
+def test_label_caches_share_sprites():
+    atlas = SpriteAtlas()
+    first = LabelCache(atlas).get_label_image('A1', 20, 12, (0, 0, 0))
+    second = LabelCache(atlas).get_label_image('A1', 20, 12, (0, 0, 0))
+
+    assert first is second
+    assert atlas.stats()['misses'] == 1
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from core.jobs import (
+    JobManager, JobStage, JobQueueFull,
+    SUCCEEDED, FAILED, CANCELLED,
+)
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager({"cpu": 1, "remote": 1}, max_pending=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_stages_run_in_order_on_their_pools(manager):
+    seen = []
+
+    def first(ctx):
+        seen.append(threading.current_thread().name)
+        ctx.progress(0.5, "half")
+        return 3
+
+    def second(ctx):
+        seen.append(threading.current_thread().name)
+        return ctx.results["first"] * 2
+
+    job = manager.submit("double", [JobStage("first", first, pool="remote", weight=3),
+                                    JobStage("second", second, pool="cpu", weight=1)])
+    job.done.result(timeout=5)
+
+    assert job.status == SUCCEEDED and job.result == 6
+    assert seen[0].startswith("job_remote") and seen[1].startswith("job_cpu")
+    snapshot = job.snapshot()
+    assert snapshot["percent"] == 100.0
+    assert [stage["status"] for stage in snapshot["stages"]] == ["done", "done"]
+    assert all(stage["run_seconds"] is not None for stage in snapshot["stages"])
+
+
+def test_percent_uses_stage_weights(manager):
+    gate = threading.Event()
+
+    def waiting(ctx):
+        ctx.progress(0.5)
+        gate.wait(5)
+
+    job = manager.submit("weighted", [JobStage("a", lambda ctx: None, pool="cpu", weight=1),
+                                      JobStage("b", waiting, pool="cpu", weight=2),
+                                      JobStage("c", lambda ctx: None, pool="cpu", weight=1)])
+    version = 0
+    while job.snapshot()["stage"] != "b" or job.stage_fraction < 0.5:
+        version = job.wait(version, timeout=5)
+    assert job.percent == 50.0
+    gate.set()
+    job.done.result(timeout=5)
+
+
+def test_cancel_queued_and_running_jobs(manager):
+    gate = threading.Event()
+
+    def blocking(ctx):
+        gate.wait(5)
+        ctx.check_cancelled()
+
+    running = manager.submit("slow", [JobStage("s", blocking, pool="cpu")])
+    queued = manager.submit("slow", [JobStage("s", blocking, pool="cpu")])
+    manager.cancel(queued.job_id)
+    assert queued.done.result(timeout=5).status == CANCELLED
+
+    manager.cancel(running.job_id)
+    gate.set()
+    assert running.done.result(timeout=5).status == CANCELLED
+    assert running.result is None
+
+
+def test_failures_and_queue_limit(manager):
+    gate = threading.Event()
+    manager.submit("slow", [JobStage("s", lambda ctx: gate.wait(5), pool="cpu")])
+    failing = manager.submit("broken", [JobStage("s", lambda ctx: 1 / 0, pool="remote")])
+    failing.done.result(timeout=5)
+    assert failing.status == FAILED and "division" in failing.error
+    assert isinstance(failing.exception, ZeroDivisionError)
+
+    manager.submit("slow", [JobStage("s", lambda ctx: gate.wait(5), pool="cpu")])
+    with pytest.raises(JobQueueFull):
+        manager.submit("slow", [JobStage("s", lambda ctx: None, pool="cpu")])
+    with pytest.raises(ValueError):
+        manager.submit("nowhere", [JobStage("s", lambda ctx: None, pool="gpu")])
+    gate.set()
+
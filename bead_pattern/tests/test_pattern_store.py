@@ -0,0 +1,98 @@
+import os
+import pickle
+
+import numpy as np
+
+from bead_pattern import BeadPattern
+from bead_pattern.core.pattern import BeadPatternV2
+from core.pattern_store import PatternStore, estimate_entry_bytes
+
+
+def _make_pattern(seed, size=40):
+    pattern = BeadPatternV2(size, size, 2.6)
+    for i in range(6):
+        pattern.palette.upsert_from_dict({'id': i + 1, 'code': f'A{i + 1:02d}', 'name_zh': '色',
+                                          'rgb': [40 * i, 255 - 40 * i, 7 * i]})
+    rng = np.random.default_rng(seed)
+    pattern.grid.grid_ids = rng.integers(1, 7, (size, size)).astype(np.int32)
+    return BeadPattern._from_v2(pattern)
+
+
+def test_evicted_entries_spill_to_disk_and_reload(tmp_path):
+    patterns = [_make_pattern(seed) for seed in range(3)]
+    entry_bytes = estimate_entry_bytes({'pattern': patterns[0], 'file_id': 'f0'})
+    store = PatternStore(str(tmp_path), max_memory_bytes=int(entry_bytes * 2.5))
+
+    for i, pattern in enumerate(patterns):
+        store[f'p{i}'] = {'pattern': pattern, 'file_id': f'f{i}'}
+
+    stats = store.stats()
+    assert (stats['memory_entries'], stats['disk_entries'], stats['spills']) == (2, 1, 1)
+    assert len(store) == 3 and 'p0' in store
+
+    reloaded = store['p0']
+    assert isinstance(reloaded['pattern'], BeadPattern)
+    assert reloaded['file_id'] == 'f0'
+    assert reloaded['pattern'].content_hash == patterns[0].content_hash
+    # reloading p0 pushed the least recently used entry (p1) out
+    locations = {item['key']: item['location'] for item in store.entries()}
+    assert locations == {'p0': 'memory', 'p1': 'disk', 'p2': 'memory'}
+
+    # spilled entries survive a restart
+    reopened = PatternStore(str(tmp_path))
+    assert reopened['p1']['pattern'].content_hash == patterns[1].content_hash
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('core.pattern_store.time.time', lambda: clock[0])
+    store = PatternStore(str(tmp_path), max_memory_bytes=1, ttl_seconds=60)
+    store['a'] = {'pattern': _make_pattern(0, size=8)}
+    store['b'] = {'value': 1}
+
+    clock[0] += 45
+    assert store.get('a') is not None
+    clock[0] += 45
+    assert 'a' in store and 'b' not in store
+    assert store.stats()['expirations'] == 1
+    assert store.stats()['disk_entries'] == 0
+
+
+def test_spilled_fields_round_trip_without_pickle(tmp_path):
+    directory = tmp_path / 'store'
+    store = PatternStore(str(directory), max_memory_bytes=1)
+    fields = {
+        'params': {'size': (40, 30), 'ratio': np.float64(0.5), 'count': np.int64(3)},
+        'statistics': {'color_counts': {1: 10, 2: 20}, '__type__': 'x'},
+        'urls': ['/a', '/b'],
+    }
+    store['a'] = {'pattern': _make_pattern(0, size=8), **fields}
+    store['b'] = {'value': None}
+
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    (path,) = [p for p in directory.iterdir() if p.suffix == '.entry']
+    assert path.read_bytes().startswith(b'BPS1')
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+    entry = PatternStore(str(directory))['a']
+    assert entry['params'] == {'size': (40, 30), 'ratio': 0.5, 'count': 3}
+    assert entry['statistics'] == fields['statistics'] and entry['urls'] == fields['urls']
+    assert entry['pattern'].content_hash == _make_pattern(0, size=8).content_hash
+
+
+def test_planted_pickle_is_discarded_not_loaded(tmp_path):
+    marker = tmp_path / 'executed'
+
+    class Payload:
+        def __reduce__(self):
+            return (open, (str(marker), 'w'))
+
+    directory = tmp_path / 'store'
+    directory.mkdir()
+    (directory / 'planted.entry').write_bytes(pickle.dumps({'key': 'x', 'entry': Payload()}))
+
+    store = PatternStore(str(directory))
+
+    assert len(store) == 0 and 'x' not in store
+    assert not marker.exists()
+    assert not (directory / 'planted.entry').exists()
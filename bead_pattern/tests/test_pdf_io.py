@@ -0,0 +1,64 @@
+import io
+import re
+
+import numpy as np
+from reportlab.pdfgen import canvas
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.io.pdf_io import color_runs, draw_pattern_vector
+
+
+def _make_pattern(width, height):
+    pattern = BeadPatternV2(width, height, 5.0)
+    pattern.palette.upsert_from_dict({'id': 1, 'code': 'A01', 'rgb': [255, 0, 0]})
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'B02', 'rgb': [0, 0, 255]})
+    grid_ids = np.ones((height, width), dtype=np.int32)
+    grid_ids[:, width // 2:] = 2
+    grid_ids[0, 0] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_color_runs_cover_every_cell_once():
+    compact = np.random.default_rng(5).integers(0, 3, (7, 9))
+    rows, starts, lengths, indices = color_runs(compact)
+
+    rebuilt = np.full(compact.shape, -1)
+    for row, start, length, idx in zip(rows, starts, lengths, indices):
+        assert np.all(rebuilt[row, start:start + length] == -1)
+        rebuilt[row, start:start + length] = idx
+    assert np.array_equal(rebuilt, compact)
+
+
+def test_vector_pdf_has_no_images_and_embeds_font():
+    pattern = _make_pattern(10, 6)
+    out = io.BytesIO()
+    c = canvas.Canvas(out, pagesize=(200, 200))
+    c.setPageCompression(0)
+    draw_pattern_vector(c, pattern, 10, 190, 12)
+    c.save()
+    data = out.getvalue()
+
+    assert data.startswith(b'%PDF')
+    assert b'/Subtype /Image' not in data
+    # same-color cells in a row merge into one rect: two runs per row
+    assert len(re.findall(rb' re\b', data)) == 6 * 2
+    # one label per non-empty cell, drawn twice (stroke, then fill)
+    assert len(re.findall(rb' Tj\b', data)) == (10 * 6 - 1) * 2
+    assert b'/FontFile2' in data
+
+
+def test_vector_pdf_bounds_draws_only_the_region():
+    pattern = _make_pattern(10, 6)
+    out = io.BytesIO()
+    c = canvas.Canvas(out, pagesize=(200, 200))
+    c.setPageCompression(0)
+    # columns 3..6 straddle the color boundary at column 5
+    draw_pattern_vector(c, pattern, 10, 190, 12, bounds=(3, 1, 7, 4), font_size=5)
+    c.save()
+    data = out.getvalue()
+
+    assert len(re.findall(rb' re\b', data)) == 3 * 2
+    assert len(re.findall(rb' Tj\b', data)) == 4 * 3 * 2
+    assert b' 5 Tf' in data
@@ -0,0 +1,38 @@
+import io
+import re
+
+import numpy as np
+from reportlab.lib.units import mm
+
+from bead_pattern import BeadPattern
+from bead_pattern.core.pattern import BeadPatternV2
+from core.printer import Printer
+
+
+def _make_pattern(width, height, bead_size_mm):
+    pattern = BeadPatternV2(width, height, bead_size_mm)
+    pattern.palette.upsert_from_dict({'id': 1, 'code': 'A01', 'rgb': [200, 30, 30]})
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'A02', 'rgb': [30, 30, 200]})
+    pattern.grid.grid_ids = (1 + np.arange(width) % 2 + np.zeros((height, 1), dtype=int)).astype(np.int32)
+    return BeadPattern._from_v2(pattern)
+
+
+def test_tiled_print_uses_pattern_bead_size():
+    pattern = _make_pattern(150, 120, 2.6)
+    printer = Printer()
+
+    out = io.BytesIO()
+    layout = printer.generate_tiled_pdf(pattern, out, paper_size='A4', margin_mm=10.0,
+                                        overlap_cells=2, show_labels=False)
+
+    # A4 landscape fits 106 x 69 beads of 2.6 mm (5 mm beads would only fit 55 x 35),
+    # so the pattern takes 2 x 2 pages
+    assert layout['bead_size_mm'] == 2.6
+    assert layout['cell_points'] == 2.6 * mm
+    assert (layout['page_width_mm'], layout['cells_x'], layout['cells_y']) == (297, 106, 69)
+    assert (layout['columns'], layout['rows']) == (2, 2)
+    pages = len(re.findall(rb'/Type /Page\b(?!s)', out.getvalue()))
+    assert pages == len(layout['pages']) == 4
+
+    # The printer's own bead size only applies when none is given
+    assert printer.plan_tiled_pages(150, 120)['cell_points'] == 5.0 * mm
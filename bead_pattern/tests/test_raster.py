@@ -0,0 +1,154 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.render.raster import rasterize, render_pattern
+from bead_pattern.render.fonts import get_font_registry
+from bead_pattern.render.labels import (
+    LabelCache, blit_labels, build_label_sprites, compute_text_color, fit_font_size,
+)
+from bead_pattern.render.plan import RenderPlan
+
+
+def _make_pattern(width, height):
+    pattern = BeadPatternV2(width, height, 5.0)
+    pattern.palette.upsert_from_dict({'id': 1, 'code': 'A', 'rgb': [255, 0, 0]})
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'B', 'rgb': [0, 0, 255]})
+    grid_ids = np.tile(np.array([1, 2], dtype=np.int32), (height, (width + 1) // 2))[:, :width]
+    grid_ids[0, 0] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_cells_match_lut():
+    pattern = _make_pattern(5, 3)
+    buf = rasterize(pattern, 4)
+
+    assert buf.shape == (12, 20, 3)
+    assert tuple(buf[0, 0]) == (255, 255, 255)
+    assert tuple(buf[5, 7]) == (0, 0, 255)
+    assert tuple(buf[11, 19]) == (255, 0, 0)
+
+
+def test_grid_lines_match_draw_line():
+    pattern = _make_pattern(12, 7)
+    cell_size = 6
+    img = render_pattern(pattern, cell_size, show_grid=True, major_interval=5,
+                         major_color=(0, 0, 0), major_width=2)
+
+    expected = render_pattern(pattern, cell_size)
+    draw = ImageDraw.Draw(expected)
+    for x in range(13):
+        draw.line([(x * cell_size, 0), (x * cell_size, 7 * cell_size)], fill=(200, 200, 200), width=1)
+    for y in range(8):
+        draw.line([(0, y * cell_size), (12 * cell_size, y * cell_size)], fill=(200, 200, 200), width=1)
+    for x in range(0, 13, 5):
+        draw.line([(x * cell_size, 0), (x * cell_size, 7 * cell_size)], fill=(0, 0, 0), width=2)
+    for y in range(0, 8, 5):
+        draw.line([(0, y * cell_size), (12 * cell_size, y * cell_size)], fill=(0, 0, 0), width=2)
+
+    assert np.array_equal(np.asarray(img), np.asarray(expected))
+
+
+def test_bounds_and_closing_line():
+    pattern = _make_pattern(8, 8)
+    buf = rasterize(pattern, 3, bounds=(2, 1, 6, 5), show_grid=True, close_grid=True)
+
+    assert buf.shape == (13, 13, 3)
+    assert (buf[-1] == 200).all() and (buf[:, -1] == 200).all()
+    assert tuple(buf[1, 1]) == (255, 0, 0)
+
+
+def _composite_labels(img, pattern, cell_size, font_size):
+    result = img.convert('RGBA')
+    cache = LabelCache()
+    for y in range(pattern.grid.height):
+        for x in range(pattern.grid.width):
+            color_info = pattern.palette.get_color(pattern.grid.get_id(x, y))
+            if color_info:
+                label = cache.get_label_image(color_info.display_code, cell_size, font_size,
+                                              compute_text_color(color_info.rgb), 1)
+                result.alpha_composite(label, (x * cell_size, y * cell_size))
+    return result.convert('RGB')
+
+
+def test_labels_match_alpha_composite():
+    pattern = _make_pattern(11, 6)
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'WIDE88', 'rgb': [0, 0, 255]})
+    cell_size, font_size = 14, 11
+    grid_args = dict(show_grid=True, major_interval=5, major_width=2)
+
+    expected = _composite_labels(render_pattern(pattern, cell_size, **grid_args),
+                                 pattern, cell_size, font_size)
+    sprites = build_label_sprites(pattern, cell_size, font_size)
+    img = render_pattern(pattern, cell_size, label_sprites=sprites, **grid_args)
+    blitted = blit_labels(rasterize(pattern, cell_size, **grid_args), pattern, cell_size, font_size)
+
+    assert np.array_equal(np.asarray(img), np.asarray(expected))
+    assert np.array_equal(blitted, np.asarray(expected))
+
+
+def test_render_plan_matches_single_renders():
+    pattern = _make_pattern(11, 6)
+    cell_size = 12
+    grid_args = dict(major_interval=5, major_width=2)
+    plan = RenderPlan(pattern, cell_size, **grid_args)
+    outputs = plan.render(['base', 'grid', 'labels', 'grid_labels'])
+    sprites = build_label_sprites(pattern, cell_size)
+
+    expected = {
+        'base': render_pattern(pattern, cell_size),
+        'grid': render_pattern(pattern, cell_size, show_grid=True, **grid_args),
+        'labels': render_pattern(pattern, cell_size, label_sprites=sprites),
+        'grid_labels': render_pattern(pattern, cell_size, show_grid=True,
+                                      label_sprites=sprites, **grid_args),
+    }
+    for name, img in expected.items():
+        assert np.array_equal(np.asarray(outputs[name]), np.asarray(img)), name
+    # base branches into grid and labels: exactly one copy
+    assert plan.copies == 1
+    assert plan.get('grid') is outputs['grid']
+
+
+def test_indexed_matches_rgb():
+    pattern = _make_pattern(11, 6)
+    cell_size = 12
+    grid_args = dict(show_grid=True, major_interval=5, major_width=2, close_grid=True)
+    sprites = build_label_sprites(pattern, cell_size)
+
+    for label_sprites in (None, sprites):
+        img = render_pattern(pattern, cell_size, label_sprites=label_sprites, indexed=True, **grid_args)
+        expected = render_pattern(pattern, cell_size, label_sprites=label_sprites, **grid_args)
+        assert img.mode == 'P'
+        assert np.array_equal(np.asarray(img.convert('RGB')), np.asarray(expected))
+
+    plan = RenderPlan(pattern, cell_size, indexed=True)
+    for name, img in plan.render(['base', 'grid', 'labels', 'grid_labels']).items():
+        expected = RenderPlan(pattern, cell_size).get(name)
+        assert img.mode == 'P'
+        assert np.array_equal(np.asarray(img.convert('RGB')), np.asarray(expected)), name
+
+
+def test_indexed_falls_back_to_rgb():
+    pattern = _make_pattern(4, 4)
+    # 300 colors cannot fit in a 256-entry palette
+    for i in range(300):
+        pattern.palette.upsert_from_dict({'id': 10 + i, 'code': f'X{i}', 'rgb': [i % 256, i // 256, 7]})
+    img = render_pattern(pattern, 5, indexed=True)
+    assert img.mode == 'RGB'
+
+
+def test_fit_font_size_keeps_labels_inside_cell():
+    pattern = _make_pattern(4, 2)
+    pattern.palette.upsert_from_dict({'id': 3, 'code': 'WIDE12345', 'rgb': [0, 255, 0]})
+    pattern.grid.set_id(1, 1, 3)
+    cell_size = 20
+
+    size = fit_font_size(pattern, cell_size, font_size=14)
+    bbox = get_font_registry().get_font(size).getbbox('WIDE12345')
+    assert size < 14
+    assert bbox[2] - bbox[0] <= cell_size * 0.8 or size == 6
+    # short codes keep the requested size
+    pattern.grid.set_id(1, 1, 1)
+    assert fit_font_size(pattern, cell_size, font_size=10) == 10
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import pytest
+
+from bead_pattern.render.cache import RenderCache
+
+
+def _writer(payload, calls):
+    def build(path):
+        calls.append(path)
+        with open(path, 'wb') as f:
+            f.write(payload)
+    return build
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.make_key('abc', 'preview', cell_size=10, show_grid=True)
+    assert key == cache.make_key('abc', 'preview', show_grid=True, cell_size=10)
+
+    calls = []
+    assert cache.get_bytes(key, '.png', _writer(b'x' * 100, calls)) == b'x' * 100
+    assert cache.get_bytes(key, '.png', _writer(b'y', calls)) == b'x' * 100
+    assert len(calls) == 1
+
+    reopened = RenderCache(str(tmp_path))
+    assert reopened.get_file(key, '.png', _writer(b'y', calls)) == cache.path_for(key, '.png')
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert (stats['misses'], stats['memory_hits']) == (1, 1)
+    assert reopened.stats()['disk_hits'] == 1
+
+
+def test_disk_quota_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path), max_disk_bytes=250)
+    calls = []
+    for key in ('a', 'b'):
+        cache.get_file(key, '.bin', _writer(b'0' * 100, calls))
+    cache.get_file('a', '.bin', _writer(b'0' * 100, calls))
+    cache.get_file('c', '.bin', _writer(b'0' * 100, calls))
+
+    assert sorted(os.listdir(tmp_path)) == ['a.bin', 'c.bin']
+    assert cache.stats()['disk_bytes'] == 200
+    assert cache.stats()['disk_evictions'] == 1
+
+
+def test_render_without_persist_stays_in_memory(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.make_key('abc', 'export_png')
+    targets = []
+
+    def build(target):
+        targets.append(target)
+        target.write(b'x' * 100)
+
+    file, size = cache.render(key, '.png', build)
+    assert (file.read(), size) == (b'x' * 100, 100)
+    assert not isinstance(targets[0], str)
+    assert os.listdir(str(tmp_path)) == []
+
+    file, _ = cache.render(key, '.png', build)
+    assert file.read() == b'x' * 100
+    assert len(targets) == 1
+
+    # opting in writes the in-memory result to the disk tier
+    cache.render(key, '.png', build, persist=True)
+    assert os.listdir(str(tmp_path)) == [key + '.png']
+    assert len(targets) == 1
+
+
+def test_render_spools_large_results(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.make_key('abc', 'print')
+
+    file, size = cache.render(key, '.pdf', lambda target: target.write(b'y' * 1000), spool_bytes=100)
+    with file:
+        assert (file.read(), size) == (b'y' * 1000, 1000)
+    assert cache.stats()['memory_entries'] == 0
+    assert os.listdir(str(tmp_path)) == []
+
+
+def _concurrent(func, count):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, func())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _wait_for_waiters(cache, name, count):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with cache._lock:
+            flight = cache._building.get(name)
+            if flight is not None and flight.waiters == count:
+                return
+        time.sleep(0.005)
+    raise AssertionError("waiters did not join")
+
+
+@pytest.mark.parametrize("persist", [True, False])
+def test_concurrent_callers_share_one_render(tmp_path, persist):
+    cache = RenderCache(str(tmp_path))
+    release = threading.Event()
+    calls = []
+
+    def build(target):
+        calls.append(target)
+        release.wait(5)
+        if isinstance(target, str):
+            _writer(b'z' * 1000, [])(target)
+        else:
+            target.write(b'z' * 1000)
+
+    def call():
+        file, size = cache.render('k', '.bin', build, persist=persist, spool_bytes=100)
+        with file:
+            return file.read(), size
+
+    threads, results = _concurrent(call, 4)
+    _wait_for_waiters(cache, 'k.bin', 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [(b'z' * 1000, 1000)] * 4
+    assert cache._building == {}
+    assert os.listdir(tmp_path) == (['k.bin'] if persist else [])
+
+
+def test_pinned_files_are_not_evicted(tmp_path):
+    cache = RenderCache(str(tmp_path), max_disk_bytes=250)
+
+    with cache.pinned('a', '.bin', _writer(b'0' * 100, [])) as path:
+        for key in ('b', 'c', 'd'):
+            cache.get_file(key, '.bin', _writer(b'0' * 100, []))
+        with open(path, 'rb') as f:
+            assert f.read() == b'0' * 100
+
+    assert sorted(os.listdir(tmp_path)) == ['a.bin', 'd.bin']
+    cache.get_file('e', '.bin', _writer(b'0' * 100, []))
+    assert sorted(os.listdir(tmp_path)) == ['d.bin', 'e.bin']
@@ -0,0 +1,101 @@
+import numpy as np
+
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.core.grid import BeadGrid, BAND_ROWS
+from bead_pattern.io.compact_io import to_compact_bytes
+from bead_pattern.render.raster import rasterize
+
+
+def _make_pattern(width, height, num_colors=4):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({
+            'id': 10 + i,
+            'code': f'C{i}',
+            'rgb': [(40 * i) % 256, 60, (200 + 40 * i) % 256]
+        })
+    rng = np.random.default_rng(2)
+    pattern.grid.grid_ids = rng.integers(10, 10 + num_colors, (height, width)).astype(np.int32)
+    return pattern
+
+
+def test_snapshot_shares_until_write_then_copies_one_band():
+    pattern = _make_pattern(30, 4 * BAND_ROWS)
+    original = pattern.grid.grid_ids.copy()
+    original_hash = pattern.content_hash
+    snap = pattern.snapshot()
+
+    assert snap.grid.grid_ids is pattern.grid.grid_ids
+    assert snap.palette.colors_by_id is pattern.palette.colors_by_id
+    assert snap.content_hash == original_hash
+
+    y = 2 * BAND_ROWS + 5
+    snap.grid.set_id(4, y, 13 if original[y, 4] != 13 else 12)
+
+    assert snap.grid.private_bands == 1
+    assert pattern.grid.get_id(4, y) == original[y, 4]
+    assert snap.grid.get_id(4, y) != original[y, 4]
+    assert snap.content_hash != original_hash
+    assert pattern.content_hash == original_hash
+
+    merged = snap.grid.grid_ids
+    assert snap.grid.private_bands == 0
+    assert np.array_equal(np.delete(merged, y, axis=0), np.delete(original, y, axis=0))
+    assert np.array_equal(pattern.grid.grid_ids, original)
+
+
+def test_both_sides_write_independently():
+    pattern = _make_pattern(10, 10)
+    snap = pattern.snapshot()
+    pattern.grid.set_id(0, 0, 10)
+    snap.grid.set_id(0, 0, 11)
+    child = snap.snapshot()
+    child.grid.set_id(0, 0, 12)
+
+    assert (pattern.grid.get_id(0, 0), snap.grid.get_id(0, 0), child.grid.get_id(0, 0)) == (10, 11, 12)
+
+    snap.palette.upsert_from_dict({'id': 99, 'code': 'X', 'rgb': [1, 2, 3]})
+    assert 99 in snap.palette and 99 not in pattern.palette
+    assert len(pattern.palette.rgb_lut) == 5
+
+
+def test_grid_from_view_is_copy_on_write():
+    pattern = _make_pattern(10, 2 * BAND_ROWS)
+    original = pattern.grid.grid_ids.copy()
+    tile = BeadGrid.from_array(pattern.grid.grid_ids[BAND_ROWS:, 2:8])
+
+    assert tile.is_shared and pattern.grid.is_shared
+    tile.set_id(0, 0, 99)
+    pattern.grid.set_id(3, BAND_ROWS + 1, 98)
+
+    assert np.array_equal(tile.grid_ids[1:, :], original[BAND_ROWS + 1:, 2:8])
+    assert tile.get_id(1, 1) == original[BAND_ROWS + 1, 3]
+    assert pattern.grid.get_id(2, BAND_ROWS) == original[BAND_ROWS, 2]
+    assert tile.private_bands == 0 and pattern.grid.private_bands == 1
+
+
+def test_reads_after_write_do_not_merge_bands():
+    pattern = _make_pattern(30, 4 * BAND_ROWS)
+    snap = pattern.snapshot()
+    y = BAND_ROWS + 3
+    expected = pattern.grid.grid_ids.copy()
+    expected[y, 7] = 13 if expected[y, 7] != 13 else 12
+    snap.grid.set_id(7, y, expected[y, 7])
+
+    bounds = (2, BAND_ROWS - 5, 20, 2 * BAND_ROWS + 5)
+    image = rasterize(snap, 3, bounds=bounds)
+    data = to_compact_bytes(snap)
+    counts = snap.get_color_statistics()
+    subject = snap.get_subject_bounds()
+    rows = snap.grid.rows(BAND_ROWS - 2, BAND_ROWS + 2)
+
+    # Every read went through the overlay, the base array was not copied
+    assert snap.grid.private_bands == 1 and snap.grid.is_shared
+
+    reference = BeadPatternV2.from_grid(BeadGrid.from_array(expected.copy()), snap.palette, 5.0)
+    assert np.array_equal(image, rasterize(reference, 3, bounds=bounds))
+    assert data == to_compact_bytes(reference)
+    assert counts == reference.get_color_statistics()
+    assert subject == reference.get_subject_bounds()
+    assert np.array_equal(rows, expected[BAND_ROWS - 2:BAND_ROWS + 2])
+    assert not rows.flags.writeable
@@ -0,0 +1,82 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from core.color_matcher import ColorMatcher
+from core.optimizer import PatternOptimizer
+from core.executor import SharedArray, create_stage_executor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_image():
+    rng = np.random.default_rng(7)
+    image = np.full((24, 32, 3), 255, dtype=np.uint8)
+    image[4:20, 6:26] = rng.integers(0, 256, (16, 20, 3))
+    return image
+
+
+def test_shared_array_round_trip():
+    array = np.arange(12, dtype=np.int32).reshape(3, 4)
+    handle, shm = SharedArray.create(array)
+    try:
+        copy = handle.copy()
+        assert copy.dtype == np.int32 and np.array_equal(copy, array)
+        assert handle.nbytes == array.nbytes
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_process_executor_matches_thread_executor(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    color_matcher = ColorMatcher()
+    optimizer = PatternOptimizer(color_matcher)
+    thread = create_stage_executor("thread", color_matcher, optimizer)
+    process = create_stage_executor("process", color_matcher, optimizer, max_workers=1)
+    try:
+        image = _make_image()
+        options = dict(target_colors=0, max_dimension=20, denoise_strength=0.0)
+        expected, expected_size = thread.optimize_image(image, **options)
+        optimized, size = process.optimize_image(image, **options)
+        assert size == expected_size and np.array_equal(optimized, expected)
+
+        width, height = size
+        expected_pattern = thread.match_pattern(optimized, width, height, 2.6, method="cie76")
+        pattern = process.match_pattern(optimized, width, height, 2.6, method="cie76")
+        assert pattern.content_hash == expected_pattern.content_hash
+
+        expected_png, png = io.BytesIO(), io.BytesIO()
+        thread.render_preview(expected_pattern, "grid_labels", expected_png)
+        process.render_preview(pattern, "grid_labels", png)
+        assert png.getvalue() == expected_png.getvalue()
+        assert process.stats()["tasks"] == 3
+    finally:
+        process.shutdown()
+
+
+def test_broken_pool_is_rebuilt(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    color_matcher = ColorMatcher()
+    process = create_stage_executor("process", color_matcher, PatternOptimizer(color_matcher),
+                                    max_workers=1)
+    try:
+        original_pool = process._pool
+        # Several threads see the same pool break at once
+        with ThreadPoolExecutor(max_workers=4) as threads:
+            futures = [threads.submit(process._run, os._exit, 1) for _ in range(4)]
+        for future in futures:
+            with pytest.raises(BrokenProcessPool):
+                future.result()
+
+        assert process._pool is not original_pool
+        assert process.stats()["tasks"] == 4
+        optimized, size = process.optimize_image(_make_image(), target_colors=0, max_dimension=8,
+                                                 denoise_strength=0.0)
+        assert optimized.shape[:2] == (size[1], size[0])
+    finally:
+        process.shutdown()
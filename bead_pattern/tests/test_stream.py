@@ -0,0 +1,61 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.blueprint import BlueprintConfig, composite_blueprint
+from bead_pattern.render.labels import build_label_sprites
+from bead_pattern.render.raster import render_pattern
+from bead_pattern.render.stream import stream_blueprint_png, stream_pattern_png
+
+
+def _make_pattern(width, height, num_colors=6):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({'id': i + 1, 'code': f'C{i}',
+                                          'rgb': [(40 * i) % 256, (90 * i) % 256, 255 - 30 * i]})
+    rng = np.random.default_rng(7)
+    grid_ids = rng.integers(1, num_colors + 1, (height, width)).astype(np.int32)
+    grid_ids[:3, :4] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def _decode(data):
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+
+def test_streamed_bands_match_full_render():
+    pattern = _make_pattern(23, 17)
+    cell_size = 9
+    sprites = build_label_sprites(pattern, cell_size)
+
+    for indexed in (False, True):
+        for close_grid in (False, True):
+            kwargs = dict(show_grid=True, major_interval=5, close_grid=close_grid,
+                          label_sprites=sprites)
+            out = io.BytesIO()
+            # a tiny band budget forces several bands
+            size = stream_pattern_png(pattern, out, cell_size, indexed=indexed,
+                                      max_band_bytes=4096, **kwargs)
+            img = _decode(out.getvalue())
+            expected = render_pattern(pattern, cell_size, **kwargs)
+
+            assert img.size == size == expected.size
+            assert img.mode == ('P' if indexed else 'RGB')
+            assert np.array_equal(np.asarray(img.convert('RGB')), np.asarray(expected))
+
+
+def test_streamed_blueprint_matches_composite():
+    pattern = _make_pattern(30, 24)
+    config = BlueprintConfig()
+
+    out = io.BytesIO()
+    stream_blueprint_png(pattern, out, config, max_band_bytes=1 << 16)
+
+    assert np.array_equal(np.asarray(_decode(out.getvalue())),
+                          np.asarray(composite_blueprint(pattern, config)))
@@ -0,0 +1,61 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.io import to_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def _make_pattern(width, height):
+    pattern = BeadPatternV2(width, height, 5.0)
+    pattern.palette.upsert_from_dict({'id': 1, 'code': 'A01', 'rgb': [255, 0, 0]})
+    pattern.palette.upsert_from_dict({'id': 2, 'code': 'B02', 'rgb': [0, 0, 255]})
+    grid_ids = np.ones((height, width), dtype=np.int32)
+    grid_ids[:, width // 2:] = 2
+    grid_ids[0, 0] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def _render(pattern, **kwargs):
+    out = io.BytesIO()
+    to_svg(pattern, out, **kwargs)
+    return ET.fromstring(out.getvalue())
+
+
+def test_svg_merges_runs_into_one_path_per_color():
+    root = _render(_make_pattern(10, 6), show_labels=False)
+    assert root.get('viewBox') == '0 0 10 6'
+
+    fills = [p for p in root.iter(SVG + 'path') if p.get('fill') != 'none']
+    assert [p.get('fill') for p in fills] == ['#ff0000', '#0000ff']
+    # one rectangle per row and color; the empty cell splits the first red run
+    assert len(re.findall('M', fills[0].get('d'))) == 6
+    assert len(re.findall('M', fills[1].get('d'))) == 6
+    assert 'M1 0h4v1h-4z' in fills[0].get('d')
+
+    grid = [p for p in root.iter(SVG + 'path') if p.get('fill') == 'none']
+    assert len(grid) == 1
+    assert len(re.findall('M', grid[0].get('d'))) == 11 + 7
+
+
+def test_svg_labels_use_display_codes():
+    root = _render(_make_pattern(10, 6), show_grid=False, major_interval=5)
+    texts = list(root.iter(SVG + 'text'))
+    assert len(texts) == 10 * 6 - 1
+    assert {t.text for t in texts} == {'A1', 'B2'}
+    assert {t.text for t in texts if t.get('x') == '0.5'} == {'A1'}
+    assert not [p for p in root.iter(SVG + 'path') if p.get('fill') == 'none']
+
+
+def test_svg_size_tracks_color_boundaries_not_beads():
+    small = io.BytesIO()
+    large = io.BytesIO()
+    to_svg(_make_pattern(10, 6), small, show_grid=False, show_labels=False)
+    to_svg(_make_pattern(400, 6), large, show_grid=False, show_labels=False)
+    assert len(large.getvalue()) - len(small.getvalue()) < 100
@@ -0,0 +1,58 @@
+import numpy as np
+from PIL import Image
+
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.labels import build_label_sprites
+from bead_pattern.render.raster import render_pattern
+from bead_pattern.render.tiles import TILE_SIZE, TilePyramid, render_tile
+
+
+def _make_pattern(width, height, num_colors=6):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({'id': i + 1, 'code': f'C{i}',
+                                          'rgb': [(40 * i) % 256, (90 * i) % 256, 255 - 30 * i]})
+    rng = np.random.default_rng(3)
+    grid_ids = rng.integers(1, num_colors + 1, (height, width)).astype(np.int32)
+    grid_ids[:3, :4] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def _stitch(pattern, z):
+    pyramid = TilePyramid.for_pattern(pattern)
+    cols, rows = pyramid.tile_count(z)
+    canvas = Image.new('RGB', pyramid.level_size(z))
+    for y in range(rows):
+        for x in range(cols):
+            tile = render_tile(pattern, z, x, y)
+            assert tile.width <= TILE_SIZE and tile.height <= TILE_SIZE
+            canvas.paste(tile.convert('RGB'), (x * TILE_SIZE, y * TILE_SIZE))
+    return canvas
+
+
+def test_tiles_stitch_to_full_render():
+    pattern = _make_pattern(37, 21)
+    pyramid = TilePyramid.for_pattern(pattern)
+    z = pyramid.max_zoom
+    cell_size = int(pyramid.cell_size(z))
+    sprites = build_label_sprites(pattern, cell_size)
+
+    expected = render_pattern(pattern, cell_size, show_grid=True, label_sprites=sprites)
+    assert np.array_equal(np.asarray(_stitch(pattern, z)), np.asarray(expected))
+
+
+def test_low_zoom_tiles_sample_index_plane():
+    pattern = _make_pattern(600, 300)
+    pyramid = TilePyramid.for_pattern(pattern)
+    assert pyramid.cell_size(0) < 1
+
+    step = int(1 / pyramid.cell_size(0))
+    tile = np.asarray(render_tile(pattern, 0, 0, 0).convert('RGB'))
+    # The sample is copied, the stored pattern's grid stays writable
+    assert not pattern.grid.is_shared
+    lut = pattern.palette.rgb_lut
+    expected = lut[pattern.palette.to_compact_indices(pattern.grid.grid_ids[::step, ::step])]
+    assert tile.shape == expected.shape
+    assert np.array_equal(tile, expected)
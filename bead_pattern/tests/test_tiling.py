@@ -0,0 +1,62 @@
+import numpy as np
+
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.tiling import BoardTiling
+from bead_pattern.render.board_sheet import export_board_tiles, render_board_tiles
+
+
+def _make_pattern(width, height, num_colors=4):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({
+            'id': 10 + i,
+            'code': f'C{i}',
+            'rgb': [(40 * i) % 256, 60, (200 + 40 * i) % 256]
+        })
+    rng = np.random.default_rng(0)
+    pattern.grid.grid_ids = rng.integers(10, 10 + num_colors, (height, width)).astype(np.int32)
+    pattern.grid.grid_ids[0, 0] = BeadGrid.EMPTY
+    return pattern
+
+
+def test_tiles_cover_grid_with_edge_tiles():
+    pattern = _make_pattern(70, 31)
+    tiling = BoardTiling(pattern.grid, 29)
+
+    assert (tiling.rows, tiling.cols) == (2, 3)
+    assert sum(tile.width * tile.height for tile in tiling) == 70 * 31
+    last = tiling.get_tile(1, 2)
+    assert (last.x0, last.y0, last.width, last.height) == (58, 29, 12, 2)
+
+
+def test_tile_views_are_zero_copy():
+    pattern = _make_pattern(40, 40)
+    tiling = BoardTiling(pattern.grid, 29)
+    tile, view = next(tiling.iter_views())
+
+    assert np.shares_memory(view, pattern.grid.grid_ids)
+    assert view.shape == (29, 29)
+
+
+def test_tile_boms_match_per_tile_unique():
+    pattern = _make_pattern(70, 31)
+    tiling = BoardTiling(pattern.grid, 29)
+    boms = tiling.tile_boms(pattern.palette)
+
+    for (tile, view), bom in zip(tiling.iter_views(), boms):
+        ids, counts = np.unique(view[view != BeadGrid.EMPTY], return_counts=True)
+        assert bom == dict(zip(ids.tolist(), counts.tolist()))
+
+
+def test_render_and_export_tiles(tmp_path):
+    pattern = _make_pattern(35, 20)
+    tiling = BoardTiling(pattern.grid, 29)
+
+    rendered = render_board_tiles(pattern, tiling, cell_size=4, show_labels=False, max_workers=2)
+    assert [img.size for _, img in rendered] == [(29 * 4, 20 * 4), (6 * 4, 20 * 4)]
+
+    manifest = export_board_tiles(pattern, str(tmp_path), cell_size=4, show_labels=False)
+    assert len(manifest['tiles']) == 2
+    assert (tmp_path / 'boards_summary.png').exists()
+    assert (tmp_path / 'boards_bom.csv').exists()
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.core.grid import BeadGrid
+
+
+def _make_pattern(width, height, num_colors=4):
+    pattern = BeadPatternV2(width, height, 5.0)
+    for i in range(num_colors):
+        pattern.palette.upsert_from_dict({
+            'id': 10 + i,
+            'code': f'C{i}',
+            'rgb': [(40 * i) % 256, 60, (200 + 40 * i) % 256]
+        })
+    rng = np.random.default_rng(1)
+    grid_ids = rng.integers(10, 10 + num_colors, (height, width)).astype(np.int32)
+    grid_ids[0, :3] = BeadGrid.EMPTY
+    pattern.grid.grid_ids = grid_ids
+    return pattern
+
+
+def test_mirror_and_rotate_are_views_with_cached_stats():
+    pattern = _make_pattern(7, 5)
+    original = pattern.grid.grid_ids.copy()
+    stats = pattern.get_color_statistics()
+
+    mirrored = pattern.mirror('horizontal')
+    rotated = pattern.rotate(90)
+
+    assert np.array_equal(mirrored.grid.grid_ids, original[:, ::-1])
+    assert np.array_equal(rotated.grid.grid_ids, np.rot90(original, k=-1))
+    assert rotated.grid.shape == (7, 5)
+    assert np.shares_memory(rotated.grid.grid_ids, pattern.grid.grid_ids)
+    assert rotated.palette.colors_by_id is pattern.palette.colors_by_id
+    assert rotated._stats_cache is not None
+    assert rotated.get_color_statistics()['color_counts'] == stats['color_counts']
+
+
+def test_write_after_view_transform_does_not_leak():
+    pattern = _make_pattern(6, 6)
+    mirrored = pattern.mirror('vertical')
+    before = mirrored.grid.grid_ids.copy()
+
+    pattern.grid.set_id(0, 5, 11)
+
+    assert pattern.grid.get_id(0, 5) == 11
+    assert np.array_equal(mirrored.grid.grid_ids, before)
+    assert pattern.get_color_statistics()['color_counts'] == dict(
+        zip(*[a.tolist() for a in np.unique(pattern.grid.grid_ids, return_counts=True)]))
+
+
+@pytest.mark.parametrize("transform", [
+    lambda p: p.mirror('horizontal'),
+    lambda p: p.rotate(90),
+    lambda p: p.crop((1, 1, 5, 5)),
+])
+def test_write_to_derived_view_does_not_leak(transform):
+    pattern = _make_pattern(6, 6)
+    original = pattern.grid.grid_ids.copy()
+    original_hash = pattern.content_hash
+    derived = transform(pattern)
+
+    derived.grid.set_id(0, 0, 13 if derived.grid.get_id(0, 0) != 13 else 12)
+
+    assert np.array_equal(pattern.grid.grid_ids, original)
+    assert pattern.content_hash == original_hash
+    assert derived.content_hash != transform(pattern).content_hash
+
+
+def test_crop_pad_and_rotate_invalid():
+    pattern = _make_pattern(8, 6)
+
+    cropped = pattern.crop((2, 1, 6, 4))
+    assert np.array_equal(cropped.grid.grid_ids, pattern.grid.grid_ids[1:4, 2:6])
+
+    padded = pattern.pad(1, 2, 3, 4)
+    assert padded.grid.shape == (12, 12)
+    assert padded.get_color_statistics()['color_counts'][BeadGrid.EMPTY] == 144 - 48 + 3
+    assert padded.get_color_statistics()['color_counts'] == dict(
+        zip(*[a.tolist() for a in np.unique(padded.grid.grid_ids, return_counts=True)]))
+
+    with pytest.raises(ValueError):
+        pattern.rotate(45)
+    with pytest.raises(ValueError):
+        pattern.crop((0, 0, 9, 6))
+
+
+def test_upscale_downscale_round_trip_and_mode():
+    pattern = _make_pattern(5, 3)
+
+    upscaled = pattern.upscale(3)
+    assert upscaled.grid.shape == (9, 15)
+    assert upscaled.get_color_statistics()['color_counts'] == {
+        k: v * 9 for k, v in pattern.get_color_statistics()['color_counts'].items()}
+    assert np.array_equal(upscaled.downscale(3).grid.grid_ids, pattern.grid.grid_ids)
+
+    block = BeadPatternV2(2, 2, 5.0)
+    block.palette.upsert_from_dict({'id': 1, 'code': 'A', 'rgb': [0, 0, 0]})
+    block.palette.upsert_from_dict({'id': 2, 'code': 'B', 'rgb': [255, 0, 0]})
+    block.grid.grid_ids = np.array([[2, 2], [BeadGrid.EMPTY, BeadGrid.EMPTY]], dtype=np.int32)
+    assert block.downscale(2).grid.grid_ids.tolist() == [[2]]
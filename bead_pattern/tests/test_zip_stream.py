@@ -0,0 +1,45 @@
+import io
+import threading
+import zipfile
+
+import pytest
+
+from bead_pattern.io import stream_zip
+
+
+def test_stream_zip_writes_files_in_completion_order():
+    slow_started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        slow_started.set()
+        release.wait(5)
+        return b'%PDF' + b'\0' * 100
+
+    def fast():
+        slow_started.wait(5)
+        return b'{"a": 1}' * 50
+
+    completed = []
+    chunks = []
+    for chunk in stream_zip({'a.pdf': slow, 'b.json': fast}, max_workers=2,
+                            on_complete=lambda name, done, total: completed.append((name, done, total))):
+        chunks.append(chunk)
+        release.set()
+
+    assert completed == [('b.json', 1, 2), ('a.pdf', 2, 2)]
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.testzip() is None
+    assert archive.namelist() == ['b.json', 'a.pdf']
+    assert archive.read('a.pdf') == b'%PDF' + b'\0' * 100
+    # already-compressed formats are stored, text is deflated
+    assert archive.getinfo('a.pdf').compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo('b.json').compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_stream_zip_propagates_build_errors():
+    def broken():
+        raise RuntimeError('render failed')
+
+    with pytest.raises(RuntimeError, match='render failed'):
+        list(stream_zip({'ok.csv': lambda: b'x', 'bad.png': broken}))
@@ -8,6 +8,7 @@ import json
 from PIL import Image, ImageDraw, ImageFont
 import os
 import re
+from bead_pattern.render.fonts import get_font_registry
 
 
 class BeadPattern:
@@ -368,40 +369,13 @@ class BeadPattern:
         else:
             base_font_size = max(12, int(cell_size * 0.5))
         
-        font_cache: Dict[int, Any] = {}
+        fonts = get_font_registry()
         text_layout_cache: Dict[str, Tuple[Any, float, float]] = {}
         display_code_cache: Dict[str, str] = {}
 
         def get_font(size):
             """获取指定大小的字体 - 使用粗体以提高清晰度"""
-            cached = font_cache.get(size)
-            if cached is not None:
-                return cached
-            try:
-                # 优先使用粗体字体，提高清晰度
-                try:
-                    font = ImageFont.truetype("arialbd.ttf", size)
-                except:
-                    try:
-                        font = ImageFont.truetype("/System/Library/Fonts/Arial Bold.ttf", size)
-                    except:
-                        try:
-                            font = ImageFont.truetype("arial.ttf", size)
-                        except:
-                            try:
-                                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
-                            except:
-                                try:
-                                    font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size)
-                                except:
-                                    try:
-                                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size)
-                                    except:
-                                        font = ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-            font_cache[size] = font
-            return font
+            return fonts.get_font(size, bold=True)
         
         base_font = get_font(base_font_size)
         if hasattr(draw, "fontmode"):
@@ -529,16 +503,8 @@ class BeadPattern:
             legend_x = img_width + 20
             legend_y = 20
 
-            try:
-                title_font = ImageFont.truetype("arialbd.ttf", 16)
-                item_font = ImageFont.truetype("arial.ttf", 12)
-            except:
-                try:
-                    title_font = ImageFont.truetype("/System/Library/Fonts/Arial Bold.ttf", 16)
-                    item_font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-                except:
-                    title_font = ImageFont.load_default()
-                    item_font = ImageFont.load_default()
+            title_font = fonts.get_font(16, bold=True)
+            item_font = fonts.get_font(12)
 
             draw.text((legend_x, legend_y), "颜色统计", fill=(0, 0, 0), font=title_font)
             legend_y += 30
@@ -0,0 +1,389 @@
+"""
+CPU 密集型阶段的执行器
+图像优化（降噪 / KMeans 减色）、颜色匹配（含抖动）和预览渲染大部分是持有 GIL 的
+Python 循环，多线程几乎只能用到一个核心
+
+- ThreadStageExecutor：在调用线程中直接执行（单核机器 / 调试）
+- ProcessStageExecutor：在进程池中执行
+  - 工作进程启动时加载一次色板（ColorMatcher）和字体，之后的任务直接使用；
+    自定义色板文件变化时自动重新加载
+  - 图像、网格数组通过 multiprocessing.shared_memory 传递，不经过 pickle；
+    只有参数、色板等小对象走 pickle
+
+两种执行器接口相同，由 create_stage_executor 按配置创建
+"""
+import io
+import os
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Tuple, Union, BinaryIO
+
+import numpy as np
+
+from bead_pattern import BeadPattern
+from bead_pattern.core.grid import BeadGrid
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.plan import RenderPlan
+
+logger = logging.getLogger(__name__)
+
+
+# 执行器类型
+EXECUTOR_KINDS = ("auto", "thread", "process")
+
+
+class SharedArray:
+    """共享内存中的数组句柄（名称、形状、类型），可 pickle 传给其他进程"""
+
+    __slots__ = ('name', 'shape', 'dtype')
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> Tuple['SharedArray', SharedMemory]:
+        """
+        把数组复制到新建的共享内存
+
+        Returns:
+            (句柄, SharedMemory)，创建方负责 close / unlink
+        """
+        array = np.ascontiguousarray(array)
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return cls(shm.name, array.shape, array.dtype.str), shm
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def copy(self, unlink: bool = False) -> np.ndarray:
+        """
+        复制出普通数组（不持有共享内存的引用）
+
+        Args:
+            unlink: 复制后是否释放共享内存
+        """
+        shm = SharedMemory(name=self.name)
+        try:
+            view = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+            array = view.copy()
+            del view
+            return array
+        finally:
+            shm.close()
+            if unlink:
+                shm.unlink()
+
+
+@contextmanager
+def _shared(array: np.ndarray) -> Iterator[SharedArray]:
+    """临时共享数组，退出时释放"""
+    handle, shm = SharedArray.create(array)
+    try:
+        yield handle
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def _shared_grid(grid: BeadGrid) -> Iterator[SharedArray]:
+    """临时共享网格颜色 ID（逐行带写入，不合并写时复制的私有行带），退出时释放"""
+    shm = SharedMemory(create=True, size=max(len(grid) * 4, 1))
+    try:
+        out = np.ndarray(grid.shape, dtype=np.int32, buffer=shm.buf)
+        for row, ids in grid.iter_bands():
+            out[row:row + ids.shape[0]] = ids
+        del out
+        yield SharedArray(shm.name, grid.shape, np.dtype(np.int32).str)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _take(handle: SharedArray) -> np.ndarray:
+    """取回工作进程创建的共享数组并释放共享内存"""
+    return handle.copy(unlink=True)
+
+
+def _put(array: np.ndarray) -> SharedArray:
+    """工作进程中把结果放入共享内存（由父进程 _take 释放）"""
+    handle, shm = SharedArray.create(array)
+    shm.close()
+    return handle
+
+
+def _save_png(image, out: Union[str, os.PathLike, BinaryIO]) -> None:
+    image.save(out, format='PNG')
+
+
+# ---------- 工作进程 ----------
+
+# 工作进程内的常驻对象（_init_worker 中创建）
+_worker: Dict = {}
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _init_worker(standard_colors_path: str, custom_colors_path: str) -> None:
+    """工作进程初始化：加载色板和字体（每个进程只执行一次）"""
+    from core.color_matcher import ColorMatcher
+    from core.optimizer import PatternOptimizer
+    from bead_pattern.render.fonts import get_font_registry
+
+    color_matcher = ColorMatcher(standard_colors_path, custom_colors_path)
+    _worker['color_matcher'] = color_matcher
+    _worker['pattern_optimizer'] = PatternOptimizer(color_matcher)
+    _worker['colors_stamp'] = _file_stamp(custom_colors_path)
+    get_font_registry().discover()
+
+
+def _worker_color_matcher():
+    """工作进程的颜色匹配器（自定义色板文件变化后重新加载）"""
+    color_matcher = _worker['color_matcher']
+    stamp = _file_stamp(color_matcher.custom_colors_path)
+    if stamp != _worker['colors_stamp']:
+        color_matcher.load_colors()
+        _worker['colors_stamp'] = stamp
+    return color_matcher
+
+
+def _optimize_image_task(image: SharedArray, options: Dict) -> Tuple[SharedArray, Tuple[int, int]]:
+    _worker_color_matcher()
+    optimized, size = _worker['pattern_optimizer'].apply_full_optimization(image.copy(), **options)
+    return _put(optimized), size
+
+
+def _match_colors_task(image: SharedArray, options: Dict) -> Tuple[SharedArray, List[Dict]]:
+    matched = _worker_color_matcher().match_image_colors(image.copy(), **options)
+    grid_ids, colors = _matched_to_ids(matched)
+    return _put(grid_ids), colors
+
+
+def _render_preview_task(grid_ids: SharedArray, palette, bead_size_mm: float,
+                         output: str, cell_size: int) -> bytes:
+    pattern = BeadPatternV2.from_grid(BeadGrid.from_array(grid_ids.copy()), palette, bead_size_mm)
+    out = io.BytesIO()
+    _save_png(RenderPlan(pattern, cell_size=cell_size, indexed=True).get(output), out)
+    return out.getvalue()
+
+
+def _matched_to_ids(matched_colors: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    颜色匹配结果（每个像素一个颜色字典）转换为颜色 ID 网格 + 颜色列表
+
+    与 BeadPattern.from_matched_colors 的取色规则相同：颜色按首次出现的顺序，
+    字典取最后一次出现的（只有 distance 不同）
+    """
+    grid_ids = np.full(matched_colors.shape[:2], BeadGrid.EMPTY, dtype=np.int32)
+    flat_ids = grid_ids.reshape(-1)
+    colors: Dict[int, Dict] = {}
+    for i, cell in enumerate(matched_colors.reshape(-1)):
+        if cell is not None:
+            color_id = cell.get('id')
+            if color_id is not None:
+                colors[color_id] = cell
+                flat_ids[i] = color_id
+    return grid_ids, list(colors.values())
+
+
+# ---------- 执行器 ----------
+
+class ThreadStageExecutor:
+    """在调用线程中执行（使用主进程的色板和优化器）"""
+
+    kind = "thread"
+
+    def __init__(self, color_matcher, pattern_optimizer):
+        self.color_matcher = color_matcher
+        self.pattern_optimizer = pattern_optimizer
+        self.max_workers = 1
+        self.tasks = 0
+        self._lock = threading.Lock()
+
+    def _count(self) -> None:
+        with self._lock:
+            self.tasks += 1
+
+    def optimize_image(self, image_array: np.ndarray, **options) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        图像优化（PatternOptimizer.apply_full_optimization）
+
+        Returns:
+            (优化后的图像数组, (宽, 高))
+        """
+        self._count()
+        return self.pattern_optimizer.apply_full_optimization(image_array, **options)
+
+    def match_pattern(self, image_array: np.ndarray, width: int, height: int,
+                      bead_size_mm: float, **options) -> BeadPattern:
+        """
+        颜色匹配并生成图案（ColorMatcher.match_image_colors 的参数通过 options 传入）
+
+        Returns:
+            BeadPattern 对象
+        """
+        self._count()
+        matched_colors = self.color_matcher.match_image_colors(image_array, **options)
+        bead_pattern = BeadPattern(width, height, bead_size_mm=bead_size_mm)
+        bead_pattern.from_matched_colors(matched_colors)
+        return bead_pattern
+
+    def render_preview(self, bead_pattern, output: str, out: Union[str, os.PathLike, BinaryIO],
+                       cell_size: int = 10) -> None:
+        """
+        渲染预览图（RenderPlan 的单个输出）并写入 PNG
+
+        Args:
+            bead_pattern: BeadPattern 或 BeadPatternV2
+            output: 输出名称（"grid" / "grid_labels" 等）
+            out: 输出路径或二进制文件对象
+            cell_size: 单元格大小（像素）
+        """
+        self._count()
+        _save_png(RenderPlan(bead_pattern, cell_size=cell_size, indexed=True).get(output), out)
+
+    def stats(self) -> Dict:
+        return {"kind": self.kind, "max_workers": self.max_workers, "tasks": self.tasks}
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class ProcessStageExecutor:
+    """在进程池中执行，数组通过共享内存传递"""
+
+    kind = "process"
+
+    def __init__(self, color_matcher, max_workers: Optional[int] = None):
+        """
+        Args:
+            color_matcher: 主进程的颜色匹配器（工作进程按相同的色板文件加载）
+            max_workers: 工作进程数（None 使用 CPU 核心数）
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._initargs = (color_matcher.standard_colors_path, color_matcher.custom_colors_path)
+        self._lock = threading.Lock()
+        self._pool = self._create_pool()
+        self.tasks = 0
+        self.shared_bytes = 0
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # spawn：主进程中已有线程（线程池、事件循环），fork 不安全
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=self._initargs)
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """
+        重建损坏的进程池
+
+        多个线程可能同时发现同一个进程池损坏，只有仍在使用的那个会被替换
+        """
+        with self._lock:
+            if self._pool is not broken:
+                return
+            logger.error("阶段执行进程池已损坏，正在重建")
+            self._pool = self._create_pool()
+        broken.shutdown(wait=False)
+
+    def _run(self, func, *args, shared_bytes: int = 0):
+        with self._lock:
+            self.tasks += 1
+            self.shared_bytes += shared_bytes
+        while True:
+            with self._lock:
+                pool = self._pool
+            try:
+                future = pool.submit(func, *args)
+                break
+            except BrokenProcessPool:
+                # 任务还没有提交：重建后重试
+                self._replace_pool(pool)
+            except RuntimeError:
+                # 进程池刚被其他线程替换（旧池已关闭）时重试，执行器已关闭时抛出
+                if pool is self._pool:
+                    raise
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # 工作进程异常退出后进程池不可再用，重建后让本次任务失败
+            self._replace_pool(pool)
+            raise
+
+    def optimize_image(self, image_array: np.ndarray, **options) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """同 ThreadStageExecutor.optimize_image"""
+        with _shared(image_array) as image:
+            result, size = self._run(_optimize_image_task, image, options, shared_bytes=image.nbytes)
+        return _take(result), size
+
+    def match_pattern(self, image_array: np.ndarray, width: int, height: int,
+                      bead_size_mm: float, **options) -> BeadPattern:
+        """同 ThreadStageExecutor.match_pattern"""
+        with _shared(image_array) as image:
+            result, colors = self._run(_match_colors_task, image, options, shared_bytes=image.nbytes)
+        bead_pattern = BeadPattern(width, height, bead_size_mm=bead_size_mm)
+        bead_pattern.from_color_ids(_take(result), colors)
+        return bead_pattern
+
+    def render_preview(self, bead_pattern, output: str, out: Union[str, os.PathLike, BinaryIO],
+                       cell_size: int = 10) -> None:
+        """同 ThreadStageExecutor.render_preview"""
+        pattern: BeadPatternV2 = bead_pattern._v2 if hasattr(bead_pattern, '_v2') else bead_pattern
+        with _shared_grid(pattern.grid) as grid_ids:
+            data = self._run(_render_preview_task, grid_ids, pattern.palette,
+                             pattern.bead_size_mm, output, cell_size, shared_bytes=grid_ids.nbytes)
+        if isinstance(out, (str, os.PathLike)):
+            with open(out, 'wb') as f:
+                f.write(data)
+        else:
+            out.write(data)
+
+    def stats(self) -> Dict:
+        return {"kind": self.kind, "max_workers": self.max_workers, "tasks": self.tasks,
+                "shared_bytes": self.shared_bytes}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool = self._pool
+        pool.shutdown(wait=wait)
+
+
+def create_stage_executor(kind: str, color_matcher, pattern_optimizer,
+                          max_workers: Optional[int] = None):
+    """
+    创建执行器
+
+    Args:
+        kind: "thread"、"process" 或 "auto"（多核时使用进程池）
+        color_matcher: 主进程的颜色匹配器
+        pattern_optimizer: 主进程的图案优化器（thread 使用）
+        max_workers: 进程数（None 使用 CPU 核心数）
+
+    Returns:
+        ThreadStageExecutor 或 ProcessStageExecutor
+
+    Raises:
+        ValueError: 未知的执行器类型
+    """
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"未知的执行器类型: {kind}，支持: {', '.join(EXECUTOR_KINDS)}")
+    if kind == "auto":
+        kind = "process" if (max_workers or os.cpu_count() or 1) > 1 else "thread"
+    if kind == "process":
+        return ProcessStageExecutor(color_matcher, max_workers)
+    return ThreadStageExecutor(color_matcher, pattern_optimizer)
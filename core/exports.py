@@ -0,0 +1,218 @@
+"""
+导出文件构建模块
+Web 接口与桌面端共用的导出文件（PNG、打印 PDF、工程图纸、颜色统计、打包下载）
+缓存键、后缀与生成函数
+
+每个 *_build 函数返回 (cache_key, suffix, build)，可直接交给渲染缓存的
+get_file / get_bytes / render；缓存键只由影响输出的参数组成，
+两端对相同内容和参数得到同一个缓存文件。
+"""
+from typing import Callable, Optional, Tuple
+
+from bead_pattern.render.cache import get_render_cache
+from bead_pattern.render.technical_panel import (
+    TechnicalPanelConfig,
+    save_technical_sheet,
+    save_technical_sheet_pdf,
+    export_statistics
+)
+from core.printer import Printer
+
+# 导出 PNG 的默认单元格大小（像素）
+EXPORT_PNG_CELL_SIZE = 30
+
+# 单张工程图纸的默认单元格大小（像素，0 为按色号可读自动计算）
+TECHNICAL_SHEET_CELL_SIZE = 10
+
+# 打包下载可选的文件（默认全部）
+BUNDLE_ARTIFACTS = ("png", "labeled_png", "json", "statistics", "technical_sheet", "pdf")
+
+Build = Tuple[str, str, Callable]
+
+
+def pattern_cache_key(pattern, renderer: str, **options) -> str:
+    """
+    渲染/导出/打印缓存键：图案内容哈希 + 渲染器 + 参数摘要
+
+    内容相同的图案（例如不同 pattern_id 但网格和色板一致）共用同一个缓存文件
+    """
+    return get_render_cache().make_key(pattern.content_hash, renderer, **options)
+
+
+def export_png_build(pattern, show_labels: bool = True,
+                     cell_size: int = EXPORT_PNG_CELL_SIZE) -> Build:
+    """导出PNG的缓存键、后缀与生成函数"""
+    cache_key = pattern_cache_key(pattern, "export_png", cell_size=cell_size,
+                                  show_labels=show_labels, show_grid=True)
+
+    def _render(target):
+        pattern.save_image(target, cell_size=cell_size, show_labels=show_labels, show_grid=True)
+
+    return cache_key, "_export.png", _render
+
+
+def generate_pdf(pattern, pdf_path, paper_size: str = "A4", margin_mm: float = 10.0,
+                 show_grid: bool = True, show_labels: bool = True, dpi: int = 300,
+                 vector: bool = True, tiled: bool = False, overlap_cells: int = 2,
+                 printer: Optional[Printer] = None) -> None:
+    """生成打印PDF（pdf_path 为输出路径或二进制文件对象，tiled 为 1:1 分页打印）"""
+    printer = printer or Printer()
+    if tiled:
+        printer.generate_tiled_pdf(
+            pattern,
+            pdf_path,
+            paper_size=paper_size,
+            margin_mm=margin_mm,
+            overlap_cells=overlap_cells,
+            show_grid=show_grid,
+            show_labels=show_labels,
+            dpi=dpi,
+            vector=vector
+        )
+        return
+    printer.generate_pdf(
+        pattern,
+        pdf_path,
+        paper_size=paper_size,
+        margin_mm=margin_mm,
+        show_grid=show_grid,
+        show_labels=show_labels,
+        dpi=dpi,
+        vector=vector
+    )
+
+
+def print_build(pattern, paper_size: str = "A4", margin_mm: float = 10.0,
+                show_grid: bool = True, show_labels: bool = True, dpi: int = 300,
+                vector: bool = True, tiled: bool = False, overlap_cells: int = 2,
+                printer: Optional[Printer] = None) -> Build:
+    """打印PDF的缓存键、后缀与生成函数（矢量PDF不使用 dpi，非分页打印不使用 overlap_cells）"""
+    cache_key = pattern_cache_key(pattern, "print", paper_size=paper_size,
+                                  margin_mm=margin_mm, show_grid=show_grid,
+                                  show_labels=show_labels,
+                                  dpi=None if vector else dpi,
+                                  vector=vector, tiled=tiled,
+                                  overlap_cells=overlap_cells if tiled else None)
+
+    def _render(target):
+        generate_pdf(pattern, target, paper_size, margin_mm, show_grid, show_labels,
+                     dpi, vector, tiled, overlap_cells, printer=printer)
+
+    return cache_key, "_print.pdf", _render
+
+
+def technical_sheet_build(pattern, paginate: bool = False,
+                          cell_size: int = TECHNICAL_SHEET_CELL_SIZE,
+                          show_labels: bool = False,
+                          font_size: int = 12, color_block_size: int = 24,
+                          row_height: int = 32, panel_padding: int = 20,
+                          margin_from_pattern: int = 20,
+                          exclude_background: bool = True,
+                          paper_size: str = "A4") -> Build:
+    """
+    工程图纸的缓存键、后缀与生成函数
+
+    paginate 为 True 时生成分页 PDF（封面 + 带坐标标尺的分页主网格，
+    按色号可读的单元格大小分页，忽略 cell_size / show_labels），
+    否则生成单张 PNG（主网格分带渲染、流式写入，paper_size 不使用）
+    """
+    config = TechnicalPanelConfig(
+        font_size=font_size,
+        color_block_size=color_block_size,
+        row_height=row_height,
+        panel_padding=panel_padding,
+        margin_from_pattern=margin_from_pattern,
+        background_color=(255, 255, 255),
+        text_color=(0, 0, 0),
+        border_width=0,
+        header_font_size=font_size + 2
+    )
+
+    if paginate:
+        cell_size, show_labels = 0, True
+        renderer, suffix = "technical_sheet_pages", "_technical_sheet.pdf"
+    else:
+        paper_size = None
+        renderer, suffix = "technical_sheet", "_technical_sheet.png"
+
+    cache_key = pattern_cache_key(pattern, renderer, cell_size=cell_size,
+                                  show_labels=show_labels,
+                                  exclude_background=exclude_background,
+                                  paper_size=paper_size, **vars(config))
+
+    def _render(target):
+        if paginate:
+            save_technical_sheet_pdf(
+                pattern,
+                target,
+                cell_size=0,
+                show_grid=True,
+                show_labels=True,
+                config=config,
+                exclude_background=exclude_background,
+                paper_size=paper_size
+            )
+            return
+        save_technical_sheet(
+            pattern,
+            target,
+            cell_size=cell_size,
+            show_grid=True,
+            show_labels=show_labels,
+            config=config,
+            exclude_background=exclude_background
+        )
+
+    return cache_key, suffix, _render
+
+
+def statistics_build(pattern, format: str = "csv", exclude_background: bool = True) -> Build:
+    """颜色统计（json / csv）的缓存键、后缀与生成函数"""
+    cache_key = pattern_cache_key(pattern, "statistics", format=format,
+                                  exclude_background=exclude_background)
+
+    def _export_stats(target):
+        export_statistics(
+            pattern,
+            target,
+            format=format,
+            exclude_background=exclude_background
+        )
+
+    return cache_key, f"_statistics.{format}", _export_stats
+
+
+def json_build(pattern) -> Build:
+    """图案 JSON 的缓存键、后缀与生成函数"""
+    return pattern_cache_key(pattern, "export_json"), ".json", pattern.to_json
+
+
+def bundle_artifact(pattern, name: str, prefix: str = "pattern",
+                    printer: Optional[Printer] = None) -> Tuple[str, str, str, Callable]:
+    """
+    打包下载中单个文件的包内文件名、缓存键、后缀与生成函数
+
+    使用各导出函数的默认参数，与单独导出默认参数的文件共用缓存
+
+    Args:
+        pattern: 图案
+        name: BUNDLE_ARTIFACTS 之一
+        prefix: 包内文件名前缀
+        printer: 生成打印PDF使用的打印器（None 时新建）
+
+    Raises:
+        ValueError: 未知的文件名
+    """
+    if name == "png":
+        return (f"{prefix}.png",) + export_png_build(pattern, show_labels=False)
+    if name == "labeled_png":
+        return (f"{prefix}_labeled.png",) + export_png_build(pattern, show_labels=True)
+    if name == "json":
+        return (f"{prefix}.json",) + json_build(pattern)
+    if name == "statistics":
+        return (f"{prefix}_statistics.csv",) + statistics_build(pattern)
+    if name == "technical_sheet":
+        return (f"{prefix}_technical_sheet.png",) + technical_sheet_build(pattern)
+    if name == "pdf":
+        return (f"{prefix}.pdf",) + print_build(pattern, printer=printer)
+    raise ValueError(f"未知的打包文件: {name}")
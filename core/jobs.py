@@ -0,0 +1,392 @@
+"""
+后台任务模块
+长时间运行的处理步骤（预处理、图案生成、Nano Banana 调用）以任务方式执行：
+提交后立即返回任务 ID，客户端轮询或订阅进度，完成后获取结果
+
+- 任务由若干阶段组成，按顺序执行；每个阶段指定一个工作池，
+  每个工作池有独立的线程数（例如 Nano Banana 网络请求不占用 CPU 计算的线程）
+- 未完成的任务数有上限，超出时提交失败（JobQueueFull）
+- 进度：当前阶段、百分比（按阶段权重换算）、每个阶段的排队 / 执行耗时
+- 取消：排队中的阶段直接取消；执行中的阶段在下一次 check_cancelled()
+  或阶段结束时停止，结果丢弃
+- 已结束的任务保留 retention_seconds 秒供查询
+"""
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# 默认上限
+DEFAULT_MAX_PENDING = 32
+DEFAULT_RETENTION_SECONDS = 3600
+
+
+class JobQueueFull(Exception):
+    """未完成的任务数已达上限"""
+
+
+class JobCancelled(Exception):
+    """任务已被取消（阶段函数通过 check_cancelled() 抛出）"""
+
+
+class JobStage:
+    """任务阶段"""
+
+    __slots__ = ('name', 'func', 'pool', 'weight', 'label')
+
+    def __init__(self, name: str, func: Callable[['JobContext'], Any],
+                 pool: Optional[str] = None, weight: float = 1.0,
+                 label: Optional[str] = None):
+        """
+        Args:
+            name: 阶段名称（结果按名称保存在 ctx.results 中）
+            func: 阶段函数，参数为 JobContext，返回值为阶段结果
+            pool: 工作池名称（None 时与阶段同名）
+            weight: 进度权重（相对其他阶段的耗时比例）
+            label: 显示名称（None 时使用 name）
+        """
+        self.name = name
+        self.func = func
+        self.pool = pool or name
+        self.weight = weight
+        self.label = label or name
+
+
+class JobContext:
+    """传给阶段函数的上下文：读取前面阶段的结果、报告进度、检查取消"""
+
+    def __init__(self, job: 'Job'):
+        self._job = job
+
+    @property
+    def job_id(self) -> str:
+        return self._job.job_id
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        """已完成阶段的结果（阶段名称 -> 返回值）"""
+        return self._job.results
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_requested
+
+    def check_cancelled(self) -> None:
+        """任务已被取消时抛出 JobCancelled"""
+        if self._job.cancel_requested:
+            raise JobCancelled(self._job.job_id)
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """
+        报告当前阶段的进度
+
+        Args:
+            fraction: 当前阶段完成比例（0~1）
+            message: 进度说明
+        """
+        self._job._update(stage_fraction=min(max(fraction, 0.0), 1.0), message=message)
+
+
+class Job:
+    """任务状态（由 JobManager 创建和更新）"""
+
+    def __init__(self, kind: str, stages: List[JobStage]):
+        self.job_id = str(uuid.uuid4())
+        self.kind = kind
+        self.stages = stages
+        self.status = QUEUED
+        self.stage_index = 0
+        self.stage_fraction = 0.0
+        self.message: Optional[str] = None
+        self.results: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self.cancel_requested = False
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 每个阶段的 [进入队列, 开始执行, 结束] 时间
+        self.timings: List[List[Optional[float]]] = [[None, None, None] for _ in stages]
+
+        # 任务结束时完成（结果为任务自身），供 asyncio.wrap_future 等待
+        self.done: Future = Future()
+        self.version = 0
+        self._future: Optional[Future] = None
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def percent(self) -> float:
+        """按阶段权重换算的总进度（0~100）"""
+        if self.status == SUCCEEDED:
+            return 100.0
+        total = sum(stage.weight for stage in self.stages) or 1.0
+        done = sum(stage.weight for stage in self.stages[:self.stage_index])
+        if self.stage_index < len(self.stages):
+            done += self.stages[self.stage_index].weight * self.stage_fraction
+        return round(100.0 * done / total, 1)
+
+    def wait(self, version: int = -1, timeout: Optional[float] = None) -> int:
+        """
+        等待任务状态变化
+
+        Args:
+            version: 上次看到的版本号（当前版本不同则立即返回）
+            timeout: 超时时间（秒）
+
+        Returns:
+            当前版本号
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version or self.finished, timeout)
+            return self.version
+
+    def snapshot(self) -> Dict:
+        """
+        获取任务状态（不含结果）
+
+        Returns:
+            任务 ID、类型、状态、当前阶段、百分比、各阶段耗时等
+        """
+        now = time.time()
+        stages = []
+        for i, (stage, (queued, started, ended)) in enumerate(zip(self.stages, self.timings)):
+            if ended is not None:
+                state = "done" if i < self.stage_index or self.status == SUCCEEDED else self.status
+            elif started is not None:
+                state = RUNNING
+            elif queued is not None:
+                state = QUEUED
+            else:
+                state = "pending"
+            stages.append({
+                "name": stage.name,
+                "label": stage.label,
+                "status": state,
+                "wait_seconds": _elapsed(queued, started, now),
+                "run_seconds": _elapsed(started, ended, now),
+            })
+
+        current = self.stages[self.stage_index] if self.stage_index < len(self.stages) else None
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": current.name if current and not self.finished else None,
+            "stage_label": current.label if current and not self.finished else None,
+            "percent": self.percent,
+            "message": self.message,
+            "stages": stages,
+            "created_at": self.created_at,
+            "elapsed_seconds": round((self.finished_at or now) - self.created_at, 3),
+            "error": self.error,
+            "version": self.version,
+        }
+
+    def _update(self, **fields) -> None:
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+
+def _elapsed(start: Optional[float], end: Optional[float], now: float) -> Optional[float]:
+    if start is None:
+        return None
+    return round((end if end is not None else now) - start, 3)
+
+
+class JobManager:
+    """
+    任务管理器 - 按阶段分配到各自的工作池执行
+
+    阶段完成后再把下一阶段提交到对应的工作池，任务在等待某个池时不占用其他池的线程
+    """
+
+    def __init__(self, pools: Dict[str, int], max_pending: int = DEFAULT_MAX_PENDING,
+                 retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        """
+        初始化任务管理器
+
+        Args:
+            pools: 工作池名称 -> 线程数
+            max_pending: 未完成任务数上限
+            retention_seconds: 已结束任务的保留时间（秒）
+        """
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.pools = dict(pools)
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"job_{name}")
+            for name, workers in pools.items()
+        }
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, stages: List[JobStage]) -> Job:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型（如 "preprocess"）
+            stages: 按顺序执行的阶段
+
+        Returns:
+            Job 对象
+
+        Raises:
+            JobQueueFull: 未完成任务数已达上限
+            ValueError: 没有阶段或工作池不存在
+        """
+        if not stages:
+            raise ValueError("任务至少需要一个阶段")
+        for stage in stages:
+            if stage.pool not in self._executors:
+                raise ValueError(f"未知的工作池: {stage.pool}")
+
+        job = Job(kind, stages)
+        with self._lock:
+            self._prune(time.time())
+            pending = sum(1 for item in self._jobs.values() if not item.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"未完成的任务过多（{pending}/{self.max_pending}），请稍后重试")
+            self._jobs[job.job_id] = job
+        self._schedule(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """获取任务（不存在或已清理时返回 None）"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        取消任务
+
+        排队中的阶段立即取消；执行中的阶段结束后任务标记为已取消，结果丢弃
+
+        Returns:
+            Job 对象（不存在时返回 None）
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job._update(cancel_requested=True, message="正在取消")
+        future = job._future
+        if future is not None:
+            # 阶段尚未开始时取消成功，回调中把任务标记为已取消
+            future.cancel()
+        return job
+
+    def stats(self) -> Dict:
+        """
+        获取任务统计
+
+        Returns:
+            各状态的任务数和未完成任务上限
+        """
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"jobs": counts, "max_pending": self.max_pending,
+                    "pools": dict(self.pools)}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """取消所有未完成任务并关闭工作池"""
+        with self._lock:
+            job_ids = [job_id for job_id, job in self._jobs.items() if not job.finished]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+    # ---------- 内部实现 ----------
+
+    def _schedule(self, job: Job) -> None:
+        """把当前阶段提交到对应的工作池"""
+        if job.cancel_requested:
+            self._finish(job, CANCELLED)
+            return
+        stage = job.stages[job.stage_index]
+        job.timings[job.stage_index][0] = time.time()
+        job._update(stage_fraction=0.0, message=None)
+        try:
+            future = self._executors[stage.pool].submit(self._run_stage, job, job.stage_index)
+        except RuntimeError as e:
+            # 工作池已关闭
+            self._finish(job, FAILED, exception=e)
+            return
+        job._future = future
+        future.add_done_callback(lambda f: self._after_stage(job, f))
+
+    def _run_stage(self, job: Job, index: int) -> Any:
+        if job.cancel_requested:
+            raise JobCancelled(job.job_id)
+        now = time.time()
+        job.timings[index][1] = now
+        if job.started_at is None:
+            job.started_at = now
+        job._update(status=RUNNING)
+        return job.stages[index].func(JobContext(job))
+
+    def _after_stage(self, job: Job, future: Future) -> None:
+        index = job.stage_index
+        job.timings[index][2] = time.time()
+        if future.cancelled():
+            self._finish(job, CANCELLED)
+            return
+        exception = future.exception()
+        if isinstance(exception, JobCancelled) or (exception is None and job.cancel_requested):
+            self._finish(job, CANCELLED)
+            return
+        if exception is not None:
+            logger.error(f"任务失败: {job.kind} {job.job_id} 阶段 {job.stages[index].name}: {exception}",
+                         exc_info=(type(exception), exception, exception.__traceback__))
+            self._finish(job, FAILED, exception=exception)
+            return
+
+        result = future.result()
+        job.results[job.stages[index].name] = result
+        if index + 1 < len(job.stages):
+            job._update(stage_index=index + 1, stage_fraction=0.0)
+            self._schedule(job)
+        else:
+            job.result = result
+            self._finish(job, SUCCEEDED)
+
+    def _finish(self, job: Job, status: str, exception: Optional[BaseException] = None) -> None:
+        if job.finished:
+            return
+        job._update(status=status, finished_at=time.time(), exception=exception,
+                    error=(str(getattr(exception, 'detail', exception)) if exception is not None else None),
+                    message={CANCELLED: "已取消", FAILED: "失败"}.get(status))
+        job._future = None
+        job.done.set_result(job)
+
+    def _prune(self, now: float) -> None:
+        """删除超过保留时间的已结束任务（需持有锁）"""
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and now - job.finished_at > self.retention_seconds]:
+            del self._jobs[job_id]
@@ -0,0 +1,434 @@
+"""
+有界条目存储模块
+用于保存生成的图案、上传文件信息和分步处理结果
+
+- 内存层：按估算字节数限制的 LRU
+- 超出容量时淘汰最久未访问的条目并落盘：图案使用紧凑二进制格式
+  （bead_pattern.io.to_compact_bytes），其余字段 JSON（元组、非字符串键的字典
+  和 NumPy 标量带类型标记），不使用 pickle，读取落盘文件不会执行代码
+- 落盘目录和文件仅当前用户可读写（0700 / 0600）
+- 访问已落盘的条目时透明加载回内存
+- TTL：条目最后一次访问后超过 ttl_seconds 即过期，内存和磁盘上的副本都删除
+
+条目是普通字典；修改取出的字典后需要重新赋值（store[key] = entry），
+内存占用才会重新计算。
+"""
+import os
+import json
+import time
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bead_pattern import BeadPattern
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.io import to_compact_bytes, from_compact_bytes
+
+logger = logging.getLogger(__name__)
+
+
+# 默认容量与过期时间
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+# 网格每个单元格的内存（int32 颜色 ID）
+GRID_CELL_BYTES = 4
+# 色板每种颜色的估算内存（ColorInfo + LUT 行 + 字典项）
+PALETTE_ENTRY_BYTES = 256
+# 过期扫描的最小间隔（秒）
+SWEEP_INTERVAL_SECONDS = 60
+
+_ENTRY_SUFFIX = '.entry'
+# 落盘文件：魔数 + 头部长度（uint32 小端）+ JSON 头部 + 各图案的紧凑二进制数据
+_ENTRY_MAGIC = b'BPS1'
+# JSON 中标记特殊类型的键（tuple / dict / pattern）
+_TYPE_TAG = '__type__'
+
+
+def _to_json(value):
+    """
+    转换为可 JSON 序列化的值
+
+    元组和非字符串键的字典带类型标记，NumPy 标量转为 Python 标量；
+    其他类型原样返回（由 json.dumps 报错）
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TYPE_TAG: 'tuple', 'items': [_to_json(item) for item in value]}
+    if isinstance(value, dict):
+        if _TYPE_TAG not in value and all(isinstance(key, str) for key in value):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {_TYPE_TAG: 'dict',
+                'items': [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    return value
+
+
+def _from_json(value):
+    """_to_json 的逆变换"""
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if isinstance(value, dict):
+        kind = value.get(_TYPE_TAG)
+        if kind == 'tuple':
+            return tuple(_from_json(item) for item in value['items'])
+        if kind == 'dict':
+            return {_from_json(key): _from_json(item) for key, item in value['items']}
+        return {key: _from_json(item) for key, item in value.items()}
+    return value
+
+
+def _read_record(path: str, with_patterns: bool = True) -> Tuple[Dict, List[bytes]]:
+    """
+    读取落盘文件
+
+    Returns:
+        (头部, 各图案的紧凑二进制数据)；with_patterns 为 False 时只读头部
+
+    Raises:
+        ValueError: 文件格式错误或被截断
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(_ENTRY_MAGIC)) != _ENTRY_MAGIC:
+            raise ValueError("不是存储条目文件")
+        size = f.read(4)
+        if len(size) != 4:
+            raise ValueError("条目文件被截断")
+        header = json.loads(f.read(struct.unpack('<I', size)[0]).decode('utf-8'))
+        blobs = []
+        if with_patterns:
+            for length in header['blobs']:
+                blob = f.read(length)
+                if len(blob) != length:
+                    raise ValueError("条目文件被截断")
+                blobs.append(blob)
+    return header, blobs
+
+
+def _pattern_v2(value) -> Optional[BeadPatternV2]:
+    if isinstance(value, BeadPattern):
+        return value._v2
+    if isinstance(value, BeadPatternV2):
+        return value
+    return None
+
+
+def estimate_entry_bytes(entry: Dict) -> int:
+    """
+    估算条目的内存占用
+
+    图案按网格数组和色板大小计算，其余字段按 JSON 序列化后的大小计算
+
+    Args:
+        entry: 条目字典
+
+    Returns:
+        字节数
+    """
+    total = 0
+    rest = {}
+    for name, value in entry.items():
+        pattern = _pattern_v2(value)
+        if pattern is None:
+            rest[name] = value
+        else:
+            total += len(pattern.grid) * GRID_CELL_BYTES + PALETTE_ENTRY_BYTES * len(pattern.palette)
+    return total + len(json.dumps(_to_json(rest), default=repr))
+
+
+class PatternStore:
+    """
+    条目存储 - 内存 LRU（按字节数）+ 落盘 + TTL
+
+    用法与字典相同（in / [] / get / pop / len），值为条目字典
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        """
+        初始化存储
+
+        Args:
+            directory: 落盘目录（None 时在系统临时目录下新建私有目录），
+                不存在时创建，权限设为 0700
+            max_memory_bytes: 内存层容量（字节）
+            ttl_seconds: 最后一次访问后的保留时间（None 不过期）
+        """
+        self.directory = directory or tempfile.mkdtemp(prefix='bead_pattern_store_')
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        os.chmod(self.directory, 0o700)
+
+        self._memory: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._disk: Dict[str, int] = {}
+        self._disk_bytes = 0
+        self._created: Dict[str, float] = {}
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._next_sweep = 0.0
+
+        self.memory_hits = 0
+        self.disk_loads = 0
+        self.spills = 0
+        self.expirations = 0
+
+        self._scan_disk()
+
+    # ---------- 字典接口 ----------
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._live(key, time.time())
+
+    def __getitem__(self, key: str) -> Dict:
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key: str, entry: Dict) -> None:
+        size = estimate_entry_bytes(entry)
+        now = time.time()
+        with self._lock:
+            self._drop_disk(key)
+            self._memory_bytes -= self._sizes.get(key, 0)
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            self._sizes[key] = size
+            self._memory_bytes += size
+            self._created.setdefault(key, now)
+            self._accessed[key] = now
+            self._evict()
+            self._sweep(now)
+
+    def __delitem__(self, key: str) -> None:
+        if self.pop(key, None) is None:
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sweep(time.time(), force=True)
+            return len(self._memory) + len(self._disk)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._sweep(time.time(), force=True)
+            return iter(list(self._memory) + list(self._disk))
+
+    def get(self, key: str, default=None):
+        """获取条目（已落盘的条目加载回内存），不存在或已过期时返回 default"""
+        now = time.time()
+        with self._lock:
+            if not self._live(key, now):
+                return default
+            self._accessed[key] = now
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+            entry = self._load(key)
+            if entry is None:
+                return default
+            self.disk_loads += 1
+            self._memory[key] = entry
+            self._sizes[key] = estimate_entry_bytes(entry)
+            self._memory_bytes += self._sizes[key]
+            self._evict()
+            return entry
+
+    def pop(self, key: str, default=None):
+        """删除并返回条目"""
+        with self._lock:
+            entry = self.get(key)
+            if entry is None:
+                return default
+            self._forget(key)
+            return entry
+
+    # ---------- 统计 ----------
+
+    def entries(self) -> List[Dict]:
+        """
+        每个条目的大小与位置（监控用）
+
+        Returns:
+            [{"key", "location", "bytes", "age_seconds", "idle_seconds", "expires_in_seconds"}]，
+            内存中的条目按估算大小计，落盘条目按文件大小计
+        """
+        now = time.time()
+        with self._lock:
+            self._sweep(now, force=True)
+            result = []
+            for location, sizes in (('memory', self._sizes), ('disk', self._disk)):
+                for key, size in sizes.items():
+                    idle = now - self._accessed[key]
+                    result.append({
+                        'key': key,
+                        'location': location,
+                        'bytes': size,
+                        'age_seconds': round(now - self._created[key], 1),
+                        'idle_seconds': round(idle, 1),
+                        'expires_in_seconds': (round(self.ttl_seconds - idle, 1)
+                                               if self.ttl_seconds is not None else None),
+                    })
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取存储统计
+
+        Returns:
+            各层条目数与字节数、命中 / 加载 / 落盘 / 过期计数
+        """
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'max_memory_bytes': self.max_memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'memory_hits': self.memory_hits,
+                'disk_loads': self.disk_loads,
+                'spills': self.spills,
+                'expirations': self.expirations,
+            }
+
+    # ---------- 内部实现（需持有锁） ----------
+
+    def _path(self, key: str) -> str:
+        # 键来自请求参数，文件名使用哈希，不直接拼路径
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + _ENTRY_SUFFIX)
+
+    def _live(self, key: str, now: float) -> bool:
+        """条目是否存在且未过期（过期的顺便删除）"""
+        if key not in self._memory and key not in self._disk:
+            return False
+        if self.ttl_seconds is not None and now - self._accessed[key] > self.ttl_seconds:
+            self._forget(key)
+            self.expirations += 1
+            return False
+        return True
+
+    def _forget(self, key: str) -> None:
+        """从内存和磁盘删除条目"""
+        if key in self._memory:
+            del self._memory[key]
+            self._memory_bytes -= self._sizes.pop(key)
+        self._drop_disk(key)
+        self._created.pop(key, None)
+        self._accessed.pop(key, None)
+
+    def _drop_disk(self, key: str) -> None:
+        size = self._disk.pop(key, None)
+        if size is None:
+            return
+        self._disk_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """内存超出容量时把最久未访问的条目落盘（至少保留最新的一个）"""
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            key, entry = self._memory.popitem(last=False)
+            self._memory_bytes -= self._sizes.pop(key)
+            try:
+                self._spill(key, entry)
+            except Exception as e:
+                logger.warning(f"条目落盘失败，已丢弃: {key} ({e})")
+                self._created.pop(key, None)
+                self._accessed.pop(key, None)
+
+    def _spill(self, key: str, entry: Dict) -> None:
+        """写入磁盘（先写临时文件再替换，文件权限 0600）"""
+        fields = {}
+        blobs = []
+        for name, value in entry.items():
+            pattern = _pattern_v2(value)
+            if pattern is None:
+                fields[name] = _to_json(value)
+            else:
+                fields[name] = {_TYPE_TAG: 'pattern', 'index': len(blobs),
+                                'legacy': isinstance(value, BeadPattern)}
+                blobs.append(to_compact_bytes(pattern))
+        header = json.dumps({'key': key, 'created': self._created[key], 'entry': fields,
+                             'blobs': [len(blob) for blob in blobs]},
+                            ensure_ascii=False).encode('utf-8')
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_ENTRY_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        size = len(_ENTRY_MAGIC) + 4 + len(header) + sum(len(blob) for blob in blobs)
+        self._disk[key] = size
+        self._disk_bytes += size
+        self.spills += 1
+
+    def _load(self, key: str) -> Optional[Dict]:
+        """从磁盘加载并删除落盘文件"""
+        try:
+            header, blobs = _read_record(self._path(key))
+            entry = {}
+            for name, value in header['entry'].items():
+                if isinstance(value, dict) and value.get(_TYPE_TAG) == 'pattern':
+                    pattern = from_compact_bytes(blobs[value['index']])
+                    entry[name] = BeadPattern._from_v2(pattern) if value['legacy'] else pattern
+                else:
+                    entry[name] = _from_json(value)
+        except Exception as e:
+            logger.warning(f"落盘条目读取失败: {key} ({e})")
+            self._forget(key)
+            return None
+        self._drop_disk(key)
+        return entry
+
+    def _sweep(self, now: float, force: bool = False) -> None:
+        """删除所有过期条目（非强制时每 SWEEP_INTERVAL_SECONDS 最多一次）"""
+        if self.ttl_seconds is None or (not force and now < self._next_sweep):
+            return
+        self._next_sweep = now + SWEEP_INTERVAL_SECONDS
+        for key in [key for key, accessed in self._accessed.items()
+                    if now - accessed > self.ttl_seconds]:
+            self._forget(key)
+            self.expirations += 1
+
+    def _scan_disk(self) -> None:
+        """启动时登记上次运行留下的落盘条目（最后访问时间取文件修改时间）"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(_ENTRY_SUFFIX):
+                if name.endswith('.tmp'):
+                    os.remove(path)
+                continue
+            try:
+                record, _ = _read_record(path, with_patterns=False)
+                stat = os.stat(path)
+                key = record['key']
+            except Exception:
+                os.remove(path)
+                continue
+            self._disk[key] = stat.st_size
+            self._disk_bytes += stat.st_size
+            self._created[key] = record.get('created', stat.st_mtime)
+            self._accessed[key] = stat.st_mtime
+        self._sweep(time.time(), force=True)
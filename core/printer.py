@@ -3,8 +3,9 @@
 负责生成可打印的PDF和图像文件，支持同比例打印
 """
 import os
-from typing import Tuple, Optional, Dict
-from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
+from PIL import Image, ImageDraw
 import numpy as np
 from reportlab.lib.pagesizes import A4, letter
 from reportlab.lib.units import mm as mm_unit
@@ -12,6 +13,11 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 import io
 from core.bead_pattern import BeadPattern
+from bead_pattern.core.pattern import BeadPatternV2
+from bead_pattern.render.raster import render_pattern
+from bead_pattern.render.labels import build_label_sprites, fit_font_size
+from bead_pattern.render.fonts import get_font_registry
+from bead_pattern.io.pdf_io import draw_pattern_vector, register_pdf_fonts, label_font_size
 
 
 class Printer:
@@ -28,6 +34,10 @@ class Printer:
     # 拼豆标准尺寸（毫米）
     BEAD_SIZE_MM = 5.0
     
+    # 分页打印：页眉高度（毫米，页码与坐标范围）和对位标记半径（毫米）
+    TILE_HEADER_MM = 8.0
+    REGISTRATION_MARK_MM = 2.5
+    
     def __init__(self, bead_size_mm: float = 5.0):
         """
         初始化打印器
@@ -37,6 +47,31 @@ class Printer:
         """
         self.bead_size_mm = bead_size_mm
     
+    @staticmethod
+    def _as_pattern_v2(pattern) -> BeadPatternV2:
+        """
+        获取 BeadPatternV2（兼容层直接取内部对象，旧版图案逐格转换）
+        
+        Args:
+            pattern: BeadPatternV2、兼容层 BeadPattern 或旧版 core.bead_pattern.BeadPattern
+            
+        Returns:
+            BeadPatternV2对象
+        """
+        if isinstance(pattern, BeadPatternV2):
+            return pattern
+        if hasattr(pattern, '_v2'):
+            return pattern._v2
+        
+        pattern_v2 = BeadPatternV2(pattern.width, pattern.height, pattern.bead_size_mm)
+        for y in range(pattern.height):
+            for x in range(pattern.width):
+                bead = pattern.get_bead(x, y)
+                if bead is not None and bead.get('id') is not None:
+                    pattern_v2.palette.upsert_from_dict(bead)
+                    pattern_v2.grid.set_id(x, y, bead['id'])
+        return pattern_v2
+    
     def calculate_print_scale(self, pattern_width_mm: float, pattern_height_mm: float,
                              paper_size: str = 'A4', margin_mm: float = 10.0) -> Tuple[float, float]:
         """
@@ -107,154 +142,30 @@ class Printer:
         cell_size_mm = self.bead_size_mm * scale
         cell_size_px = int(cell_size_mm * mm_to_pixel)
         
-        font_cache: Dict[int, ImageFont.ImageFont] = {}
-        text_layout_cache: Dict[str, Tuple[ImageFont.ImageFont, int, int]] = {}
-        display_code_cache: Dict[str, str] = {}
-        
-        def get_font(size: int) -> ImageFont.ImageFont:
-            cached = font_cache.get(size)
-            if cached is not None:
-                return cached
-            try:
-                try:
-                    font = ImageFont.truetype("arial.ttf", size)
-                except:
-                    try:
-                        font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
-                    except:
-                        try:
-                            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size)
-                        except:
-                            font = ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-            font_cache[size] = font
-            return font
-        
-        if cell_size_px <= 15:
-            base_font_size = max(7, int(cell_size_px * 0.6))
-        elif cell_size_px <= 30:
-            base_font_size = max(9, int(cell_size_px * 0.6))
-        else:
-            base_font_size = max(12, int(cell_size_px * 0.5))
-        base_font = get_font(base_font_size)
-        if hasattr(draw, "fontmode"):
-            draw.fontmode = "1" if base_font_size <= 10 else "L"
-        stroke_width = max(1, cell_size_px // 30)
-        stroke_offsets = [
-            (adj_x, adj_y)
-            for adj_x in range(-stroke_width, stroke_width + 1)
-            for adj_y in range(-stroke_width, stroke_width + 1)
-            if adj_x != 0 or adj_y != 0
-        ]
-        
         # 计算图案在页面中的位置（居中）
         pattern_width_px = pattern.width * cell_size_px
         pattern_height_px = pattern.height * cell_size_px
         start_x = margin_px + (page_width_px - 2 * margin_px - pattern_width_px) // 2
         start_y = margin_px + (page_height_px - 2 * margin_px - pattern_height_px) // 2
         
-        # 绘制拼豆图案
-        for y in range(pattern.height):
-            for x in range(pattern.width):
-                bead = pattern.get_bead(x, y)
-                if bead is not None:
-                    rgb = bead.get('rgb', [255, 255, 255])
-                    
-                    rect = [
-                        start_x + x * cell_size_px,
-                        start_y + y * cell_size_px,
-                        start_x + (x + 1) * cell_size_px,
-                        start_y + (y + 1) * cell_size_px
-                    ]
-                    draw.rectangle(rect, fill=tuple(rgb))
-                    
-                    # 显示标签
-                    if show_labels:
-                        # 优先使用完整的code（包含品牌信息），如果没有则构建
-                        code = bead.get('code', '')
-                        if not code:
-                            # 如果没有code，尝试从品牌和色号构建
-                            brand = bead.get('brand', '')
-                            series = bead.get('series', '')
-                            color_name = bead.get('color_name', '')
-                            if brand and series and color_name:
-                                code = f"{brand}-{series}-{color_name}"
-                            elif color_name:
-                                code = color_name
-                        
-                        if code:
-                            # 统一只显示色号编号（最后一部分），不显示品牌和系列信息
-                            # 例如：COCO-291-A01 -> A01, Mard-120-B05 -> B05
-                            display_code = display_code_cache.get(code)
-                            if display_code is None:
-                                parts = code.split('-')
-                                if len(parts) > 1:
-                                    display_code = parts[-1]  # 只显示最后一部分（色号编号）
-                                else:
-                                    # 如果没有分隔符，直接使用code（可能是自定义色号）
-                                    display_code = code
-                                display_code_cache[code] = display_code
-                            
-                            cached_layout = text_layout_cache.get(display_code)
-                            if cached_layout is None:
-                                font = base_font
-                                bbox = draw.textbbox((0, 0), display_code, font=font)
-                                text_width = bbox[2] - bbox[0]
-                                text_height = bbox[3] - bbox[1]
-                                
-                                # 确保文字不超出格子，宽高都需要适配
-                                if text_width > cell_size_px * 0.8 or text_height > cell_size_px * 0.8:
-                                    width_scale = (cell_size_px * 0.8) / text_width if text_width else 1.0
-                                    height_scale = (cell_size_px * 0.8) / text_height if text_height else 1.0
-                                    text_scale = min(width_scale, height_scale)
-                                    adjusted_font_size = max(6, int(base_font_size * text_scale))
-                                    font = get_font(adjusted_font_size)
-                                    # 重新计算
-                                    bbox = draw.textbbox((0, 0), display_code, font=font)
-                                    text_width = bbox[2] - bbox[0]
-                                    text_height = bbox[3] - bbox[1]
-                                
-                                cached_layout = (font, text_width, text_height)
-                                text_layout_cache[display_code] = cached_layout
-                            
-                            font, text_width, text_height = cached_layout
-                            
-                            text_x = start_x + x * cell_size_px + (cell_size_px - text_width) // 2
-                            text_y = start_y + y * cell_size_px + (cell_size_px - text_height) // 2
-                            
-                            # 计算对比色（确保文字可读）
-                            brightness = (rgb[0] * 299 + rgb[1] * 587 + rgb[2] * 114) / 1000
-                            if brightness > 128:
-                                # 背景较亮，使用深色文字
-                                text_color = (0, 0, 0)
-                                stroke_color = (255, 255, 255)
-                            else:
-                                # 背景较暗，使用浅色文字
-                                text_color = (255, 255, 255)
-                                stroke_color = (0, 0, 0)
-                            
-                            # 添加描边以确保文字清晰可见
-                            # 先绘制描边（四周）
-                            for adj_x, adj_y in stroke_offsets:
-                                draw.text((text_x + adj_x, text_y + adj_y), display_code, 
-                                         fill=stroke_color, font=font)
-                            
-                            # 再绘制文字
-                            draw.text((text_x, text_y), display_code, fill=text_color, font=font)
-        
-        # 绘制网格线
-        if show_grid:
-            grid_color = (200, 200, 200)
-            for x in range(pattern.width + 1):
-                x_pos = start_x + x * cell_size_px
-                draw.line([(x_pos, start_y), (x_pos, start_y + pattern_height_px)],
-                         fill=grid_color, width=1)
-            
-            for y in range(pattern.height + 1):
-                y_pos = start_y + y * cell_size_px
-                draw.line([(start_x, y_pos), (start_x + pattern_width_px, y_pos)],
-                         fill=grid_color, width=1)
+        # 绘制拼豆图案：单元格颜色、色号精灵和网格线（含收边线）一次渲染后整体粘贴
+        if cell_size_px > 0:
+            pattern_v2 = self._as_pattern_v2(pattern)
+            label_sprites = None
+            if show_labels:
+                # 字号按最长的色号适配单元格（不超过 80%），每种颜色只光栅化一次
+                font_size = fit_font_size(pattern_v2, cell_size_px)
+                label_sprites = build_label_sprites(pattern_v2, cell_size_px, font_size,
+                                                    stroke_width=max(1, cell_size_px // 30))
+            pattern_image = render_pattern(
+                pattern_v2,
+                cell_size_px,
+                show_grid=show_grid,
+                grid_color=(200, 200, 200),
+                close_grid=show_grid,
+                label_sprites=label_sprites
+            )
+            canvas_image.paste(pattern_image, (start_x, start_y))
         
         # 添加信息文本
         info_text = [
@@ -264,10 +175,7 @@ class Printer:
             f"打印尺寸: {print_width_mm:.1f}mm × {print_height_mm:.1f}mm"
         ]
         
-        try:
-            info_font = ImageFont.truetype("arial.ttf", 12)
-        except:
-            info_font = ImageFont.load_default()
+        info_font = get_font_registry().get_font(12)
         
         y_offset = margin_px // 2
         for i, text in enumerate(info_text):
@@ -275,22 +183,29 @@ class Printer:
         
         return canvas_image
     
-    def generate_pdf(self, pattern: BeadPattern, output_path: str,
+    def generate_pdf(self, pattern: BeadPattern, output_path: Union[str, BinaryIO],
                     paper_size: str = 'A4', margin_mm: float = 10.0,
                     show_grid: bool = True, show_labels: bool = True,
-                    dpi: int = 300) -> None:
+                    dpi: int = 300, vector: bool = True) -> None:
         """
         生成PDF打印文件
         
         Args:
             pattern: 拼豆图案对象
-            output_path: 输出文件路径
+            output_path: 输出文件路径或二进制文件对象
             paper_size: 纸张大小
             margin_mm: 页边距（毫米）
             show_grid: 是否显示网格
             show_labels: 是否显示色号标签
-            dpi: 图像分辨率
+            dpi: 图像分辨率（仅位图模式）
+            vector: 矢量绘制（单元格为矩形、色号为嵌入字体的文字）；
+                    False 时嵌入 generate_print_image 的整页位图
         """
+        if vector:
+            self._generate_vector_pdf(pattern, output_path, paper_size, margin_mm,
+                                      show_grid, show_labels)
+            return
+        
         # 获取纸张尺寸
         if paper_size not in self.PAPER_SIZES:
             paper_size = 'A4'
@@ -345,6 +260,274 @@ class Printer:
         
         c.save()
     
+    def _generate_vector_pdf(self, pattern: BeadPattern, output_path: Union[str, BinaryIO],
+                             paper_size: str, margin_mm: float,
+                             show_grid: bool, show_labels: bool) -> None:
+        """
+        矢量PDF：版面与 generate_print_image 相同（同比例、居中、左上角信息文本）
+        """
+        scale, page_width_mm, page_height_mm = self.calculate_print_scale(
+            pattern.actual_width_mm, pattern.actual_height_mm, paper_size, margin_mm
+        )
+        print_width_mm = pattern.actual_width_mm * scale
+        print_height_mm = pattern.actual_height_mm * scale
+        
+        page_width_points = page_width_mm * mm_unit
+        page_height_points = page_height_mm * mm_unit
+        margin_points = margin_mm * mm_unit
+        cell_points = self.bead_size_mm * scale * mm_unit
+        
+        # 图案在页面中居中（PDF 坐标原点在左下角）
+        pattern_width_points = pattern.width * cell_points
+        pattern_height_points = pattern.height * cell_points
+        start_x = margin_points + (page_width_points - 2 * margin_points - pattern_width_points) / 2
+        start_top = page_height_points - margin_points - (
+            page_height_points - 2 * margin_points - pattern_height_points) / 2
+        
+        label_font, info_font = register_pdf_fonts()
+        c = canvas.Canvas(output_path, pagesize=(page_width_points, page_height_points))
+        draw_pattern_vector(c, self._as_pattern_v2(pattern), start_x, start_top, cell_points,
+                            show_grid=show_grid, show_labels=show_labels,
+                            font_name=label_font)
+        
+        info_text = [
+            f"图案尺寸: {pattern.width} × {pattern.height} 拼豆",
+            f"实际尺寸: {pattern.actual_width_mm:.1f}mm × {pattern.actual_height_mm:.1f}mm",
+            f"打印比例: {scale*100:.1f}%",
+            f"打印尺寸: {print_width_mm:.1f}mm × {print_height_mm:.1f}mm"
+        ]
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont(info_font, 7)
+        for i, text in enumerate(info_text):
+            c.drawString(margin_points, page_height_points - margin_points / 2 - (i + 1) * 8.5, text)
+        
+        c.save()
+    
+    @staticmethod
+    def _tile_starts(total: int, per_page: int, overlap: int) -> List[int]:
+        """每页起始格：相邻页重叠 overlap 格，最后一页不超出图案"""
+        starts = [0]
+        while starts[-1] + per_page < total:
+            starts.append(starts[-1] + per_page - overlap)
+        return starts
+    
+    def plan_tiled_pages(self, pattern_width: int, pattern_height: int,
+                         paper_size: str = 'A4', margin_mm: float = 10.0,
+                         overlap_cells: int = 2, bead_size_mm: Optional[float] = None) -> Dict:
+        """
+        规划 1:1 分页打印：每格按拼豆原尺寸打印，图案拆到多页
+        
+        纵向和横向纸张各算一次，取页数较少的方向（相同时取纵向）。
+        
+        Args:
+            pattern_width: 图案宽度（格）
+            pattern_height: 图案高度（格）
+            paper_size: 纸张大小
+            margin_mm: 页边距（毫米）
+            overlap_cells: 相邻页重叠的格数（拼接时对齐用）
+            bead_size_mm: 单个拼豆的尺寸（毫米），应取图案的 bead_size_mm；
+                None 时使用打印器的 bead_size_mm
+            
+        Returns:
+            {'bead_size_mm', 'cell_points', 'page_width_mm', 'page_height_mm',
+             'cells_x', 'cells_y', 'columns', 'rows',
+             'pages': [{'row', 'col', 'bounds': (min_x, min_y, max_x, max_y)}, ...]}
+            
+        Raises:
+            ValueError: 重叠格数为负，或一页放不下比重叠更多的格子
+        """
+        if overlap_cells < 0:
+            raise ValueError("重叠格数不能为负数")
+        if paper_size not in self.PAPER_SIZES:
+            paper_size = 'A4'
+        if bead_size_mm is None:
+            bead_size_mm = self.bead_size_mm
+        
+        best = None
+        short_mm, long_mm = self.PAPER_SIZES[paper_size]
+        for page_width_mm, page_height_mm in ((short_mm, long_mm), (long_mm, short_mm)):
+            cells_x = int((page_width_mm - 2 * margin_mm) // bead_size_mm)
+            cells_y = int((page_height_mm - 2 * margin_mm - self.TILE_HEADER_MM) // bead_size_mm)
+            if min(cells_x, cells_y) <= overlap_cells:
+                continue
+            xs = self._tile_starts(pattern_width, cells_x, overlap_cells)
+            ys = self._tile_starts(pattern_height, cells_y, overlap_cells)
+            if best is None or len(xs) * len(ys) < best['columns'] * best['rows']:
+                best = {
+                    'bead_size_mm': bead_size_mm,
+                    'cell_points': bead_size_mm * mm_unit,
+                    'page_width_mm': page_width_mm,
+                    'page_height_mm': page_height_mm,
+                    'cells_x': cells_x,
+                    'cells_y': cells_y,
+                    'columns': len(xs),
+                    'rows': len(ys),
+                    'pages': [
+                        {'row': row, 'col': col,
+                         'bounds': (x0, y0, min(x0 + cells_x, pattern_width),
+                                    min(y0 + cells_y, pattern_height))}
+                        for row, y0 in enumerate(ys) for col, x0 in enumerate(xs)
+                    ],
+                }
+        if best is None:
+            raise ValueError(f"{paper_size} 纸张在 {margin_mm}mm 页边距下每页容纳的拼豆不超过重叠格数 {overlap_cells}")
+        return best
+    
+    def generate_tiled_pdf(self, pattern: BeadPattern, output_path: Union[str, BinaryIO],
+                           paper_size: str = 'A4', margin_mm: float = 10.0,
+                           overlap_cells: int = 2, show_grid: bool = True,
+                           show_labels: bool = True, dpi: int = 300, vector: bool = True,
+                           max_workers: Optional[int] = None) -> Dict:
+        """
+        生成 1:1 分页打印 PDF（可直接作为熨烫模板拼接使用）
+        
+        每页打印图案的一块，不缩放（每格为图案的 bead_size_mm）；相邻页重叠 overlap_cells 格并用虚线标出重叠区，
+        图案四角画对位标记，页眉注明页码与坐标范围，边上每 10 格标注全局坐标。
+        位图模式下各页在线程池中并发渲染，然后按顺序写入同一个 PDF；
+        矢量模式直接在画布上逐页绘制。
+        
+        Args:
+            pattern: 拼豆图案对象
+            output_path: 输出文件路径或二进制文件对象
+            paper_size: 纸张大小
+            margin_mm: 页边距（毫米）
+            overlap_cells: 相邻页重叠的格数
+            show_grid: 是否显示网格
+            show_labels: 是否显示色号标签
+            dpi: 图像分辨率（仅位图模式）
+            vector: 矢量绘制；False 时各页嵌入并发渲染的位图
+            max_workers: 位图渲染线程数（None 取页数与 CPU 核数的较小值）
+            
+        Returns:
+            plan_tiled_pages 的分页结果
+        """
+        pattern_v2 = self._as_pattern_v2(pattern)
+        layout = self.plan_tiled_pages(pattern_v2.grid.width, pattern_v2.grid.height,
+                                       paper_size, margin_mm, overlap_cells,
+                                       bead_size_mm=pattern_v2.bead_size_mm)
+        pages = layout['pages']
+        
+        page_width_points = layout['page_width_mm'] * mm_unit
+        page_height_points = layout['page_height_mm'] * mm_unit
+        cell_points = layout['cell_points']
+        start_x = margin_mm * mm_unit
+        start_top = page_height_points - (margin_mm + self.TILE_HEADER_MM) * mm_unit
+        
+        label_font, info_font = register_pdf_fonts()
+        images = [None] * len(pages)
+        label_size = None
+        if not vector:
+            images = self._render_tile_images(pattern_v2, pages, layout['bead_size_mm'],
+                                              show_grid, show_labels, dpi, max_workers)
+        elif show_labels:
+            # 所有页使用同一字号
+            palette = pattern_v2.palette
+            present = np.unique(pattern_v2.grid.map_bands(palette.to_compact_indices))
+            codes = [palette.get_color(int(palette.sorted_ids[idx - 1])).display_code
+                     for idx in present[present > 0]]
+            label_size = label_font_size(cell_points, label_font, codes)
+        
+        c = canvas.Canvas(output_path, pagesize=(page_width_points, page_height_points))
+        for page, image in zip(pages, images):
+            min_x, min_y, max_x, max_y = page['bounds']
+            if image is None:
+                draw_pattern_vector(c, pattern_v2, start_x, start_top, cell_points,
+                                    show_grid=show_grid, show_labels=show_labels,
+                                    font_name=label_font, bounds=page['bounds'],
+                                    font_size=label_size)
+            else:
+                c.drawImage(image, start_x, start_top - (max_y - min_y) * cell_points,
+                            width=(max_x - min_x) * cell_points,
+                            height=(max_y - min_y) * cell_points)
+            self._draw_tile_marks(c, layout, page, start_x, start_top, cell_points,
+                                  overlap_cells, info_font)
+            c.showPage()
+        c.save()
+        return layout
+    
+    def _render_tile_images(self, pattern_v2: BeadPatternV2, pages: List[Dict],
+                            bead_size_mm: float, show_grid: bool, show_labels: bool, dpi: int,
+                            max_workers: Optional[int]) -> List[ImageReader]:
+        """在线程池中并发渲染各页位图（共享同一组色号精灵），按页序返回"""
+        cell_size_px = max(1, round(bead_size_mm / 25.4 * dpi))
+        label_sprites = None
+        if show_labels:
+            font_size = fit_font_size(pattern_v2, cell_size_px)
+            label_sprites = build_label_sprites(pattern_v2, cell_size_px, font_size,
+                                                stroke_width=max(1, cell_size_px // 30))
+        
+        def _render(page: Dict) -> ImageReader:
+            return ImageReader(render_pattern(
+                pattern_v2,
+                cell_size_px,
+                bounds=page['bounds'],
+                show_grid=show_grid,
+                grid_color=(200, 200, 200),
+                close_grid=show_grid,
+                label_sprites=label_sprites
+            ))
+        
+        if max_workers is None:
+            max_workers = min(len(pages), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return list(pool.map(_render, pages))
+    
+    def _draw_tile_marks(self, c, layout: Dict, page: Dict, start_x: float, start_top: float,
+                         cell_points: float, overlap_cells: int, info_font: str) -> None:
+        """分页打印的页眉、全局坐标、重叠区虚线和四角对位标记"""
+        min_x, min_y, max_x, max_y = page['bounds']
+        width_points = (max_x - min_x) * cell_points
+        height_points = (max_y - min_y) * cell_points
+        right = start_x + width_points
+        bottom = start_top - height_points
+        
+        c.saveState()
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont(info_font, 8)
+        c.drawString(start_x, start_top + self.TILE_HEADER_MM * mm_unit / 2,
+                     f"第 {page['row'] + 1}/{layout['rows']} 行，第 {page['col'] + 1}/{layout['columns']} 列"
+                     f"    列 {min_x + 1}-{max_x}，行 {min_y + 1}-{max_y}"
+                     f"    1:1 打印（{layout['bead_size_mm']:g}mm/颗，重叠 {overlap_cells} 颗）")
+        
+        # 全局坐标：每 10 格标注一次（1 起始）
+        c.setFont(info_font, 5)
+        for x in range(min_x, max_x):
+            if (x + 1) % 10 == 0:
+                c.drawCentredString(start_x + (x - min_x + 0.5) * cell_points, start_top + 1.5, str(x + 1))
+        for y in range(min_y, max_y):
+            if (y + 1) % 10 == 0:
+                c.drawRightString(start_x - 1.5, start_top - (y - min_y + 0.5) * cell_points - 1.8, str(y + 1))
+        
+        # 重叠区：本页开头的 overlap 格与上一页重复，末尾的 overlap 格与下一页重复
+        if overlap_cells > 0:
+            c.setStrokeColorRGB(0.85, 0.1, 0.1)
+            c.setLineWidth(0.6)
+            c.setDash(3, 2)
+            if page['col'] > 0:
+                c.line(start_x + overlap_cells * cell_points, start_top,
+                       start_x + overlap_cells * cell_points, bottom)
+            if page['col'] < layout['columns'] - 1:
+                c.line(right - overlap_cells * cell_points, start_top,
+                       right - overlap_cells * cell_points, bottom)
+            if page['row'] > 0:
+                c.line(start_x, start_top - overlap_cells * cell_points,
+                       right, start_top - overlap_cells * cell_points)
+            if page['row'] < layout['rows'] - 1:
+                c.line(start_x, bottom + overlap_cells * cell_points,
+                       right, bottom + overlap_cells * cell_points)
+            c.setDash()
+        
+        # 对位标记：图案四角的圆圈加十字
+        radius = self.REGISTRATION_MARK_MM * mm_unit
+        c.setStrokeColorRGB(0, 0, 0)
+        c.setLineWidth(0.3)
+        for corner_x, corner_y in ((start_x, start_top), (right, start_top),
+                                   (start_x, bottom), (right, bottom)):
+            c.circle(corner_x, corner_y, radius * 0.6, stroke=1, fill=0)
+            c.line(corner_x - radius, corner_y, corner_x + radius, corner_y)
+            c.line(corner_x, corner_y - radius, corner_x, corner_y + radius)
+        c.restoreState()
+    
     def generate_print_png(self, pattern: BeadPattern, output_path: str,
                           paper_size: str = 'A4', margin_mm: float = 10.0,
                           show_grid: bool = True, show_labels: bool = True,
@@ -96,6 +96,10 @@ class ConfigManager:
         """获取默认输出目录"""
         return str(self.data_dir / 'output')
 
+    def get_render_cache_dir(self) -> str:
+        """获取渲染缓存目录"""
+        return str(self.data_dir / 'cache' / 'render')
+
     def get(self, key, default=None):
         """获取配置值"""
         return self.config.get(key, default)
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from desktop.main_window import MainWindow
 from desktop.styles.theme_manager import ThemeManager
 from desktop.config import ConfigManager
+from bead_pattern.render.cache import configure_render_cache
 
 
 def main():
@@ -31,6 +32,9 @@ def main():
     # 配置管理器
     config = ConfigManager()
 
+    # 渲染结果缓存（导出时相同图案和参数直接复用）
+    configure_render_cache(config.get_render_cache_dir())
+
     # 应用主题
     theme_manager = ThemeManager()
     theme_manager.apply_light_blue_theme()
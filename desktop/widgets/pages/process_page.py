@@ -17,6 +17,7 @@ from core.image_processor import ImageProcessor
 from core.color_matcher import ColorMatcher
 from core.optimizer import PatternOptimizer
 from bead_pattern import BeadPattern
+from bead_pattern.render.plan import RenderPlan
 from desktop.config import ConfigManager
 
 
@@ -317,8 +318,10 @@ class ProcessPage(QWidget):
             bead_pattern.from_matched_colors(matched_colors)
 
             preview_cell_size = 8
-            viz_with_labels = bead_pattern.to_image(cell_size=preview_cell_size, show_labels=True, show_grid=True)
-            viz_no_labels = bead_pattern.to_image(cell_size=preview_cell_size, show_labels=False, show_grid=True)
+            # 两个预览共用底图，只在加标签前复制一次
+            previews = RenderPlan(bead_pattern, preview_cell_size, indexed=True).render(('grid', 'grid_labels'))
+            viz_with_labels = previews['grid_labels']
+            viz_no_labels = previews['grid']
 
             pattern_id = uuid.uuid4().hex
             viz_path_with = output_dir / f"{pattern_id}_viz.png"
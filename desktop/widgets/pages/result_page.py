@@ -11,10 +11,21 @@ from PyQt6.QtCore import Qt, pyqtSignal, QObject, QTimer, QSize
 from PyQt6.QtGui import QPixmap, QFont, QColor, QBrush
 from typing import Optional, Dict
 import os
+import uuid
 import threading
 import shutil
 import json
 import csv
+from functools import partial
+
+from bead_pattern.render.cache import get_render_cache
+from bead_pattern.render.plan import RenderPlan
+from core.exports import BUNDLE_ARTIFACTS, export_png_build, technical_sheet_build, bundle_artifact
+
+
+# 桌面端导出：PNG 使用较小的单元格，工程图自动计算单元格大小并显示色号
+EXPORT_PNG_CELL_SIZE = 20
+TECHNICAL_SHEET_OPTIONS = {"cell_size": 0, "show_labels": True}
 
 
 class ResultPage(QWidget):
@@ -32,6 +43,8 @@ class ResultPage(QWidget):
         self._export_thread = None
         self._progress_dialog = None
         self._worker_ref = None
+        self._transform_thread = None
+        self._transform_worker = None
         self.init_ui()
 
     def init_ui(self):
@@ -216,6 +229,41 @@ class ResultPage(QWidget):
 
         layout.addWidget(preview_group)
 
+        transform_group = QGroupBox("调整 / Adjust")
+        transform_group.setStyleSheet("""
+            QGroupBox {
+                border: 2px solid #E1E8F0;
+                border-radius: 8px;
+                margin-top: 5px;
+                padding-top: 12px;
+                font-weight: 600;
+                color: #357ABD;
+            }
+        """)
+        transform_layout = QHBoxLayout(transform_group)
+        transform_layout.setContentsMargins(15, 15, 15, 15)
+
+        # 直接在色号网格上变换，无需重新处理图片
+        self.transform_buttons = []
+        transforms = [
+            ("↔ 左右镜像", lambda p: p.mirror('horizontal')),
+            ("↕ 上下镜像", lambda p: p.mirror('vertical')),
+            ("↻ 顺时针90°", lambda p: p.rotate(90)),
+            ("↺ 逆时针90°", lambda p: p.rotate(270)),
+            ("✂ 裁剪到主体", lambda p: p.crop_to_subject(margin=1)),
+            ("▣ 加边1格", lambda p: p.pad(1, 1, 1, 1)),
+            ("✕2 放大", lambda p: p.upscale(2)),
+            ("÷2 缩小", lambda p: p.downscale(2)),
+        ]
+        for text, transform in transforms:
+            btn = QPushButton(text)
+            btn.clicked.connect(lambda _checked=False, t=transform: self.on_transform(t))
+            transform_layout.addWidget(btn)
+            self.transform_buttons.append(btn)
+        transform_layout.addStretch()
+
+        layout.addWidget(transform_group)
+
         export_group = QGroupBox("导出 / Export")
         export_group.setStyleSheet("""
             QGroupBox {
@@ -250,6 +298,10 @@ class ResultPage(QWidget):
         self.export_pdf_btn.clicked.connect(lambda: self.on_export('pdf'))
         export_layout.addWidget(self.export_pdf_btn)
 
+        self.export_all_btn = QPushButton("📦 导出全部")
+        self.export_all_btn.clicked.connect(lambda: self.on_export('bundle'))
+        export_layout.addWidget(self.export_all_btn)
+
         layout.addWidget(export_group)
         layout.addStretch()
 
@@ -434,6 +486,55 @@ class ResultPage(QWidget):
         self.toggle_numbers_btn.setText("🔢 隐藏编号" if "显示" in self.toggle_numbers_btn.text() else "🔢 显示编号")
         # TODO: 实现编号显示切换逻辑
 
+    def on_transform(self, transform) -> None:
+        """对当前图案做几何变换，后台渲染预览和统计后刷新页面"""
+        if not self.pattern_object:
+            QMessageBox.warning(self, "警告 / Warning", "请先生成图案 / Please generate pattern first")
+            return
+        if self._transform_thread and self._transform_thread.is_alive():
+            return
+
+        self._set_transform_buttons_enabled(False)
+
+        output_dir = os.path.dirname(self.pattern_path_no_labels) if self.pattern_path_no_labels else "."
+        worker = TransformWorker(transform, self.pattern_object, self.pattern_data, output_dir)
+
+        # 与导出相同，使用Python threading，结果通过信号回到界面线程
+        transform_thread = threading.Thread(target=worker.run, daemon=True)
+        worker.finished.connect(self._on_transform_finished)
+        worker.failed.connect(self._on_transform_failed)
+
+        self._transform_worker = worker
+        self._transform_thread = transform_thread
+
+        transform_thread.start()
+
+    def _on_transform_finished(self, result: Dict) -> None:
+        """变换完成，刷新预览和统计"""
+        self._set_transform_buttons_enabled(True)
+        worker, self._transform_worker = self._transform_worker, None
+        # 变换期间页面已重置或图案已替换时丢弃结果
+        if worker is None or self.pattern_object is not worker.pattern_object:
+            return
+
+        self.set_pattern_object(result['pattern'])
+        self.set_pattern_data(result['data'])
+        self.set_pattern_images(result['viz_path_no'], result['viz_path_with'])
+        self.set_color_statistics(result['color_counts'], result['color_details'],
+                                  result['data']['total_beads'])
+        self.update_zoom(100)
+
+    def _on_transform_failed(self, message: str) -> None:
+        """变换失败"""
+        self._set_transform_buttons_enabled(True)
+        self._transform_worker = None
+        QMessageBox.warning(self, "警告 / Warning", message)
+
+    def _set_transform_buttons_enabled(self, enabled: bool) -> None:
+        """启用/禁用变换按钮"""
+        for btn in getattr(self, 'transform_buttons', []):
+            btn.setEnabled(enabled)
+
     def on_export(self, format_type: str):
         """导出文件"""
         if not self.pattern_data:
@@ -450,12 +551,16 @@ class ResultPage(QWidget):
         elif format_type == 'png':
             file_dialog.setNameFilter("PNG Files (*.png)")
         elif format_type == 'technical':
-            file_dialog.setNameFilter("PNG Files (*.png)")
+            # PDF 为分页工程图：封面 + 带坐标标尺的分页主网格
+            file_dialog.setNameFilters(["PNG Files (*.png)", "分页PDF / Paginated PDF (*.pdf)"])
         elif format_type == 'pdf':
             file_dialog.setNameFilter("PDF Files (*.pdf)")
+        elif format_type == 'bundle':
+            # PNG、带色号PNG、JSON、统计CSV、工程图、PDF 打包为一个 ZIP
+            file_dialog.setNameFilter("ZIP Files (*.zip)")
 
-        # technical格式使用png作为文件后缀
-        suffix = format_type if format_type != 'technical' else 'png'
+        # technical格式使用png作为文件后缀，全部导出使用zip
+        suffix = {'technical': 'png', 'bundle': 'zip'}.get(format_type, format_type)
 
         file_dialog.setDefaultSuffix(suffix)
 
@@ -464,6 +569,8 @@ class ResultPage(QWidget):
         if file_dialog.exec():
             file_path = file_dialog.selectedFiles()[0]
             if not os.path.splitext(file_path)[1]:
+                if format_type == 'technical' and '*.pdf' in file_dialog.selectedNameFilter():
+                    suffix = 'pdf'
                 file_path = f"{file_path}.{suffix}"
             self.export_requested.emit((format_type, file_path))
 
@@ -826,6 +933,8 @@ class ResultPage(QWidget):
             self.export_csv_btn.setEnabled(enabled)
         if hasattr(self, 'export_pdf_btn'):
             self.export_pdf_btn.setEnabled(enabled)
+        if hasattr(self, 'export_all_btn'):
+            self.export_all_btn.setEnabled(enabled)
 
     def reset(self):
         """重置页面"""
@@ -842,6 +951,78 @@ class ResultPage(QWidget):
         self.update_zoom(100)
 
 
+class TransformWorker(QObject):
+    """几何变换线程（变换、渲染预览、统计颜色，不阻塞界面）"""
+
+    finished = pyqtSignal(object)  # 结果字典
+    failed = pyqtSignal(str)
+
+    def __init__(self, transform, pattern_object, pattern_data: Optional[Dict], output_dir: str):
+        super().__init__()
+        self.transform = transform
+        self.pattern_object = pattern_object
+        self.pattern_data = pattern_data
+        self.output_dir = output_dir
+
+    def run(self):
+        try:
+            new_pattern = self.transform(self.pattern_object)
+        except ValueError as exc:
+            self.failed.emit(str(exc))
+            return
+
+        try:
+            pattern_id = uuid.uuid4().hex
+            viz_path_with = os.path.join(self.output_dir, f"{pattern_id}_viz.png")
+            viz_path_no = os.path.join(self.output_dir, f"{pattern_id}_viz_no_labels.png")
+            previews = RenderPlan(new_pattern, 8, indexed=True).render(('grid', 'grid_labels'))
+            previews['grid_labels'].save(viz_path_with)
+            previews['grid'].save(viz_path_no)
+
+            stats = new_pattern.get_color_statistics(exclude_background=True)
+            color_counts = stats.get('color_counts', {})
+            color_details = {}
+            for color_id, count in color_counts.items():
+                color_info = new_pattern._v2.palette.get_color(color_id)
+                if color_info:
+                    color_details[color_id] = {
+                        'id': color_info.id,
+                        'code': color_info.display_code,
+                        'name_zh': color_info.name_zh,
+                        'name_en': color_info.name_en,
+                        'rgb': list(color_info.rgb)
+                    }
+
+            subject_size = new_pattern.get_subject_size()
+            data = dict(self.pattern_data or {})
+            data.update({
+                'width': new_pattern.width,
+                'height': new_pattern.height,
+                'actual_width_mm': new_pattern.actual_width_mm,
+                'actual_height_mm': new_pattern.actual_height_mm,
+                'color_count': stats.get('unique_colors', 0),
+                'total_beads': stats.get('total_beads', new_pattern.width * new_pattern.height),
+                'subject_width': subject_size['subject_width'],
+                'subject_height': subject_size['subject_height'],
+                'subject_width_mm': subject_size['subject_width_mm'],
+                'subject_height_mm': subject_size['subject_height_mm']
+            })
+        except Exception as exc:
+            import traceback
+            traceback.print_exc()
+            self.failed.emit(f"变换失败 / Transform failed: {exc}")
+            return
+
+        self.finished.emit({
+            'pattern': new_pattern,
+            'data': data,
+            'viz_path_no': viz_path_no,
+            'viz_path_with': viz_path_with,
+            'color_counts': color_counts,
+            'color_details': color_details,
+        })
+
+
 class ExportWorker(QObject):
     """导出线程"""
 
@@ -875,11 +1056,11 @@ class ExportWorker(QObject):
                 self.progress.emit(50, "合成图像 / Compositing image")
 
                 if self.pattern_object:
-                    export_image = self.pattern_object.to_image(cell_size=20, show_labels=True, show_grid=True)
-                    self.progress.emit(70, "准备保存 / Preparing save")
-                    self.progress.emit(80, "保存文件 / Saving")
-                    self.progress.emit(90, "完成保存 / Finishing save")
-                    export_image.save(self.file_path, compress_level=1)
+                    with get_render_cache().pinned(*export_png_build(
+                            self.pattern_object, show_labels=True,
+                            cell_size=EXPORT_PNG_CELL_SIZE)) as cached_path:
+                        self.progress.emit(80, "保存文件 / Saving")
+                        shutil.copyfile(cached_path, self.file_path)
                 elif self.labeled_path and os.path.exists(self.labeled_path):
                     self.progress.emit(60, "使用缓存图像 / Using cached image")
                     self.progress.emit(80, "保存文件 / Saving")
@@ -894,11 +1075,6 @@ class ExportWorker(QObject):
                 return
 
             if self.format_type == 'technical':
-                from bead_pattern.render.technical_panel import (
-                    TechnicalPanelConfig,
-                    generate_technical_sheet
-                )
-
                 self.progress.emit(20, "准备生成工程图 / Preparing technical sheet")
                 self.progress.emit(40, "渲染基础图案 / Rendering base pattern")
                 self.progress.emit(60, "生成信息面板 / Generating info panel")
@@ -906,29 +1082,12 @@ class ExportWorker(QObject):
 
                 try:
                     if self.pattern_object:
-                        config = TechnicalPanelConfig(
-                            font_size=12,
-                            color_block_size=24,
-                            row_height=32,
-                            panel_padding=20,
-                            margin_from_pattern=20,
-                            background_color=(255, 255, 255),
-                            text_color=(0, 0, 0),
-                            border_width=0,
-                            header_font_size=14
-                        )
-
-                        tech_sheet = generate_technical_sheet(
-                            self.pattern_object,
-                            cell_size=0,  # 自动计算，确保色号可读
-                            show_grid=True,
-                            show_labels=True,  # 显示色号
-                            config=config,
-                            exclude_background=True
-                        )
-
-                        self.progress.emit(90, "保存文件 / Saving")
-                        tech_sheet.save(self.file_path, compress_level=1)
+                        # .pdf 导出分页工程图（超出一页的大图案不再生成巨幅画布）
+                        paginate = self.file_path.lower().endswith('.pdf')
+                        with get_render_cache().pinned(*technical_sheet_build(
+                                self.pattern_object, paginate, **TECHNICAL_SHEET_OPTIONS)) as cached_path:
+                            self.progress.emit(90, "保存文件 / Saving")
+                            shutil.copyfile(cached_path, self.file_path)
                         self.progress.emit(100, "导出完成 / Export completed")
                         self.finished.emit(True, "工程图导出成功 / Technical sheet exported successfully")
                     else:
@@ -941,6 +1100,10 @@ class ExportWorker(QObject):
                     self.finished.emit(False, f"导出失败 / Export failed: {exc}")
                 return
 
+            if self.format_type == 'bundle':
+                self._export_bundle()
+                return
+
             if self.format_type == 'json':
                 if not self.pattern_data:
                     self.progress.emit(60, "错误 / Error")
@@ -976,3 +1139,37 @@ class ExportWorker(QObject):
             import traceback
             traceback.print_exc()
             self.finished.emit(False, f"导出失败 / Export failed: {exc}")
+
+    def _export_bundle(self):
+        """全部导出：各文件并发生成（已缓存的直接读取），按完成顺序写入 ZIP"""
+        if not self.pattern_object:
+            self.progress.emit(60, "错误 / Error")
+            self.finished.emit(False, "没有可导出的图案 / No pattern to export")
+            return
+
+        from bead_pattern.io import stream_zip
+
+        # 与 Web 打包下载使用相同的文件、参数和缓存键；JSON 导出桌面端的图案数据
+        pattern = self.pattern_object
+        cache = get_render_cache()
+        files = {}
+        for name in BUNDLE_ARTIFACTS:
+            if name == "json":
+                continue
+            arcname, cache_key, suffix, build = bundle_artifact(pattern, name)
+            files[arcname] = partial(cache.get_bytes, cache_key, suffix, build)
+        if self.pattern_data:
+            files["pattern.json"] = lambda: json.dumps(
+                self.pattern_data, ensure_ascii=False, indent=2).encode('utf-8')
+
+        self.progress.emit(10, "正在生成文件 / Rendering files")
+
+        def _on_complete(name: str, done: int, total: int):
+            self.progress.emit(10 + 85 * done // total, f"{name} ({done}/{total})")
+
+        with open(self.file_path, 'wb') as f:
+            for chunk in stream_zip(files, on_complete=_on_complete):
+                f.write(chunk)
+
+        self.progress.emit(100, "导出完成 / Export completed")
+        self.finished.emit(True, "全部导出完成 / All files exported")
@@ -0,0 +1,81 @@
+"""
+工程蓝图合成基准测试：冷启动 vs 面板缓存命中
+
+依次切换网格显示选项（网格线、色号、加粗线）重复合成，
+只有第一次需要渲染 Title Block 和 BOM，其余直接复用面板缓存。
+
+用法：
+    python scripts/bench_blueprint.py [尺寸 ...]      # 默认 100 200
+"""
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bead_pattern.render.blueprint import BlueprintConfig, composite_blueprint
+from bead_pattern.render.blueprint.compositor import (
+    get_panel_cache, prepare_blueprint, render_blueprint_info,
+)
+from bead_pattern.bench.bench_render import create_test_pattern
+
+
+GRID_OPTIONS = [
+    {},
+    {'show_grid': False},
+    {'show_labels': False},
+    {'show_major_grid': False},
+]
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_blueprint(size: int, num_colors: int = 60) -> dict:
+    """
+    合成 size×size 图案的工程蓝图
+
+    Returns:
+        {"info_cold_ms", "info_cached_ms", "composite_cold_ms", "composite_cached_ms"}
+    """
+    pattern = create_test_pattern(size, size, num_colors=num_colors)
+    config = BlueprintConfig()
+    parts = prepare_blueprint(pattern, config)
+
+    cache = get_panel_cache()
+    cache.clear()
+    info_cold = _timed(lambda: render_blueprint_info(parts, config))
+    info_cached = _timed(lambda: render_blueprint_info(parts, config))
+
+    cache.clear()
+    composite_cold = _timed(lambda: composite_blueprint(pattern, BlueprintConfig()))
+    cached = [_timed(lambda: composite_blueprint(pattern, BlueprintConfig(**options)))
+              for options in GRID_OPTIONS[1:]]
+    return {
+        "info_cold_ms": info_cold,
+        "info_cached_ms": info_cached,
+        "composite_cold_ms": composite_cold,
+        "composite_cached_ms": sum(cached) / len(cached),
+    }
+
+
+def main(sizes):
+    print("工程蓝图合成基准测试（A4 @ 300dpi，60 色）")
+    print("=" * 60)
+    for size in sizes:
+        result = bench_blueprint(size)
+        print(f"{size}×{size}:")
+        print(f"  信息区: 首次 {result['info_cold_ms']:.1f}ms, 缓存命中 {result['info_cached_ms']:.1f}ms")
+        print(f"  整图合成: 首次 {result['composite_cold_ms']:.0f}ms, "
+              f"切换网格选项 {result['composite_cached_ms']:.0f}ms")
+    print(f"面板缓存: {get_panel_cache().stats()}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 200])
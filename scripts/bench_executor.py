@@ -0,0 +1,105 @@
+"""
+CPU 阶段执行器吞吐量基准测试：线程 vs 进程池（共享内存）
+
+模拟 N 个并发请求，每个请求依次执行图像优化（KMeans 减色）、颜色匹配和带色号的预览渲染，
+由 max(4, 进程数) 个线程提交（与服务端任务池相同，线程数不少于工作进程数）；
+thread 执行器在这些线程中直接计算，process 执行器把计算交给工作进程
+（每个进程预加载一次色板和字体）。
+
+多核机器（例如 8 核）上 process 的吞吐量应随核心数增长；单核机器上两者接近，
+process 还要多付出进程间传输的开销。
+
+用法：
+    python scripts/bench_executor.py [请求数] [图像边长] [进程数]      # 默认 16 160 CPU核心数
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.chdir(project_root)
+
+from core.color_matcher import ColorMatcher
+from core.optimizer import PatternOptimizer
+from core.executor import create_stage_executor
+
+# 与 app.py 的 thread_pool_executor 相同
+REQUEST_THREADS = 4
+
+
+def make_image(size: int, seed: int) -> np.ndarray:
+    """白底 + 随机色块的测试图像"""
+    rng = np.random.default_rng(seed)
+    image = np.full((size, size, 3), 255, dtype=np.uint8)
+    margin = size // 8
+    for _ in range(12):
+        x0, y0 = rng.integers(margin, size - 2 * margin, 2)
+        w, h = rng.integers(margin, 3 * margin, 2)
+        image[y0:y0 + h, x0:x0 + w] = rng.integers(0, 256, 3)
+    return image
+
+
+def run_request(executor, image: np.ndarray) -> float:
+    """一次完整请求，返回耗时（秒）"""
+    start = time.perf_counter()
+    optimized, (width, height) = executor.optimize_image(
+        image, target_colors=20, max_dimension=100, use_custom=True
+    )
+    pattern = executor.match_pattern(optimized, width, height, 2.6, method="cie76")
+    executor.render_preview(pattern, "grid_labels", io.BytesIO())
+    return time.perf_counter() - start
+
+
+def bench(kind: str, requests: int, size: int, workers: int) -> dict:
+    color_matcher = ColorMatcher()
+    executor = create_stage_executor(kind, color_matcher, PatternOptimizer(color_matcher),
+                                     max_workers=workers)
+    images = [make_image(size, seed) for seed in range(requests)]
+    try:
+        # 预热：进程池启动、工作进程加载色板和字体
+        warm = ThreadPoolExecutor(max_workers=workers)
+        list(warm.map(lambda image: run_request(executor, image), images[:workers]))
+        warm.shutdown()
+
+        pool = ThreadPoolExecutor(max_workers=max(REQUEST_THREADS, workers))
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda image: run_request(executor, image), images))
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+    finally:
+        executor.shutdown()
+
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "elapsed_s": elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+def main(requests: int, size: int, workers: int):
+    print(f"CPU 阶段执行器基准测试（{requests} 个并发请求，{size}×{size} 图像，"
+          f"{workers} 个工作进程，{os.cpu_count()} 核）")
+    print("=" * 60)
+    results = {}
+    for kind in ("thread", "process"):
+        results[kind] = bench(kind, requests, size, workers)
+        r = results[kind]
+        print(f"{kind:8s}: {r['throughput']:.2f} 请求/秒, 总计 {r['elapsed_s']:.1f}s, "
+              f"p50 {r['p50_ms']:.0f}ms, p95 {r['p95_ms']:.0f}ms")
+    print(f"加速比: {results['process']['throughput'] / results['thread']['throughput']:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    defaults = [16, 160, os.cpu_count() or 1]
+    main(*(args + defaults[len(args):]))
@@ -0,0 +1,54 @@
+"""
+打印PDF基准测试：矢量PDF vs 嵌入整页位图的PDF
+
+用法：
+    python scripts/bench_print_pdf.py [尺寸 ...]      # 默认 100 300
+"""
+import io
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.printer import Printer
+from bead_pattern import BeadPattern
+from bead_pattern.bench.bench_render import create_test_pattern
+
+
+def bench_pdf(size: int, vector: bool, iterations: int = 3) -> dict:
+    """
+    生成 size×size 图案的 A4 PDF
+
+    Returns:
+        {"avg_time_ms": ..., "size_kb": ...}
+    """
+    pattern = BeadPattern._from_v2(create_test_pattern(size, size, num_colors=20))
+    printer = Printer()
+    times = []
+    data = b''
+    for _ in range(iterations):
+        out = io.BytesIO()
+        start = time.perf_counter()
+        printer.generate_pdf(pattern, out, vector=vector)
+        times.append((time.perf_counter() - start) * 1000)
+        data = out.getvalue()
+    return {"avg_time_ms": sum(times) / len(times), "size_kb": len(data) / 1024}
+
+
+def main(sizes):
+    print("打印PDF基准测试（A4，网格 + 色号）")
+    print("=" * 60)
+    for size in sizes:
+        raster = bench_pdf(size, vector=False, iterations=1)
+        vector = bench_pdf(size, vector=True)
+        print(f"{size}×{size}:")
+        print(f"  位图: {raster['avg_time_ms']:.0f}ms, {raster['size_kb']:.0f}KB")
+        print(f"  矢量: {vector['avg_time_ms']:.0f}ms, {vector['size_kb']:.0f}KB")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 300])
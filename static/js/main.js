@@ -162,8 +162,11 @@ function initializeUI() {
                         <button class="btn btn-success" id="exportJsonBtn">导出JSON</button>
                         <button class="btn btn-success" id="exportCsvBtn">导出CSV</button>
                         <button class="btn btn-success" id="exportPngBtn">导出PNG</button>
+                        <button class="btn btn-success" id="exportSvgBtn">导出SVG</button>
                         <button class="btn btn-secondary" id="printPreviewBtn">打印预览</button>
                         <button class="btn btn-secondary" id="printBtn">生成PDF</button>
+                        <button class="btn btn-secondary" id="printTiledBtn">1:1分页PDF</button>
+                        <button class="btn btn-primary" id="exportBundleBtn">打包下载</button>
                     </div>
                     <div class="print-preview hidden" id="printPreviewArea"></div>
                 </div>
@@ -273,6 +276,10 @@ function setupStepButtons() {
     if (refreshGenerateRenderBtn) {
         refreshGenerateRenderBtn.addEventListener('click', runGenerateRender);
     }
+    const localBeadPreviewBtn = document.getElementById('localBeadPreviewBtn');
+    if (localBeadPreviewBtn) {
+        localBeadPreviewBtn.addEventListener('click', runLocalBeadPreview);
+    }
     
     // Nano Banana最大尺寸滑块
     const nanoBananaMaxDimension = document.getElementById('nanoBananaMaxDimension');
@@ -603,9 +610,13 @@ function setupExportButtons() {
     const exportJsonBtn = document.getElementById('exportJsonBtn');
     const exportCsvBtn = document.getElementById('exportCsvBtn');
     const exportPngBtn = document.getElementById('exportPngBtn');
+    const exportSvgBtn = document.getElementById('exportSvgBtn');
     const exportTechnicalSheetBtn = document.getElementById('exportTechnicalSheetBtn');
+    const exportTechnicalPagesBtn = document.getElementById('exportTechnicalPagesBtn');
     const printPreviewBtn = document.getElementById('printPreviewBtn');
     const printBtn = document.getElementById('printBtn');
+    const printTiledBtn = document.getElementById('printTiledBtn');
+    const exportBundleBtn = document.getElementById('exportBundleBtn');
 
     // 使用 onclick 属性，避免重复绑定问题
     if (exportJsonBtn) {
@@ -617,16 +628,28 @@ function setupExportButtons() {
     if (exportPngBtn) {
         exportPngBtn.onclick = () => exportPattern('png');
     }
+    if (exportSvgBtn) {
+        exportSvgBtn.onclick = () => exportPattern('svg');
+    }
     if (exportTechnicalSheetBtn) {
-        exportTechnicalSheetBtn.onclick = exportTechnicalSheet;
+        exportTechnicalSheetBtn.onclick = () => exportTechnicalSheet(false);
+    }
+    if (exportTechnicalPagesBtn) {
+        exportTechnicalPagesBtn.onclick = () => exportTechnicalSheet(true);
     }
     if (printPreviewBtn) {
         printPreviewBtn.onclick = showPrintPreview;
     }
     if (printBtn) {
-        printBtn.onclick = generatePrint;
+        printBtn.onclick = () => generatePrint(false);
         console.log('PDF按钮事件已绑定:', printBtn);
     }
+    if (printTiledBtn) {
+        printTiledBtn.onclick = () => generatePrint(true);
+    }
+    if (exportBundleBtn) {
+        exportBundleBtn.onclick = exportBundle;
+    }
 }
 
 // 拖拽处理
@@ -765,10 +788,10 @@ async function handleProcess() {
     try {
         showLoading('正在处理图像，请稍候...');
         
-        const response = await fetch('/api/process', {
+        const response = await runJob('/api/process', {
             method: 'POST',
             body: formData
-        });
+        }, job => showLoading(`正在处理图像: ${formatJobProgress(job)}`));
         
         if (!response.ok) {
             // 尝试获取详细错误信息
@@ -861,8 +884,23 @@ async function exportPattern(format) {
     }
 }
 
+// 打包下载（PNG、带色号PNG、JSON、统计CSV、工程图、PDF）
+// 服务端边生成边写入 ZIP，直接交给浏览器下载，不在页面中缓存整个压缩包
+function exportBundle() {
+    if (!currentPatternId) {
+        showError('请先生成图案');
+        return;
+    }
+    
+    const a = document.createElement('a');
+    a.href = `/api/pattern/${currentPatternId}/bundle`;
+    a.download = `pattern_${currentPatternId}.zip`;
+    a.click();
+    showSuccess('正在打包下载...');
+}
+
 // 导出工程图（含信息面板）
-async function exportTechnicalSheet() {
+async function exportTechnicalSheet(paginate = false) {
     if (!currentPatternId) {
         showError('请先生成图案');
         return;
@@ -879,7 +917,9 @@ async function exportTechnicalSheet() {
             show_dimensions: true,
             show_bead_size: true,
             sort_by_count: true,
-            exclude_background: true
+            exclude_background: true,
+            paginate: paginate,  // 分页 PDF：大图案按页拆分，带坐标标尺
+            paper_size: 'A4'
         };
 
         const response = await fetch(`/api/pattern/${currentPatternId}/technical-sheet`, {
@@ -898,7 +938,7 @@ async function exportTechnicalSheet() {
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
-        a.download = `pattern_${currentPatternId}_technical_sheet.png`;
+        a.download = `pattern_${currentPatternId}_technical_sheet.${paginate ? 'pdf' : 'png'}`;
         a.click();
         window.URL.revokeObjectURL(url);
 
@@ -941,8 +981,8 @@ async function showPrintPreview() {
     }
 }
 
-// 生成打印PDF
-async function generatePrint() {
+// 生成打印PDF（tiled: 1:1 原尺寸分页打印，拼接后可直接作熨烫模板）
+async function generatePrint(tiled = false) {
     if (!currentPatternId) {
         showError('请先生成图案');
         return;
@@ -954,7 +994,9 @@ async function generatePrint() {
             margin_mm: 10.0,
             show_grid: true,
             show_labels: true,  // 默认显示色号
-            dpi: 300
+            dpi: 300,
+            tiled: tiled,
+            overlap_cells: 2
         };
         
         const response = await fetch(`/api/pattern/${currentPatternId}/print`, {
@@ -966,14 +1008,15 @@ async function generatePrint() {
         });
         
         if (!response.ok) {
-            throw new Error('生成PDF失败');
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.detail || '生成PDF失败');
         }
         
         const blob = await response.blob();
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
-        a.download = `pattern_${currentPatternId}.pdf`;
+        a.download = tiled ? `pattern_${currentPatternId}_tiled.pdf` : `pattern_${currentPatternId}.pdf`;
         a.click();
         window.URL.revokeObjectURL(url);
         
@@ -1040,6 +1083,62 @@ function showSuccess(message) {
     console.log(message);
 }
 
+// 任务进度文字：阶段 + 百分比 + 说明
+function formatJobProgress(job) {
+    const parts = [];
+    if (job.stage_label) parts.push(job.stage_label);
+    parts.push(`${Math.round(job.percent)}%`);
+    if (job.message) parts.push(job.message);
+    return parts.join(' · ');
+}
+
+// 以后台任务方式执行处理步骤：提交后通过 SSE 接收进度，结束后获取结果
+// 返回结果请求的 Response，调用方按普通 fetch 的结果处理；
+// requestOptions.signal 中止时同时取消服务端任务
+async function runJob(url, requestOptions, onProgress) {
+    requestOptions.body.append('async_job', 'true');
+    const submitResponse = await fetch(url, requestOptions);
+    if (submitResponse.status !== 202) {
+        // 参数错误、队列已满等
+        return submitResponse;
+    }
+    
+    const job = await submitResponse.json();
+    const signal = requestOptions.signal;
+    
+    await new Promise((resolve) => {
+        const source = new EventSource(job.events_url);
+        const finish = () => {
+            source.close();
+            resolve();
+        };
+        source.addEventListener('progress', (event) => {
+            if (onProgress) onProgress(JSON.parse(event.data));
+        });
+        source.addEventListener('end', finish);
+        // 连接中断时改为轮询结果
+        source.onerror = finish;
+        if (signal) {
+            signal.addEventListener('abort', () => {
+                fetch(job.cancel_url, { method: 'POST' });
+                finish();
+            }, { once: true });
+        }
+    });
+    
+    if (signal && signal.aborted) {
+        throw new Error('执行已停止');
+    }
+    
+    let response = await fetch(job.result_url, { signal });
+    while (response.status === 202) {
+        if (onProgress) onProgress(await response.json());
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        response = await fetch(job.result_url, { signal });
+    }
+    return response;
+}
+
 // ============ 分步骤处理功能 ============
 
 // 启用步骤按钮（现在只启用刷新按钮）
@@ -1123,7 +1222,9 @@ async function runNanoBanana() {
             requestOptions.signal = executionController.signal;
         }
         
-        const response = await fetch('/api/step/nano-banana', requestOptions);
+        const response = await runJob('/api/step/nano-banana', requestOptions, job => {
+            resultDiv.innerHTML = `<div class="loading">正在调用Nano Banana API转换图片... ${formatJobProgress(job)}</div>`;
+        });
         
         // 检查是否被中止
         if (response.status === 0 || shouldStopExecution) {
@@ -1239,7 +1340,9 @@ async function runPreprocess() {
             requestOptions.signal = executionController.signal;
         }
         
-        const response = await fetch('/api/step/preprocess', requestOptions);
+        const response = await runJob('/api/step/preprocess', requestOptions, job => {
+            resultDiv.innerHTML = `<div class="loading">正在预处理图像... ${formatJobProgress(job)}</div>`;
+        });
         
         // 检查是否被中止
         if (response.status === 0 || shouldStopExecution) {
@@ -1352,7 +1455,9 @@ async function runGeneratePattern() {
             requestOptions.signal = executionController.signal;
         }
         
-        const response = await fetch('/api/step/generate-pattern', requestOptions);
+        const response = await runJob('/api/step/generate-pattern', requestOptions, job => {
+            resultDiv.innerHTML = `<div class="loading">正在生成拼豆图案... ${formatJobProgress(job)}</div>`;
+        });
         
         // 检查是否被中止
         if (response.status === 0 || shouldStopExecution) {
@@ -1393,6 +1498,11 @@ async function runGeneratePattern() {
                         ${showLabels ? '隐藏编号' : '显示编号'}
                     </button>
                 </div>
+                ${useTileViewer(data) ? `
+                <div class="tile-viewer" id="patternTileViewer"></div>
+                ` : data.grid_url ? `
+                <div class="tile-viewer" id="patternCanvasViewer"></div>
+                ` : `
                 <div class="image-viewer" onclick="toggleImageZoom(this)">
                     <img id="patternImage" src="${showLabels ? vizUrlWithLabels : vizUrlNoLabels}" alt="拼豆图案" style="max-width: 100%; margin-top: 10px;">
                     <div class="zoom-controls">
@@ -1401,6 +1511,7 @@ async function runGeneratePattern() {
                         <button class="zoom-btn" onclick="event.stopPropagation(); resetImageZoom(this.parentElement.parentElement)">重置</button>
                     </div>
                 </div>
+                `}
                 <div style="margin-top: 15px; padding: 10px; background: white; border-radius: 5px;">
                     ${(() => {
                         const sw = data.subject_width || 0;
@@ -1482,6 +1593,17 @@ async function runGeneratePattern() {
         // 保存当前pattern_id以便后续使用
         window.currentPatternId = data.pattern_id;
         
+        // 超大图案使用瓦片查看器（按需加载 256×256 瓦片），其余在 canvas 上本地绘制
+        if (useTileViewer(data)) {
+            window.currentPatternViewer = createTileViewer(
+                document.getElementById('patternTileViewer'), data.pattern_id, data.tiles, showLabels);
+        } else if (data.grid_url) {
+            window.currentPatternViewer = createCanvasViewer(
+                document.getElementById('patternCanvasViewer'), data.grid_url, showLabels);
+        } else {
+            window.currentPatternViewer = null;
+        }
+        
         console.log('保存图案URL:', {
             patternId: data.pattern_id,
             withLabels: window.currentPatternVizUrlWithLabels,
@@ -1656,6 +1778,39 @@ function toggleColorList() {
     }
 }
 
+// 步骤4: 本地拼豆实物效果预览（不调用 Nano Banana）
+function runLocalBeadPreview() {
+    const patternId = currentPatternId || (stepStatus.generate_pattern && stepStatus.generate_pattern.pattern_id);
+    if (!patternId) {
+        showError('请先生成拼豆图案');
+        return;
+    }
+    
+    const resultDiv = document.getElementById('generateRenderResult');
+    const meltedCheckbox = document.getElementById('beadPreviewMelted');
+    const melted = !!(meltedCheckbox && meltedCheckbox.checked);
+    const url = `/api/pattern/${patternId}/bead-preview.png?melted=${melted}`;
+    
+    resultDiv.innerHTML = '<div class="loading">正在生成本地预览...</div>';
+    const img = new Image();
+    img.alt = '本地实物效果预览';
+    img.style.cssText = 'max-width: 100%; margin-top: 10px; border-radius: 5px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);';
+    img.onload = () => {
+        resultDiv.innerHTML = `
+            <div class="result-info">
+                <h3>✓ 本地预览${melted ? '（熔烫效果）' : ''}</h3>
+                <p style="color: #666;">本地模拟效果，满意后可点击"刷新"使用 Nano Banana 生成实物效果图</p>
+            </div>
+        `;
+        resultDiv.querySelector('.result-info').appendChild(img);
+    };
+    img.onerror = () => {
+        resultDiv.innerHTML = '';
+        showError('本地预览生成失败');
+    };
+    img.src = url;
+}
+
 // 步骤4: 生成实物效果图
 async function runGenerateRender() {
     if (!currentFileId) {
@@ -1727,7 +1882,9 @@ async function runGenerateRender() {
             requestOptions.signal = executionController.signal;
         }
         
-        const response = await fetch('/api/step/generate-render', requestOptions);
+        const response = await runJob('/api/step/generate-render', requestOptions, job => {
+            resultDiv.innerHTML = `<div class="loading">正在使用Nano Banana生成实物效果图... ${formatJobProgress(job)}</div>`;
+        });
         
         // 检查是否被中止
         if (response.status === 0 || shouldStopExecution) {
@@ -2076,6 +2233,406 @@ function resetImageZoom(viewer) {
     img.style.transform = 'scale(1)';
 }
 
+// 超过该拼豆数的图案改用瓦片查看器，不再加载整幅预览图
+const TILE_VIEWER_MIN_BEADS = 200 * 200;
+
+function useTileViewer(data) {
+    return !!(data && data.tiles && data.width * data.height > TILE_VIEWER_MIN_BEADS);
+}
+
+/**
+ * 瓦片查看器：拖动平移、滚轮/按钮缩放，只加载视口内的瓦片
+ * 瓦片地址 /api/pattern/{id}/tiles/{z}/{x}/{y}.png，由浏览器按 Cache-Control / ETag 缓存
+ */
+function createTileViewer(container, patternId, tiles, showLabels) {
+    if (!container || !tiles) return null;
+    
+    const tileSize = tiles.tile_size;
+    const layer = document.createElement('div');
+    layer.className = 'tile-layer';
+    const info = document.createElement('div');
+    info.className = 'tile-zoom-info';
+    const controls = document.createElement('div');
+    controls.className = 'zoom-controls';
+    controls.innerHTML = `
+        <button class="zoom-btn" data-action="in">+</button>
+        <button class="zoom-btn" data-action="out">-</button>
+        <button class="zoom-btn" data-action="reset">重置</button>
+    `;
+    container.innerHTML = '';
+    container.append(layer, info, controls);
+    
+    const state = {
+        z: 0,
+        offsetX: 0,   // 视口左上角在当前层级中的像素坐标
+        offsetY: 0,
+        labels: showLabels,
+        images: new Map()
+    };
+    
+    function cellSize(z) {
+        return tiles.max_cell_size / Math.pow(2, tiles.max_zoom - z);
+    }
+    
+    function levelSize(z) {
+        const cs = cellSize(z);
+        return [Math.ceil(tiles.width * cs), Math.ceil(tiles.height * cs)];
+    }
+    
+    // 能完整放入视口的最大层级
+    function fitZoom() {
+        for (let z = tiles.max_zoom; z > 0; z--) {
+            const [w, h] = levelSize(z);
+            if (w <= container.clientWidth && h <= container.clientHeight) return z;
+        }
+        return 0;
+    }
+    
+    function clampOffset() {
+        const [w, h] = levelSize(state.z);
+        const viewW = container.clientWidth;
+        const viewH = container.clientHeight;
+        // 图案小于视口时居中
+        state.offsetX = w <= viewW ? (w - viewW) / 2 : Math.min(Math.max(0, state.offsetX), w - viewW);
+        state.offsetY = h <= viewH ? (h - viewH) / 2 : Math.min(Math.max(0, state.offsetY), h - viewH);
+    }
+    
+    function render() {
+        clampOffset();
+        const [w, h] = levelSize(state.z);
+        const cols = Math.ceil(w / tileSize);
+        const rows = Math.ceil(h / tileSize);
+        const x0 = Math.max(0, Math.floor(state.offsetX / tileSize));
+        const y0 = Math.max(0, Math.floor(state.offsetY / tileSize));
+        const x1 = Math.min(cols - 1, Math.floor((state.offsetX + container.clientWidth) / tileSize));
+        const y1 = Math.min(rows - 1, Math.floor((state.offsetY + container.clientHeight) / tileSize));
+        
+        layer.style.transform = `translate(${-state.offsetX}px, ${-state.offsetY}px)`;
+        
+        const visible = new Set();
+        for (let y = y0; y <= y1; y++) {
+            for (let x = x0; x <= x1; x++) {
+                const key = `${state.z}/${x}/${y}/${state.labels ? 1 : 0}`;
+                visible.add(key);
+                if (state.images.has(key)) continue;
+                const img = document.createElement('img');
+                img.src = `/api/pattern/${patternId}/tiles/${state.z}/${x}/${y}.png?labels=${state.labels}`;
+                img.alt = '';
+                img.draggable = false;
+                img.style.left = `${x * tileSize}px`;
+                img.style.top = `${y * tileSize}px`;
+                layer.appendChild(img);
+                state.images.set(key, img);
+            }
+        }
+        // 移除视口外和其他层级的瓦片
+        for (const [key, img] of state.images) {
+            if (!visible.has(key)) {
+                img.remove();
+                state.images.delete(key);
+            }
+        }
+        
+        info.textContent = `缩放 ${state.z}/${tiles.max_zoom}`;
+    }
+    
+    // 以视口内 (px, py) 为中心缩放到层级 z
+    function zoomTo(z, px, py) {
+        z = Math.max(0, Math.min(tiles.max_zoom, z));
+        if (z === state.z) return;
+        const scale = Math.pow(2, z - state.z);
+        state.offsetX = (state.offsetX + px) * scale - px;
+        state.offsetY = (state.offsetY + py) * scale - py;
+        state.z = z;
+        render();
+    }
+    
+    function zoomAtCenter(delta) {
+        zoomTo(state.z + delta, container.clientWidth / 2, container.clientHeight / 2);
+    }
+    
+    function reset() {
+        state.z = fitZoom();
+        state.offsetX = 0;
+        state.offsetY = 0;
+        render();
+    }
+    
+    controls.addEventListener('click', (e) => {
+        const action = e.target.dataset.action;
+        if (action === 'in') zoomAtCenter(1);
+        else if (action === 'out') zoomAtCenter(-1);
+        else if (action === 'reset') reset();
+    });
+    
+    container.addEventListener('wheel', (e) => {
+        e.preventDefault();
+        const rect = container.getBoundingClientRect();
+        zoomTo(state.z + (e.deltaY < 0 ? 1 : -1), e.clientX - rect.left, e.clientY - rect.top);
+    }, { passive: false });
+    
+    let drag = null;
+    container.addEventListener('pointerdown', (e) => {
+        if (e.target.closest('.zoom-controls')) return;
+        drag = { x: e.clientX, y: e.clientY };
+        container.classList.add('dragging');
+        container.setPointerCapture(e.pointerId);
+    });
+    container.addEventListener('pointermove', (e) => {
+        if (!drag) return;
+        state.offsetX -= e.clientX - drag.x;
+        state.offsetY -= e.clientY - drag.y;
+        drag = { x: e.clientX, y: e.clientY };
+        render();
+    });
+    const endDrag = () => {
+        drag = null;
+        container.classList.remove('dragging');
+    };
+    container.addEventListener('pointerup', endDrag);
+    container.addEventListener('pointercancel', endDrag);
+    
+    reset();
+    
+    return {
+        setLabels(labels) {
+            state.labels = labels;
+            render();
+        },
+        get showLabels() {
+            return state.labels;
+        }
+    };
+}
+
+// 与服务端渲染一致：单元格 ≥8px 显示网格线，≥16px 显示色号
+const CANVAS_GRID_MIN_CELL = 8;
+const CANVAS_LABEL_MIN_CELL = 16;
+
+// 与 bead_pattern.render.labels.compute_base_font_size 一致
+function computeBaseFontSize(cellSize) {
+    if (cellSize <= 15) return Math.max(7, Math.floor(cellSize * 0.6));
+    if (cellSize <= 30) return Math.max(9, Math.floor(cellSize * 0.6));
+    return Math.max(12, Math.floor(cellSize * 0.5));
+}
+
+// 解码紧凑图案数据（/api/pattern/{id}/grid）
+function decodeCompactGrid(payload) {
+    const binary = atob(payload.indices);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    const indices = payload.dtype === 'uint16' ? new Uint16Array(bytes.buffer) : bytes;
+    
+    const colors = payload.palette.map(c => {
+        const [r, g, b] = c.rgb;
+        const dark = (r * 299 + g * 587 + b * 114) / 1000 <= 128;
+        return {
+            label: c.label,
+            fill: `rgb(${r}, ${g}, ${b})`,
+            text: dark ? '#fff' : '#000',
+            stroke: dark ? '#000' : '#fff'
+        };
+    });
+    
+    // 每个拼豆一个像素的底图，缩放时用最近邻绘制
+    const base = document.createElement('canvas');
+    base.width = payload.width;
+    base.height = payload.height;
+    const baseCtx = base.getContext('2d');
+    const image = baseCtx.createImageData(payload.width, payload.height);
+    for (let i = 0; i < indices.length; i++) {
+        const rgb = payload.palette[indices[i]].rgb;
+        image.data[i * 4] = rgb[0];
+        image.data[i * 4 + 1] = rgb[1];
+        image.data[i * 4 + 2] = rgb[2];
+        image.data[i * 4 + 3] = 255;
+    }
+    baseCtx.putImageData(image, 0, 0);
+    
+    return { width: payload.width, height: payload.height, indices, colors, base };
+}
+
+/**
+ * canvas 查看器：从紧凑图案数据在本地绘制单元格、网格线和色号
+ * 拖动平移、滚轮/按钮缩放，切换编号只重绘，不请求服务端
+ */
+function createCanvasViewer(container, gridUrl, showLabels) {
+    if (!container) return null;
+    
+    const canvas = document.createElement('canvas');
+    canvas.style.width = '100%';
+    canvas.style.height = '100%';
+    const info = document.createElement('div');
+    info.className = 'tile-zoom-info';
+    const controls = document.createElement('div');
+    controls.className = 'zoom-controls';
+    controls.innerHTML = `
+        <button class="zoom-btn" data-action="in">+</button>
+        <button class="zoom-btn" data-action="out">-</button>
+        <button class="zoom-btn" data-action="reset">重置</button>
+    `;
+    container.innerHTML = '';
+    container.append(canvas, info, controls);
+    info.textContent = '加载中...';
+    
+    const state = {
+        grid: null,
+        cell: 1,       // 每个拼豆的屏幕像素
+        originX: 0,    // 图案左上角的屏幕坐标
+        originY: 0,
+        labels: showLabels
+    };
+    
+    function draw() {
+        const grid = state.grid;
+        if (!grid) return;
+        
+        const ratio = window.devicePixelRatio || 1;
+        const viewW = container.clientWidth;
+        const viewH = container.clientHeight;
+        if (canvas.width !== Math.round(viewW * ratio) || canvas.height !== Math.round(viewH * ratio)) {
+            canvas.width = Math.round(viewW * ratio);
+            canvas.height = Math.round(viewH * ratio);
+        }
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.clearRect(0, 0, viewW, viewH);
+        ctx.imageSmoothingEnabled = false;
+        
+        const cell = state.cell;
+        ctx.drawImage(grid.base, state.originX, state.originY, grid.width * cell, grid.height * cell);
+        
+        // 只处理视口内的单元格
+        const x0 = Math.max(0, Math.floor(-state.originX / cell));
+        const y0 = Math.max(0, Math.floor(-state.originY / cell));
+        const x1 = Math.min(grid.width, Math.ceil((viewW - state.originX) / cell));
+        const y1 = Math.min(grid.height, Math.ceil((viewH - state.originY) / cell));
+        
+        if (state.labels && cell >= CANVAS_LABEL_MIN_CELL) {
+            ctx.font = `${computeBaseFontSize(Math.floor(cell))}px "Segoe UI", "Microsoft YaHei", sans-serif`;
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'middle';
+            ctx.lineWidth = 2;
+            ctx.lineJoin = 'round';
+            for (let y = y0; y < y1; y++) {
+                const cy = state.originY + (y + 0.5) * cell;
+                for (let x = x0; x < x1; x++) {
+                    const idx = grid.indices[y * grid.width + x];
+                    if (idx === 0) continue;
+                    const color = grid.colors[idx];
+                    const cx = state.originX + (x + 0.5) * cell;
+                    ctx.strokeStyle = color.stroke;
+                    ctx.strokeText(color.label, cx, cy);
+                    ctx.fillStyle = color.text;
+                    ctx.fillText(color.label, cx, cy);
+                }
+            }
+        }
+        
+        if (cell >= CANVAS_GRID_MIN_CELL) {
+            ctx.strokeStyle = 'rgb(200, 200, 200)';
+            ctx.lineWidth = 1;
+            ctx.beginPath();
+            for (let x = x0; x <= x1; x++) {
+                const px = Math.round(state.originX + x * cell) + 0.5;
+                ctx.moveTo(px, state.originY + y0 * cell);
+                ctx.lineTo(px, state.originY + y1 * cell);
+            }
+            for (let y = y0; y <= y1; y++) {
+                const py = Math.round(state.originY + y * cell) + 0.5;
+                ctx.moveTo(state.originX + x0 * cell, py);
+                ctx.lineTo(state.originX + x1 * cell, py);
+            }
+            ctx.stroke();
+        }
+        
+        info.textContent = `${Math.round(cell * 10) / 10} px/格`;
+    }
+    
+    // 以视口内 (px, py) 为中心缩放
+    function zoomBy(factor, px, py) {
+        if (!state.grid) return;
+        const cell = Math.max(0.25, Math.min(64, state.cell * factor));
+        const scale = cell / state.cell;
+        state.originX = px - (px - state.originX) * scale;
+        state.originY = py - (py - state.originY) * scale;
+        state.cell = cell;
+        draw();
+    }
+    
+    function reset() {
+        if (!state.grid) return;
+        const viewW = container.clientWidth;
+        const viewH = container.clientHeight;
+        state.cell = Math.min(viewW / state.grid.width, viewH / state.grid.height);
+        state.originX = (viewW - state.grid.width * state.cell) / 2;
+        state.originY = (viewH - state.grid.height * state.cell) / 2;
+        draw();
+    }
+    
+    controls.addEventListener('click', (e) => {
+        const action = e.target.dataset.action;
+        const cx = container.clientWidth / 2;
+        const cy = container.clientHeight / 2;
+        if (action === 'in') zoomBy(1.5, cx, cy);
+        else if (action === 'out') zoomBy(1 / 1.5, cx, cy);
+        else if (action === 'reset') reset();
+    });
+    
+    container.addEventListener('wheel', (e) => {
+        e.preventDefault();
+        const rect = container.getBoundingClientRect();
+        zoomBy(e.deltaY < 0 ? 1.25 : 0.8, e.clientX - rect.left, e.clientY - rect.top);
+    }, { passive: false });
+    
+    let drag = null;
+    container.addEventListener('pointerdown', (e) => {
+        if (e.target.closest('.zoom-controls')) return;
+        drag = { x: e.clientX, y: e.clientY };
+        container.classList.add('dragging');
+        container.setPointerCapture(e.pointerId);
+    });
+    container.addEventListener('pointermove', (e) => {
+        if (!drag) return;
+        state.originX += e.clientX - drag.x;
+        state.originY += e.clientY - drag.y;
+        drag = { x: e.clientX, y: e.clientY };
+        draw();
+    });
+    const endDrag = () => {
+        drag = null;
+        container.classList.remove('dragging');
+    };
+    container.addEventListener('pointerup', endDrag);
+    container.addEventListener('pointercancel', endDrag);
+    
+    fetch(gridUrl)
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return response.json();
+        })
+        .then(payload => {
+            state.grid = decodeCompactGrid(payload);
+            reset();
+        })
+        .catch(error => {
+            console.error('加载图案数据失败:', error);
+            info.textContent = '加载图案数据失败';
+        });
+    
+    return {
+        setLabels(labels) {
+            state.labels = labels;
+            draw();
+        },
+        get showLabels() {
+            return state.labels;
+        }
+    };
+}
+
 // 加载色板信息
 async function loadColorPalette() {
     try {
@@ -2223,6 +2780,15 @@ function togglePatternLabels() {
     const patternImage = document.getElementById('patternImage');
     const toggleBtn = document.getElementById('toggleLabelsBtn');
     
+    // 瓦片 / canvas 查看器：本地切换，无需请求另一张预览图
+    if (window.currentPatternViewer) {
+        const newShowLabels = !window.currentPatternViewer.showLabels;
+        window.currentPatternViewer.setLabels(newShowLabels);
+        window.currentPatternShowLabels = newShowLabels;
+        if (toggleBtn) toggleBtn.textContent = newShowLabels ? '隐藏编号' : '显示编号';
+        return;
+    }
+    
     if (!patternImage) {
         console.error('找不到patternImage元素');
         return;